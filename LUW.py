@@ -3,7 +3,10 @@
 import smartpy as sp
 
 class LUW(sp.Contract):
-    def __init__(self, certifier):
+    def __init__(self, certifier, page_limit = 100):
+        # Maximum number of states and of repositories returned by one fetch_page call
+        self.page_limit = page_limit
+
         self.init_type(
             sp.TRecord(
                 luw_map = sp.TBigMap(
@@ -12,16 +15,26 @@ class LUW(sp.Contract):
                         creator_wallet_address = sp.TAddress,
                         provider_id = sp.TString,
                         luw_service_endpoint = sp.TAddress,
-                        state_history = sp.TMap(
-                            sp.TNat,
-                            sp.TNat
-                        ),
-                        repository_endpoints = sp.TMap(
-                            sp.TString,
-                            sp.TNat
-                        ),
+                        active_state_id = sp.TNat,
+                        state_count = sp.TNat,
+                        repository_count = sp.TNat,
                     )
                 ),
+                # (luw_id, sequence number) -> state_id, sequence numbers start from 1
+                state_history = sp.TBigMap(
+                    sp.TPair(sp.TNat, sp.TNat),
+                    sp.TNat
+                ),
+                # (luw_id, repository_id) -> state_id
+                repository_states = sp.TBigMap(
+                    sp.TPair(sp.TNat, sp.TString),
+                    sp.TNat
+                ),
+                # (luw_id, index) -> repository_id, in the order the repositories were added
+                repository_index = sp.TBigMap(
+                    sp.TPair(sp.TNat, sp.TNat),
+                    sp.TString
+                ),
                 luw_last_id = sp.TNat,
                 logic_contract_address = sp.TOption(sp.TAddress),
                 certifier = sp.TAddress
@@ -29,11 +42,38 @@ class LUW(sp.Contract):
         )
         self.init(
             luw_map = sp.big_map(),
+            state_history = sp.big_map(),
+            repository_states = sp.big_map(),
+            repository_index = sp.big_map(),
             luw_last_id = 0,
             logic_contract_address = sp.none,
             certifier = certifier
         )
 
+    ###########
+    # Helpers #
+    ###########
+
+    # Full state history of a LUW, as stored before the storage was normalized
+    def build_state_history(self, luw_id, state_count):
+        state_history = sp.local("state_history", sp.map(tkey = sp.TNat, tvalue = sp.TNat))
+
+        sp.for state_key in sp.range(1, state_count + 1):
+            state_history.value[state_key] = self.data.state_history[sp.pair(luw_id, state_key)]
+
+        return state_history.value
+
+    # All repositories of a LUW with their states, as stored before the storage was normalized
+    def build_repository_endpoints(self, luw_id, repository_count):
+        repository_endpoints = sp.local("repository_endpoints", sp.map(tkey = sp.TString, tvalue = sp.TNat))
+        repository_id = sp.local("repository_id", "")
+
+        sp.for repository_key in sp.range(0, repository_count):
+            repository_id.value = self.data.repository_index[sp.pair(luw_id, repository_key)]
+            repository_endpoints.value[repository_id.value] = self.data.repository_states[sp.pair(luw_id, repository_id.value)]
+
+        return repository_endpoints.value
+
     @sp.entry_point
     def add(self, provider_id, luw_service_endpoint):
         sp.set_type(provider_id, sp.TString)
@@ -47,11 +87,16 @@ class LUW(sp.Contract):
             creator_wallet_address = sp.source,
             provider_id = provider_id,
             luw_service_endpoint = luw_service_endpoint,
-            state_history = {1: 1},
-            repository_endpoints = {},
+            active_state_id = 1,
+            state_count = 1,
+            repository_count = 0,
         )
 
         self.data.luw_map[self.data.luw_last_id] = new_luw_record
+        self.data.state_history[sp.pair(self.data.luw_last_id, 1)] = 1
+
+        sp.emit(sp.record(luw_id = self.data.luw_last_id, creator_wallet_address = sp.source), tag = "luw_created")
+
         self.data.luw_last_id += 1
 
     @sp.entry_point
@@ -65,22 +110,16 @@ class LUW(sp.Contract):
 
         sp.verify(self.data.luw_map.contains(luw_id), message = "LUW ID does not exist")
 
-        luw = self.data.luw_map[luw_id]
+        # Only the new history entry, the active state and the state counter are written
+        luw_new_state_key = sp.local("luw_new_state_key", self.data.luw_map[luw_id].state_count + 1)
 
-        luw_new_state_key = sp.len(luw.state_history) + 1
-        luw_state_history = luw.state_history
+        self.data.state_history[sp.pair(luw_id, luw_new_state_key.value)] = state_id
 
-        luw_state_history[luw_new_state_key] = state_id
+        with sp.modify_record(self.data.luw_map[luw_id], "data") as data:
+            data.active_state_id = state_id
+            data.state_count = luw_new_state_key.value
 
-        new_luw_record = sp.record(
-            creator_wallet_address = luw.creator_wallet_address,
-            provider_id = luw.provider_id,
-            luw_service_endpoint = luw.luw_service_endpoint,
-            state_history = luw_state_history,
-            repository_endpoints = luw.repository_endpoints
-        )
-
-        self.data.luw_map[luw_id] = new_luw_record
+        sp.emit(sp.record(luw_id = luw_id, state_id = state_id), tag = "luw_state_added")
 
     @sp.entry_point
     def add_repository(self, luw_id, repository_id, state_id):
@@ -94,23 +133,46 @@ class LUW(sp.Contract):
 
         sp.verify(self.data.luw_map.contains(luw_id), message = "LUW ID does not exist")
 
-        luw = self.data.luw_map[luw_id]
+        repository_key = sp.pair(luw_id, repository_id)
 
-        luw_repository_endpoints = luw.repository_endpoints
+        sp.verify(self.data.repository_states.contains(repository_key) == False, message = "Repository ID already exists")
 
-        sp.verify(luw_repository_endpoints.contains(repository_id) == False, message = "Repository ID already exists")
+        self.data.repository_states[repository_key] = state_id
+        self.data.repository_index[sp.pair(luw_id, self.data.luw_map[luw_id].repository_count)] = repository_id
 
-        luw_repository_endpoints[repository_id] = state_id
+        with sp.modify_record(self.data.luw_map[luw_id], "data") as data:
+            data.repository_count += 1
 
-        new_luw_record = sp.record(
-            creator_wallet_address = luw.creator_wallet_address,
-            provider_id = luw.provider_id,
-            luw_service_endpoint = luw.luw_service_endpoint,
-            state_history = luw.state_history,
-            repository_endpoints = luw_repository_endpoints
-        )
+        sp.emit(sp.record(luw_id = luw_id, repository_id = repository_id, state_id = state_id), tag = "repository_added")
 
-        self.data.luw_map[luw_id] = new_luw_record
+    @sp.entry_point
+    def add_repositories(self, luw_id, repository_ids, state_id):
+        sp.set_type(luw_id, sp.TNat)
+        sp.set_type(repository_ids, sp.TList(sp.TString))
+        sp.set_type(state_id, sp.TNat)
+
+        # Verifying whether the calling contract address is the logic contract
+        sp.verify(self.data.logic_contract_address.open_some(message = "Empty logic_contract_address") == sp.sender,
+            message="Incorrect caller")
+
+        sp.verify(self.data.luw_map.contains(luw_id), message = "LUW ID does not exist")
+
+        repository_count = sp.local("repository_count", self.data.luw_map[luw_id].repository_count)
+
+        sp.for repository_id in repository_ids:
+            repository_key = sp.pair(luw_id, repository_id)
+
+            sp.verify(self.data.repository_states.contains(repository_key) == False, message = "Repository ID already exists")
+
+            self.data.repository_states[repository_key] = state_id
+            self.data.repository_index[sp.pair(luw_id, repository_count.value)] = repository_id
+            repository_count.value += 1
+
+            sp.emit(sp.record(luw_id = luw_id, repository_id = repository_id, state_id = state_id), tag = "repository_added")
+
+        # The LUW header is written once for the whole batch
+        with sp.modify_record(self.data.luw_map[luw_id], "data") as data:
+            data.repository_count = repository_count.value
 
     @sp.entry_point
     def change_repository_state(self, luw_id, repository_id, state_id):
@@ -124,22 +186,133 @@ class LUW(sp.Contract):
 
         sp.verify(self.data.luw_map.contains(luw_id), message = "LUW ID does not exist")
 
-        luw = self.data.luw_map[luw_id]
+        repository_key = sp.pair(luw_id, repository_id)
 
-        luw_repository_endpoints = luw.repository_endpoints
+        # Repositories are only created by add_repository, which keeps them indexed
+        sp.verify(self.data.repository_states.contains(repository_key), message = "Repository ID does not exist")
 
-        luw_repository_endpoints[repository_id] = state_id
+        self.data.repository_states[repository_key] = state_id
 
-        new_luw_record = sp.record(
-            creator_wallet_address = luw.creator_wallet_address,
-            provider_id = luw.provider_id,
-            luw_service_endpoint = luw.luw_service_endpoint,
-            state_history = luw.state_history,
-            repository_endpoints = luw_repository_endpoints
-        )
+        sp.emit(sp.record(luw_id = luw_id, repository_id = repository_id, state_id = state_id), tag = "repository_state_changed")
+
+    @sp.entry_point
+    def change_repository_states(self, luw_id, repositories):
+        sp.set_type(luw_id, sp.TNat)
+        sp.set_type(repositories, sp.TList(sp.TRecord(repository_id = sp.TString, state_id = sp.TNat)))
+
+        # Verifying whether the calling contract address is the logic contract
+        sp.verify(self.data.logic_contract_address.open_some(message = "Empty logic_contract_address") == sp.sender,
+            message = "Incorrect caller")
+
+        sp.verify(self.data.luw_map.contains(luw_id), message = "LUW ID does not exist")
+
+        sp.for repository in repositories:
+            repository_key = sp.pair(luw_id, repository.repository_id)
+
+            # Membership of the batch is checked here, while applying it
+            sp.verify(self.data.repository_states.contains(repository_key), message = "Repository ID does not exist")
+
+            self.data.repository_states[repository_key] = repository.state_id
+
+            sp.emit(sp.record(
+                luw_id = luw_id,
+                repository_id = repository.repository_id,
+                state_id = repository.state_id,
+            ), tag = "repository_state_changed")
+
+    @sp.entry_point
+    def close(self, luw_id, luw_state_id, repository_state_id, ready_state_id):
+        sp.set_type(luw_id, sp.TNat)
+        sp.set_type(luw_state_id, sp.TNat)
+        sp.set_type(repository_state_id, sp.TNat)
+        sp.set_type(ready_state_id, sp.TOption(sp.TNat))
 
-        self.data.luw_map[luw_id] = new_luw_record
+        # Verifying whether the calling contract address is the logic contract
+        sp.verify(self.data.logic_contract_address.open_some(message = "Empty logic_contract_address") == sp.sender,
+            message = "Incorrect caller")
+
+        sp.verify(self.data.luw_map.contains(luw_id), message = "LUW ID does not exist")
+
+        luw = sp.local("luw", self.data.luw_map[luw_id])
+        repository_key = sp.local("repository_key", sp.pair(luw_id, ""))
+
+        # Every repository is moved to the final state, after checking it is ready when required
+        sp.for repository_index in sp.range(0, luw.value.repository_count):
+            repository_key.value = sp.pair(luw_id, self.data.repository_index[sp.pair(luw_id, repository_index)])
+
+            sp.if (ready_state_id.is_some()):
+                sp.verify(self.data.repository_states[repository_key.value] == ready_state_id.open_some(),
+                    message = "Repository is not ready")
+
+            self.data.repository_states[repository_key.value] = repository_state_id
+
+        # The LUW state is appended once, in the same execution
+        self.data.state_history[sp.pair(luw_id, luw.value.state_count + 1)] = luw_state_id
+
+        with sp.modify_record(self.data.luw_map[luw_id], "data") as data:
+            data.active_state_id = luw_state_id
+            data.state_count = luw.value.state_count + 1
+
+        # One event for all the repositories, they share the final state
+        sp.emit(sp.record(luw_id = luw_id, state_id = repository_state_id), tag = "luw_repositories_closed")
+        sp.emit(sp.record(luw_id = luw_id, state_id = luw_state_id), tag = "luw_state_added")
+
+    @sp.entry_point
+    def import_luws(self, luws):
+        # Migration path from the previous layout, where each LUW record held its
+        # state history and repositories. Items mirror the values of the old luw_map.
+        sp.set_type(luws, sp.TList(
+            sp.TRecord(
+                luw_id = sp.TNat,
+                luw = sp.TRecord(
+                    creator_wallet_address = sp.TAddress,
+                    provider_id = sp.TString,
+                    luw_service_endpoint = sp.TAddress,
+                    state_history = sp.TMap(
+                        sp.TNat,
+                        sp.TNat
+                    ),
+                    repository_endpoints = sp.TMap(
+                        sp.TString,
+                        sp.TNat
+                    ),
+                )
+            )
+        ))
+
+        with sp.if_(self.data.certifier != sp.source):
+            sp.failwith("Incorrect certifier")
+
+        repository_count = sp.local("repository_count", sp.nat(0))
+
+        sp.for imported in luws:
+            sp.verify(~self.data.luw_map.contains(imported.luw_id), message = "LUW ID already exists")
+            sp.verify(sp.len(imported.luw.state_history) > 0, message = "Empty state history")
+
+            # Sequence numbers start from 1 without gaps, so the last one is the active state
+            sp.for state in imported.luw.state_history.items():
+                sp.verify((state.key >= 1) & (state.key <= sp.len(imported.luw.state_history)), message = "Invalid state history")
+                self.data.state_history[sp.pair(imported.luw_id, state.key)] = state.value
+
+            repository_count.value = 0
+
+            sp.for repository in imported.luw.repository_endpoints.items():
+                self.data.repository_states[sp.pair(imported.luw_id, repository.key)] = repository.value
+                self.data.repository_index[sp.pair(imported.luw_id, repository_count.value)] = repository.key
+                repository_count.value += 1
+
+            self.data.luw_map[imported.luw_id] = sp.record(
+                creator_wallet_address = imported.luw.creator_wallet_address,
+                provider_id = imported.luw.provider_id,
+                luw_service_endpoint = imported.luw.luw_service_endpoint,
+                active_state_id = imported.luw.state_history[sp.len(imported.luw.state_history)],
+                state_count = sp.len(imported.luw.state_history),
+                repository_count = repository_count.value,
+            )
 
+            # New LUWs keep being numbered after the imported ones
+            sp.if (imported.luw_id >= self.data.luw_last_id):
+                self.data.luw_last_id = imported.luw_id + 1
 
     @sp.entry_point
     def change_logic_contract_address(self, new_logic_contract_address):
@@ -153,16 +326,77 @@ class LUW(sp.Contract):
     @sp.onchain_view()
     def fetch(self, luw_id):
         sp.verify(self.data.luw_map.contains(luw_id), message = "LUW ID does not exist")
-        sp.result(self.data.luw_map[luw_id])
+
+        luw = sp.local("luw", self.data.luw_map[luw_id])
+
+        sp.result(sp.record(
+            creator_wallet_address = luw.value.creator_wallet_address,
+            provider_id = luw.value.provider_id,
+            luw_service_endpoint = luw.value.luw_service_endpoint,
+            state_history = self.build_state_history(luw_id, luw.value.state_count),
+            repository_endpoints = self.build_repository_endpoints(luw_id, luw.value.repository_count),
+        ))
+
+    @sp.onchain_view()
+    def fetch_page(self, parameters):
+        sp.set_type(parameters.luw_id, sp.TNat)
+        sp.set_type(parameters.offset, sp.TNat)
+        sp.set_type(parameters.limit, sp.TNat)
+
+        sp.verify(self.data.luw_map.contains(parameters.luw_id), message = "LUW ID does not exist")
+        sp.verify(parameters.limit <= self.page_limit, message = "Page limit exceeded")
+
+        luw = sp.local("luw", self.data.luw_map[parameters.luw_id])
+
+        # The page holds the states offset + 1 to offset + limit (they are numbered from 1)
+        # and the repositories offset to offset + limit - 1 (they are indexed from 0)
+        state_page_end = sp.local("state_page_end", parameters.offset + parameters.limit)
+
+        sp.if (state_page_end.value > luw.value.state_count):
+            state_page_end.value = luw.value.state_count
+
+        state_history = sp.local("state_history", sp.map(tkey = sp.TNat, tvalue = sp.TNat))
+
+        sp.for state_key in sp.range(parameters.offset + 1, state_page_end.value + 1):
+            state_history.value[state_key] = self.data.state_history[sp.pair(parameters.luw_id, state_key)]
+
+        repository_page_end = sp.local("repository_page_end", parameters.offset + parameters.limit)
+
+        sp.if (repository_page_end.value > luw.value.repository_count):
+            repository_page_end.value = luw.value.repository_count
+
+        repository_endpoints = sp.local("repository_endpoints", sp.map(tkey = sp.TString, tvalue = sp.TNat))
+        repository_id = sp.local("repository_id", "")
+
+        sp.for repository_key in sp.range(parameters.offset, repository_page_end.value):
+            repository_id.value = self.data.repository_index[sp.pair(parameters.luw_id, repository_key)]
+            repository_endpoints.value[repository_id.value] = self.data.repository_states[sp.pair(parameters.luw_id, repository_id.value)]
+
+        sp.result(sp.record(
+            creator_wallet_address = luw.value.creator_wallet_address,
+            provider_id = luw.value.provider_id,
+            luw_service_endpoint = luw.value.luw_service_endpoint,
+            active_state_id = luw.value.active_state_id,
+            state_count = luw.value.state_count,
+            repository_count = luw.value.repository_count,
+            state_history = state_history.value,
+            repository_endpoints = repository_endpoints.value,
+        ))
 
     @sp.onchain_view()
     def get_active_luw_state(self, luw_id):
         sp.set_type(luw_id, sp.TNat)
         sp.verify(self.data.luw_map.contains(luw_id), message = "LUW ID does not exist")
-        
-        luw = self.data.luw_map[luw_id]
-        last_state = luw.state_history[sp.len(luw.state_history)]
-        sp.result(last_state)
+
+        # Kept in the header by add_state, the history is not read
+        sp.result(self.data.luw_map[luw_id].active_state_id)
+
+    @sp.onchain_view()
+    def get_luw_state_history(self, luw_id):
+        sp.set_type(luw_id, sp.TNat)
+        sp.verify(self.data.luw_map.contains(luw_id), message = "LUW ID does not exist")
+
+        sp.result(self.build_state_history(luw_id, self.data.luw_map[luw_id].state_count))
 
     @sp.onchain_view()
     def get_luw_owner_address(self, luw_id):
@@ -172,12 +406,20 @@ class LUW(sp.Contract):
     @sp.onchain_view()
     def get_luw_repositories(self, luw_id):
         sp.verify(self.data.luw_map.contains(luw_id), message = "LUW ID does not exist")
-        sp.result(self.data.luw_map[luw_id].repository_endpoints)
+        sp.result(self.build_repository_endpoints(luw_id, self.data.luw_map[luw_id].repository_count))
+
+    @sp.onchain_view()
+    def has_luw_repository(self, params):
+        sp.set_type(params.luw_id, sp.TNat)
+        sp.set_type(params.repository_id, sp.TString)
+
+        sp.verify(self.data.luw_map.contains(params.luw_id), message = "LUW ID does not exist")
+        sp.result(self.data.repository_states.contains(sp.pair(params.luw_id, params.repository_id)))
 
     @sp.onchain_view()
     def get_luw_repository_state(self, params):
         sp.verify(self.data.luw_map.contains(params.luw_id), message = "LUW ID does not exist")
-        sp.result(self.data.luw_map[params.luw_id].repository_endpoints[params.repository_id])
+        sp.result(self.data.repository_states[sp.pair(params.luw_id, params.repository_id)])
 
 @sp.add_test(name = "LUW")
 def test():
@@ -2,12 +2,37 @@
 
 import smartpy as sp
 
+# State IDs and names, fixed at origination
+LUW_STATES = {
+    1: "active",
+    2: "prepare_to_commit",
+    3: "committed",
+    4: "aborted"
+}
+
+REPOSITORY_STATES = {
+    1: "open",
+    2: "ready",
+    3: "committed",
+    4: "rollbacked"
+}
+
 class LUWRepository(sp.Contract):
-    def __init__(self, storage_contract, certifier):
-        self.init_type(
-            sp.TRecord(
-                storage_contract = sp.TAddress,
-                certifier = sp.TAddress,
+    def __init__(self, storage_contract, certifier, constant_tables = False):
+        # With constant_tables the state names are compiled into the code instead of being kept in big_maps
+        self.constant_tables = constant_tables
+
+        storage_type = dict(
+            storage_contract = sp.TAddress,
+            certifier = sp.TAddress,
+        )
+        storage = dict(
+            storage_contract = storage_contract,
+            certifier = certifier,
+        )
+
+        if not constant_tables:
+            storage_type.update(
                 states = sp.TBigMap(
                     sp.TNat,
                     sp.TString
@@ -17,28 +42,32 @@ class LUWRepository(sp.Contract):
                     sp.TString
                 ),
             )
-        )
-        self.init(
-            storage_contract = storage_contract,
-            certifier = certifier,
-            states = sp.big_map({
-                1: "active",
-                2: "prepare_to_commit",
-                3: "committed",
-                4: "aborted"
-            }),
-            repo_states = sp.big_map({
-                1: "open",
-                2: "ready",
-                3: "committed",
-                4: "rollbacked"
-            }),
-        )
+            storage.update(
+                states = sp.big_map(LUW_STATES),
+                repo_states = sp.big_map(REPOSITORY_STATES),
+            )
+
+        self.init_type(sp.TRecord(**storage_type))
+        self.init(**storage)
 
     ###########
     # Helpers #
     ###########
 
+    # LUW state names, from storage or compiled into the code
+    def luw_state_table(self):
+        if self.constant_tables:
+            return sp.map(LUW_STATES, tkey = sp.TNat, tvalue = sp.TString)
+
+        return self.data.states
+
+    # Repository state names, from storage or compiled into the code
+    def repository_state_table(self):
+        if self.constant_tables:
+            return sp.map(REPOSITORY_STATES, tkey = sp.TNat, tvalue = sp.TString)
+
+        return self.data.repo_states
+
     # Verify source of transaction is owner or certifier
     @sp.private_lambda(with_storage="read-only")
     def verify_owner_source_address(self, params):
@@ -81,19 +110,66 @@ class LUWRepository(sp.Contract):
 
         return luw_last_state_id
 
-    # Get LUW repositories
-    def get_luw_repositories(self, luw_id):
-        luw_repositories = sp.view(
-            "get_luw_repositories",
+    # Get LUW with its raw state history and repository states
+    def get_luw(self, luw_id):
+        luw = sp.view(
+            "fetch",
             self.data.storage_contract,
             luw_id,
-            t = sp.TMap(
-                sp.TString,
-                sp.TNat
+            t = sp.TRecord(
+                creator_wallet_address = sp.TAddress,
+                provider_id = sp.TString,
+                luw_service_endpoint = sp.TAddress,
+                state_history = sp.TMap(
+                    sp.TNat,
+                    sp.TNat
+                ),
+                repository_endpoints = sp.TMap(
+                    sp.TString,
+                    sp.TNat
+                ),
             )
         ).open_some("Invalid view");
 
-        return luw_repositories
+        return luw
+
+    # Move every repository of a LUW and the LUW itself to their final states in the Storage contract
+    def close_luw(self, luw_id, luw_state_id, repository_state_id, ready_state_id):
+        # Defining the data that we expect as a return from the Logic contract
+        data_schema = sp.TRecord(
+            luw_id = sp.TNat,
+            luw_state_id = sp.TNat,
+            repository_state_id = sp.TNat,
+            ready_state_id = sp.TOption(sp.TNat),
+        )
+
+        # Defining the Logic contract itself and its entry point for the call
+        storage_contract = sp.contract(data_schema, self.data.storage_contract, "close").open_some()
+
+        # Defining the parameters that will be passed to the Storage contract
+        params = sp.record(
+            luw_id = luw_id,
+            luw_state_id = luw_state_id,
+            repository_state_id = repository_state_id,
+            ready_state_id = ready_state_id,
+        )
+
+        # Calling the Storage contract with the parameters we defined
+        sp.transfer(params, sp.mutez(0), storage_contract)
+
+    # Check LUW repository membership without fetching the LUW repositories
+    def has_luw_repository(self, luw_id, repository_id):
+        luw_has_repository = sp.view(
+            "has_luw_repository",
+            self.data.storage_contract,
+            sp.record(
+                luw_id = luw_id,
+                repository_id = repository_id,
+            ),
+            t = sp.TBool
+        ).open_some("Invalid view");
+
+        return luw_has_repository
 
     #############################
     # Repo Entry points / Views #
@@ -124,7 +200,7 @@ class LUWRepository(sp.Contract):
         sp.set_type(luw_id, sp.TNat)
         sp.set_type(state_id, sp.TNat)
 
-        sp.verify(self.data.states.contains(state_id), message = "Incorrect state ID")
+        sp.verify(self.luw_state_table().contains(state_id), message = "Incorrect state ID")
 
         owner_address = self.get_luw_owner_address(luw_id)
         sp.verify(self.verify_owner_source_address(
@@ -196,11 +272,10 @@ class LUWRepository(sp.Contract):
             )
         ), message = "Non-matching owner address")
 
-        luw_repositories = self.get_luw_repositories(luw_id)
-        sp.verify(luw_repositories.contains(repository_id), message = "Repository ID does not exist")
+        sp.verify(self.has_luw_repository(luw_id, repository_id), message = "Repository ID does not exist")
 
         # Verify state ID exists
-        sp.verify(self.data.repo_states.contains(state_id), message = "Incorrect state ID")
+        sp.verify(self.repository_state_table().contains(state_id), message = "Incorrect state ID")
 
         # Defining the data that we expect as a return from the Logic contract
         data_schema = sp.TRecord(luw_id = sp.TNat, repository_id = sp.TString, state_id = sp.TNat)
@@ -218,6 +293,114 @@ class LUWRepository(sp.Contract):
         # Calling the Storage contract with the parameters we defined
         sp.transfer(params, sp.mutez(0), storage_contract)
 
+    @sp.entry_point
+    def add_repositories(self, luw_id, repository_ids):
+        sp.set_type(luw_id, sp.TNat)
+        sp.set_type(repository_ids, sp.TList(sp.TString))
+
+        sp.verify(sp.len(repository_ids) > 0, message = "Empty batch")
+
+        # Owner and LUW state are checked once for the whole batch
+        owner_address = self.get_luw_owner_address(luw_id)
+        sp.verify(self.verify_owner_source_address(
+            sp.record(
+                owner_address = owner_address,
+            )
+        ), message = "Non-matching owner address")
+
+        luw_state_id = self.get_luw_state(luw_id)
+        sp.verify(self.verify_luw_active(
+            sp.record(
+                luw_state_id = luw_state_id,
+            )
+        ), message = "LUW is not Active")
+
+        # Defining the data that we expect as a return from the Logic contract
+        data_schema = sp.TRecord(luw_id = sp.TNat, repository_ids = sp.TList(sp.TString), state_id = sp.TNat)
+
+        # Defining the Logic contract itself and its entry point for the call
+        storage_contract = sp.contract(data_schema, self.data.storage_contract, "add_repositories").open_some()
+
+        # Defining the parameters that will be passed to the Storage contract
+        params = sp.record(
+            luw_id = luw_id,
+            repository_ids = repository_ids,
+            state_id = 1
+        )
+
+        # Calling the Storage contract with the parameters we defined
+        sp.transfer(params, sp.mutez(0), storage_contract)
+
+    @sp.entry_point
+    def change_repository_states(self, luw_id, repositories):
+        sp.set_type(luw_id, sp.TNat)
+        sp.set_type(repositories, sp.TList(sp.TRecord(repository_id = sp.TString, state_id = sp.TNat)))
+
+        sp.verify(sp.len(repositories) > 0, message = "Empty batch")
+
+        # Owner is checked once for the whole batch
+        owner_address = self.get_luw_owner_address(luw_id)
+        sp.verify(self.verify_owner_source_address(
+            sp.record(
+                owner_address = owner_address,
+            )
+        ), message = "Non-matching owner address")
+
+        # Verify state IDs exist. Repository membership is checked by the Storage contract
+        # while applying the batch, instead of with one view call per repository.
+        sp.for repository in repositories:
+            sp.verify(self.repository_state_table().contains(repository.state_id), message = "Incorrect state ID")
+
+        # Defining the data that we expect as a return from the Logic contract
+        data_schema = sp.TRecord(luw_id = sp.TNat, repositories = sp.TList(sp.TRecord(repository_id = sp.TString, state_id = sp.TNat)))
+
+        # Defining the Logic contract itself and its entry point for the call
+        storage_contract = sp.contract(data_schema, self.data.storage_contract, "change_repository_states").open_some()
+
+        # Defining the parameters that will be passed to the Storage contract
+        params = sp.record(
+            luw_id = luw_id,
+            repositories = repositories
+        )
+
+        # Calling the Storage contract with the parameters we defined
+        sp.transfer(params, sp.mutez(0), storage_contract)
+
+    @sp.entry_point
+    def commit_luw(self, luw_id):
+        sp.set_type(luw_id, sp.TNat)
+
+        owner_address = self.get_luw_owner_address(luw_id)
+        sp.verify(self.verify_owner_source_address(
+            sp.record(
+                owner_address = owner_address,
+            )
+        ), message = "Non-matching owner address")
+
+        # Only a LUW in prepare_to_commit can be committed
+        sp.verify(self.get_luw_state(luw_id) == 2, message = "LUW is not prepared to commit")
+
+        # Every repository has to be ready, and is moved to committed along with the LUW
+        self.close_luw(luw_id, 3, 3, sp.some(2))
+
+    @sp.entry_point
+    def abort_luw(self, luw_id):
+        sp.set_type(luw_id, sp.TNat)
+
+        owner_address = self.get_luw_owner_address(luw_id)
+        sp.verify(self.verify_owner_source_address(
+            sp.record(
+                owner_address = owner_address,
+            )
+        ), message = "Non-matching owner address")
+
+        # A LUW can be aborted while it is active or in prepare_to_commit
+        luw_state_id = sp.local("luw_state_id", self.get_luw_state(luw_id))
+        sp.verify((luw_state_id.value == 1) | (luw_state_id.value == 2), message = "LUW is already closed")
+
+        # Every repository is rolled back along with the LUW, whatever its state
+        self.close_luw(luw_id, 4, 4, sp.none)
+
     @sp.entry_point
     def update_storage_contract_with_address(self):
         # Update is allowed only from certifier
@@ -239,19 +422,24 @@ class LUWRepository(sp.Contract):
 
 
     @sp.onchain_view()
-    def fetch_luw(self, luw_id):
-        # Defining the parameters' types
-        sp.set_type(luw_id, sp.TNat)
-        
+    def fetch_luw(self, parameters):
         # Defining the parameters' types
-        luw = sp.view(
-            "fetch",
+        sp.set_type(parameters.luw_id, sp.TNat)
+        sp.set_type(parameters.offset, sp.TNat)
+        sp.set_type(parameters.limit, sp.TNat)
+
+        # Only one page of the state history and of the repositories is read from the Storage contract
+        luw = sp.local("luw", sp.view(
+            "fetch_page",
             self.data.storage_contract,
-            luw_id,
+            parameters,
             t = sp.TRecord(
                 creator_wallet_address = sp.TAddress,
                 provider_id = sp.TString,
                 luw_service_endpoint = sp.TAddress,
+                active_state_id = sp.TNat,
+                state_count = sp.TNat,
+                repository_count = sp.TNat,
                 state_history = sp.TMap(
                     sp.TNat,
                     sp.TNat
@@ -261,21 +449,51 @@ class LUWRepository(sp.Contract):
                     sp.TNat
                 ),
             )
-        ).open_some("Invalid view");
+        ).open_some("Invalid view"))
+
+        # State IDs are returned as stored, without any state name lookup
+        formatted_luw = sp.record(
+            luw_id = parameters.luw_id,
+            creator_wallet_address = luw.value.creator_wallet_address,
+            provider_id = luw.value.provider_id,
+            luw_service_endpoint = luw.value.luw_service_endpoint,
+            active_state_id = luw.value.active_state_id,
+            state_count = luw.value.state_count,
+            repository_count = luw.value.repository_count,
+            state_history = luw.value.state_history,
+            repository_endpoints = luw.value.repository_endpoints
+        )
+
+        sp.result(formatted_luw)
+
+    @sp.onchain_view()
+    def fetch_luw_decoded(self, luw_id):
+        # Defining the parameters' types
+        sp.set_type(luw_id, sp.TNat)
 
-        formatted_state_history = {}
+        luw = sp.local("luw", self.get_luw(luw_id))
 
-        sp.for x in luw.state_history.items():
-            current_len = sp.len(formatted_state_history)
-            formatted_state_history[current_len] = self.data.states[x]
+        # The state names are pushed as constants with the view code instead of being read from the big_maps
+        luw_states = sp.local("luw_states", sp.map(LUW_STATES, tkey = sp.TNat, tvalue = sp.TString))
+        repository_states = sp.local("repository_states", sp.map(REPOSITORY_STATES, tkey = sp.TNat, tvalue = sp.TString))
+
+        decoded_state_history = sp.local("decoded_state_history", sp.map(tkey = sp.TNat, tvalue = sp.TString))
+
+        sp.for state in luw.value.state_history.items():
+            decoded_state_history.value[state.key] = luw_states.value[state.value]
+
+        decoded_repository_endpoints = sp.local("decoded_repository_endpoints", sp.map(tkey = sp.TString, tvalue = sp.TString))
+
+        sp.for repository in luw.value.repository_endpoints.items():
+            decoded_repository_endpoints.value[repository.key] = repository_states.value[repository.value]
 
         formatted_luw = sp.record(
             luw_id = luw_id,
-            creator_wallet_address = luw.creator_wallet_address,
-            provider_id = luw.provider_id,
-            luw_service_endpoint = luw.luw_service_endpoint,
-            state_history = luw.state_history,
-            repository_endpoints = luw.repository_endpoints
+            creator_wallet_address = luw.value.creator_wallet_address,
+            provider_id = luw.value.provider_id,
+            luw_service_endpoint = luw.value.luw_service_endpoint,
+            state_history = decoded_state_history.value,
+            repository_endpoints = decoded_repository_endpoints.value
         )
 
         sp.result(formatted_luw)
@@ -293,7 +511,7 @@ class LUWRepository(sp.Contract):
             t = sp.TNat
         ).open_some("Invalid view");
 
-        formatted_state = self.data.states[luw_last_state_id]
+        formatted_state = self.luw_state_table()[luw_last_state_id]
 
         sp.result(formatted_state)
 
@@ -313,7 +531,7 @@ class LUWRepository(sp.Contract):
             t = sp.TNat
         ).open_some("Invalid view");
 
-        formatted_state = self.data.repo_states[repository_state_id]
+        formatted_state = self.repository_state_table()[repository_state_id]
 
         sp.result(formatted_state)
 
@@ -329,3 +547,11 @@ def test():
             sp.address('tz1_certifier_address')
         )
     )
+
+    sp.add_compilation_target("luwRepositoryConstantTables",
+        LUWRepository(
+            sp.address('KT1_contract_address'),
+            sp.address('tz1_certifier_address'),
+            constant_tables = True
+        )
+    )
@@ -2,15 +2,25 @@
 
 import smartpy as sp
 
+# Provider data is either the provider document itself or, in the content-addressed
+# mode, the SHA-256 digest of the document and the URI it is served from
+def provider_data_type(content_addressed):
+    if content_addressed:
+        return sp.TRecord(digest = sp.TBytes, uri = sp.TString)
+
+    return sp.TString
+
 class AssetProvider(sp.Contract):
-    def __init__(self, certifier):
+    def __init__(self, certifier, content_addressed = False):
+        self.provider_data_type = provider_data_type(content_addressed)
+
         self.init_type(
             sp.TRecord(
                 asset_providers = sp.TBigMap(
                     sp.TString,
                     sp.TRecord(
                         provider_id = sp.TString,
-                        provider_data = sp.TString,
+                        provider_data = self.provider_data_type,
                         status = sp.TNat,
                         creator_wallet_address = sp.TAddress,
                     )
@@ -32,6 +42,11 @@ class AssetProvider(sp.Contract):
 
         self.data.asset_providers[parameters.provider_id] = parameters
 
+        sp.emit(sp.record(
+            provider_id = parameters.provider_id,
+            creator_wallet_address = parameters.creator_wallet_address,
+        ), tag = "provider_created")
+
     @sp.entry_point
     def change_status(self, parameters):
         # Verifying whether the calling contract address is the logic contract
@@ -48,6 +63,8 @@ class AssetProvider(sp.Contract):
 
         self.data.asset_providers[parameters.provider_id] = provider_data
 
+        sp.emit(sp.record(provider_id = parameters.provider_id, status = parameters.status), tag = "provider_status_changed")
+
     @sp.entry_point
     def change_data(self, parameters):
         # Verifying whether the calling contract address is the logic contract
@@ -55,7 +72,7 @@ class AssetProvider(sp.Contract):
 
         # Defining the parameters' types
         sp.set_type(parameters.provider_id, sp.TString)
-        sp.set_type(parameters.provider_data, sp.TString)
+        sp.set_type(parameters.provider_data, self.provider_data_type)
 
         provider_data = self.data.asset_providers[parameters.provider_id]
         
@@ -64,6 +81,9 @@ class AssetProvider(sp.Contract):
 
         self.data.asset_providers[parameters.provider_id] = provider_data
 
+        # Only the provider ID, the data itself is read with get_asset_provider
+        sp.emit(parameters.provider_id, tag = "provider_data_changed")
+
     @sp.entry_point
     def change_owner(self, parameters):
         # Verifying whether the calling contract address is the logic contract
@@ -80,6 +100,11 @@ class AssetProvider(sp.Contract):
 
         self.data.asset_providers[parameters.provider_id] = provider_data
 
+        sp.emit(sp.record(
+            provider_id = parameters.provider_id,
+            new_owner_address = parameters.new_owner_address,
+        ), tag = "provider_owner_changed")
+
     @sp.entry_point
     def change_logic_contract_address(self, new_logic_contract_address):
         with sp.if_(self.data.certifier != sp.source):
@@ -102,8 +127,30 @@ class AssetProvider(sp.Contract):
         sp.verify(self.data.asset_providers.contains(provider_id), message = "Provider ID does not exist")
         sp.result(self.data.asset_providers[provider_id].creator_wallet_address)
 
+    @sp.onchain_view()
+    def get_provider_auth_context(self, provider_id):
+        sp.set_type(provider_id, sp.TString)
+
+        # Existence, owner and status in a single view call
+        sp.if (self.data.asset_providers.contains(provider_id)):
+            sp.result(sp.record(
+                exists = True,
+                owner_address = sp.some(self.data.asset_providers[provider_id].creator_wallet_address),
+                status = sp.some(self.data.asset_providers[provider_id].status),
+            ))
+        sp.else:
+            sp.result(sp.record(
+                exists = False,
+                owner_address = sp.none,
+                status = sp.none,
+            ))
+
 @sp.add_test(name = "AssetProvider")
 def test():
     sp.add_compilation_target("assetProvider",
         AssetProvider(sp.address('tz1_certifier_address'))
     )
+
+    sp.add_compilation_target("assetProviderContentAddressed",
+        AssetProvider(sp.address('tz1_certifier_address'), content_addressed = True)
+    )
@@ -0,0 +1,303 @@
+# Schema Registry Contract
+
+import smartpy as sp
+
+# Provider status IDs and names, fixed at origination
+PROVIDER_STATUSES = {
+    1: "active",
+    2: "deprecated"
+}
+
+# Provider data is either the provider document itself or, in the content-addressed
+# mode, the SHA-256 digest of the document and the URI it is served from
+def provider_data_type(content_addressed):
+    if content_addressed:
+        return sp.TRecord(digest = sp.TBytes, uri = sp.TString)
+
+    return sp.TString
+
+# Provider record and repository logic parameter types for either provider data mode
+def provider_types(content_addressed = False):
+    provider = sp.TRecord(
+        provider_id = sp.TString,
+        provider_data = provider_data_type(content_addressed),
+        status = sp.TNat,
+        creator_wallet_address = sp.TAddress,
+    )
+
+    logic_params = sp.TRecord(
+        provider = provider,
+        source = sp.TAddress,
+        update = sp.TVariant(
+            provider_data = provider_data_type(content_addressed),
+            status = sp.TNat,
+            new_owner_address = sp.TAddress,
+        ),
+    )
+
+    return provider, logic_params
+
+# Repository logic applied to a provider record, stored in the contract so that it can be upgraded
+def provider_logic(content_addressed = False):
+    _, logic_params_type = provider_types(content_addressed)
+
+    def update_provider(params):
+        sp.set_type(params, logic_params_type)
+
+        # Update is allowed only from owner
+        sp.verify(params.source == params.provider.creator_wallet_address, message = "Non-matching owner address")
+
+        provider = sp.local("provider", params.provider)
+
+        with params.update.match_cases() as arg:
+            with arg.match("provider_data") as provider_data:
+                provider.value.provider_data = provider_data
+            with arg.match("status") as status:
+                provider.value.status = status
+            with arg.match("new_owner_address") as new_owner_address:
+                provider.value.creator_wallet_address = new_owner_address
+
+        sp.result(provider.value)
+
+    return update_provider
+
+update_provider = provider_logic()
+
+# Asset Provider storage and repository logic in a single contract.
+# Exposes the AssetProviderRepository interface, so the Registry can be deployed against either topology.
+class AssetProviderDirect(sp.Contract):
+    def __init__(self, certifier, constant_tables = False, content_addressed = False):
+        # With constant_tables the status names are compiled into the code instead of being kept in a big_map
+        self.constant_tables = constant_tables
+        self.content_addressed = content_addressed
+        self.provider_data_type = provider_data_type(content_addressed)
+        self.provider_type, self.provider_logic_params_type = provider_types(content_addressed)
+
+        storage_type = dict(
+            asset_providers = sp.TBigMap(
+                sp.TString,
+                self.provider_type
+            ),
+            logic = sp.TBigMap(
+                sp.TString,
+                sp.TLambda(self.provider_logic_params_type, self.provider_type)
+            ),
+            certifier = sp.TAddress
+        )
+        storage = dict(
+            asset_providers = sp.big_map(),
+            logic = sp.big_map({
+                "update_provider": sp.build_lambda(provider_logic(content_addressed))
+            }),
+            certifier = certifier
+        )
+
+        if not constant_tables:
+            storage_type.update(
+                provider_statuses = sp.TBigMap(
+                    sp.TNat,
+                    sp.TString
+                ),
+            )
+            storage.update(
+                provider_statuses = sp.big_map(PROVIDER_STATUSES),
+            )
+
+        self.init_type(sp.TRecord(**storage_type))
+        self.init(**storage)
+
+    ###########
+    # Helpers #
+    ###########
+
+    # Provider status names, from storage or compiled into the code
+    def provider_status_table(self):
+        if self.constant_tables:
+            return sp.map(PROVIDER_STATUSES, tkey = sp.TNat, tvalue = sp.TString)
+
+        return self.data.provider_statuses
+
+    # Run the stored repository logic against an existing provider and return the updated record
+    def apply_provider_logic(self, provider_id, update):
+        sp.verify(self.data.asset_providers.contains(provider_id), message = "Provider ID does not exist")
+
+        updated_provider = sp.local("updated_provider", self.data.logic["update_provider"](
+            sp.record(
+                provider = self.data.asset_providers[provider_id],
+                source = sp.source,
+                update = update,
+            )
+        ))
+
+        return updated_provider.value
+
+    # Content-addressed provider data has to carry a SHA-256 digest
+    def verify_provider_data(self, provider_data):
+        if self.content_addressed:
+            sp.verify(sp.len(provider_data.digest) == 32, message = "Invalid digest length")
+
+    @sp.entry_point
+    def create_asset_provider(self, provider_id, provider_data):
+        sp.set_type(provider_id, sp.TString)
+        sp.set_type(provider_data, self.provider_data_type)
+
+        # Check if provider does not exist, does not allow add call otherwise
+        sp.verify(~self.data.asset_providers.contains(provider_id), message = "Provider ID already exists")
+
+        self.verify_provider_data(provider_data)
+
+        self.data.asset_providers[provider_id] = sp.record(
+            provider_id = provider_id,
+            provider_data = provider_data,
+            status = 1,
+            creator_wallet_address = sp.source,
+        )
+
+        # Same events as the AssetProvider storage contract
+        sp.emit(sp.record(provider_id = provider_id, creator_wallet_address = sp.source), tag = "provider_created")
+
+    @sp.entry_point
+    def set_provider_active(self, parameters):
+        # Defining the parameters' types
+        sp.set_type(parameters.provider_id, sp.TString)
+
+        self.data.asset_providers[parameters.provider_id] = self.apply_provider_logic(
+            parameters.provider_id, sp.variant("status", 1)
+        )
+
+        sp.emit(sp.record(provider_id = parameters.provider_id, status = 1), tag = "provider_status_changed")
+
+    @sp.entry_point
+    def set_provider_deprecated(self, parameters):
+        # Defining the parameters' types
+        sp.set_type(parameters.provider_id, sp.TString)
+
+        self.data.asset_providers[parameters.provider_id] = self.apply_provider_logic(
+            parameters.provider_id, sp.variant("status", 2)
+        )
+
+        sp.emit(sp.record(provider_id = parameters.provider_id, status = 2), tag = "provider_status_changed")
+
+    @sp.entry_point
+    def set_provider_status(self, parameters):
+        # Defining the parameters' types
+        sp.set_type(parameters.provider_id, sp.TString)
+        sp.set_type(parameters.status, sp.TNat)
+
+        provider = self.apply_provider_logic(parameters.provider_id, sp.variant("status", parameters.status))
+
+        # Verify status ID exists
+        sp.verify(self.provider_status_table().contains(parameters.status), message = "Incorrect status")
+
+        self.data.asset_providers[parameters.provider_id] = provider
+
+        sp.emit(sp.record(provider_id = parameters.provider_id, status = parameters.status), tag = "provider_status_changed")
+
+    @sp.entry_point
+    def set_provider_data(self, parameters):
+        # Defining the parameters' types
+        sp.set_type(parameters.provider_id, sp.TString)
+        sp.set_type(parameters.provider_data, self.provider_data_type)
+
+        provider = self.apply_provider_logic(parameters.provider_id, sp.variant("provider_data", parameters.provider_data))
+
+        self.verify_provider_data(parameters.provider_data)
+
+        self.data.asset_providers[parameters.provider_id] = provider
+
+        sp.emit(parameters.provider_id, tag = "provider_data_changed")
+
+    @sp.entry_point
+    def set_provider_owner(self, parameters):
+        # Defining the parameters' types
+        sp.set_type(parameters.provider_id, sp.TString)
+        sp.set_type(parameters.new_owner_address, sp.TAddress)
+
+        self.data.asset_providers[parameters.provider_id] = self.apply_provider_logic(
+            parameters.provider_id, sp.variant("new_owner_address", parameters.new_owner_address)
+        )
+
+        sp.emit(sp.record(
+            provider_id = parameters.provider_id,
+            new_owner_address = parameters.new_owner_address,
+        ), tag = "provider_owner_changed")
+
+    @sp.entry_point
+    def set_logic(self, name, logic):
+        sp.set_type(name, sp.TString)
+        sp.set_type(logic, sp.TLambda(self.provider_logic_params_type, self.provider_type))
+
+        # Update is allowed only from certifier
+        with sp.if_(self.data.certifier != sp.source):
+            sp.failwith("Incorrect certifier")
+
+        # Only the logic the contract calls can be replaced, a misspelled name would add an unused one
+        sp.verify(self.data.logic.contains(name), message = "Unknown logic")
+
+        # Upgrade the repository logic
+        self.data.logic[name] = logic
+
+    @sp.onchain_view()
+    def get_asset_provider(self, provider_id):
+        # Defining the parameters' types
+        sp.set_type(provider_id, sp.TString)
+
+        sp.verify(self.data.asset_providers.contains(provider_id), message = "Provider ID does not exist")
+
+        provider = self.data.asset_providers[provider_id]
+
+        # Format result
+        result_provider = sp.record(
+            provider_id = provider_id,
+            provider_data = provider.provider_data,
+            status = self.provider_status_table()[provider.status],
+            creator_wallet_address = provider.creator_wallet_address,
+        )
+
+        sp.result(result_provider)
+
+    @sp.onchain_view()
+    def verify_provider_exists(self, provider_id):
+        sp.result(self.data.asset_providers.contains(provider_id))
+
+    @sp.onchain_view()
+    def get_provider_owner_address(self, provider_id):
+        sp.verify(self.data.asset_providers.contains(provider_id), message = "Provider ID does not exist")
+        sp.result(self.data.asset_providers[provider_id].creator_wallet_address)
+
+    @sp.onchain_view()
+    def get_provider_auth_context(self, provider_id):
+        sp.set_type(provider_id, sp.TString)
+
+        # Existence, owner and status in a single view call
+        sp.if (self.data.asset_providers.contains(provider_id)):
+            sp.result(sp.record(
+                exists = True,
+                owner_address = sp.some(self.data.asset_providers[provider_id].creator_wallet_address),
+                status = sp.some(self.data.asset_providers[provider_id].status),
+            ))
+        sp.else:
+            sp.result(sp.record(
+                exists = False,
+                owner_address = sp.none,
+                status = sp.none,
+            ))
+
+    @sp.onchain_view()
+    def get_storage_contract(self):
+        # The providers are stored in this contract
+        sp.result(sp.self_address)
+
+@sp.add_test(name = "AssetProviderDirect")
+def test():
+    sp.add_compilation_target("assetProviderDirect",
+        AssetProviderDirect(sp.address('tz1_certifier_address'))
+    )
+
+    sp.add_compilation_target("assetProviderDirectConstantTables",
+        AssetProviderDirect(sp.address('tz1_certifier_address'), constant_tables = True)
+    )
+
+    sp.add_compilation_target("assetProviderDirectContentAddressed",
+        AssetProviderDirect(sp.address('tz1_certifier_address'), content_addressed = True)
+    )
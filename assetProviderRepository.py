@@ -2,74 +2,101 @@
 
 import smartpy as sp
 
+# Provider status IDs and names, fixed at origination
+PROVIDER_STATUSES = {
+    1: "active",
+    2: "deprecated"
+}
+
+# Provider data is either the provider document itself or, in the content-addressed
+# mode, the SHA-256 digest of the document and the URI it is served from
+def provider_data_type(content_addressed):
+    if content_addressed:
+        return sp.TRecord(digest = sp.TBytes, uri = sp.TString)
+
+    return sp.TString
+
 class AssetProviderRepository(sp.Contract):
-    def __init__(self, storage_contract, certifier):
-        self.init_type(
-            sp.TRecord(
-                storage_contract = sp.TAddress,
-                certifier = sp.TAddress,
+    def __init__(self, storage_contract, certifier, constant_tables = False, content_addressed = False):
+        # With constant_tables the status names are compiled into the code instead of being kept in a big_map
+        self.constant_tables = constant_tables
+        self.content_addressed = content_addressed
+        self.provider_data_type = provider_data_type(content_addressed)
+
+        storage_type = dict(
+            storage_contract = sp.TAddress,
+            certifier = sp.TAddress,
+        )
+        storage = dict(
+            storage_contract = storage_contract,
+            certifier = certifier
+        )
+
+        if not constant_tables:
+            storage_type.update(
                 provider_statuses = sp.TBigMap(
                     sp.TNat,
                     sp.TString
                 ),
             )
-        )
-        self.init(
-            storage_contract = storage_contract,
-            provider_statuses = sp.big_map({
-                1: "active",
-                2: "deprecated"
-            }),
-            certifier = certifier
-        )
+            storage.update(
+                provider_statuses = sp.big_map(PROVIDER_STATUSES),
+            )
+
+        self.init_type(sp.TRecord(**storage_type))
+        self.init(**storage)
 
     ###########
     # Helpers #
     ###########
-    
-    # Verify source of transaction is owner or certifier
-    @sp.private_lambda(with_storage="read-only")
-    def verify_owner_source_address(self, params):
-        sp.set_type(params.owner_address, sp.TAddress)
-
-        sp.if (sp.source == params.owner_address):
-            sp.result(True)
-        sp.else:
-            sp.result(False)
-
-    # Verify Provider existence
-    def verify_provider_exists(self, provider_id):
-        provider_existance = sp.view(
-            "verify_provider_exists",
-            self.data.storage_contract,
-            provider_id,
-            t = sp.TBool
-        ).open_some("Invalid view");
 
-        return provider_existance
+    # Provider status names, from storage or compiled into the code
+    def provider_status_table(self):
+        if self.constant_tables:
+            return sp.map(PROVIDER_STATUSES, tkey = sp.TNat, tvalue = sp.TString)
+
+        return self.data.provider_statuses
 
-    # Get Provider owner address
-    def get_provider_owner_address(self, provider_id):
-        provider_owner_address = sp.view(
-            "get_provider_owner_address",
+    # Get Provider existence, owner address and status with a single view call
+    def get_provider_auth_context(self, provider_id):
+        provider_auth_context = sp.local("provider_auth_context", sp.view(
+            "get_provider_auth_context",
             self.data.storage_contract,
             provider_id,
-            t = sp.TAddress
-        ).open_some("Invalid view");
+            t = sp.TRecord(
+                exists = sp.TBool,
+                owner_address = sp.TOption(sp.TAddress),
+                status = sp.TOption(sp.TNat),
+            )
+        ).open_some("Invalid view"));
 
-        return provider_owner_address
+        return provider_auth_context.value
+
+    # Verify Provider existence and source of transaction is owner
+    def verify_provider_owner(self, provider_id):
+        provider_auth_context = self.get_provider_auth_context(provider_id)
+
+        sp.verify(provider_auth_context.exists, message = "Provider ID does not exist")
+        sp.verify(provider_auth_context.owner_address.open_some() == sp.source, message = "Non-matching owner address")
+
+    # Content-addressed provider data has to carry a SHA-256 digest
+    def verify_provider_data(self, provider_data):
+        if self.content_addressed:
+            sp.verify(sp.len(provider_data.digest) == 32, message = "Invalid digest length")
 
     @sp.entry_point
     def create_asset_provider(self, provider_id, provider_data):
         sp.set_type(provider_id, sp.TString)
-        sp.set_type(provider_data, sp.TString)
+        sp.set_type(provider_data, self.provider_data_type)
 
         # Check if provider does not exist, does not allow add call otherwise
-        sp.verify(~self.verify_provider_exists(provider_id), message = "Provider ID already exists")
+        sp.verify(~self.get_provider_auth_context(provider_id).exists, message = "Provider ID already exists")
+
+        self.verify_provider_data(provider_data)
 
         data_schema = sp.TRecord(
             provider_id = sp.TString,
-            provider_data = sp.TString,
+            provider_data = self.provider_data_type,
             status = sp.TNat,
             creator_wallet_address = sp.TAddress,
         )
@@ -94,12 +121,7 @@ class AssetProviderRepository(sp.Contract):
         sp.set_type(parameters.provider_id, sp.TString)
 
         # Update is allowed only from owner
-        owner_address = self.get_provider_owner_address(parameters.provider_id)
-        sp.verify(self.verify_owner_source_address(
-            sp.record(
-                owner_address = owner_address,
-            )
-        ), message = "Non-matching owner address")
+        self.verify_provider_owner(parameters.provider_id)
 
         # Defining the data expected by the Storage contract
         contract_data = sp.TRecord(provider_id = sp.TString, status = sp.TNat)
@@ -122,12 +144,7 @@ class AssetProviderRepository(sp.Contract):
         sp.set_type(parameters.provider_id, sp.TString)
 
         # Update is allowed only from owner
-        owner_address = self.get_provider_owner_address(parameters.provider_id)
-        sp.verify(self.verify_owner_source_address(
-            sp.record(
-                owner_address = owner_address,
-            )
-        ), message = "Non-matching owner address")
+        self.verify_provider_owner(parameters.provider_id)
 
         # Defining the data expected by the Storage contract
         contract_data = sp.TRecord(provider_id = sp.TString, status = sp.TNat)
@@ -151,12 +168,7 @@ class AssetProviderRepository(sp.Contract):
         sp.set_type(parameters.status, sp.TNat)
 
         # Update is allowed only from owner
-        owner_address = self.get_provider_owner_address(parameters.provider_id)
-        sp.verify(self.verify_owner_source_address(
-            sp.record(
-                owner_address = owner_address,
-            )
-        ), message = "Non-matching owner address")
+        self.verify_provider_owner(parameters.provider_id)
 
         # Defining the data expected by the Storage contract
         contract_data = sp.TRecord(provider_id = sp.TString, status = sp.TNat)
@@ -165,7 +177,7 @@ class AssetProviderRepository(sp.Contract):
         storage_contract = sp.contract(contract_data, self.data.storage_contract, "change_status").open_some()
 
         # Verify status ID exists
-        sp.verify(self.data.provider_statuses.contains(parameters.status), message = "Incorrect status")
+        sp.verify(self.provider_status_table().contains(parameters.status), message = "Incorrect status")
 
         # Defining the parameters that will be passed to the Storage contract
         params = sp.record(
@@ -180,21 +192,15 @@ class AssetProviderRepository(sp.Contract):
     def set_provider_data(self, parameters):
         # Defining the parameters' types
         sp.set_type(parameters.provider_id, sp.TString)
-        sp.set_type(parameters.provider_data, sp.TString)
-
-        # Check if provider exists, does not allow call otherwise
-        sp.verify(self.verify_provider_exists(parameters.provider_id), message = "Provider ID does not exist")
+        sp.set_type(parameters.provider_data, self.provider_data_type)
 
         # Update is allowed only from owner
-        owner_address = self.get_provider_owner_address(parameters.provider_id)
-        sp.verify(self.verify_owner_source_address(
-            sp.record(
-                owner_address = owner_address,
-            )
-        ), message = "Non-matching owner address")
+        self.verify_provider_owner(parameters.provider_id)
+
+        self.verify_provider_data(parameters.provider_data)
 
         # Defining the data expected by the Storage contract
-        contract_data = sp.TRecord(provider_id = sp.TString, provider_data = sp.TString)
+        contract_data = sp.TRecord(provider_id = sp.TString, provider_data = self.provider_data_type)
 
         # Defining the Storage contract itself and its entry point for the call
         storage_contract = sp.contract(contract_data, self.data.storage_contract, "change_data").open_some()
@@ -215,12 +221,7 @@ class AssetProviderRepository(sp.Contract):
         sp.set_type(parameters.new_owner_address, sp.TAddress)
 
         # Update is allowed only from owner
-        owner_address = self.get_provider_owner_address(parameters.provider_id)
-        sp.verify(self.verify_owner_source_address(
-            sp.record(
-                owner_address = owner_address,
-            )
-        ), message = "Non-matching owner address")
+        self.verify_provider_owner(parameters.provider_id)
 
         # Defining the data expected by the Storage contract
         contract_data = sp.TRecord(provider_id = sp.TString, new_owner_address = sp.TAddress)
@@ -267,7 +268,7 @@ class AssetProviderRepository(sp.Contract):
             provider_id,
             t = sp.TRecord(
                 provider_id = sp.TString,
-                provider_data = sp.TString,
+                provider_data = self.provider_data_type,
                 status = sp.TNat,
                 creator_wallet_address = sp.TAddress,
             )
@@ -277,7 +278,7 @@ class AssetProviderRepository(sp.Contract):
         result_provider = sp.record(
             provider_id = provider_id,
             provider_data = provider.provider_data,
-            status = self.data.provider_statuses[provider.status],
+            status = self.provider_status_table()[provider.status],
             creator_wallet_address = provider.creator_wallet_address,
         )
 
@@ -296,3 +297,19 @@ def test():
             sp.address('tz1_certifier_address')
         )
     )
+
+    sp.add_compilation_target("assetProviderRepositoryConstantTables",
+        AssetProviderRepository(
+            sp.address('KT1_contract_address'),
+            sp.address('tz1_certifier_address'),
+            constant_tables = True
+        )
+    )
+
+    sp.add_compilation_target("assetProviderRepositoryContentAddressed",
+        AssetProviderRepository(
+            sp.address('KT1_contract_address'),
+            sp.address('tz1_certifier_address'),
+            content_addressed = True
+        )
+    )
@@ -0,0 +1,103 @@
+# Asset Twin Scenarios
+
+import smartpy as sp
+
+@sp.add_test(name = "AssetTwinScenarios")
+def test():
+    FIXTURE = sp.io.import_stored_contract("testFixture.py")
+
+    accounts = FIXTURE.Accounts()
+
+    operator_A_address = accounts.operator_A_address
+    operator_B_address = accounts.operator_B_address
+
+    scenario = sp.test_scenario()
+
+    topology = FIXTURE.Topology(scenario, accounts)
+
+    lambda_contract = topology.lambda_contract
+
+    scenario.h2("Asset Providers")
+    topology.create_asset_providers()
+
+    # Testing
+
+    scenario.h1("Testing")
+    scenario.h2("Expected Successful Cases")
+
+    # Asset Twin Testing
+
+    scenario.h2("Asset Twin Testing")
+
+    provider_id_1 = FIXTURE.provider_id_1
+    provider_id_2 = FIXTURE.provider_id_2
+
+    hash_1 = FIXTURE.hash_1
+    hash_2 = FIXTURE.hash_2
+
+    hash_1_provider_1 = sp.record(
+        anchor_hash = hash_1,
+        provider_id = provider_id_1,
+        repo_end_point = "end_point_1"
+    )
+
+    hash_1_provider_2 = sp.record(
+        anchor_hash = hash_1,
+        provider_id = provider_id_2,
+        repo_end_point = "end_point_1"
+    )
+
+    hash_2_provider_1 = sp.record(
+        anchor_hash = hash_2,
+        provider_id = provider_id_1,
+        repo_end_point = "end_point_2"
+    )
+
+    lambda_contract.register_asset_twin(hash_1_provider_1).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.fetch_asset_twin(hash_1_provider_1).creator_wallet_address == operator_A_address)
+    lambda_contract.register_asset_twin(hash_1_provider_2).run(valid = True, sender = operator_A_address)
+    lambda_contract.register_asset_twin(hash_2_provider_1).run(valid = True, sender = operator_B_address)
+    lambda_contract.register_asset_twin(hash_1_provider_1).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.fetch_asset_twin(hash_2_provider_1).creator_wallet_address == operator_B_address)
+    scenario.verify(lambda_contract.fetch_asset_twin(hash_1_provider_1).registration_count == 2)
+
+    scenario.h3("Asset Twin Registration History")
+
+    hash_1_provider_1_history = sp.record(
+        anchor_hash = hash_1,
+        provider_id = provider_id_1,
+        offset = 0,
+        limit = 10
+    )
+
+    hash_1_provider_1_history_second_page = sp.record(
+        anchor_hash = hash_1,
+        provider_id = provider_id_1,
+        offset = 1,
+        limit = 1
+    )
+
+    scenario.verify(sp.len(lambda_contract.fetch_asset_twin_history(hash_1_provider_1_history)) == 2)
+    scenario.verify(sp.len(lambda_contract.fetch_asset_twin_history(hash_1_provider_1_history_second_page)) == 1)
+    scenario.verify(lambda_contract.fetch_asset_twin_history(hash_1_provider_1_history_second_page).contains(1))
+
+    scenario.h3("Asset Twin Batch Registration")
+
+    hash_3 = FIXTURE.hash_3
+
+    hash_3_provider_1 = sp.record(
+        anchor_hash = hash_3,
+        provider_id = provider_id_1,
+        repo_end_point = "end_point_3"
+    )
+
+    hash_3_provider_2 = sp.record(
+        anchor_hash = hash_3,
+        provider_id = provider_id_2,
+        repo_end_point = "end_point_3"
+    )
+
+    lambda_contract.register_asset_twins_batch([hash_3_provider_1, hash_3_provider_2, hash_1_provider_2]).run(valid = True, sender = operator_B_address)
+    scenario.verify(lambda_contract.fetch_asset_twin(hash_3_provider_1).creator_wallet_address == operator_B_address)
+    scenario.verify(lambda_contract.fetch_asset_twin(hash_3_provider_2).asset_repository_endpoint == "end_point_3")
+    scenario.verify(lambda_contract.fetch_asset_twin(hash_1_provider_2).registration_count == 2)
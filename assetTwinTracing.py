@@ -3,27 +3,35 @@
 import smartpy as sp
 
 class AssetTwinTracing(sp.Contract):
-    def __init__(self, certifier):
+    def __init__(self, certifier, history_page_limit = 100, max_batch_size = 100):
+        # Maximum number of registrations returned by one fetch_asset_twin_history call
+        self.history_page_limit = history_page_limit
+
         self.init_type(
             sp.TRecord(
                 assets = sp.TBigMap(
-                    sp.TString,
-                    sp.TMap(
-                        sp.TString,
-                        sp.TRecord(
-                            asset_repository_endpoint = sp.TString,
-                            creator_wallet_address = sp.TAddress,
-                            registration_timestamps = sp.TList(sp.TTimestamp)
-                        )
+                    sp.TPair(sp.TString, sp.TString),
+                    sp.TRecord(
+                        asset_repository_endpoint = sp.TString,
+                        creator_wallet_address = sp.TAddress,
+                        latest_registration = sp.TTimestamp,
+                        registration_count = sp.TNat
                     )
                 ),
+                registration_history = sp.TBigMap(
+                    sp.TPair(sp.TPair(sp.TString, sp.TString), sp.TNat),
+                    sp.TTimestamp
+                ),
                 calling_contract_address = sp.TOption(sp.TAddress),
+                max_batch_size = sp.TNat,
                 certifier = sp.TAddress
             )
         )
         self.init(
             assets = sp.big_map(),
+            registration_history = sp.big_map(),
             calling_contract_address = sp.none,
+            max_batch_size = max_batch_size,
             certifier = certifier
         )
 
@@ -31,41 +39,151 @@ class AssetTwinTracing(sp.Contract):
     # Helpers #
     ###########
 
-    @sp.entry_point
-    def register(self, anchor_hash, provider_id, repo_end_point):
-        sp.set_type(anchor_hash, sp.TString)
-        sp.set_type(provider_id, sp.TString)
-        sp.set_type(repo_end_point, sp.TString)
-
-        # Verifying whether the caller address is the calling contract
+    # Verifying whether the caller address is the calling contract
+    def verify_calling_contract(self):
         sp.verify(self.data.calling_contract_address.open_some(message = "Empty calling contract address") == sp.sender,
             message = "Incorrect caller")
 
+    # Register a single asset twin, shared by the single and batch entry points
+    def register_asset_twin(self, anchor_hash, provider_id, repo_end_point):
+        # Asset twins are keyed by (anchor_hash, provider_id), so only the record of this provider is read
+        asset_key = sp.pair(anchor_hash, provider_id)
+
+        registration_timestamp = sp.timestamp_from_utc_now()
+
         tracable_record = sp.record(
             asset_repository_endpoint = repo_end_point,
             creator_wallet_address = sp.source,
-            registration_timestamps = sp.list([sp.timestamp_from_utc_now()], t = sp.TTimestamp),
+            latest_registration = registration_timestamp,
+            registration_count = 1,
         )
 
-        sp.if (self.data.assets.contains(anchor_hash) == True):
-            sp.if (self.data.assets[anchor_hash].contains(provider_id) == True):
-                new_timestamps = sp.cons(sp.timestamp_from_utc_now(), self.data.assets[anchor_hash][provider_id].registration_timestamps)
-                with sp.modify_record(self.data.assets[anchor_hash][provider_id], "data") as data:
-                    data.registration_timestamps = new_timestamps
-            sp.else:
-                self.data.assets[anchor_hash][provider_id] = tracable_record
+        sp.if (self.data.assets.contains(asset_key) == True):
+            # Re-registrations are appended to the history under the next counter value
+            self.data.registration_history[sp.pair(asset_key, self.data.assets[asset_key].registration_count)] = registration_timestamp
+
+            with sp.modify_record(self.data.assets[asset_key], "data") as data:
+                data.latest_registration = registration_timestamp
+                data.registration_count += 1
         sp.else:
-            self.data.assets[anchor_hash] = {provider_id : tracable_record}
+            self.data.registration_history[sp.pair(asset_key, 0)] = registration_timestamp
+            self.data.assets[asset_key] = tracable_record
+
+        sp.emit(sp.record(
+            anchor_hash = anchor_hash,
+            provider_id = provider_id,
+            registration_count = self.data.assets[asset_key].registration_count,
+        ), tag = "asset_twin_registered")
+
+    @sp.entry_point
+    def register(self, anchor_hash, provider_id, repo_end_point):
+        sp.set_type(anchor_hash, sp.TString)
+        sp.set_type(provider_id, sp.TString)
+        sp.set_type(repo_end_point, sp.TString)
+
+        self.verify_calling_contract()
+
+        self.register_asset_twin(anchor_hash, provider_id, repo_end_point)
+
+    @sp.entry_point
+    def register_asset_twins_batch(self, asset_twins):
+        sp.set_type(asset_twins, sp.TList(
+            sp.TRecord(
+                anchor_hash = sp.TString,
+                provider_id = sp.TString,
+                repo_end_point = sp.TString
+            )
+        ))
+
+        self.verify_calling_contract()
+
+        sp.verify(sp.len(asset_twins) > 0, message = "Empty batch")
+        sp.verify(sp.len(asset_twins) <= self.data.max_batch_size, message = "Batch size exceeds limit")
+
+        # A failing item fails the whole operation, so the batch is registered all-or-nothing
+        sp.for asset_twin in asset_twins:
+            self.register_asset_twin(asset_twin.anchor_hash, asset_twin.provider_id, asset_twin.repo_end_point)
 
     @sp.onchain_view()
     def fetch_asset_twin(self, parameters):
         sp.set_type(parameters.anchor_hash, sp.TString)
         sp.set_type(parameters.provider_id, sp.TString)
-        
-        sp.verify(self.data.assets.contains(parameters.anchor_hash), message = "Hash not found")
-        sp.verify(self.data.assets[parameters.anchor_hash].contains(parameters.provider_id), message = "Hash not found")
-        
-        sp.result(self.data.assets[parameters.anchor_hash][parameters.provider_id])
+
+        asset_key = sp.pair(parameters.anchor_hash, parameters.provider_id)
+
+        sp.verify(self.data.assets.contains(asset_key), message = "Hash not found")
+
+        sp.result(self.data.assets[asset_key])
+
+    @sp.onchain_view()
+    def fetch_asset_twin_history(self, parameters):
+        sp.set_type(parameters.anchor_hash, sp.TString)
+        sp.set_type(parameters.provider_id, sp.TString)
+        sp.set_type(parameters.offset, sp.TNat)
+        sp.set_type(parameters.limit, sp.TNat)
+
+        asset_key = sp.pair(parameters.anchor_hash, parameters.provider_id)
+
+        sp.verify(self.data.assets.contains(asset_key), message = "Hash not found")
+        sp.verify(parameters.limit <= self.history_page_limit, message = "History page limit exceeded")
+
+        # Registrations are indexed from 0 (first) to registration_count - 1 (latest)
+        page_end = sp.local("page_end", parameters.offset + parameters.limit)
+
+        sp.if (page_end.value > self.data.assets[asset_key].registration_count):
+            page_end.value = self.data.assets[asset_key].registration_count
+
+        history = sp.local("history", sp.map(tkey = sp.TNat, tvalue = sp.TTimestamp))
+
+        sp.for index in sp.range(parameters.offset, page_end.value):
+            history.value[index] = self.data.registration_history[sp.pair(asset_key, index)]
+
+        sp.result(history.value)
+
+    @sp.entry_point
+    def import_asset_twins(self, asset_twins):
+        # Migration path from the previous (anchor_hash -> provider_id -> record) layout.
+        # Each item mirrors one value of the old big_map, so exported data can be replayed as-is.
+        sp.set_type(asset_twins, sp.TList(
+            sp.TRecord(
+                anchor_hash = sp.TString,
+                providers = sp.TMap(
+                    sp.TString,
+                    sp.TRecord(
+                        asset_repository_endpoint = sp.TString,
+                        creator_wallet_address = sp.TAddress,
+                        registration_timestamps = sp.TList(sp.TTimestamp)
+                    )
+                )
+            )
+        ))
+
+        with sp.if_(self.data.certifier != sp.source):
+            sp.failwith("Incorrect certifier")
+
+        history_index = sp.local("history_index", sp.nat(0))
+
+        sp.for asset_twin in asset_twins:
+            sp.for provider in asset_twin.providers.items():
+                asset_key = sp.pair(asset_twin.anchor_hash, provider.key)
+                registration_count = sp.len(provider.value.registration_timestamps)
+
+                sp.verify(~self.data.assets.contains(asset_key), message = "Asset twin already exists")
+                sp.verify(registration_count > 0, message = "Empty registration history")
+
+                # The old timestamp lists are ordered from the latest registration to the first one
+                history_index.value = registration_count
+
+                sp.for registration_timestamp in provider.value.registration_timestamps:
+                    history_index.value = sp.as_nat(history_index.value - 1)
+                    self.data.registration_history[sp.pair(asset_key, history_index.value)] = registration_timestamp
+
+                self.data.assets[asset_key] = sp.record(
+                    asset_repository_endpoint = provider.value.asset_repository_endpoint,
+                    creator_wallet_address = provider.value.creator_wallet_address,
+                    latest_registration = self.data.registration_history[sp.pair(asset_key, sp.as_nat(registration_count - 1))],
+                    registration_count = registration_count,
+                )
 
     @sp.entry_point
     def change_calling_contract_address(self, new_calling_contract_address):
@@ -75,6 +193,15 @@ class AssetTwinTracing(sp.Contract):
         # Update logic contract address
         self.data.calling_contract_address = sp.some(new_calling_contract_address)
 
+    @sp.entry_point
+    def set_max_batch_size(self, max_batch_size):
+        sp.set_type(max_batch_size, sp.TNat)
+
+        with sp.if_(self.data.certifier != sp.source):
+            sp.failwith("Incorrect certifier")
+
+        self.data.max_batch_size = max_batch_size
+
 @sp.add_test(name = "AssetTwinTracing")
 def test():
     sp.add_compilation_target("assetTwinTracing",
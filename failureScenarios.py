@@ -0,0 +1,339 @@
+# Failure Scenarios
+
+import smartpy as sp
+
+@sp.add_test(name = "FailureScenarios")
+def test():
+    FIXTURE = sp.io.import_stored_contract("testFixture.py")
+
+    accounts = FIXTURE.Accounts()
+
+    certifier_address = accounts.certifier_address
+    operator_A_address = accounts.operator_A_address
+    operator_B_address = accounts.operator_B_address
+
+    scenario = sp.test_scenario()
+
+    topology = FIXTURE.Topology(scenario, accounts)
+
+    lambda_contract = topology.lambda_contract
+    asset_twin_tracing = topology.asset_twin_tracing
+    luw_contract = topology.luw_contract
+
+    # The data left behind by the successful cases of the other scenario modules
+
+    scenario.h2("Asset Providers")
+    topology.create_asset_providers()
+
+    scenario.h2("Asset Twins")
+    topology.register_asset_twins()
+
+    scenario.h2("LUWs")
+    topology.create_luws()
+
+    # Testing
+
+    scenario.h1("Testing")
+    scenario.h2("Expected Failed Cases")
+
+    provider_id_1 = FIXTURE.provider_id_1
+    provider_id_2 = FIXTURE.provider_id_2
+
+    # Asset Provider Testing
+
+    scenario.h2("Asset Provider Testing")
+    scenario.h3("Asset Provider Creation")
+
+    asset_provider_1 = sp.record(
+        provider_id = provider_id_1,
+        provider_data = FIXTURE.asset_provider_data_A
+    )
+
+    change_asset_provider_1_data = sp.record(
+        provider_id = provider_id_1,
+        provider_data = FIXTURE.asset_provider_data_B
+    )
+
+    change_asset_provider_1_owner_B = sp.record(
+        provider_id = provider_id_1,
+        new_owner_address = operator_B_address
+    )
+
+    scenario.h4("Adding an existing Provider ID. Expected exception - Provider ID already exists")
+    lambda_contract.create_asset_provider(asset_provider_1).run(valid = False, sender = operator_B_address, exception = "Provider ID already exists")
+
+    scenario.h4("Changing provider data from incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.set_provider_data(change_asset_provider_1_data).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
+
+    scenario.h4("Changing provider owner from incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.set_provider_owner(change_asset_provider_1_owner_B).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
+
+    scenario.h3("Asset Provider Status Change")
+
+    asset_status_invalid_status = sp.record(
+        provider_id = provider_id_2,
+        status = 9999
+    )
+
+    asset_status_invalid_provider = sp.record(
+        provider_id = "non_existing_did",
+        status = 1
+    )
+
+    scenario.h4("Changing provider to Active status from incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.set_provider_active(provider_id_1).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
+
+    scenario.h4("Changing provider status from incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.set_provider_status(asset_status_invalid_status).run(valid = False, sender = operator_A_address, exception = "Non-matching owner address")
+
+    scenario.h4("Changing provider status of a non-existing provider ID. Expected exception - Provider ID does not exist")
+    lambda_contract.set_provider_status(asset_status_invalid_provider).run(valid = False, sender = operator_A_address, exception = "Provider ID does not exist")
+
+    # Asset Twin Testing
+
+    scenario.h2("Asset Twin Testing")
+
+    hash_1 = FIXTURE.hash_1
+    hash_3 = FIXTURE.hash_3
+
+    hash_1_provider_2 = sp.record(
+        anchor_hash = hash_1,
+        provider_id = provider_id_2,
+        repo_end_point = "end_point_1"
+    )
+
+    hash_1_provider_invalid = sp.record(
+        anchor_hash = hash_1,
+        provider_id = "provider_id_invalid",
+        repo_end_point = "end_point_1"
+    )
+
+    hash_1_provider_1_history_over_limit = sp.record(
+        anchor_hash = hash_1,
+        provider_id = provider_id_1,
+        offset = 0,
+        limit = 1000
+    )
+
+    hash_3_provider_1 = sp.record(
+        anchor_hash = hash_3,
+        provider_id = provider_id_1,
+        repo_end_point = "end_point_3"
+    )
+
+    hash_3_provider_2 = sp.record(
+        anchor_hash = hash_3,
+        provider_id = provider_id_2,
+        repo_end_point = "end_point_3"
+    )
+
+    scenario.verify(sp.is_failing(lambda_contract.fetch_asset_twin(hash_1_provider_invalid)))
+    e = sp.catch_exception(lambda_contract.fetch_asset_twin(hash_1_provider_invalid), t = sp.TString)
+    scenario.verify(e == sp.some("Hash not found"))
+
+    e = sp.catch_exception(lambda_contract.fetch_asset_twin_history(hash_1_provider_1_history_over_limit), t = sp.TString)
+    scenario.verify(e == sp.some("History page limit exceeded"))
+
+    scenario.h3("Asset Twin Batch Registration")
+
+    scenario.h4("Changing the maximum batch size from a non-certifier address. Expected exception - Incorrect certifier")
+    lambda_contract.set_max_batch_size(1).run(valid = False, sender = operator_A_address, exception = "Incorrect certifier")
+
+    lambda_contract.set_max_batch_size(2).run(valid = True, sender = certifier_address)
+
+    scenario.h4("Registering a batch larger than the maximum batch size. Expected exception - Batch size exceeds limit")
+    lambda_contract.register_asset_twins_batch([hash_3_provider_1, hash_3_provider_2, hash_1_provider_2]).run(valid = False, sender = operator_A_address, exception = "Batch size exceeds limit")
+
+    scenario.h4("Registering an empty batch. Expected exception - Empty batch")
+    lambda_contract.register_asset_twins_batch([]).run(valid = False, sender = operator_A_address, exception = "Empty batch")
+
+    scenario.h4("Registering a batch directly on the Asset Twin contract. Expected exception - Incorrect caller")
+    asset_twin_tracing.register_asset_twins_batch([hash_3_provider_1]).run(valid = False, sender = operator_A_address, exception = "Incorrect caller")
+
+    # A rejected batch leaves no registration behind
+    scenario.verify(lambda_contract.fetch_asset_twin(hash_3_provider_1).registration_count == 1)
+
+    # LUW Testing
+
+    scenario.h2("LUW Testing")
+
+    repository_id_1 = FIXTURE.repository_id_1
+    repository_id_2 = FIXTURE.repository_id_2
+    repository_id_3 = FIXTURE.repository_id_3
+
+    repository_add_valid_1 = sp.record(
+        luw_id = 0,
+        repository_id = repository_id_1,
+    )
+
+    repository_add_valid_2 = sp.record(
+        luw_id = 0,
+        repository_id = repository_id_2,
+    )
+
+    repository_change_state_valid = sp.record(
+        luw_id = 0,
+        repository_id = repository_id_1,
+        state_id = 2
+    )
+
+    repository_change_state_invalid_luw = sp.record(
+        luw_id = 999,
+        repository_id = repository_id_1,
+        state_id = 2
+    )
+
+    repository_change_state_invalid_state = sp.record(
+        luw_id = 0,
+        repository_id = repository_id_1,
+        state_id = 999
+    )
+
+    repository_change_state_invalid_repo = sp.record(
+        luw_id = 0,
+        repository_id = "invalid_repo",
+        state_id = 2
+    )
+
+    scenario.h3("LUW Repository Management")
+
+    scenario.h4("Adding a Repository to a non-active LUW. Expected exception - LUW is not Active")
+    lambda_contract.add_luw_repository(repository_add_valid_1).run(valid = False, sender = operator_A_address, exception = "LUW is not Active")
+
+    scenario.h4("Adding a Repository to a LUW from an incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.add_luw_repository(repository_add_valid_2).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
+
+    scenario.h4("Changing a LUW Repository state from an incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.change_luw_repository_state(repository_change_state_valid).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
+
+    scenario.h4("Changing a LUW Repository state for a non-existing LUW ID. Expected exception - LUW ID does not exist")
+    lambda_contract.change_luw_repository_state(repository_change_state_invalid_luw).run(valid = False, sender = operator_A_address, exception = "LUW ID does not exist")
+
+    scenario.h4("Changing a LUW Repository state to an invalid state ID. Expected exception - Incorrect state ID")
+    lambda_contract.change_luw_repository_state(repository_change_state_invalid_state).run(valid = False, sender = operator_A_address, exception = "Incorrect state ID")
+
+    scenario.h4("Changing a LUW Repository state for a non-existing Repository. Expected exception - Repository ID does not exist")
+    lambda_contract.change_luw_repository_state(repository_change_state_invalid_repo).run(valid = False, sender = operator_A_address, exception = "Repository ID does not exist")
+
+    scenario.h3("LUW State Change")
+
+    luw_valid_new_state_record = sp.record(
+        luw_id = 0,
+        state_id = 2,
+    )
+
+    luw_new_state_invalid_luw_id_record = sp.record(
+        luw_id = 999,
+        state_id = 2,
+    )
+
+    luw_new_state_invalid_state_id_record = sp.record(
+        luw_id = 0,
+        state_id = 999,
+    )
+
+    scenario.h4("Changing LUW state from incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.change_luw_state(luw_valid_new_state_record).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
+
+    scenario.h4("Changing LUW state for a non-existing LUW ID. Expected exception - LUW ID does not exist")
+    lambda_contract.change_luw_state(luw_new_state_invalid_luw_id_record).run(valid = False, sender = operator_A_address, exception = "LUW ID does not exist")
+
+    scenario.h4("Changing LUW state to an invalid state ID. Expected exception - Incorrect state ID")
+    lambda_contract.change_luw_state(luw_new_state_invalid_state_id_record).run(valid = False, sender = operator_A_address, exception = "Incorrect state ID")
+
+    scenario.h3("LUW Batch Repository Management")
+
+    repositories_change_state_batch = sp.record(
+        luw_id = 1,
+        repositories = [
+            sp.record(repository_id = repository_id_1, state_id = 2),
+            sp.record(repository_id = repository_id_3, state_id = 2),
+        ],
+    )
+
+    scenario.h4("Adding a batch of Repositories to a non-active LUW. Expected exception - LUW is not Active")
+    lambda_contract.add_luw_repositories(luw_id = 0, repository_ids = ["repository_4"]).run(valid = False, sender = operator_A_address, exception = "LUW is not Active")
+
+    scenario.h4("Adding a batch of Repositories from an incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.add_luw_repositories(luw_id = 1, repository_ids = ["repository_4"]).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
+
+    scenario.h4("Adding a batch that contains an existing Repository. Expected exception - Repository ID already exists")
+    lambda_contract.add_luw_repositories(luw_id = 1, repository_ids = ["repository_4", repository_id_1]).run(valid = False, sender = operator_A_address, exception = "Repository ID already exists")
+
+    scenario.h4("Adding an empty batch of Repositories. Expected exception - Empty batch")
+    lambda_contract.add_luw_repositories(luw_id = 1, repository_ids = []).run(valid = False, sender = operator_A_address, exception = "Empty batch")
+
+    # The maximum batch size was set to 2 by the Asset Twin cases above
+    scenario.h4("Adding a batch of Repositories larger than the maximum batch size. Expected exception - Batch size exceeds limit")
+    lambda_contract.add_luw_repositories(luw_id = 1, repository_ids = ["repository_4", "repository_5", "repository_6"]).run(valid = False, sender = operator_A_address, exception = "Batch size exceeds limit")
+
+    scenario.h4("Changing a batch of Repository states from an incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.change_luw_repository_states(repositories_change_state_batch).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
+
+    scenario.h4("Changing a batch of Repository states with an invalid state ID. Expected exception - Incorrect state ID")
+    lambda_contract.change_luw_repository_states(
+        luw_id = 1,
+        repositories = [sp.record(repository_id = repository_id_2, state_id = 2), sp.record(repository_id = repository_id_3, state_id = 999)]
+    ).run(valid = False, sender = operator_A_address, exception = "Incorrect state ID")
+
+    scenario.h4("Changing a batch of Repository states with a non-existing Repository. Expected exception - Repository ID does not exist")
+    lambda_contract.change_luw_repository_states(
+        luw_id = 1,
+        repositories = [sp.record(repository_id = repository_id_2, state_id = 2), sp.record(repository_id = "invalid_repo", state_id = 2)]
+    ).run(valid = False, sender = operator_A_address, exception = "Repository ID does not exist")
+
+    # A rejected batch leaves every repository of the LUW unchanged
+    scenario.verify(luw_contract.data.luw_map[1].repository_count == 3)
+    scenario.verify(lambda_contract.get_luw_repository_state(sp.record(luw_id = 1, repository_id = repository_id_2)) == "open")
+
+    scenario.h3("LUW Commit and Abort")
+
+    scenario.h4("Committing a LUW with a Repository that is not ready. Expected exception - Repository is not ready")
+    lambda_contract.commit_luw(0).run(valid = False, sender = operator_A_address, exception = "Repository is not ready")
+
+    scenario.h4("Committing a LUW that is not in prepare_to_commit. Expected exception - LUW is not prepared to commit")
+    lambda_contract.commit_luw(1).run(valid = False, sender = operator_A_address, exception = "LUW is not prepared to commit")
+
+    scenario.h4("Committing a LUW from an incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.commit_luw(0).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
+
+    scenario.h4("Committing a non-existing LUW ID. Expected exception - LUW ID does not exist")
+    lambda_contract.commit_luw(999).run(valid = False, sender = operator_A_address, exception = "LUW ID does not exist")
+
+    scenario.h4("Aborting a committed LUW. Expected exception - LUW is already closed")
+    lambda_contract.abort_luw(2).run(valid = False, sender = operator_A_address, exception = "LUW is already closed")
+
+    scenario.h4("Aborting a LUW from an incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.abort_luw(1).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
+
+    # A rejected commit leaves the LUW and its repositories unchanged
+    scenario.verify(lambda_contract.get_active_luw_state(0) == "prepare_to_commit")
+    scenario.verify(lambda_contract.get_luw_repository_state(repository_add_valid_1) == "ready")
+
+    # Storage Contracts Testing
+
+    scenario.h2("Storage Contracts Testing")
+
+    scenario.h4("Syncing the storage contracts from an incorrect wallet address. Expected exception - Incorrect certifier")
+    lambda_contract.sync_storage_contracts().run(valid = False, sender = operator_A_address, exception = "Incorrect certifier")
+
+    scenario.h4("Reading the storage contracts of a Registry that was never synced. Expected exception - Storage contracts not synced")
+    REGISTRY = sp.io.import_stored_contract("registry.py")
+
+    unsynced_registry = REGISTRY.Registry(
+        sp.record(
+            asset_provider_contract = topology.asset_provider_repo.address,
+            asset_twin_contract = asset_twin_tracing.address,
+            luw_contract = topology.luw_repo_contract.address,
+        ),
+        certifier_address
+    )
+
+    scenario += unsynced_registry
+
+    scenario.verify(~unsynced_registry.verify_storage_contracts())
+    e = sp.catch_exception(unsynced_registry.get_storage_contracts(), t = sp.TString)
+    scenario.verify(e == sp.some("Storage contracts not synced"))
+
+    unsynced_registry.sync_storage_contracts().run(valid = True, sender = certifier_address)
+    scenario.verify(unsynced_registry.verify_storage_contracts())
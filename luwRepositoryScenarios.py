@@ -0,0 +1,88 @@
+# LUW Repository Scenarios
+
+import smartpy as sp
+
+@sp.add_test(name = "LUWRepositoryScenarios")
+def test():
+    FIXTURE = sp.io.import_stored_contract("testFixture.py")
+
+    accounts = FIXTURE.Accounts()
+
+    operator_A_address = accounts.operator_A_address
+
+    scenario = sp.test_scenario()
+
+    topology = FIXTURE.Topology(scenario, accounts)
+
+    lambda_contract = topology.lambda_contract
+    luw_contract = topology.luw_contract
+
+    luw_record = sp.record(
+        provider_id = "provider_id",
+        luw_service_endpoint = accounts.offchain_coordinator_address,
+    )
+
+    scenario.h2("LUWs")
+    lambda_contract.create_luw(luw_record).run(valid = True, sender = operator_A_address)
+
+    # Testing
+
+    scenario.h1("Testing")
+    scenario.h2("Expected Successful Cases")
+
+    # LUW Repository Testing
+
+    scenario.h2("LUW Repository Testing")
+
+    repository_id_1 = FIXTURE.repository_id_1
+    repository_id_2 = FIXTURE.repository_id_2
+    repository_id_3 = FIXTURE.repository_id_3
+
+    repository_add_valid_1 = sp.record(
+        luw_id = 0,
+        repository_id = repository_id_1,
+    )
+
+    repository_add_valid_2 = sp.record(
+        luw_id = 0,
+        repository_id = repository_id_2,
+    )
+
+    scenario.h3("LUW Repository Management")
+    lambda_contract.add_luw_repository(repository_add_valid_1).run(valid = True, sender = operator_A_address)
+    lambda_contract.add_luw_repository(repository_add_valid_2).run(valid = True, sender = operator_A_address)
+    scenario.verify(luw_contract.has_luw_repository(repository_add_valid_1))
+    scenario.verify(~luw_contract.has_luw_repository(sp.record(luw_id = 0, repository_id = "invalid_repo")))
+
+    repository_change_state_valid = sp.record(
+        luw_id = 0,
+        repository_id = repository_id_1,
+        state_id = 2
+    )
+
+    lambda_contract.change_luw_repository_state(repository_change_state_valid).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_luw_repository_state(repository_add_valid_1) == "ready")
+
+    scenario.h3("LUW Batch Repository Management")
+
+    lambda_contract.create_luw(luw_record).run(valid = True, sender = operator_A_address)
+
+    repositories_add_batch = sp.record(
+        luw_id = 1,
+        repository_ids = [repository_id_1, repository_id_2, repository_id_3],
+    )
+
+    repositories_change_state_batch = sp.record(
+        luw_id = 1,
+        repositories = [
+            sp.record(repository_id = repository_id_1, state_id = 2),
+            sp.record(repository_id = repository_id_3, state_id = 2),
+        ],
+    )
+
+    lambda_contract.add_luw_repositories(repositories_add_batch).run(valid = True, sender = operator_A_address)
+    scenario.verify(luw_contract.data.luw_map[1].repository_count == 3)
+    scenario.verify(luw_contract.has_luw_repository(sp.record(luw_id = 1, repository_id = repository_id_3)))
+
+    lambda_contract.change_luw_repository_states(repositories_change_state_batch).run(valid = True, sender = operator_A_address)
+    scenario.verify_equal(lambda_contract.fetch_luw_decoded(1).repository_endpoints, {repository_id_1: "ready", repository_id_2: "open", repository_id_3: "ready"})
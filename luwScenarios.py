@@ -0,0 +1,95 @@
+# LUW Scenarios
+
+import smartpy as sp
+
+@sp.add_test(name = "LUWScenarios")
+def test():
+    FIXTURE = sp.io.import_stored_contract("testFixture.py")
+
+    accounts = FIXTURE.Accounts()
+
+    operator_A_address = accounts.operator_A_address
+
+    scenario = sp.test_scenario()
+
+    topology = FIXTURE.Topology(scenario, accounts)
+
+    lambda_contract = topology.lambda_contract
+    luw_contract = topology.luw_contract
+
+    # Testing
+
+    scenario.h1("Testing")
+    scenario.h2("Expected Successful Cases")
+
+    # LUW Testing
+
+    scenario.h2("LUW Testing")
+    scenario.h3("LUW Creation")
+
+    luw_record = sp.record(
+        provider_id = "provider_id",
+        luw_service_endpoint = accounts.offchain_coordinator_address,
+    )
+
+    lambda_contract.create_luw(luw_record).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.fetch_luw(sp.record(luw_id = 0, offset = 0, limit = 100)).creator_wallet_address == operator_A_address)
+    scenario.verify(lambda_contract.get_active_luw_state(0) == "active")
+
+    repository_id_1 = FIXTURE.repository_id_1
+    repository_id_2 = FIXTURE.repository_id_2
+
+    # Repositories are covered by luwRepositoryScenarios.py, they are only added for the decoded view
+    lambda_contract.add_luw_repositories(luw_id = 0, repository_ids = [repository_id_1, repository_id_2]).run(valid = True, sender = operator_A_address)
+    lambda_contract.change_luw_repository_state(luw_id = 0, repository_id = repository_id_1, state_id = 2).run(valid = True, sender = operator_A_address)
+
+    scenario.h3("LUW State Change")
+
+    luw_valid_new_state_record = sp.record(
+        luw_id = 0,
+        state_id = 2,
+    )
+
+    lambda_contract.change_luw_state(luw_valid_new_state_record).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_active_luw_state(0) == "prepare_to_commit")
+
+    # The active state is kept in the LUW header, next to the full history
+    scenario.verify(luw_contract.data.luw_map[0].active_state_id == 2)
+    scenario.verify(luw_contract.data.luw_map[0].state_count == 2)
+    scenario.verify_equal(luw_contract.get_luw_state_history(0), {1: 1, 2: 2})
+
+    scenario.verify_equal(lambda_contract.fetch_luw(sp.record(luw_id = 0, offset = 0, limit = 100)).state_history, {1: 1, 2: 2})
+
+    # fetch_luw reads one page of the history and repositories, with the header counts
+    luw_page = lambda_contract.fetch_luw(sp.record(luw_id = 0, offset = 1, limit = 1))
+    scenario.verify_equal(luw_page.state_history, {2: 2})
+    scenario.verify_equal(luw_page.repository_endpoints, {repository_id_2: 1})
+    scenario.verify(luw_page.active_state_id == 2)
+    scenario.verify(luw_page.state_count == 2)
+    scenario.verify(luw_page.repository_count == 2)
+    scenario.verify_equal(lambda_contract.fetch_luw_decoded(0).state_history, {1: "active", 2: "prepare_to_commit"})
+    scenario.verify_equal(lambda_contract.fetch_luw_decoded(0).repository_endpoints, {repository_id_1: "ready", repository_id_2: "open"})
+
+    scenario.h3("LUW Commit and Abort")
+
+    # LUW 1 is committed once every repository is ready
+    lambda_contract.create_luw(luw_record).run(valid = True, sender = operator_A_address)
+    lambda_contract.add_luw_repositories(luw_id = 1, repository_ids = [repository_id_1, repository_id_2]).run(valid = True, sender = operator_A_address)
+    lambda_contract.change_luw_repository_states(
+        luw_id = 1,
+        repositories = [sp.record(repository_id = repository_id_1, state_id = 2), sp.record(repository_id = repository_id_2, state_id = 2)]
+    ).run(valid = True, sender = operator_A_address)
+    lambda_contract.change_luw_state(luw_id = 1, state_id = 2).run(valid = True, sender = operator_A_address)
+
+    lambda_contract.commit_luw(1).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_active_luw_state(1) == "committed")
+    scenario.verify_equal(lambda_contract.fetch_luw_decoded(1).state_history, {1: "active", 2: "prepare_to_commit", 3: "committed"})
+    scenario.verify_equal(lambda_contract.fetch_luw_decoded(1).repository_endpoints, {repository_id_1: "committed", repository_id_2: "committed"})
+
+    # LUW 2 is aborted while active, with a repository that is not ready
+    lambda_contract.create_luw(luw_record).run(valid = True, sender = operator_A_address)
+    lambda_contract.add_luw_repositories(luw_id = 2, repository_ids = [repository_id_1]).run(valid = True, sender = operator_A_address)
+
+    lambda_contract.abort_luw(2).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_active_luw_state(2) == "aborted")
+    scenario.verify(lambda_contract.get_luw_repository_state(sp.record(luw_id = 2, repository_id = repository_id_1)) == "rollbacked")
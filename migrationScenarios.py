@@ -0,0 +1,181 @@
+# Migration Scenarios
+
+import smartpy as sp
+
+@sp.add_test(name = "MigrationScripts")
+def test():
+    ASSET_TWIN_TRACING = sp.io.import_stored_contract("assetTwinTracing.py")
+    LUW = sp.io.import_stored_contract("LUW.py")
+
+    certifier = sp.test_account("Certifier")
+    operator_A = sp.test_account("Operator_A")
+    operator_B = sp.test_account("Operator_B")
+
+    certifier_address = certifier.address
+    operator_A_address = operator_A.address
+    operator_B_address = operator_B.address
+
+    scenario = sp.test_scenario()
+    scenario.h1("Preparation")
+    scenario.table_of_contents()
+
+    scenario.h2("Accounts")
+    scenario.show([certifier, operator_A, operator_B])
+
+    scenario.h2("Contracts List")
+
+    # Asset Twin Contract Instantiation
+
+    scenario.h3("Asset Twin Tracing")
+
+    asset_twin_tracing = ASSET_TWIN_TRACING.AssetTwinTracing(
+        certifier_address
+    )
+
+    scenario += asset_twin_tracing
+
+    # LUW Contract Instantiation
+
+    scenario.h3("LUW")
+
+    luw_contract = LUW.LUW(certifier_address)
+
+    scenario += luw_contract
+
+    # Testing
+
+    scenario.h1("Testing")
+
+    # Asset Twin Migration Testing
+
+    scenario.h2("Asset Twin Migration")
+
+    hash_1 = "efb583d376b19d92d81e75bea335768d2b5cc9d60460c182cb6e66e8031b1aea"
+    hash_2 = "fc2c0c139d5b71c45a339f91a81961904ec564d62ca3727e0679bef4193c7c7a"
+
+    provider_id_1 = "86a6c8f7-dc31-46ba-98fc-58bea40fc28d"
+    provider_id_2 = "7f6fd42a-1927-4dd1-b32a-e87f4890d77a"
+
+    # Values exported from the previous anchor_hash -> provider_id -> record layout
+    legacy_asset_twins = [
+        sp.record(
+            anchor_hash = hash_1,
+            providers = {
+                provider_id_1: sp.record(
+                    asset_repository_endpoint = "end_point_1",
+                    creator_wallet_address = operator_A_address,
+                    registration_timestamps = [sp.timestamp(200), sp.timestamp(100)]
+                ),
+                provider_id_2: sp.record(
+                    asset_repository_endpoint = "end_point_1",
+                    creator_wallet_address = operator_A_address,
+                    registration_timestamps = [sp.timestamp(150)]
+                ),
+            }
+        ),
+        sp.record(
+            anchor_hash = hash_2,
+            providers = {
+                provider_id_1: sp.record(
+                    asset_repository_endpoint = "end_point_2",
+                    creator_wallet_address = operator_B_address,
+                    registration_timestamps = [sp.timestamp(300)]
+                ),
+            }
+        ),
+    ]
+
+    hash_1_provider_1 = sp.record(anchor_hash = hash_1, provider_id = provider_id_1)
+    hash_1_provider_2 = sp.record(anchor_hash = hash_1, provider_id = provider_id_2)
+    hash_2_provider_1 = sp.record(anchor_hash = hash_2, provider_id = provider_id_1)
+    hash_2_provider_2 = sp.record(anchor_hash = hash_2, provider_id = provider_id_2)
+
+    scenario.h3("Asset Twin Import")
+
+    scenario.h4("Importing asset twins from a non-certifier address. Expected exception - Incorrect certifier")
+    asset_twin_tracing.import_asset_twins(legacy_asset_twins).run(valid = False, sender = operator_A_address, exception = "Incorrect certifier")
+
+    asset_twin_tracing.import_asset_twins(legacy_asset_twins).run(valid = True, sender = certifier_address)
+
+    scenario.h4("Importing an existing asset twin. Expected exception - Asset twin already exists")
+    asset_twin_tracing.import_asset_twins([legacy_asset_twins[1]]).run(valid = False, sender = certifier_address, exception = "Asset twin already exists")
+
+    scenario.verify(asset_twin_tracing.fetch_asset_twin(hash_1_provider_1).creator_wallet_address == operator_A_address)
+    scenario.verify(asset_twin_tracing.fetch_asset_twin(hash_1_provider_1).registration_count == 2)
+    scenario.verify(asset_twin_tracing.fetch_asset_twin(hash_1_provider_1).latest_registration == sp.timestamp(200))
+    scenario.verify(asset_twin_tracing.fetch_asset_twin(hash_1_provider_2).asset_repository_endpoint == "end_point_1")
+    scenario.verify(asset_twin_tracing.fetch_asset_twin(hash_2_provider_1).creator_wallet_address == operator_B_address)
+    scenario.verify(sp.is_failing(asset_twin_tracing.fetch_asset_twin(hash_2_provider_2)))
+
+    # The old newest-first timestamp lists become the counter-indexed history, oldest first
+    hash_1_provider_1_history = sp.record(anchor_hash = hash_1, provider_id = provider_id_1, offset = 0, limit = 10)
+    scenario.verify(asset_twin_tracing.fetch_asset_twin_history(hash_1_provider_1_history)[0] == sp.timestamp(100))
+    scenario.verify(asset_twin_tracing.fetch_asset_twin_history(hash_1_provider_1_history)[1] == sp.timestamp(200))
+
+    # LUW Migration Testing
+
+    scenario.h2("LUW Migration")
+
+    repository_id_1 = "01add8a4-7302-490b-be57-cec2cd02f8da"
+    repository_id_2 = "db161792-d5a9-434b-b0fc-5359f6d6460b"
+
+    # Values exported from the previous luw_map, where each LUW held its state history and repositories
+    legacy_luw_0 = sp.record(
+        creator_wallet_address = operator_A_address,
+        provider_id = "provider_id",
+        luw_service_endpoint = operator_B_address,
+        state_history = {1: 1, 2: 2},
+        repository_endpoints = {repository_id_1: 2, repository_id_2: 1},
+    )
+
+    legacy_luw_3 = sp.record(
+        creator_wallet_address = operator_B_address,
+        provider_id = "provider_id",
+        luw_service_endpoint = operator_A_address,
+        state_history = {1: 1},
+        repository_endpoints = {},
+    )
+
+    legacy_luws = [
+        sp.record(luw_id = 0, luw = legacy_luw_0),
+        sp.record(luw_id = 3, luw = legacy_luw_3),
+    ]
+
+    scenario.h3("LUW Import")
+
+    scenario.h4("Importing LUWs from a non-certifier address. Expected exception - Incorrect certifier")
+    luw_contract.import_luws(legacy_luws).run(valid = False, sender = operator_A_address, exception = "Incorrect certifier")
+
+    luw_contract.import_luws(legacy_luws).run(valid = True, sender = certifier_address)
+
+    # The normalized storage is read back in the previous shape
+    scenario.verify_equal(luw_contract.fetch(0), legacy_luw_0)
+    scenario.verify_equal(luw_contract.fetch(3), legacy_luw_3)
+    scenario.verify(luw_contract.get_active_luw_state(0) == 2)
+    scenario.verify(luw_contract.data.luw_map[0].active_state_id == 2)
+    scenario.verify_equal(luw_contract.get_luw_state_history(0), legacy_luw_0.state_history)
+    scenario.verify(luw_contract.get_luw_repository_state(sp.record(luw_id = 0, repository_id = repository_id_1)) == 2)
+
+    # New LUWs are numbered after the imported ones
+    scenario.verify(luw_contract.data.luw_last_id == 4)
+
+    scenario.h4("Importing an existing LUW ID. Expected exception - LUW ID already exists")
+    luw_contract.import_luws(legacy_luws).run(valid = False, sender = certifier_address, exception = "LUW ID already exists")
+
+    def legacy_luw(state_history):
+        return sp.record(
+            creator_wallet_address = operator_A_address,
+            provider_id = "provider_id",
+            luw_service_endpoint = operator_B_address,
+            state_history = state_history,
+            repository_endpoints = {},
+        )
+
+    scenario.h4("Importing a LUW without states. Expected exception - Empty state history")
+    luw_contract.import_luws([sp.record(luw_id = 4, luw = legacy_luw({}))]).run(valid = False, sender = certifier_address, exception = "Empty state history")
+
+    # The states have to be numbered from 1 without gaps, the last one is the active state
+    scenario.h4("Importing a LUW with a gap in its states. Expected exception - Invalid state history")
+    luw_contract.import_luws([sp.record(luw_id = 4, luw = legacy_luw({1: 1, 3: 2}))]).run(valid = False, sender = certifier_address, exception = "Invalid state history")
+
+    scenario.verify(~luw_contract.data.luw_map.contains(4))
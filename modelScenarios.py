@@ -0,0 +1,126 @@
+# Model Scenarios
+#
+# Differential test of the pure-Python model of oat/model.py: a seeded random
+# sequence of Registry operations is run on both the model and the contracts.
+# Each operation has to succeed or fail, with the same message, as it does in the
+# model, and the views of the Registry have to return what the model holds.
+
+import smartpy as sp
+
+SEED = 21
+
+OPERATIONS = 400
+
+# The views are compared with the model every so many operations, and at the end
+VERIFY_EVERY = 100
+
+def replay(operations, verify_every = VERIFY_EVERY):
+    # Runs the operations, MODEL.Operation values or tuples of their fields, on the
+    # contracts and on the model; also used by the fuzzing harness of oat/fuzz.py
+    FIXTURE = sp.io.import_stored_contract("testFixture.py")
+    MODEL = sp.io.import_stored_contract("oat/model.py")
+
+    accounts = FIXTURE.Accounts()
+
+    # Accounts are named in the model
+    addresses = {
+        "certifier": accounts.certifier_address,
+        "operator_A": accounts.operator_A_address,
+        "operator_B": accounts.operator_B_address,
+        "offchain_coordinator": accounts.offchain_coordinator_address,
+    }
+
+    scenario = sp.test_scenario()
+
+    topology = FIXTURE.Topology(scenario, accounts)
+
+    lambda_contract = topology.lambda_contract
+
+    model = MODEL.Topology(certifier = "certifier")
+
+    def parameter(name, value):
+        if name in ("new_owner_address", "luw_service_endpoint"):
+            return addresses[value]
+        if isinstance(value, list):
+            return [sp.record(**item) if isinstance(item, dict) else item for item in value]
+
+        return value
+
+    def run(operation):
+        error = model.apply(operation)
+
+        parameters = {name: parameter(name, value) for name, value in operation.parameters.items()}
+        entry_point = getattr(lambda_contract, operation.entry_point)
+
+        # Entry points with a single parameter take it as is
+        if len(parameters) == 1:
+            call = entry_point(*parameters.values())
+        else:
+            call = entry_point(**parameters)
+
+        run_parameters = dict(sender = addresses[operation.sender], now = sp.timestamp(operation.now))
+
+        if error is None:
+            call.run(valid = True, **run_parameters)
+        elif error.message is None:
+            call.run(valid = False, **run_parameters)
+        else:
+            call.run(valid = False, exception = error.message, **run_parameters)
+
+    def verify_views():
+        for provider_id in sorted(model.asset_provider.asset_providers):
+            provider = model.registry.get_asset_provider(provider_id)
+            provider["creator_wallet_address"] = addresses[provider["creator_wallet_address"]]
+
+            scenario.verify_equal(lambda_contract.get_asset_provider(provider_id), sp.record(**provider))
+
+        for anchor_hash, provider_id in sorted(model.asset_twin_tracing.assets):
+            asset_twin = model.registry.fetch_asset_twin(anchor_hash, provider_id)
+            asset_twin["creator_wallet_address"] = addresses[asset_twin["creator_wallet_address"]]
+            asset_twin["latest_registration"] = sp.timestamp(asset_twin["latest_registration"])
+
+            scenario.verify_equal(
+                lambda_contract.fetch_asset_twin(sp.record(anchor_hash = anchor_hash, provider_id = provider_id)),
+                sp.record(**asset_twin)
+            )
+
+            history = model.registry.fetch_asset_twin_history(anchor_hash, provider_id, 0, asset_twin["registration_count"])
+
+            scenario.verify_equal(
+                lambda_contract.fetch_asset_twin_history(sp.record(
+                    anchor_hash = anchor_hash,
+                    provider_id = provider_id,
+                    offset = 0,
+                    limit = asset_twin["registration_count"],
+                )),
+                {index: sp.timestamp(registration) for index, registration in history.items()}
+            )
+
+        for luw_id in sorted(model.luw_contract.luw_map):
+            luw = model.registry.fetch_luw_decoded(luw_id)
+            luw["creator_wallet_address"] = addresses[luw["creator_wallet_address"]]
+            luw["luw_service_endpoint"] = addresses[luw["luw_service_endpoint"]]
+
+            scenario.verify_equal(lambda_contract.fetch_luw_decoded(luw_id), sp.record(**luw))
+
+    # Testing
+
+    scenario.h1("Testing")
+    scenario.h2("Random Registry Operations")
+
+    for index, operation in enumerate(operations):
+        run(MODEL.Operation(*operation))
+
+        if (index + 1) % verify_every == 0:
+            scenario.h3("Views after %d operations" % (index + 1))
+            verify_views()
+
+    if len(operations) % verify_every:
+        scenario.h3("Views after %d operations" % len(operations))
+        verify_views()
+
+@sp.add_test(name = "ModelScenarios")
+def test():
+    MODEL = sp.io.import_stored_contract("oat/model.py")
+
+    replay(MODEL.OperationGenerator(seed = SEED).operations(OPERATIONS))
@@ -0,0 +1 @@
+# Open Asset Traceability off-chain tooling
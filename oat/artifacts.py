@@ -0,0 +1,181 @@
+# Compiled Michelson artifact cache
+#
+# Contracts are compiled once and stored under a content hash of what the
+# compilation depends on, so that tests, benchmarks and deployments only
+# recompile a contract after its source changed:
+#
+#  - compile_contract() compiles one contract class with the given constructor
+#    arguments, keyed by the contract source and the arguments
+#  - build() compiles the sp.add_compilation_target targets of a contract
+#    module, keyed by the module source
+#
+# Build every compilation target of the repository with
+#
+#     python -m oat.artifacts [<file> ...] [--force]
+
+import argparse
+import hashlib
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from oat import toolchain
+
+CACHE_ROOT = toolchain.REPOSITORY_ROOT / ".oat-cache"
+
+ARTIFACTS_DIR = CACHE_ROOT / "artifacts"
+
+COMPILATION_TARGET = re.compile(r"""sp\.add_compilation_target\(\s*["']([^"']+)["']""")
+
+CODE_FILE = "step_000_cont_0_contract.tz"
+STORAGE_FILE = "step_000_cont_0_storage.tz"
+
+
+def digest(parts):
+    # Each part is hashed on its own, so that no two sequences of parts collide
+    hashed = hashlib.sha256()
+
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode()
+        hashed.update(hashlib.sha256(part).digest())
+
+    return hashed.hexdigest()
+
+
+def contract_path(contract_file):
+    path = Path(contract_file)
+    if not path.is_absolute():
+        path = toolchain.REPOSITORY_ROOT / path
+
+    return path
+
+
+def read_artifact(target_dir):
+    return toolchain.CompiledContract(
+        code = (target_dir / CODE_FILE).read_text(),
+        storage = (target_dir / STORAGE_FILE).read_text().strip(),
+    )
+
+
+def store(cache_dir, output_dir):
+    # Artifacts are moved in place at once, so a concurrent reader never sees half of them
+    cache_dir.parent.mkdir(parents = True, exist_ok = True)
+    staging_dir = Path(tempfile.mkdtemp(prefix = "staging-", dir = cache_dir.parent))
+    shutil.copytree(output_dir, staging_dir, dirs_exist_ok = True)
+
+    try:
+        staging_dir.rename(cache_dir)
+    except OSError:
+        # Stored by another process in the meantime
+        shutil.rmtree(staging_dir, ignore_errors = True)
+
+
+#############
+# Contracts #
+#############
+
+def contract_key(contract_file, contract_class, arguments):
+    return digest([
+        contract_path(contract_file).read_bytes(),
+        contract_class,
+        "\n".join(arguments),
+        toolchain.smartpy_version(),
+    ])
+
+
+def compile_contract(contract_file, contract_class, arguments, use_cache = True):
+    # Same as toolchain.compile_contract, served from the cache when nothing changed
+    cache_dir = ARTIFACTS_DIR / "contracts" / contract_key(contract_file, contract_class, arguments)
+
+    if use_cache and (cache_dir / CODE_FILE).exists():
+        return read_artifact(cache_dir)
+
+    compiled = toolchain.compile_contract(contract_path(contract_file), contract_class, arguments)
+
+    with tempfile.TemporaryDirectory(prefix = "oat-artifact-") as work_dir:
+        (Path(work_dir) / CODE_FILE).write_text(compiled.code)
+        (Path(work_dir) / STORAGE_FILE).write_text(compiled.storage)
+
+        shutil.rmtree(cache_dir, ignore_errors = True)
+        store(cache_dir, work_dir)
+
+    return compiled
+
+
+#######################
+# Compilation targets #
+#######################
+
+def module_key(contract_file):
+    return digest([contract_path(contract_file).read_bytes(), toolchain.smartpy_version()])
+
+
+def build(contract_file, use_cache = True):
+    # Returns the target directory of every compilation target of the module, and
+    # whether they were compiled (False when they came from the cache)
+    path = contract_path(contract_file)
+    cache_dir = ARTIFACTS_DIR / "targets" / module_key(path)
+
+    targets = COMPILATION_TARGET.findall(path.read_text())
+    compiled = not (use_cache and all((cache_dir / target / CODE_FILE).exists() for target in targets))
+
+    if compiled:
+        with tempfile.TemporaryDirectory(prefix = "oat-build-") as work_dir:
+            output_dir = Path(work_dir) / "output"
+            toolchain.run_command([toolchain.SMARTPY_CLI, "compile", str(path), str(output_dir)])
+
+            shutil.rmtree(cache_dir, ignore_errors = True)
+            store(cache_dir, output_dir)
+
+    return {target: cache_dir / target for target in targets}, compiled
+
+
+def load_target(contract_file, target):
+    # The code and initial storage of a compilation target, e.g. load_target("registry.py", "registry")
+    target_dirs, _ = build(contract_file)
+
+    if target not in target_dirs:
+        raise ValueError("%s has no compilation target named %r" % (Path(contract_file).name, target))
+
+    return read_artifact(target_dirs[target])
+
+
+def main(argv = None):
+    from oat.benchmarks import format_table
+
+    parser = argparse.ArgumentParser(prog = "python -m oat.artifacts")
+    parser.add_argument("files", nargs = "*",
+        help = "contract modules to build (default: every module with a compilation target)")
+    parser.add_argument("--force", action = "store_true", help = "compile even if the sources did not change")
+    args = parser.parse_args(argv)
+
+    paths = [contract_path(path) for path in args.files] or sorted(
+        path for path in toolchain.REPOSITORY_ROOT.glob("*.py") if COMPILATION_TARGET.search(path.read_text())
+    )
+
+    rows = []
+
+    for path in paths:
+        started = time.monotonic()
+        try:
+            target_dirs, compiled = build(path, use_cache = not args.force)
+        except (OSError, toolchain.ToolchainError) as error:
+            parser.exit(1, "%s: %s\n" % (path.name, error))
+        duration = time.monotonic() - started
+
+        rows += [{
+            "file": path.name,
+            "target": target,
+            "status": "compiled" if compiled else "cached",
+            "duration": "%.1fs" % duration,
+            "artifacts": target_dir.relative_to(toolchain.REPOSITORY_ROOT),
+        } for target, target_dir in target_dirs.items()]
+
+    print(format_table(rows))
+
+
+if __name__ == "__main__":
+    main()
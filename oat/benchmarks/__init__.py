@@ -0,0 +1,147 @@
+# Gas and storage benchmarks
+#
+# Each benchmark module exposes `run(mockup)`, which deploys what it needs into a
+# fresh octez-client mockup and returns a list of result rows. Run them with
+#
+#     python -m oat.benchmarks [<name> ...]
+
+from collections import namedtuple
+from pathlib import Path
+
+from oat import artifacts, michelson
+
+BENCHMARKS = (
+    "registryOperations",
+    "assetTwinProviders",
+    "assetTwinHistory",
+    "assetTwinBatch",
+    "providerTopologies",
+    "providerAuthContext",
+    "providerDocuments",
+    "luwRepositories",
+    "luwFetch",
+    "stateTables",
+    "luwRepositoryLogic",
+    "luwRepositoryBatch",
+    "luwCommit",
+    "scaling",
+)
+
+VIEW_PROBE = Path(__file__).resolve().parent / "viewProbe.py"
+
+# Measured columns of the result rows, every other column identifies the measurement
+METRIC_COLUMNS = (
+    "consumed_gas",
+    "storage_size",
+    "paid_storage_size_diff",
+    "internal_operations",
+)
+
+Topology = namedtuple("Topology", [
+    "asset_provider",
+    "asset_provider_repository",
+    "asset_twin_tracing",
+    "luw",
+    "luw_repository",
+    "registry",
+])
+
+
+def sp_address(address):
+    return "sp.address(%r)" % address
+
+
+def registry_arguments(certifier_address, asset_provider_contract, asset_twin_contract, luw_contract):
+    return [
+        "sp.record(asset_provider_contract = %s, asset_twin_contract = %s, luw_contract = %s)" % (
+            sp_address(asset_provider_contract), sp_address(asset_twin_contract), sp_address(luw_contract),
+        ),
+        sp_address(certifier_address),
+    ]
+
+
+def deploy(mockup, name, contract_file, contract_class, arguments):
+    compiled = artifacts.compile_contract(contract_file, contract_class, arguments)
+    address, _ = mockup.originate(name, compiled)
+
+    return address
+
+
+def deploy_registry_topology(mockup, certifier_account = "bootstrap1"):
+    # All six contracts, linked the same way as in testFixture.py
+    certifier_address = mockup.accounts[certifier_account]
+
+    asset_provider = deploy(mockup, "asset_provider", "assetProvider.py", "AssetProvider", [
+        sp_address(certifier_address),
+    ])
+    asset_provider_repository = deploy(mockup, "asset_provider_repository", "assetProviderRepository.py", "AssetProviderRepository", [
+        sp_address(asset_provider),
+        sp_address(certifier_address),
+    ])
+    asset_twin_tracing = deploy(mockup, "asset_twin_tracing", "assetTwinTracing.py", "AssetTwinTracing", [
+        sp_address(certifier_address),
+    ])
+    luw = deploy(mockup, "luw", "LUW.py", "LUW", [
+        sp_address(certifier_address),
+    ])
+    luw_repository = deploy(mockup, "luw_repository", "LUWRepository.py", "LUWRepository", [
+        sp_address(luw),
+        sp_address(certifier_address),
+    ])
+    registry = deploy(mockup, "registry", "registry.py", "Registry",
+        registry_arguments(certifier_address, asset_provider_repository, asset_twin_tracing, luw_repository))
+
+    mockup.transfer(certifier_account, asset_provider_repository, "update_storage_contract_with_address", michelson.unit())
+    mockup.transfer(certifier_account, luw_repository, "update_storage_contract_with_address", michelson.unit())
+    mockup.transfer(certifier_account, asset_twin_tracing, "change_calling_contract_address", michelson.address(registry))
+    mockup.transfer(certifier_account, registry, "sync_storage_contracts", michelson.unit())
+
+    return Topology(
+        asset_provider = asset_provider,
+        asset_provider_repository = asset_provider_repository,
+        asset_twin_tracing = asset_twin_tracing,
+        luw = luw,
+        luw_repository = luw_repository,
+        registry = registry,
+    )
+
+
+def deploy_view_probe(mockup, name, views, param_type):
+    # `views` are (view name, SmartPy result type source) pairs
+    views_source = "[%s]" % ", ".join("(%r, %s)" % (view_name, result_type) for view_name, result_type in views)
+
+    return deploy(mockup, name, VIEW_PROBE, "ViewProbe", [views_source, param_type])
+
+
+def probe(mockup, probe_address, target, argument, source = "bootstrap1"):
+    return mockup.transfer(source, probe_address, "probe", michelson.record(
+        argument = argument,
+        target = michelson.address(target),
+    ))
+
+
+def row(operation, size, receipt):
+    return {
+        "operation": operation,
+        "size": size,
+        "consumed_gas": receipt.consumed_gas,
+        "storage_size": receipt.storage_size,
+        "paid_storage_size_diff": receipt.paid_storage_size_diff,
+        "internal_operations": receipt.internal_operations,
+    }
+
+
+def format_table(rows):
+    if not rows:
+        return "(no results)"
+
+    # Benchmarks may add their own columns to the rows, in the same order for every row
+    columns = tuple(rows[0])
+
+    cells = [columns] + [tuple(str(result[column]) for column in columns) for result in rows]
+    widths = [max(len(line[index]) for line in cells) for index in range(len(columns))]
+
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip() for line in cells]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+
+    return "\n".join(lines)
@@ -0,0 +1,52 @@
+import argparse
+import importlib
+
+from oat import toolchain
+from oat.benchmarks import BENCHMARKS, format_table, report
+
+FORMATS = ("table", "json", "csv")
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m oat.benchmarks")
+    parser.add_argument("benchmarks", nargs = "*", metavar = "benchmark",
+        help = "benchmarks to run (default: all of %s)" % ", ".join(BENCHMARKS))
+    parser.add_argument("--protocol", help = "octez protocol hash for the mockup (default: octez-client's)")
+    parser.add_argument("--format", choices = FORMATS, default = "table", help = "output format (default: table)")
+    parser.add_argument("--output", help = "file to write the results to (default: standard output)")
+    args = parser.parse_args(argv)
+
+    unknown = sorted(set(args.benchmarks) - set(BENCHMARKS))
+    if unknown:
+        parser.error("unknown benchmarks: %s" % ", ".join(unknown))
+
+    results = {}
+
+    for name in args.benchmarks or BENCHMARKS:
+        benchmark = importlib.import_module("oat.benchmarks.%s" % name)
+
+        # Each benchmark gets a fresh mockup so storage from one does not skew another
+        try:
+            with toolchain.Mockup(protocol = args.protocol) as mockup:
+                results[name] = benchmark.run(mockup)
+        except toolchain.ToolchainError as error:
+            parser.exit(1, "%s: %s\n" % (name, error))
+
+    benchmark_report = report.build_report(results, protocol = args.protocol)
+
+    if args.format == "json":
+        output = report.to_json(benchmark_report)
+    elif args.format == "csv":
+        output = report.to_csv(benchmark_report)
+    else:
+        output = "".join("# %s\n\n%s\n\n" % (name, format_table(rows)) for name, rows in results.items())
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output)
+    else:
+        print(output, end = "")
+
+
+if __name__ == "__main__":
+    main()
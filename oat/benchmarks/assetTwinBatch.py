@@ -0,0 +1,58 @@
+# Per-item gas of batched asset twin registration
+#
+# Registers batches of 1, 10, 100 and 500 new asset twins through
+# Registry.register_asset_twins_batch, after a single new asset twin through
+# Registry.register_asset_twin. The single registration is the baseline: the
+# per-item gas of the batches shows what batching saves over it, and the batch of
+# 1 what the batch entry point costs on top of it.
+
+from oat import michelson
+from oat.benchmarks import deploy, registry_arguments, row, sp_address
+
+BATCH_SIZES = (1, 10, 100, 500)
+
+
+def asset_twin(name):
+    # Short hashes keep the largest batch below the 32 kB operation size limit
+    return michelson.record(
+        anchor_hash = michelson.string(name),
+        provider_id = michelson.string("p"),
+        repo_end_point = michelson.string("e"),
+    )
+
+
+def batch(batch_size):
+    return michelson.sequence([asset_twin("h%d_%d" % (batch_size, index)) for index in range(batch_size)])
+
+
+def run(mockup):
+    certifier_address = mockup.accounts["bootstrap1"]
+
+    asset_twin_tracing = deploy(mockup, "asset_twin_tracing", "assetTwinTracing.py", "AssetTwinTracing", [
+        sp_address(certifier_address),
+    ])
+    # Only the asset twin contract is called by this benchmark
+    registry = deploy(mockup, "registry", "registry.py", "Registry",
+        registry_arguments(certifier_address, asset_twin_tracing, asset_twin_tracing, asset_twin_tracing))
+
+    mockup.transfer("bootstrap1", asset_twin_tracing, "change_calling_contract_address", michelson.address(registry))
+
+    # Lift the default batch limits to the largest measured batch
+    max_batch_size = michelson.nat(max(BATCH_SIZES))
+    mockup.transfer("bootstrap1", asset_twin_tracing, "set_max_batch_size", max_batch_size)
+    mockup.transfer("bootstrap1", registry, "set_max_batch_size", max_batch_size)
+
+    receipt = mockup.transfer("bootstrap2", registry, "register_asset_twin", asset_twin("h"))
+
+    result = row("register_asset_twin", 1, receipt)
+    result["gas_per_item"] = receipt.consumed_gas
+    rows = [result]
+
+    for batch_size in BATCH_SIZES:
+        receipt = mockup.transfer("bootstrap2", registry, "register_asset_twins_batch", batch(batch_size))
+
+        result = row("register_asset_twins_batch", batch_size, receipt)
+        result["gas_per_item"] = round(receipt.consumed_gas / batch_size, 1)
+        rows.append(result)
+
+    return rows
@@ -0,0 +1,85 @@
+# Asset twin gas vs. length of the registration history
+#
+# Re-registers and fetches an asset twin that already has 1 to 500 registrations.
+# With the counter-indexed registration_history big map, register and
+# fetch_asset_twin must stay flat, and a history page only depends on its limit.
+
+from oat import michelson
+from oat.benchmarks import deploy, deploy_view_probe, probe, row, sp_address
+from oat.benchmarks.assetTwinProviders import ASSET_TWIN_TYPE, FETCH_PARAMETERS_TYPE, register_arguments
+
+REGISTRATION_COUNTS = (1, 10, 100, 500)
+
+PAGE_LIMIT = 10
+
+HISTORY_PARAMETERS_TYPE = """sp.TRecord(
+    anchor_hash = sp.TString,
+    provider_id = sp.TString,
+    offset = sp.TNat,
+    limit = sp.TNat
+)"""
+
+HISTORY_TYPE = "sp.TMap(sp.TNat, sp.TTimestamp)"
+
+PROVIDER_ID = "provider"
+
+
+def populate(mockup, asset_twin_tracing, anchor_hash, registration_count):
+    # import_asset_twins takes the legacy newest-first timestamp list
+    imported_asset_twin = michelson.record(
+        asset_repository_endpoint = michelson.string("end_point"),
+        creator_wallet_address = michelson.address(mockup.accounts["bootstrap1"]),
+        registration_timestamps = michelson.sequence([
+            michelson.timestamp(index) for index in reversed(range(registration_count))
+        ]),
+    )
+
+    mockup.transfer("bootstrap1", asset_twin_tracing, "import_asset_twins", michelson.sequence([
+        michelson.record(
+            anchor_hash = michelson.string(anchor_hash),
+            providers = michelson.mapping([(michelson.string(PROVIDER_ID), imported_asset_twin)]),
+        ),
+    ]))
+
+
+def run(mockup):
+    certifier_address = mockup.accounts["bootstrap1"]
+
+    asset_twin_tracing = deploy(mockup, "asset_twin_tracing", "assetTwinTracing.py", "AssetTwinTracing", [
+        sp_address(certifier_address),
+    ])
+
+    # bootstrap2 stands in for the Registry so that only AssetTwinTracing is measured
+    mockup.transfer("bootstrap1", asset_twin_tracing, "change_calling_contract_address",
+        michelson.address(mockup.accounts["bootstrap2"]))
+
+    fetch_probe = deploy_view_probe(mockup, "fetch_asset_twin_probe",
+        [("fetch_asset_twin", ASSET_TWIN_TYPE)], FETCH_PARAMETERS_TYPE)
+    history_probe = deploy_view_probe(mockup, "fetch_asset_twin_history_probe",
+        [("fetch_asset_twin_history", HISTORY_TYPE)], HISTORY_PARAMETERS_TYPE)
+
+    rows = []
+
+    for registration_count in REGISTRATION_COUNTS:
+        anchor_hash = "hash_%d" % registration_count
+        populate(mockup, asset_twin_tracing, anchor_hash, registration_count)
+
+        receipt = mockup.transfer("bootstrap2", asset_twin_tracing, "register",
+            register_arguments(anchor_hash, PROVIDER_ID))
+        rows.append(row("register (re-registration)", registration_count, receipt))
+
+        receipt = probe(mockup, fetch_probe, asset_twin_tracing, michelson.record(
+            anchor_hash = michelson.string(anchor_hash),
+            provider_id = michelson.string(PROVIDER_ID),
+        ))
+        rows.append(row("fetch_asset_twin", registration_count, receipt))
+
+        receipt = probe(mockup, history_probe, asset_twin_tracing, michelson.record(
+            anchor_hash = michelson.string(anchor_hash),
+            provider_id = michelson.string(PROVIDER_ID),
+            offset = michelson.nat(0),
+            limit = michelson.nat(PAGE_LIMIT),
+        ))
+        rows.append(row("fetch_asset_twin_history (limit %d)" % PAGE_LIMIT, registration_count, receipt))
+
+    return rows
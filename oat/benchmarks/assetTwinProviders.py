@@ -0,0 +1,94 @@
+# Asset twin gas vs. number of providers per anchor hash
+#
+# Registers and fetches one (anchor_hash, provider_id) pair while the same hash is
+# already anchored by 1 to 500 other providers. With asset twins keyed directly by
+# (anchor_hash, provider_id) the figures must stay flat across provider counts.
+
+from oat import michelson
+from oat.benchmarks import deploy, deploy_view_probe, probe, row, sp_address
+
+PROVIDER_COUNTS = (1, 10, 100, 500)
+
+# Providers imported per import_asset_twins operation, to stay well below the operation size limit
+IMPORT_CHUNK = 50
+
+ASSET_TWIN_TYPE = """sp.TRecord(
+    asset_repository_endpoint = sp.TString,
+    creator_wallet_address = sp.TAddress,
+    latest_registration = sp.TTimestamp,
+    registration_count = sp.TNat
+)"""
+
+FETCH_PARAMETERS_TYPE = "sp.TRecord(anchor_hash = sp.TString, provider_id = sp.TString)"
+
+
+def provider_id(index):
+    # Zero-padded so that the imported map literal is already in key order
+    return "provider_%04d" % index
+
+
+def imported_asset_twin(creator_address):
+    return michelson.record(
+        asset_repository_endpoint = michelson.string("end_point"),
+        creator_wallet_address = michelson.address(creator_address),
+        registration_timestamps = michelson.sequence([michelson.timestamp(0)]),
+    )
+
+
+def populate(mockup, asset_twin_tracing, anchor_hash, provider_count):
+    creator_address = mockup.accounts["bootstrap1"]
+
+    for start in range(0, provider_count, IMPORT_CHUNK):
+        providers = michelson.mapping([
+            (michelson.string(provider_id(index)), imported_asset_twin(creator_address))
+            for index in range(start, min(start + IMPORT_CHUNK, provider_count))
+        ])
+
+        mockup.transfer("bootstrap1", asset_twin_tracing, "import_asset_twins", michelson.sequence([
+            michelson.record(anchor_hash = michelson.string(anchor_hash), providers = providers),
+        ]))
+
+
+def register_arguments(anchor_hash, provider):
+    return michelson.record(
+        anchor_hash = michelson.string(anchor_hash),
+        provider_id = michelson.string(provider),
+        repo_end_point = michelson.string("end_point"),
+    )
+
+
+def run(mockup):
+    certifier_address = mockup.accounts["bootstrap1"]
+
+    asset_twin_tracing = deploy(mockup, "asset_twin_tracing", "assetTwinTracing.py", "AssetTwinTracing", [
+        sp_address(certifier_address),
+    ])
+
+    # bootstrap2 stands in for the Registry so that only AssetTwinTracing is measured
+    mockup.transfer("bootstrap1", asset_twin_tracing, "change_calling_contract_address",
+        michelson.address(mockup.accounts["bootstrap2"]))
+
+    fetch_probe = deploy_view_probe(mockup, "fetch_asset_twin_probe",
+        [("fetch_asset_twin", ASSET_TWIN_TYPE)], FETCH_PARAMETERS_TYPE)
+
+    rows = []
+
+    for provider_count in PROVIDER_COUNTS:
+        anchor_hash = "hash_%d" % provider_count
+        populate(mockup, asset_twin_tracing, anchor_hash, provider_count)
+
+        receipt = mockup.transfer("bootstrap2", asset_twin_tracing, "register",
+            register_arguments(anchor_hash, "provider_new"))
+        rows.append(row("register (new provider)", provider_count, receipt))
+
+        receipt = mockup.transfer("bootstrap2", asset_twin_tracing, "register",
+            register_arguments(anchor_hash, provider_id(0)))
+        rows.append(row("register (re-registration)", provider_count, receipt))
+
+        receipt = probe(mockup, fetch_probe, asset_twin_tracing, michelson.record(
+            anchor_hash = michelson.string(anchor_hash),
+            provider_id = michelson.string(provider_id(0)),
+        ))
+        rows.append(row("fetch_asset_twin", provider_count, receipt))
+
+    return rows
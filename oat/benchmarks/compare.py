@@ -0,0 +1,85 @@
+# Compare two benchmark reports
+#
+#     python -m oat.benchmarks.compare <baseline.json> <current.json> [--threshold <percent>]
+#
+# Prints every measurement that changed and exits with 1 when any of them grew by
+# more than the threshold, so that it can gate a CI job.
+
+import argparse
+import sys
+
+from oat.benchmarks import format_table, report
+
+
+def compare(baseline, current, threshold):
+    baseline_rows = report.index_rows(baseline)
+    current_rows = report.index_rows(current)
+
+    changes = []
+    regressions = 0
+
+    for key, current_row in current_rows.items():
+        baseline_row = baseline_rows.get(key)
+        if baseline_row is None:
+            continue
+
+        (benchmark, *_), _ = key
+
+        for column, value in current_row.items():
+            if not report.is_metric(column) or column not in baseline_row:
+                continue
+
+            before = baseline_row[column]
+            if value == before:
+                continue
+
+            change = (value - before) * 100.0 / before if before else float("inf")
+            regression = change > threshold
+            regressions += regression
+
+            changes.append({
+                "benchmark": benchmark,
+                "operation": current_row.get("operation", ""),
+                "size": current_row.get("size", ""),
+                "metric": column,
+                "baseline": before,
+                "current": value,
+                "change": "%+.1f%%" % change,
+                "regression": "yes" if regression else "",
+            })
+
+    missing = sorted(set(baseline_rows) - set(current_rows))
+    added = sorted(set(current_rows) - set(baseline_rows))
+
+    return changes, regressions, missing, added
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m oat.benchmarks.compare")
+    parser.add_argument("baseline", help = "JSON report of the reference commit")
+    parser.add_argument("current", help = "JSON report to check")
+    parser.add_argument("--threshold", type = float, default = 1.0,
+        help = "growth, in percent, above which a change is a regression (default: 1)")
+    args = parser.parse_args(argv)
+
+    try:
+        baseline = report.load(args.baseline)
+        current = report.load(args.current)
+    except (OSError, ValueError) as error:
+        parser.exit(2, "%s\n" % error)
+
+    changes, regressions, missing, added = compare(baseline, current, args.threshold)
+
+    print("# %s -> %s\n" % (baseline.get("commit"), current.get("commit")))
+    print(format_table(changes) if changes else "(no changes)")
+
+    if missing or added:
+        print("\n%d measurements only in the baseline, %d only in the current report" % (len(missing), len(added)))
+
+    if regressions:
+        print("\n%d regressions above %s%%" % (regressions, args.threshold))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Indexer ingest throughput
+#
+# Ingests the synthetic blocks of oat/workload.py into a fresh SQLite database with
+# oat/indexer.py and reports the operations and events ingested per second, for
+# several transaction batch sizes.
+#
+# The indexer does not run contracts, so this benchmark needs no mockup and is not
+# part of `python -m oat.benchmarks`. Run it on its own:
+#
+#     python -m oat.benchmarks.indexerIngest [--blocks <count>] [--operations-per-block <count>]
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from oat import indexer
+from oat.benchmarks import format_table
+from oat.workload import generate_blocks
+
+BATCH_SIZES = (1, 10, 100, 1000)
+
+
+def run(blocks, operations_per_block, batch_sizes = BATCH_SIZES):
+    documents = generate_blocks(blocks, operations_per_block)
+    rows = []
+
+    for batch_size in batch_sizes:
+        with tempfile.TemporaryDirectory(prefix = "oat-indexer-") as work_dir:
+            with indexer.Indexer(Path(work_dir) / "index.sqlite", batch_size = batch_size) as index:
+                started = time.perf_counter()
+                stats = index.ingest(documents, "benchmark")
+                duration = time.perf_counter() - started
+
+        rows.append({
+            "batch_size": batch_size,
+            "blocks": stats.documents,
+            "operations": stats.operations,
+            "events": stats.events,
+            "duration": "%.2fs" % duration,
+            "operations_per_second": round(stats.operations / duration),
+            "events_per_second": round(stats.events / duration),
+        })
+
+    return rows
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m oat.benchmarks.indexerIngest")
+    parser.add_argument("--blocks", type = int, default = 200, help = "number of blocks (default: 200)")
+    parser.add_argument("--operations-per-block", type = int, default = 50,
+        help = "Registry operations per block (default: 50)")
+    args = parser.parse_args(argv)
+
+    print(format_table(run(args.blocks, args.operations_per_block)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Gas of closing a LUW in one operation
+#
+# Commits and aborts LUWs with 1, 20 and 200 repositories through
+# Registry.commit_luw and Registry.abort_luw. Each of them replaces one
+# change_luw_repository_state per repository plus a change_luw_state, so the
+# figures compare with luwRepositoryBatch and the single-repository entry points.
+
+from oat import michelson
+from oat.benchmarks import deploy, registry_arguments, row, sp_address
+from oat.benchmarks.luwRepositories import repository_id
+from oat.benchmarks.luwRepositoryBatch import create_luw
+
+REPOSITORY_COUNTS = (1, 20, 200)
+
+
+def prepare_luw(mockup, registry, luw_id, repository_count, ready):
+    create_luw(mockup, registry)
+
+    repository_ids = [michelson.string(repository_id(index)) for index in range(repository_count)]
+
+    mockup.transfer("bootstrap2", registry, "add_luw_repositories", michelson.record(
+        luw_id = michelson.nat(luw_id),
+        repository_ids = michelson.sequence(repository_ids),
+    ))
+
+    if ready:
+        mockup.transfer("bootstrap2", registry, "change_luw_repository_states", michelson.record(
+            luw_id = michelson.nat(luw_id),
+            repositories = michelson.sequence([
+                michelson.record(repository_id = repository, state_id = michelson.nat(2))
+                for repository in repository_ids
+            ]),
+        ))
+
+        mockup.transfer("bootstrap2", registry, "change_luw_state", michelson.record(
+            luw_id = michelson.nat(luw_id),
+            state_id = michelson.nat(2),
+        ))
+
+
+def run(mockup):
+    certifier_address = mockup.accounts["bootstrap1"]
+
+    luw_contract = deploy(mockup, "luw", "LUW.py", "LUW", [sp_address(certifier_address)])
+    luw_repository = deploy(mockup, "luw_repository", "LUWRepository.py", "LUWRepository", [
+        sp_address(luw_contract),
+        sp_address(certifier_address),
+    ])
+
+    mockup.transfer("bootstrap1", luw_repository, "update_storage_contract_with_address", michelson.unit())
+
+    # Only the LUW contracts are called by this benchmark
+    registry = deploy(mockup, "registry", "registry.py", "Registry",
+        registry_arguments(certifier_address, luw_repository, luw_repository, luw_repository))
+
+    # Lift the default batch limit to the largest prepared LUW
+    mockup.transfer("bootstrap1", registry, "set_max_batch_size", michelson.nat(max(REPOSITORY_COUNTS)))
+
+    rows = []
+    luw_id = 0
+
+    for repository_count in REPOSITORY_COUNTS:
+        # Committed LUWs have every repository ready, aborted ones are still open
+        for entrypoint, ready in (("commit_luw", True), ("abort_luw", False)):
+            prepare_luw(mockup, registry, luw_id, repository_count, ready)
+
+            receipt = mockup.transfer("bootstrap2", registry, entrypoint, michelson.nat(luw_id))
+            rows.append(dict(row(entrypoint, repository_count, receipt), gas_per_repository = round(receipt.consumed_gas / repository_count, 1)))
+
+            luw_id += 1
+
+    return rows
@@ -0,0 +1,92 @@
+# Raw vs. decoded LUW view gas
+#
+# Probes Registry.fetch_luw, which returns state IDs as stored, and
+# Registry.fetch_luw_decoded, which maps them to state names with constant
+# tables, on LUWs with 1, 10 and 50 states and repositories. fetch_luw reads
+# the whole LUW as a single page, so both views return the same entries.
+
+from oat import michelson
+from oat.benchmarks import deploy, deploy_view_probe, probe, registry_arguments, row, sp_address
+from oat.benchmarks.luwRepositories import repository_id
+
+LUW_SIZES = (1, 10, 50)
+
+LUW_PARAMETERS_TYPE = """sp.TRecord(
+    luw_id = sp.TNat,
+    offset = sp.TNat,
+    limit = sp.TNat
+)"""
+
+LUW_TYPE = """sp.TRecord(
+    luw_id = sp.TNat,
+    creator_wallet_address = sp.TAddress,
+    provider_id = sp.TString,
+    luw_service_endpoint = sp.TAddress,
+    active_state_id = sp.TNat,
+    state_count = sp.TNat,
+    repository_count = sp.TNat,
+    state_history = sp.TMap(sp.TNat, sp.TNat),
+    repository_endpoints = sp.TMap(sp.TString, sp.TNat)
+)"""
+
+DECODED_LUW_TYPE = """sp.TRecord(
+    luw_id = sp.TNat,
+    creator_wallet_address = sp.TAddress,
+    provider_id = sp.TString,
+    luw_service_endpoint = sp.TAddress,
+    state_history = sp.TMap(sp.TNat, sp.TString),
+    repository_endpoints = sp.TMap(sp.TString, sp.TString)
+)"""
+
+
+def populate(mockup, luw_contract, luw_id, size):
+    # Alternating active and prepare_to_commit states, repositories alternating open and ready
+    imported_luw = michelson.record(
+        creator_wallet_address = michelson.address(mockup.accounts["bootstrap1"]),
+        provider_id = michelson.string("provider_id"),
+        luw_service_endpoint = michelson.address(mockup.accounts["bootstrap1"]),
+        state_history = michelson.mapping([
+            (michelson.nat(index), michelson.nat(2 - index % 2)) for index in range(1, size + 1)
+        ]),
+        repository_endpoints = michelson.mapping([
+            (michelson.string(repository_id(index)), michelson.nat(1 + index % 2)) for index in range(size)
+        ]),
+    )
+
+    mockup.transfer("bootstrap1", luw_contract, "import_luws", michelson.sequence([
+        michelson.record(luw_id = michelson.nat(luw_id), luw = imported_luw),
+    ]))
+
+
+def run(mockup):
+    certifier_address = mockup.accounts["bootstrap1"]
+
+    luw_contract = deploy(mockup, "luw", "LUW.py", "LUW", [sp_address(certifier_address)])
+    luw_repository = deploy(mockup, "luw_repository", "LUWRepository.py", "LUWRepository", [
+        sp_address(luw_contract),
+        sp_address(certifier_address),
+    ])
+
+    # Only the LUW views are called, the provider and asset twin contracts are never reached
+    registry = deploy(mockup, "registry", "registry.py", "Registry",
+        registry_arguments(certifier_address, luw_repository, luw_repository, luw_repository))
+
+    fetch_probe = deploy_view_probe(mockup, "fetch_luw_probe", [("fetch_luw", LUW_TYPE)], LUW_PARAMETERS_TYPE)
+    decoded_probe = deploy_view_probe(mockup, "fetch_luw_decoded_probe", [("fetch_luw_decoded", DECODED_LUW_TYPE)], "sp.TNat")
+
+    rows = []
+
+    for luw_id, size in enumerate(LUW_SIZES):
+        populate(mockup, luw_contract, luw_id, size)
+
+        receipt = probe(mockup, fetch_probe, registry, michelson.record(
+            luw_id = michelson.nat(luw_id),
+            offset = michelson.nat(0),
+            limit = michelson.nat(size),
+        ))
+        rows.append(row("fetch_luw", size, receipt))
+
+        receipt = probe(mockup, decoded_probe, registry, michelson.nat(luw_id))
+        rows.append(row("fetch_luw_decoded", size, receipt))
+
+    return rows
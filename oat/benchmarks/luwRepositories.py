@@ -0,0 +1,100 @@
+# LUW gas vs. number of repositories
+#
+# Runs the LUW storage entry points and views on LUWs that coordinate 1, 50 and
+# 500 repositories. With the normalized storage every transition only touches
+# the entries it changes, so the figures must stay flat across sizes.
+
+from oat import michelson
+from oat.benchmarks import deploy, deploy_view_probe, probe, row, sp_address
+
+REPOSITORY_COUNTS = (1, 50, 500)
+
+REPOSITORY_STATE_PARAMETERS_TYPE = "sp.TRecord(luw_id = sp.TNat, repository_id = sp.TString)"
+
+
+def repository_id(index):
+    # Zero-padded so that the imported map literal is already in key order
+    return "repository_%04d" % index
+
+
+def populate(mockup, luw_contract, luw_id, repository_count):
+    imported_luw = michelson.record(
+        creator_wallet_address = michelson.address(mockup.accounts["bootstrap1"]),
+        provider_id = michelson.string("provider_id"),
+        luw_service_endpoint = michelson.address(mockup.accounts["bootstrap1"]),
+        state_history = michelson.mapping([(michelson.nat(1), michelson.nat(1))]),
+        repository_endpoints = michelson.mapping([
+            (michelson.string(repository_id(index)), michelson.nat(1)) for index in range(repository_count)
+        ]),
+    )
+
+    mockup.transfer("bootstrap1", luw_contract, "import_luws", michelson.sequence([
+        michelson.record(luw_id = michelson.nat(luw_id), luw = imported_luw),
+    ]))
+
+
+def run(mockup):
+    certifier_address = mockup.accounts["bootstrap1"]
+
+    luw_contract = deploy(mockup, "luw", "LUW.py", "LUW", [sp_address(certifier_address)])
+
+    # bootstrap2 stands in for the LUWRepository so that only the LUW contract is measured
+    mockup.transfer("bootstrap1", luw_contract, "change_logic_contract_address",
+        michelson.address(mockup.accounts["bootstrap2"]))
+
+    active_state_probe = deploy_view_probe(mockup, "get_active_luw_state_probe",
+        [("get_active_luw_state", "sp.TNat")], "sp.TNat")
+    state_history_probe = deploy_view_probe(mockup, "get_luw_state_history_probe",
+        [("get_luw_state_history", "sp.TMap(sp.TNat, sp.TNat)")], "sp.TNat")
+    owner_probe = deploy_view_probe(mockup, "get_luw_owner_address_probe",
+        [("get_luw_owner_address", "sp.TAddress")], "sp.TNat")
+    has_repository_probe = deploy_view_probe(mockup, "has_luw_repository_probe",
+        [("has_luw_repository", "sp.TBool")], REPOSITORY_STATE_PARAMETERS_TYPE)
+    repository_state_probe = deploy_view_probe(mockup, "get_luw_repository_state_probe",
+        [("get_luw_repository_state", "sp.TNat")], REPOSITORY_STATE_PARAMETERS_TYPE)
+
+    rows = []
+
+    for luw_id, repository_count in enumerate(REPOSITORY_COUNTS):
+        populate(mockup, luw_contract, luw_id, repository_count)
+
+        operations = [
+            ("add_state", michelson.record(
+                luw_id = michelson.nat(luw_id),
+                state_id = michelson.nat(2),
+            )),
+            ("add_repository", michelson.record(
+                luw_id = michelson.nat(luw_id),
+                repository_id = michelson.string("repository_new"),
+                state_id = michelson.nat(1),
+            )),
+            ("change_repository_state", michelson.record(
+                luw_id = michelson.nat(luw_id),
+                repository_id = michelson.string(repository_id(0)),
+                state_id = michelson.nat(2),
+            )),
+        ]
+
+        for entrypoint, argument in operations:
+            receipt = mockup.transfer("bootstrap2", luw_contract, entrypoint, argument)
+            rows.append(row(entrypoint, repository_count, receipt))
+
+        views = [
+            ("get_active_luw_state", active_state_probe, michelson.nat(luw_id)),
+            ("get_luw_state_history", state_history_probe, michelson.nat(luw_id)),
+            ("get_luw_owner_address", owner_probe, michelson.nat(luw_id)),
+            ("has_luw_repository", has_repository_probe, michelson.record(
+                luw_id = michelson.nat(luw_id),
+                repository_id = michelson.string(repository_id(0)),
+            )),
+            ("get_luw_repository_state", repository_state_probe, michelson.record(
+                luw_id = michelson.nat(luw_id),
+                repository_id = michelson.string(repository_id(0)),
+            )),
+        ]
+
+        for view_name, view_probe, argument in views:
+            receipt = probe(mockup, view_probe, luw_contract, argument)
+            rows.append(row(view_name, repository_count, receipt))
+
+    return rows
@@ -0,0 +1,85 @@
+# Per-repository gas of batched LUW repository updates
+#
+# Adds batches of 1, 20 and 200 repositories to a LUW and moves them to ready
+# through Registry.add_luw_repositories and Registry.change_luw_repository_states,
+# next to one call of the single-repository entry points, which every batch
+# replaces N of.
+
+from oat import michelson
+from oat.benchmarks import deploy, registry_arguments, row, sp_address
+from oat.benchmarks.luwRepositories import repository_id
+
+BATCH_SIZES = (1, 20, 200)
+
+
+def create_luw(mockup, registry):
+    mockup.transfer("bootstrap2", registry, "create_luw", michelson.record(
+        provider_id = michelson.string("provider_id"),
+        luw_service_endpoint = michelson.address(mockup.accounts["bootstrap3"]),
+    ))
+
+
+def run(mockup):
+    certifier_address = mockup.accounts["bootstrap1"]
+
+    luw_contract = deploy(mockup, "luw", "LUW.py", "LUW", [sp_address(certifier_address)])
+    luw_repository = deploy(mockup, "luw_repository", "LUWRepository.py", "LUWRepository", [
+        sp_address(luw_contract),
+        sp_address(certifier_address),
+    ])
+
+    mockup.transfer("bootstrap1", luw_repository, "update_storage_contract_with_address", michelson.unit())
+
+    # Only the LUW contracts are called by this benchmark
+    registry = deploy(mockup, "registry", "registry.py", "Registry",
+        registry_arguments(certifier_address, luw_repository, luw_repository, luw_repository))
+
+    # Lift the default batch limit to the largest measured batch
+    mockup.transfer("bootstrap1", registry, "set_max_batch_size", michelson.nat(max(BATCH_SIZES)))
+
+    rows = []
+
+    # One repository through the single-repository entry points, on LUW 0
+    create_luw(mockup, registry)
+
+    operations = [
+        ("add_luw_repository", michelson.record(
+            luw_id = michelson.nat(0),
+            repository_id = michelson.string(repository_id(0)),
+        )),
+        ("change_luw_repository_state", michelson.record(
+            luw_id = michelson.nat(0),
+            repository_id = michelson.string(repository_id(0)),
+            state_id = michelson.nat(2),
+        )),
+    ]
+
+    for entrypoint, argument in operations:
+        receipt = mockup.transfer("bootstrap2", registry, entrypoint, argument)
+        rows.append(dict(row(entrypoint, 1, receipt), gas_per_repository = receipt.consumed_gas))
+
+    # Batches on LUWs 1, 2, ...
+    for luw_id, batch_size in enumerate(BATCH_SIZES, start = 1):
+        create_luw(mockup, registry)
+
+        repository_ids = [michelson.string(repository_id(index)) for index in range(batch_size)]
+
+        operations = [
+            ("add_luw_repositories", michelson.record(
+                luw_id = michelson.nat(luw_id),
+                repository_ids = michelson.sequence(repository_ids),
+            )),
+            ("change_luw_repository_states", michelson.record(
+                luw_id = michelson.nat(luw_id),
+                repositories = michelson.sequence([
+                    michelson.record(repository_id = repository, state_id = michelson.nat(2))
+                    for repository in repository_ids
+                ]),
+            )),
+        ]
+
+        for entrypoint, argument in operations:
+            receipt = mockup.transfer("bootstrap2", registry, entrypoint, argument)
+            rows.append(dict(row(entrypoint, batch_size, receipt), gas_per_repository = round(receipt.consumed_gas / batch_size, 1)))
+
+    return rows
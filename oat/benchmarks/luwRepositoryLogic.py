@@ -0,0 +1,46 @@
+# LUWRepository gas vs. number of repositories
+#
+# Runs the LUWRepository entry points, which check the LUW through the LUW views
+# before forwarding the update, on LUWs that coordinate 1, 50 and 500
+# repositories. The repository membership check of change_repository_state must
+# not grow with the number of repositories of the LUW.
+
+from oat import michelson
+from oat.benchmarks import deploy, row, sp_address
+from oat.benchmarks.luwRepositories import REPOSITORY_COUNTS, populate, repository_id
+
+
+def run(mockup):
+    certifier_address = mockup.accounts["bootstrap1"]
+
+    luw_contract = deploy(mockup, "luw", "LUW.py", "LUW", [sp_address(certifier_address)])
+    luw_repository = deploy(mockup, "luw_repository", "LUWRepository.py", "LUWRepository", [
+        sp_address(luw_contract),
+        sp_address(certifier_address),
+    ])
+
+    mockup.transfer("bootstrap1", luw_repository, "update_storage_contract_with_address", michelson.unit())
+
+    rows = []
+
+    for luw_id, repository_count in enumerate(REPOSITORY_COUNTS):
+        # Imported LUWs are owned by bootstrap1, which also sends the updates below
+        populate(mockup, luw_contract, luw_id, repository_count)
+
+        operations = [
+            ("add_repository", michelson.record(
+                luw_id = michelson.nat(luw_id),
+                repository_id = michelson.string("repository_new"),
+            )),
+            ("change_repository_state", michelson.record(
+                luw_id = michelson.nat(luw_id),
+                repository_id = michelson.string(repository_id(0)),
+                state_id = michelson.nat(2),
+            )),
+        ]
+
+        for entrypoint, argument in operations:
+            receipt = mockup.transfer("bootstrap1", luw_repository, entrypoint, argument)
+            rows.append(row(entrypoint, repository_count, receipt))
+
+    return rows
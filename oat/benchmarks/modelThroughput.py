@@ -0,0 +1,55 @@
+# Model throughput
+#
+# Runs random Registry operations on the pure-Python model of oat/model.py and
+# reports the operations run per second, on one core, with and without keeping
+# the emitted events. The operations are generated before the clock starts.
+#
+# The model does not run contracts, so this benchmark needs no mockup and is not
+# part of `python -m oat.benchmarks`. Run it on its own:
+#
+#     python -m oat.benchmarks.modelThroughput [--operations <count>] [--seed <seed>]
+
+import argparse
+import time
+
+from oat import model
+from oat.benchmarks import format_table
+
+
+def run(operations, seed = 0):
+    generated = model.OperationGenerator(seed = seed).operations(operations)
+    rows = []
+
+    for record_events in (False, True):
+        topology = model.Topology(network = model.Network(record_events = record_events))
+        apply = topology.apply
+
+        failed = 0
+        started = time.perf_counter()
+        for operation in generated:
+            if apply(operation) is not None:
+                failed += 1
+        duration = time.perf_counter() - started
+
+        rows.append({
+            "events": "recorded" if record_events else "dropped",
+            "operations": operations,
+            "failed": failed,
+            "duration": "%.2fs" % duration,
+            "operations_per_second": round(operations / duration),
+        })
+
+    return rows
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m oat.benchmarks.modelThroughput")
+    parser.add_argument("--operations", type = int, default = 1000000, help = "number of operations (default: 1000000)")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the random operations (default: 0)")
+    args = parser.parse_args(argv)
+
+    print(format_table(run(args.operations, args.seed)))
+
+
+if __name__ == "__main__":
+    main()
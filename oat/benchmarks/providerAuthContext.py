@@ -0,0 +1,49 @@
+# View gas of the provider owner and existence checks
+#
+# Compares the two views AssetProviderRepository used to call before a provider
+# write (verify_provider_exists and get_provider_owner_address) with the single
+# get_provider_auth_context view that replaces them, and reports the end-to-end
+# gas of the provider writes that use it.
+
+from oat import michelson
+from oat.benchmarks import deploy_view_probe, probe, row
+from oat.benchmarks.providerTopologies import PROVIDER_ID, deploy_repository_topology, provider_operations
+
+AUTH_CONTEXT_TYPE = """sp.TRecord(
+    exists = sp.TBool,
+    owner_address = sp.TOption(sp.TAddress),
+    status = sp.TOption(sp.TNat)
+)"""
+
+VIEW_CHECKS = (
+    ("verify_provider_exists + get_provider_owner_address", [
+        ("verify_provider_exists", "sp.TBool"),
+        ("get_provider_owner_address", "sp.TAddress"),
+    ]),
+    ("get_provider_auth_context", [
+        ("get_provider_auth_context", AUTH_CONTEXT_TYPE),
+    ]),
+)
+
+
+def run(mockup):
+    certifier_address = mockup.accounts["bootstrap1"]
+    owner_address = mockup.accounts["bootstrap2"]
+
+    asset_provider_repository = deploy_repository_topology(mockup, certifier_address)
+    asset_provider = mockup.contracts["asset_provider"]
+
+    rows = []
+
+    # Provider writes through the repository, which now makes a single view call each
+    for entrypoint, argument in provider_operations(owner_address):
+        receipt = mockup.transfer("bootstrap2", asset_provider_repository, entrypoint, argument)
+        rows.append(row(entrypoint, 1, receipt))
+
+    for index, (operation, views) in enumerate(VIEW_CHECKS):
+        view_probe = deploy_view_probe(mockup, "auth_probe_%d" % index, views, "sp.TString")
+
+        receipt = probe(mockup, view_probe, asset_provider, michelson.string(PROVIDER_ID))
+        rows.append(row(operation, len(views), receipt))
+
+    return rows
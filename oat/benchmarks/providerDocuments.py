@@ -0,0 +1,86 @@
+# Inline vs. content-addressed provider data
+#
+# Creates and updates providers through the Registry with the provider document
+# stored inline and with only its digest and URI stored (content_addressed =
+# True), for DID documents listing 0, 10 and 50 repositories, and reports gas
+# and paid storage of each operation.
+
+from oat import michelson, providerDocuments
+from oat.benchmarks import deploy, registry_arguments, row, sp_address
+
+REPOSITORY_COUNTS = (0, 10, 50)
+
+PROVIDER_DID = "did:tz:tz1zsSgDXeYPhZ3AuKhTFneDf1"
+
+MODES = (
+    ("inline", []),
+    ("content_addressed", ["content_addressed = True"]),
+)
+
+
+def provider_document(repository_count, revision):
+    # DID document of the test-suite README, with the provider repositories the simulation reads
+    return {
+        "@context": "https://w3id.org/did/v1",
+        "id": PROVIDER_DID,
+        "verificationMethod": [{
+            "id": PROVIDER_DID,
+            "type": "EcdsaSecp256k1VerificationKey2019",
+            "controller": PROVIDER_DID,
+            "publicKeyJwk": {
+                "kty": "EC",
+                "crv": "secp256k1",
+                "x": "n03trG-1sWidluyYQ2gcKrgYE94rMkLIArZCHjv2GpI",
+                "y": "6__x_vqe0nBGYf7azbQ1_VvvuCafG5MhhUPNvYp-Mak",
+            },
+        }],
+        "authentication": [PROVIDER_DID],
+        "assertionMethod": [PROVIDER_DID],
+        "repositories": ["https://repository-%d.example.com/r%d" % (index, revision) for index in range(repository_count)],
+    }
+
+
+def provider_data(mode, document, provider_id):
+    if mode == "inline":
+        return michelson.string(providerDocuments.canonicalize(document).decode("utf-8"))
+
+    return providerDocuments.provider_data(document, "https://providers.example.com/%s.json" % provider_id)
+
+
+def run(mockup):
+    certifier_address = mockup.accounts["bootstrap1"]
+
+    rows = []
+
+    for mode, mode_arguments in MODES:
+        asset_provider = deploy(mockup, "asset_provider_%s" % mode, "assetProvider.py", "AssetProvider",
+            [sp_address(certifier_address)] + mode_arguments)
+        asset_provider_repository = deploy(mockup, "asset_provider_repository_%s" % mode,
+            "assetProviderRepository.py", "AssetProviderRepository",
+            [sp_address(asset_provider), sp_address(certifier_address)] + mode_arguments)
+
+        mockup.transfer("bootstrap1", asset_provider_repository, "update_storage_contract_with_address", michelson.unit())
+
+        # Only the provider contracts are called by this benchmark
+        registry = deploy(mockup, "registry_%s" % mode, "registry.py", "Registry",
+            registry_arguments(certifier_address, asset_provider_repository, asset_provider_repository, asset_provider_repository)
+            + mode_arguments)
+
+        for repository_count in REPOSITORY_COUNTS:
+            provider_id = "provider_%d" % repository_count
+            document = provider_document(repository_count, 0)
+            document_size = len(providerDocuments.canonicalize(document))
+
+            operations = [
+                ("create_asset_provider", document),
+                ("set_provider_data", provider_document(repository_count, 1)),
+            ]
+
+            for entrypoint, operation_document in operations:
+                receipt = mockup.transfer("bootstrap2", registry, entrypoint, michelson.record(
+                    provider_id = michelson.string(provider_id),
+                    provider_data = provider_data(mode, operation_document, provider_id),
+                ))
+                rows.append(dict(mode = mode, **row(entrypoint, document_size, receipt)))
+
+    return rows
@@ -0,0 +1,94 @@
+# Provider entry points in the repository and direct topologies
+#
+# Runs every provider entry point of the Registry against
+# AssetProvider + AssetProviderRepository and against AssetProviderDirect, and
+# reports the gas and the number of internal operations of each.
+
+from oat import michelson
+from oat.benchmarks import deploy, deploy_view_probe, probe, registry_arguments, row, sp_address
+
+PROVIDER_ID = "did:tz:tz1zsSgDXeYPhZ3AuKhTFneDf1"
+
+PROVIDER_TYPE = """sp.TRecord(
+    provider_id = sp.TString,
+    provider_data = sp.TString,
+    creator_wallet_address = sp.TAddress,
+    status = sp.TString
+)"""
+
+
+def deploy_repository_topology(mockup, certifier_address):
+    asset_provider = deploy(mockup, "asset_provider", "assetProvider.py", "AssetProvider", [
+        sp_address(certifier_address),
+    ])
+    asset_provider_repository = deploy(mockup, "asset_provider_repository", "assetProviderRepository.py", "AssetProviderRepository", [
+        sp_address(asset_provider),
+        sp_address(certifier_address),
+    ])
+
+    mockup.transfer("bootstrap1", asset_provider_repository, "update_storage_contract_with_address", michelson.unit())
+
+    return asset_provider_repository
+
+
+def deploy_direct_topology(mockup, certifier_address):
+    return deploy(mockup, "asset_provider_direct", "assetProviderDirect.py", "AssetProviderDirect", [
+        sp_address(certifier_address),
+    ])
+
+
+TOPOLOGIES = (
+    ("repository", deploy_repository_topology),
+    ("direct", deploy_direct_topology),
+)
+
+
+def provider_operations(owner_address):
+    provider_id = michelson.string(PROVIDER_ID)
+
+    return [
+        ("create_asset_provider", michelson.record(
+            provider_id = provider_id,
+            provider_data = michelson.string("provider_data_A"),
+        )),
+        ("set_provider_data", michelson.record(
+            provider_id = provider_id,
+            provider_data = michelson.string("provider_data_B"),
+        )),
+        ("set_provider_deprecated", provider_id),
+        ("set_provider_active", provider_id),
+        ("set_provider_status", michelson.record(
+            provider_id = provider_id,
+            status = michelson.nat(2),
+        )),
+        ("set_provider_owner", michelson.record(
+            provider_id = provider_id,
+            new_owner_address = michelson.address(owner_address),
+        )),
+    ]
+
+
+def run(mockup):
+    certifier_address = mockup.accounts["bootstrap1"]
+    owner_address = mockup.accounts["bootstrap2"]
+
+    rows = []
+
+    for topology, deploy_topology in TOPOLOGIES:
+        asset_provider_contract = deploy_topology(mockup, certifier_address)
+
+        # Only the provider contracts are called by this benchmark
+        registry = deploy(mockup, "registry_%s" % topology, "registry.py", "Registry",
+            registry_arguments(certifier_address, asset_provider_contract, asset_provider_contract, asset_provider_contract))
+
+        for entrypoint, argument in provider_operations(owner_address):
+            receipt = mockup.transfer("bootstrap2", registry, entrypoint, argument)
+            rows.append(dict(topology = topology, **row(entrypoint, 1, receipt)))
+
+        provider_probe = deploy_view_probe(mockup, "get_asset_provider_probe_%s" % topology,
+            [("get_asset_provider", PROVIDER_TYPE)], "sp.TString")
+
+        receipt = probe(mockup, provider_probe, registry, michelson.string(PROVIDER_ID))
+        rows.append(dict(topology = topology, **row("get_asset_provider", 1, receipt)))
+
+    return rows
@@ -0,0 +1,168 @@
+# Gas and storage of every Registry entry point and view
+#
+# Deploys the full topology (AssetProvider, AssetProviderRepository,
+# AssetTwinTracing, LUW, LUWRepository and Registry) and runs each Registry
+# entry point and view once, in an order where every call succeeds, following
+# the flow of the scenario modules. WORKLOAD_SIZE sets the number of items of the
+# batch entry points and of the LUW used by the LUW operations.
+
+from oat import michelson
+from oat.benchmarks import deploy_registry_topology, deploy_view_probe, probe, row
+from oat.benchmarks.assetTwinHistory import HISTORY_PARAMETERS_TYPE, HISTORY_TYPE
+from oat.benchmarks.assetTwinProviders import ASSET_TWIN_TYPE, FETCH_PARAMETERS_TYPE, register_arguments
+from oat.benchmarks.luwFetch import DECODED_LUW_TYPE, LUW_PARAMETERS_TYPE, LUW_TYPE
+from oat.benchmarks.luwRepositories import REPOSITORY_STATE_PARAMETERS_TYPE, repository_id
+from oat.benchmarks.providerTopologies import PROVIDER_ID, PROVIDER_TYPE
+
+WORKLOAD_SIZE = 10
+
+ANCHOR_HASH = "1220f5b9c7d3a4e2b1f0c9d8e7f6a5b4c3d2e1f0a9b8c7d6e5f4a3b2c1d0e9f8a7b6"
+
+STORAGE_CONTRACTS_TYPE = """sp.TRecord(
+    luw_storage_contract_address = sp.TAddress,
+    provider_storage_contract_address = sp.TAddress,
+    asset_twin_storage_contract_address = sp.TAddress
+)"""
+
+
+def provider_entry_points():
+    provider_id = michelson.string(PROVIDER_ID)
+
+    return [
+        ("create_asset_provider", michelson.record(
+            provider_id = provider_id,
+            provider_data = michelson.string("provider_data_A"),
+        )),
+        ("set_provider_data", michelson.record(
+            provider_id = provider_id,
+            provider_data = michelson.string("provider_data_B"),
+        )),
+        ("set_provider_deprecated", provider_id),
+        ("set_provider_active", provider_id),
+        ("set_provider_status", michelson.record(
+            provider_id = provider_id,
+            status = michelson.nat(1),
+        )),
+    ]
+
+
+def asset_twin_entry_points(workload_size):
+    return [
+        ("register_asset_twin", register_arguments(ANCHOR_HASH, PROVIDER_ID)),
+        ("register_asset_twin", register_arguments(ANCHOR_HASH, PROVIDER_ID)),
+        ("register_asset_twins_batch", michelson.sequence([
+            register_arguments("%s_%d" % (ANCHOR_HASH, index), PROVIDER_ID) for index in range(workload_size)
+        ])),
+    ]
+
+
+def luw_entry_points(workload_size, luw_service_endpoint):
+    luw_record = michelson.record(
+        provider_id = michelson.string(PROVIDER_ID),
+        luw_service_endpoint = michelson.address(luw_service_endpoint),
+    )
+    batch_ids = [michelson.string(repository_id(index)) for index in range(1, workload_size)]
+
+    return [
+        # LUW 0 goes through the whole commit flow
+        ("create_luw", luw_record),
+        ("add_luw_repository", michelson.record(
+            luw_id = michelson.nat(0),
+            repository_id = michelson.string(repository_id(0)),
+        )),
+        ("add_luw_repositories", michelson.record(
+            luw_id = michelson.nat(0),
+            repository_ids = michelson.sequence(batch_ids),
+        )),
+        ("change_luw_repository_state", michelson.record(
+            luw_id = michelson.nat(0),
+            repository_id = michelson.string(repository_id(0)),
+            state_id = michelson.nat(2),
+        )),
+        ("change_luw_repository_states", michelson.record(
+            luw_id = michelson.nat(0),
+            repositories = michelson.sequence([
+                michelson.record(repository_id = batch_id, state_id = michelson.nat(2)) for batch_id in batch_ids
+            ]),
+        )),
+        ("change_luw_state", michelson.record(
+            luw_id = michelson.nat(0),
+            state_id = michelson.nat(2),
+        )),
+        ("commit_luw", michelson.nat(0)),
+        # LUW 1 is aborted with the same repositories, still open
+        ("create_luw", luw_record),
+        ("add_luw_repositories", michelson.record(
+            luw_id = michelson.nat(1),
+            repository_ids = michelson.sequence([michelson.string(repository_id(0))] + batch_ids),
+        )),
+        ("abort_luw", michelson.nat(1)),
+    ]
+
+
+def views():
+    # (view name, result type, parameter type, argument)
+    return [
+        ("get_asset_provider", PROVIDER_TYPE, "sp.TString", michelson.string(PROVIDER_ID)),
+        ("fetch_asset_twin", ASSET_TWIN_TYPE, FETCH_PARAMETERS_TYPE, michelson.record(
+            anchor_hash = michelson.string(ANCHOR_HASH),
+            provider_id = michelson.string(PROVIDER_ID),
+        )),
+        ("fetch_asset_twin_history", HISTORY_TYPE, HISTORY_PARAMETERS_TYPE, michelson.record(
+            anchor_hash = michelson.string(ANCHOR_HASH),
+            provider_id = michelson.string(PROVIDER_ID),
+            offset = michelson.nat(0),
+            limit = michelson.nat(10),
+        )),
+        ("fetch_luw", LUW_TYPE, LUW_PARAMETERS_TYPE, michelson.record(
+            luw_id = michelson.nat(0),
+            offset = michelson.nat(0),
+            limit = michelson.nat(10),
+        )),
+        ("fetch_luw_decoded", DECODED_LUW_TYPE, "sp.TNat", michelson.nat(0)),
+        ("get_active_luw_state", "sp.TString", "sp.TNat", michelson.nat(0)),
+        ("get_luw_repository_state", "sp.TString", REPOSITORY_STATE_PARAMETERS_TYPE, michelson.record(
+            luw_id = michelson.nat(0),
+            repository_id = michelson.string(repository_id(0)),
+        )),
+        ("get_storage_contracts", STORAGE_CONTRACTS_TYPE, "sp.TUnit", michelson.unit()),
+        ("verify_storage_contracts", "sp.TBool", "sp.TUnit", michelson.unit()),
+    ]
+
+
+def run(mockup, workload_size = WORKLOAD_SIZE):
+    topology = deploy_registry_topology(mockup)
+    registry = topology.registry
+
+    rows = []
+
+    operations = (
+        provider_entry_points()
+        + asset_twin_entry_points(workload_size)
+        + luw_entry_points(workload_size, mockup.accounts["bootstrap3"])
+    )
+
+    for entrypoint, argument in operations:
+        receipt = mockup.transfer("bootstrap2", registry, entrypoint, argument)
+        rows.append(row(entrypoint, workload_size, receipt))
+
+    # Certifier and ownership changes come last, so that they do not lock the calls above out
+    receipt = mockup.transfer("bootstrap1", registry, "set_max_batch_size", michelson.nat(100))
+    rows.append(row("set_max_batch_size", workload_size, receipt))
+
+    receipt = mockup.transfer("bootstrap1", registry, "sync_storage_contracts", michelson.unit())
+    rows.append(row("sync_storage_contracts", workload_size, receipt))
+
+    receipt = mockup.transfer("bootstrap2", registry, "set_provider_owner", michelson.record(
+        provider_id = michelson.string(PROVIDER_ID),
+        new_owner_address = michelson.address(mockup.accounts["bootstrap3"]),
+    ))
+    rows.append(row("set_provider_owner", workload_size, receipt))
+
+    for view_name, result_type, param_type, argument in views():
+        view_probe = deploy_view_probe(mockup, "%s_probe" % view_name, [(view_name, result_type)], param_type)
+
+        receipt = probe(mockup, view_probe, registry, argument)
+        rows.append(row(view_name, workload_size, receipt))
+
+    return rows
@@ -0,0 +1,89 @@
+# Benchmark reports
+#
+# A report holds the rows of every benchmark run, along with the commit and the
+# protocol they were measured on, so that reports of two commits can be compared
+# with `python -m oat.benchmarks.compare`.
+
+import csv
+import io
+import json
+
+from oat import toolchain
+from oat.benchmarks import METRIC_COLUMNS
+
+REPORT_VERSION = 1
+
+
+def is_metric(column):
+    # Derived per-item figures are measurements too
+    return column in METRIC_COLUMNS or column.startswith("gas_per_")
+
+
+def current_commit():
+    try:
+        return toolchain.run_command(["git", "describe", "--always", "--dirty"], cwd = toolchain.REPOSITORY_ROOT).strip()
+    except toolchain.ToolchainError:
+        return None
+
+
+def build_report(results, protocol = None):
+    # `results` maps benchmark names to their rows, in run order
+    return {
+        "version": REPORT_VERSION,
+        "commit": current_commit(),
+        "protocol": protocol,
+        "benchmarks": results,
+    }
+
+
+def to_json(report):
+    return json.dumps(report, indent = 2) + "\n"
+
+
+def to_csv(report):
+    # One line per row, with the benchmark name first and the union of all columns
+    columns = ["benchmark"]
+    for rows in report["benchmarks"].values():
+        for result in rows:
+            columns += [column for column in result if column not in columns]
+
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames = columns, lineterminator = "\n")
+    writer.writeheader()
+
+    for name, rows in report["benchmarks"].items():
+        for result in rows:
+            writer.writerow(dict(result, benchmark = name))
+
+    return output.getvalue()
+
+
+def load(path):
+    with open(path) as report_file:
+        report = json.load(report_file)
+
+    if report.get("version") != REPORT_VERSION:
+        raise ValueError("%s: unsupported report version %r" % (path, report.get("version")))
+
+    return report
+
+
+def row_key(benchmark, result):
+    # Rows are matched across reports by everything that is not a measurement.
+    # Operations repeated within a benchmark are told apart by their occurrence.
+    return (benchmark,) + tuple(sorted((column, str(value)) for column, value in result.items() if not is_metric(column)))
+
+
+def index_rows(report):
+    indexed = {}
+
+    for name, rows in report["benchmarks"].items():
+        for result in rows:
+            key = row_key(name, result)
+            occurrence = 0
+            while (key, occurrence) in indexed:
+                occurrence += 1
+
+            indexed[(key, occurrence)] = result
+
+    return indexed
@@ -0,0 +1,444 @@
+# Gas vs. data size, per storage structure
+#
+# Sweeps every structure that grows without bound over 1, 10, 100 and 1000
+# entries: registrations per asset twin, providers per anchor hash, states and
+# repositories per LUW, and LUWs in luw_map. Storage is pre-populated through the
+# certifier's import entry points in a few large operations, instead of through
+# thousands of Registry calls, and the contracts are then called directly.
+#
+# The gas of every operation is fitted against the size, and operations that grow
+# faster than expected are flagged. Run on its own to get the fit and a non-zero
+# exit status on flagged operations:
+#
+#     python -m oat.benchmarks.scaling [--protocol <protocol>]
+
+import argparse
+import math
+import sys
+
+from oat import artifacts, michelson, toolchain
+from oat.benchmarks import deploy_view_probe, format_table, probe, row, sp_address
+from oat.benchmarks import assetTwinHistory, assetTwinProviders
+from oat.benchmarks.assetTwinHistory import HISTORY_PARAMETERS_TYPE
+from oat.benchmarks.assetTwinProviders import ASSET_TWIN_TYPE, FETCH_PARAMETERS_TYPE, register_arguments
+from oat.benchmarks.luwFetch import LUW_PARAMETERS_TYPE
+from oat.benchmarks.luwRepositories import REPOSITORY_STATE_PARAMETERS_TYPE, repository_id
+
+SIZES = (1, 10, 100, 1000)
+
+# Entries written per populating operation, to stay well below the operation size limit
+IMPORT_CHUNK = 50
+
+# Growth from the smallest to the largest size, relative to the smallest, still counted as O(1).
+# Keys get longer with the size (e.g. nat LUW IDs), which costs a few gas units on its own.
+CONSTANT_TOLERANCE = 0.02
+
+COMPLEXITIES = ("O(1)", "O(log n)", "O(n)")
+
+# History page of the registrations sweep: the shortest history, of the smallest
+# size plus the re-registration, fills it
+HISTORY_PROBE_LIMIT = SIZES[0] + 1
+
+# LUW page of the states and repositories sweeps: the smallest size plus the state or
+# repository added before the probes fills it
+LUW_PAGE_PROBE_LIMIT = SIZES[0] + 1
+
+LUW_RECORD_TYPE = """sp.TRecord(
+    creator_wallet_address = sp.TAddress,
+    provider_id = sp.TString,
+    luw_service_endpoint = sp.TAddress,
+    state_history = sp.TMap(sp.TNat, sp.TNat),
+    repository_endpoints = sp.TMap(sp.TString, sp.TNat)
+)"""
+
+LUW_PAGE_TYPE = """sp.TRecord(
+    creator_wallet_address = sp.TAddress,
+    provider_id = sp.TString,
+    luw_service_endpoint = sp.TAddress,
+    active_state_id = sp.TNat,
+    state_count = sp.TNat,
+    repository_count = sp.TNat,
+    state_history = sp.TMap(sp.TNat, sp.TNat),
+    repository_endpoints = sp.TMap(sp.TString, sp.TNat)
+)"""
+
+# View name -> (result type, parameter type)
+VIEWS = {
+    "fetch_asset_twin": (ASSET_TWIN_TYPE, FETCH_PARAMETERS_TYPE),
+    "fetch_asset_twin_history": ("sp.TMap(sp.TNat, sp.TTimestamp)", HISTORY_PARAMETERS_TYPE),
+    "fetch": (LUW_RECORD_TYPE, "sp.TNat"),
+    "fetch_page": (LUW_PAGE_TYPE, LUW_PARAMETERS_TYPE),
+    "get_active_luw_state": ("sp.TNat", "sp.TNat"),
+    "get_luw_state_history": ("sp.TMap(sp.TNat, sp.TNat)", "sp.TNat"),
+    "get_luw_repositories": ("sp.TMap(sp.TString, sp.TNat)", "sp.TNat"),
+    "has_luw_repository": ("sp.TBool", REPOSITORY_STATE_PARAMETERS_TYPE),
+    "get_luw_repository_state": ("sp.TNat", REPOSITORY_STATE_PARAMETERS_TYPE),
+}
+
+
+def scaling_row(dimension, operation, expected, size, receipt):
+    return dict(dimension = dimension, expected = expected, **row(operation, size, receipt))
+
+
+def luw_page(luw_id):
+    return michelson.record(
+        luw_id = michelson.nat(luw_id),
+        offset = michelson.nat(0),
+        limit = michelson.nat(LUW_PAGE_PROBE_LIMIT),
+    )
+
+
+##############
+# Population #
+##############
+
+def imported_luw(mockup, state_count, repository_count):
+    # Alternating active and prepare_to_commit states, so that the history is a real one
+    return michelson.record(
+        creator_wallet_address = michelson.address(mockup.accounts["bootstrap1"]),
+        provider_id = michelson.string("provider_id"),
+        luw_service_endpoint = michelson.address(mockup.accounts["bootstrap1"]),
+        state_history = michelson.mapping([
+            (michelson.nat(index), michelson.nat(2 - index % 2)) for index in range(1, state_count + 1)
+        ]),
+        repository_endpoints = michelson.mapping([
+            (michelson.string(repository_id(index)), michelson.nat(1)) for index in range(repository_count)
+        ]),
+    )
+
+
+def populate_luw(mockup, luw_contract, luw_id, state_count, repository_count):
+    # The state history is small enough to be imported at once, the repositories past
+    # the first chunk are appended with add_repositories, called as the logic contract
+    mockup.transfer("bootstrap1", luw_contract, "import_luws", michelson.sequence([
+        michelson.record(
+            luw_id = michelson.nat(luw_id),
+            luw = imported_luw(mockup, state_count, min(repository_count, IMPORT_CHUNK)),
+        ),
+    ]))
+
+    for start in range(IMPORT_CHUNK, repository_count, IMPORT_CHUNK):
+        mockup.transfer("bootstrap2", luw_contract, "add_repositories", michelson.record(
+            luw_id = michelson.nat(luw_id),
+            repository_ids = michelson.sequence([
+                michelson.string(repository_id(index)) for index in range(start, min(start + IMPORT_CHUNK, repository_count))
+            ]),
+            state_id = michelson.nat(1),
+        ))
+
+
+def populate_luws(mockup, luw_contract, start, stop):
+    for chunk_start in range(start, stop, IMPORT_CHUNK):
+        mockup.transfer("bootstrap1", luw_contract, "import_luws", michelson.sequence([
+            michelson.record(luw_id = michelson.nat(luw_id), luw = imported_luw(mockup, 1, 1))
+            for luw_id in range(chunk_start, min(chunk_start + IMPORT_CHUNK, stop))
+        ]))
+
+
+##########
+# Sweeps #
+##########
+
+def sweep_registrations(mockup, asset_twin_tracing, probes):
+    dimension = "registrations per asset twin"
+    rows = []
+
+    for size in SIZES:
+        anchor_hash = "registrations_%d" % size
+        assetTwinHistory.populate(mockup, asset_twin_tracing, anchor_hash, size)
+
+        asset_twin = michelson.record(
+            anchor_hash = michelson.string(anchor_hash),
+            provider_id = michelson.string(assetTwinHistory.PROVIDER_ID),
+        )
+
+        receipt = mockup.transfer("bootstrap2", asset_twin_tracing, "register",
+            register_arguments(anchor_hash, assetTwinHistory.PROVIDER_ID))
+        rows.append(scaling_row(dimension, "register (re-registration)", "O(1)", size, receipt))
+
+        receipt = probe(mockup, probes["fetch_asset_twin"], asset_twin_tracing, asset_twin)
+        rows.append(scaling_row(dimension, "fetch_asset_twin", "O(1)", size, receipt))
+
+        # A history page is bounded by its limit, not by the history length; the page
+        # is one the shortest history fills, so it returns as many entries at every size
+        receipt = probe(mockup, probes["fetch_asset_twin_history"], asset_twin_tracing, michelson.record(
+            anchor_hash = michelson.string(anchor_hash),
+            provider_id = michelson.string(assetTwinHistory.PROVIDER_ID),
+            offset = michelson.nat(0),
+            limit = michelson.nat(HISTORY_PROBE_LIMIT),
+        ))
+        rows.append(scaling_row(dimension, "fetch_asset_twin_history (limit %d)" % HISTORY_PROBE_LIMIT, "O(1)", size, receipt))
+
+    return rows
+
+
+def sweep_providers(mockup, asset_twin_tracing, probes):
+    dimension = "providers per anchor hash"
+    rows = []
+
+    for size in SIZES:
+        anchor_hash = "providers_%d" % size
+        assetTwinProviders.populate(mockup, asset_twin_tracing, anchor_hash, size)
+
+        receipt = mockup.transfer("bootstrap2", asset_twin_tracing, "register",
+            register_arguments(anchor_hash, "provider_new"))
+        rows.append(scaling_row(dimension, "register (new provider)", "O(1)", size, receipt))
+
+        receipt = mockup.transfer("bootstrap2", asset_twin_tracing, "register",
+            register_arguments(anchor_hash, assetTwinProviders.provider_id(0)))
+        rows.append(scaling_row(dimension, "register (re-registration)", "O(1)", size, receipt))
+
+        receipt = probe(mockup, probes["fetch_asset_twin"], asset_twin_tracing, michelson.record(
+            anchor_hash = michelson.string(anchor_hash),
+            provider_id = michelson.string(assetTwinProviders.provider_id(0)),
+        ))
+        rows.append(scaling_row(dimension, "fetch_asset_twin", "O(1)", size, receipt))
+
+    return rows
+
+
+def sweep_states(mockup, luw_contract, probes):
+    dimension = "states per LUW"
+    rows = []
+
+    for luw_id, size in enumerate(SIZES):
+        populate_luw(mockup, luw_contract, luw_id, size, 1)
+
+        receipt = mockup.transfer("bootstrap2", luw_contract, "add_state", michelson.record(
+            luw_id = michelson.nat(luw_id),
+            state_id = michelson.nat(2),
+        ))
+        rows.append(scaling_row(dimension, "add_state", "O(1)", size, receipt))
+
+        # The history and fetch views return the whole history, so they are linear by design.
+        # fetch_page, which Registry.fetch_luw reads, is bounded by its limit instead.
+        views = [
+            ("get_active_luw_state", "O(1)", michelson.nat(luw_id)),
+            ("get_luw_state_history", "O(n)", michelson.nat(luw_id)),
+            ("fetch", "O(n)", michelson.nat(luw_id)),
+            ("fetch_page", "O(1)", luw_page(luw_id)),
+        ]
+
+        for view_name, expected, argument in views:
+            receipt = probe(mockup, probes[view_name], luw_contract, argument)
+            rows.append(scaling_row(dimension, view_name, expected, size, receipt))
+
+    return rows
+
+
+def sweep_repositories(mockup, luw_contract, probes):
+    dimension = "repositories per LUW"
+    rows = []
+
+    for luw_id, size in enumerate(SIZES):
+        populate_luw(mockup, luw_contract, luw_id, 1, size)
+
+        repository = michelson.record(
+            luw_id = michelson.nat(luw_id),
+            repository_id = michelson.string(repository_id(0)),
+        )
+
+        operations = [
+            ("add_repository", michelson.record(
+                luw_id = michelson.nat(luw_id),
+                repository_id = michelson.string("repository_new"),
+                state_id = michelson.nat(1),
+            )),
+            ("change_repository_state", michelson.record(
+                luw_id = michelson.nat(luw_id),
+                repository_id = michelson.string(repository_id(0)),
+                state_id = michelson.nat(2),
+            )),
+        ]
+
+        for entrypoint, argument in operations:
+            receipt = mockup.transfer("bootstrap2", luw_contract, entrypoint, argument)
+            rows.append(scaling_row(dimension, entrypoint, "O(1)", size, receipt))
+
+        views = [
+            ("has_luw_repository", "O(1)", repository),
+            ("get_luw_repository_state", "O(1)", repository),
+            ("get_luw_repositories", "O(n)", michelson.nat(luw_id)),
+            ("fetch", "O(n)", michelson.nat(luw_id)),
+            ("fetch_page", "O(1)", luw_page(luw_id)),
+        ]
+
+        for view_name, expected, argument in views:
+            receipt = probe(mockup, probes[view_name], luw_contract, argument)
+            rows.append(scaling_row(dimension, view_name, expected, size, receipt))
+
+        # Closing moves every repository to its final state, last since the LUW is done afterwards
+        receipt = mockup.transfer("bootstrap2", luw_contract, "close", michelson.record(
+            luw_id = michelson.nat(luw_id),
+            luw_state_id = michelson.nat(4),
+            repository_state_id = michelson.nat(4),
+            ready_state_id = michelson.none(),
+        ))
+        rows.append(scaling_row(dimension, "close", "O(n)", size, receipt))
+
+    return rows
+
+
+def sweep_luws(mockup, luw_contract, probes):
+    dimension = "LUWs in luw_map"
+    rows = []
+    luw_count = 0
+
+    for size in SIZES:
+        populate_luws(mockup, luw_contract, luw_count, size)
+
+        # add appends LUW `size`, so the next population continues after it
+        receipt = mockup.transfer("bootstrap2", luw_contract, "add", michelson.record(
+            provider_id = michelson.string("provider_id"),
+            luw_service_endpoint = michelson.address(mockup.accounts["bootstrap1"]),
+        ))
+        rows.append(scaling_row(dimension, "add", "O(1)", size, receipt))
+        luw_count = size + 1
+
+        # The LUW just added is the one probed, so its history has two states at every size
+        receipt = mockup.transfer("bootstrap2", luw_contract, "add_state", michelson.record(
+            luw_id = michelson.nat(size),
+            state_id = michelson.nat(2),
+        ))
+        rows.append(scaling_row(dimension, "add_state", "O(1)", size, receipt))
+
+        views = [
+            ("get_active_luw_state", michelson.nat(size)),
+            ("fetch", michelson.nat(size)),
+            ("fetch_page", luw_page(size)),
+        ]
+
+        for view_name, argument in views:
+            receipt = probe(mockup, probes[view_name], luw_contract, argument)
+            rows.append(scaling_row(dimension, view_name, "O(1)", size, receipt))
+
+    return rows
+
+
+def run(mockup):
+    certifier_address = mockup.accounts["bootstrap1"]
+
+    asset_twin_tracing_compiled = artifacts.compile_contract("assetTwinTracing.py", "AssetTwinTracing", [
+        sp_address(certifier_address),
+    ])
+    luw_compiled = artifacts.compile_contract("LUW.py", "LUW", [sp_address(certifier_address)])
+
+    probes = {
+        view_name: deploy_view_probe(mockup, "%s_probe" % view_name, [(view_name, result_type)], param_type)
+        for view_name, (result_type, param_type) in VIEWS.items()
+    }
+
+    rows = []
+
+    # One contract per swept structure, so that populating one does not grow the others.
+    # bootstrap2 stands in for the Registry and the LUWRepository.
+    asset_twin_sweeps = [("registrations", sweep_registrations), ("providers", sweep_providers)]
+
+    for name, sweep in asset_twin_sweeps:
+        asset_twin_tracing, _ = mockup.originate("asset_twin_tracing_%s" % name, asset_twin_tracing_compiled)
+        mockup.transfer("bootstrap1", asset_twin_tracing, "change_calling_contract_address",
+            michelson.address(mockup.accounts["bootstrap2"]))
+
+        rows += sweep(mockup, asset_twin_tracing, probes)
+
+    luw_sweeps = [("states", sweep_states), ("repositories", sweep_repositories), ("luws", sweep_luws)]
+
+    for name, sweep in luw_sweeps:
+        luw_contract, _ = mockup.originate("luw_%s" % name, luw_compiled)
+        mockup.transfer("bootstrap1", luw_contract, "change_logic_contract_address",
+            michelson.address(mockup.accounts["bootstrap2"]))
+
+        rows += sweep(mockup, luw_contract, probes)
+
+    return rows
+
+
+###########
+# Fitting #
+###########
+
+def fit_line(sizes, values):
+    # Least squares fit of values = intercept + slope * sizes, returns (slope, residual sum of squares)
+    mean_size = sum(sizes) / len(sizes)
+    mean_value = sum(values) / len(values)
+
+    variance = sum((size - mean_size) ** 2 for size in sizes)
+    slope = sum((size - mean_size) * (value - mean_value) for size, value in zip(sizes, values)) / variance if variance else 0.0
+    intercept = mean_value - slope * mean_size
+
+    residuals = sum((value - intercept - slope * size) ** 2 for size, value in zip(sizes, values))
+
+    return slope, residuals
+
+
+def classify(sizes, values):
+    # Returns the complexity class that fits best and its slope in gas per unit of the fitted term
+    smallest = min(values)
+    if smallest > 0 and (max(values) - smallest) / smallest <= CONSTANT_TOLERANCE:
+        return "O(1)", 0.0
+
+    candidates = [
+        ("O(log n)", [math.log(size) for size in sizes]),
+        ("O(n)", list(sizes)),
+    ]
+
+    fits = [(fit_line(terms, values), complexity) for complexity, terms in candidates]
+    (slope, _), complexity = min(fits, key = lambda fit: fit[0][1])
+
+    return complexity, slope
+
+
+def fit(rows):
+    # One summary per (dimension, operation), in the order the operations were measured
+    measurements = {}
+    for result in rows:
+        measurements.setdefault((result["dimension"], result["operation"], result["expected"]), []).append(result)
+
+    summary = []
+
+    for (dimension, operation, expected), results in measurements.items():
+        sizes = [result["size"] for result in results]
+        gas = [result["consumed_gas"] for result in results]
+
+        fitted, slope = classify(sizes, gas)
+
+        summary.append({
+            "dimension": dimension,
+            "operation": operation,
+            "expected": expected,
+            "fitted": fitted,
+            "gas_at_%d" % sizes[0]: gas[0],
+            "gas_at_%d" % sizes[-1]: gas[-1],
+            "slope": round(slope, 3),
+            "flagged": "yes" if COMPLEXITIES.index(fitted) > COMPLEXITIES.index(expected) else "",
+        })
+
+    return summary
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m oat.benchmarks.scaling")
+    parser.add_argument("--protocol", help = "octez protocol hash for the mockup (default: octez-client's)")
+    args = parser.parse_args(argv)
+
+    try:
+        with toolchain.Mockup(protocol = args.protocol) as mockup:
+            rows = run(mockup)
+    except toolchain.ToolchainError as error:
+        parser.exit(1, "%s\n" % error)
+
+    summary = fit(rows)
+
+    print("# measurements\n")
+    print(format_table(rows))
+    print("\n# fit\n")
+    print(format_table(summary))
+
+    flagged = [result for result in summary if result["flagged"]]
+    if flagged:
+        print("\n%d operations grow faster than expected" % len(flagged))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
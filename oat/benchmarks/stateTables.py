@@ -0,0 +1,102 @@
+# big_map vs. constant state and status tables
+#
+# Probes the views that translate status and state IDs into names, on contracts
+# built with the tables in big_maps and with constant_tables = True.
+
+from oat import michelson
+from oat.benchmarks import deploy, deploy_view_probe, probe, row, sp_address
+from oat.benchmarks.providerTopologies import PROVIDER_ID, PROVIDER_TYPE
+
+TABLE_MODES = (
+    ("big_map", []),
+    ("constant", ["constant_tables = True"]),
+)
+
+REPOSITORY_ID = "repository_0000"
+
+
+def deploy_providers(mockup, certifier_address):
+    asset_provider = deploy(mockup, "asset_provider", "assetProvider.py", "AssetProvider", [
+        sp_address(certifier_address),
+    ])
+    asset_provider_repository = deploy(mockup, "asset_provider_repository", "assetProviderRepository.py", "AssetProviderRepository", [
+        sp_address(asset_provider),
+        sp_address(certifier_address),
+    ])
+
+    mockup.transfer("bootstrap1", asset_provider_repository, "update_storage_contract_with_address", michelson.unit())
+    mockup.transfer("bootstrap1", asset_provider_repository, "create_asset_provider", michelson.record(
+        provider_id = michelson.string(PROVIDER_ID),
+        provider_data = michelson.string("provider_data"),
+    ))
+
+    return asset_provider
+
+
+def deploy_luws(mockup, certifier_address):
+    luw_contract = deploy(mockup, "luw", "LUW.py", "LUW", [sp_address(certifier_address)])
+
+    mockup.transfer("bootstrap1", luw_contract, "import_luws", michelson.sequence([
+        michelson.record(luw_id = michelson.nat(0), luw = michelson.record(
+            creator_wallet_address = michelson.address(certifier_address),
+            provider_id = michelson.string(PROVIDER_ID),
+            luw_service_endpoint = michelson.address(certifier_address),
+            state_history = michelson.mapping([(michelson.nat(1), michelson.nat(1))]),
+            repository_endpoints = michelson.mapping([(michelson.string(REPOSITORY_ID), michelson.nat(1))]),
+        )),
+    ]))
+
+    return luw_contract
+
+
+def run(mockup):
+    certifier_address = mockup.accounts["bootstrap1"]
+
+    # The views only read the storage contracts, so both table modes share them
+    asset_provider = deploy_providers(mockup, certifier_address)
+    luw_contract = deploy_luws(mockup, certifier_address)
+
+    provider_probe = deploy_view_probe(mockup, "get_asset_provider_probe",
+        [("get_asset_provider", PROVIDER_TYPE)], "sp.TString")
+    active_state_probe = deploy_view_probe(mockup, "get_active_luw_state_probe",
+        [("get_active_luw_state", "sp.TString")], "sp.TNat")
+    repository_state_probe = deploy_view_probe(mockup, "get_luw_repository_state_probe",
+        [("get_luw_repository_state", "sp.TString")], "sp.TRecord(luw_id = sp.TNat, repository_id = sp.TString)")
+
+    rows = []
+
+    for table_mode, table_arguments in TABLE_MODES:
+        asset_provider_repository = deploy(mockup, "asset_provider_repository_%s" % table_mode,
+            "assetProviderRepository.py", "AssetProviderRepository",
+            [sp_address(asset_provider), sp_address(certifier_address)] + table_arguments)
+        asset_provider_direct = deploy(mockup, "asset_provider_direct_%s" % table_mode,
+            "assetProviderDirect.py", "AssetProviderDirect",
+            [sp_address(certifier_address)] + table_arguments)
+        luw_repository = deploy(mockup, "luw_repository_%s" % table_mode,
+            "LUWRepository.py", "LUWRepository",
+            [sp_address(luw_contract), sp_address(certifier_address)] + table_arguments)
+
+        # The direct topology keeps its providers, so it gets its own
+        mockup.transfer("bootstrap1", asset_provider_direct, "create_asset_provider", michelson.record(
+            provider_id = michelson.string(PROVIDER_ID),
+            provider_data = michelson.string("provider_data"),
+        ))
+
+        views = [
+            ("AssetProviderRepository.get_asset_provider", provider_probe, asset_provider_repository,
+                michelson.string(PROVIDER_ID)),
+            ("AssetProviderDirect.get_asset_provider", provider_probe, asset_provider_direct,
+                michelson.string(PROVIDER_ID)),
+            ("LUWRepository.get_active_luw_state", active_state_probe, luw_repository,
+                michelson.nat(0)),
+            ("LUWRepository.get_luw_repository_state", repository_state_probe, luw_repository, michelson.record(
+                luw_id = michelson.nat(0),
+                repository_id = michelson.string(REPOSITORY_ID),
+            )),
+        ]
+
+        for view_name, view_probe, target, argument in views:
+            receipt = probe(mockup, view_probe, target, argument)
+            rows.append(dict(tables = table_mode, **row(view_name, 1, receipt)))
+
+    return rows
@@ -0,0 +1,163 @@
+# View cache hit rate and latency
+#
+# Reads fetch_asset_twin, get_asset_provider and fetch_luw through the view cache
+# of oat/client/viewCache.py, from the mock node of oat/client/mockNode.py, while
+# the synthetic blocks of oat/workload.py are applied and synced one by one.
+# Reads are skewed towards a few hot keys, as API traffic is, and the same reads
+# are also sent without the cache to compare latencies.
+#
+# The mock node does not run contracts, so this benchmark needs no mockup and is
+# not part of `python -m oat.benchmarks`. Run it on its own:
+#
+#     python -m oat.benchmarks.viewCache [--reads <count>] [--blocks <count>] [--seed <seed>]
+
+import argparse
+import random
+import time
+
+from oat import events
+from oat.benchmarks import format_table
+from oat.client import RPC, RegistryClient, ViewCache, codec, registryTypes
+from oat.client.mockNode import MockNode
+from oat.workload import OPERATOR_ADDRESS, generate_blocks
+
+REGISTRY_ADDRESS = "KT1TezoooozzSmartPyzzSTATiCzzzwwBFA1"
+
+# Keys are drawn as int(len(keys) * random() ** SKEW), the higher the hotter the first keys
+SKEW = 3
+
+OPERATIONS_PER_BLOCK = 20
+
+
+def view_results():
+    # Every key of a view gets the same result, which is enough for the mock node
+    def result(view, value):
+        encoded = codec.encode(registryTypes.VIEWS[view].result_type, value)
+        return lambda view_input: encoded
+
+    return {
+        "fetch_asset_twin": result("fetch_asset_twin", dict(
+            asset_repository_endpoint = "end_point",
+            creator_wallet_address = OPERATOR_ADDRESS,
+            latest_registration = "2026-01-01T00:00:00Z",
+            registration_count = 1,
+        )),
+        "get_asset_provider": result("get_asset_provider", dict(
+            provider_id = "provider",
+            provider_data = "data",
+            creator_wallet_address = OPERATOR_ADDRESS,
+            status = "active",
+        )),
+        "fetch_luw": result("fetch_luw", dict(
+            luw_id = 0,
+            creator_wallet_address = OPERATOR_ADDRESS,
+            provider_id = "provider",
+            luw_service_endpoint = OPERATOR_ADDRESS,
+            active_state_id = 3,
+            state_count = 3,
+            repository_count = 2,
+            state_history = {1: 1, 2: 2, 3: 3},
+            repository_endpoints = {"repository-a": 3, "repository-b": 3},
+        )),
+    }
+
+
+def read_requests(blocks, reads, seed):
+    # The keys the blocks touch, read in a skewed random order
+    keys = {"fetch_asset_twin": [], "get_asset_provider": [], "fetch_luw": []}
+
+    for event in events.events_from_json(blocks):
+        if event.tag == "asset_twin_registered":
+            keys["fetch_asset_twin"].append(registryTypes.FetchAssetTwinRequest(
+                anchor_hash = event.payload.anchor_hash,
+                provider_id = event.payload.provider_id,
+            ))
+        elif event.tag == "provider_created":
+            keys["get_asset_provider"].append(registryTypes.GetAssetProviderRequest(provider_id = event.payload.provider_id))
+        elif event.tag == "luw_created":
+            keys["fetch_luw"].append(registryTypes.FetchLuwRequest(luw_id = event.payload.luw_id, offset = 0, limit = 100))
+
+    keys = {view: list(dict.fromkeys(requests)) for view, requests in keys.items()}
+    generator = random.Random(seed)
+    requests = []
+
+    for _ in range(reads):
+        view = generator.choice(list(keys))
+        requests.append((view, keys[view][int(len(keys[view]) * generator.random() ** SKEW)]))
+
+    return requests
+
+
+def run(reads, blocks, seed = 0):
+    generated = generate_blocks(blocks, OPERATIONS_PER_BLOCK)
+    requests = read_requests(generated, reads, seed)
+    reads_per_block = max(1, reads // blocks)
+
+    with MockNode() as node, RPC(node.url) as rpc:
+        node.views.update(view_results())
+        client = RegistryClient(rpc, REGISTRY_ADDRESS)
+
+        cache = ViewCache(client)
+        cache.sync()
+
+        started = time.perf_counter()
+        for index, (view, request) in enumerate(requests):
+            cache.view(view, request)
+
+            # A new block is applied every so many reads
+            if (index + 1) % reads_per_block == 0 and (index + 1) // reads_per_block <= blocks:
+                level = (index + 1) // reads_per_block
+                node.blocks[level] = generated[level - 1]
+                cache.sync()
+        cached_duration = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for view, request in requests:
+            client.view(view, request)
+        uncached_duration = time.perf_counter() - started
+
+    stats = cache.stats()
+    rows = []
+
+    for view, view_stats in stats.views.items():
+        rows.append({
+            "view": view,
+            "reads": view_stats.hits + view_stats.misses,
+            "hit_rate": "%.1f%%" % (100 * view_stats.hit_rate),
+            "invalidations": view_stats.invalidations,
+            "hit_p50": "%.1fus" % (view_stats.hit_latency.p50 * 1e6),
+            "hit_p99": "%.1fus" % (view_stats.hit_latency.p99 * 1e6),
+            "miss_p50": "%.2fms" % (view_stats.miss_latency.p50 * 1e3),
+            "miss_p99": "%.2fms" % (view_stats.miss_latency.p99 * 1e3),
+            "reads_per_second": "",
+        })
+
+    # Totals, with and without the cache
+    for name, hit_rate, invalidations, duration in (
+        ("all, cached", "%.1f%%" % (100 * sum(view.hits for view in stats.views.values()) / reads), stats.invalidations, cached_duration),
+        ("all, uncached", "", "", uncached_duration),
+    ):
+        rows.append(dict(
+            {column: "" for column in rows[0]},
+            view = name,
+            reads = reads,
+            hit_rate = hit_rate,
+            invalidations = invalidations,
+            reads_per_second = round(reads / duration),
+        ))
+
+    return rows
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m oat.benchmarks.viewCache")
+    parser.add_argument("--reads", type = int, default = 20000, help = "number of view reads (default: 20000)")
+    parser.add_argument("--blocks", type = int, default = 50, help = "blocks applied during the reads (default: 50)")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the random reads (default: 0)")
+    args = parser.parse_args(argv)
+
+    print(format_table(run(args.reads, args.blocks, args.seed)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# View Probe Contract
+#
+# Calls on-chain views from an entry point so that octez-client reports the
+# gas a contract pays for them. Only used by the benchmarks.
+
+import smartpy as sp
+
+class ViewProbe(sp.Contract):
+    def __init__(self, views, param_type):
+        # `views` is a list of (view name, result type) pairs, called in order with the same argument
+        self.views = views
+        self.param_type = param_type
+
+        self.init_type(sp.TUnit)
+        self.init(sp.unit)
+
+    @sp.entry_point
+    def probe(self, target, argument):
+        sp.set_type(target, sp.TAddress)
+        sp.set_type(argument, self.param_type)
+
+        for view_name, result_type in self.views:
+            sp.verify(sp.view(view_name, target, argument, t = result_type).is_some(), message = "Invalid view")
@@ -0,0 +1,5 @@
+# Typed Python client of the Registry, see registryClient.py
+
+from oat.client.registryClient import ClientError, Estimate, Injection, OctezClientSigner, OperationGroup, RegistryClient
+from oat.client.rpc import RPC, RPCError
+from oat.client.viewCache import ViewCache
@@ -0,0 +1,143 @@
+# Micheline JSON values of the Registry client
+#
+# `encode` is the inverse of oat.events.decode: records are given as dicts or
+# dataclasses and laid out by the field annotations of their Micheline type, so
+# values follow whatever layout the contract was compiled with. `typed` turns the
+# decoded values of the views back into the dataclasses of registryTypes.py.
+
+import dataclasses
+import hashlib
+import typing
+
+from oat import events
+
+
+class CodecError(ValueError):
+    pass
+
+
+############
+# Encoding #
+############
+
+def record_value(michelson_type, fields):
+    # Walks the nested pairs of a record; each annotated leaf takes one field
+    name = events.field_name(michelson_type)
+
+    if michelson_type["prim"] == "pair" and name is None:
+        return {"prim": "Pair", "args": [record_value(arg, fields) for arg in michelson_type["args"]]}
+
+    if name not in fields:
+        raise CodecError("Missing record field: %s" % name)
+
+    return encode(michelson_type, fields[name])
+
+
+def encode(michelson_type, value):
+    prim = michelson_type["prim"]
+
+    if prim in ("string", "key_hash", "signature", "chain_id", "key", "address"):
+        return {"string": value}
+    if prim in ("nat", "int", "mutez"):
+        if prim != "int" and value < 0:
+            raise CodecError("%s must be non-negative: %d" % (prim, value))
+        return {"int": str(value)}
+    if prim == "timestamp":
+        return {"string": value} if isinstance(value, str) else {"int": str(value)}
+    if prim == "bytes":
+        return {"bytes": value.hex()}
+    if prim == "bool":
+        return {"prim": "True" if value else "False"}
+    if prim == "unit":
+        return {"prim": "Unit"}
+    if prim == "option":
+        return {"prim": "None"} if value is None else {"prim": "Some", "args": [encode(michelson_type["args"][0], value)]}
+    if prim == "list":
+        return [encode(michelson_type["args"][0], item) for item in value]
+    if prim == "set":
+        return [encode(michelson_type["args"][0], item) for item in sorted(value)]
+    if prim in ("map", "big_map"):
+        key_type, value_type = michelson_type["args"]
+        return [
+            {"prim": "Elt", "args": [encode(key_type, key), encode(value_type, value[key])]}
+            for key in sorted(value)
+        ]
+    if prim == "pair":
+        if dataclasses.is_dataclass(value):
+            value = dataclasses.asdict(value)
+
+        if not events.is_record(michelson_type):
+            # Plain pairs are given as tuples, right combs flattened as decode does
+            left_type = michelson_type["args"][0]
+            right_type = michelson_type["args"][1] if len(michelson_type["args"]) == 2 else \
+                {"prim": "pair", "args": michelson_type["args"][1:]}
+            right = value[1] if len(value) == 2 else tuple(value[1:])
+
+            return {"prim": "Pair", "args": [encode(left_type, value[0]), encode(right_type, right)]}
+
+        return record_value({"prim": "pair", "args": michelson_type["args"]}, value)
+
+    raise CodecError("Unsupported Michelson type: %s" % prim)
+
+
+def parameter(michelson_type, request):
+    # The entry point parameter or view input of a request dataclass. Records take
+    # the fields by name, a single parameter is passed as is and unit takes none.
+    fields = {field.name: getattr(request, field.name) for field in dataclasses.fields(request)}
+
+    if michelson_type["prim"] == "unit":
+        return encode(michelson_type, None)
+    if michelson_type["prim"] == "pair" and events.is_record(michelson_type):
+        return encode(michelson_type, fields)
+    if len(fields) != 1:
+        raise CodecError("%s does not match its parameter type" % type(request).__name__)
+
+    return encode(michelson_type, *fields.values())
+
+
+def typed(python_type, value):
+    # The value of a decoded view result as the given type of registryTypes.py
+    if dataclasses.is_dataclass(python_type):
+        hints = typing.get_type_hints(python_type)
+
+        return python_type(**{
+            field.name: typed(hints[field.name], value[field.name])
+            for field in dataclasses.fields(python_type)
+        })
+
+    origin = typing.get_origin(python_type)
+    args = typing.get_args(python_type)
+
+    if origin is list:
+        return [typed(args[0], item) for item in value]
+    if origin is dict:
+        return {typed(args[0], key): typed(args[1], item) for key, item in value.items()}
+    if origin is tuple:
+        return tuple(typed(arg, item) for arg, item in zip(args, value))
+    if origin is typing.Union:
+        # Optional[...], the only union of the generated types
+        return None if value is None else typed(args[0], value)
+
+    return value
+
+
+##########
+# Base58 #
+##########
+
+def base58check_decode(encoded):
+    number = 0
+    for character in encoded:
+        if character not in events.BASE58_ALPHABET:
+            raise CodecError("Invalid base58 string: %s" % encoded)
+        number = number * 58 + events.BASE58_ALPHABET.index(character)
+
+    leading_zeros = len(encoded) - len(encoded.lstrip(events.BASE58_ALPHABET[0]))
+    data = bytes(leading_zeros) + number.to_bytes((number.bit_length() + 7) // 8, "big")
+
+    payload, checksum = data[:-4], data[-4:]
+    if hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4] != checksum:
+        raise CodecError("Invalid base58 checksum: %s" % encoded)
+
+    return payload
+
@@ -0,0 +1,293 @@
+# Generator of the typed Registry interface
+#
+# The request and response dataclasses of oat/client/registryTypes.py, and the
+# client methods that take and return them, are generated from the Michelson types
+# of the Registry entry points and views, as kept in oat/client/registry.json. The
+# interface is refreshed from a deployed Registry with --node and --contract, e.g.
+# after the contract changes or for a content-addressed deployment.
+#
+#     python -m oat.client.generate [--node <URL> --contract <address>] [--interface <file>] [--output <file>]
+
+import argparse
+import inspect
+import json
+from pathlib import Path
+
+from oat import events, model
+from oat.client.rpc import RPC, RPCError
+
+CLIENT_DIR = Path(__file__).resolve().parent
+
+INTERFACE_FILE = CLIENT_DIR / "registry.json"
+TYPES_FILE = CLIENT_DIR / "registryTypes.py"
+
+PYTHON_TYPES = {
+    "string": "str",
+    "address": "str",
+    "key_hash": "str",
+    "key": "str",
+    "signature": "str",
+    "chain_id": "str",
+    # Timestamps are given as RFC 3339 strings in the readable unparsing mode
+    "timestamp": "str",
+    "nat": "int",
+    "int": "int",
+    "mutez": "int",
+    "bytes": "bytes",
+    "bool": "bool",
+    "unit": "None",
+}
+
+HEADER = """\
+# Registry entry points and views
+#
+# Generated by `python -m oat.client.generate` from oat/client/{interface}.
+# Run it again, rather than editing this file, when the interface changes.
+
+from collections import namedtuple
+from dataclasses import dataclass
+{typing_import}
+EntryPoint = namedtuple("EntryPoint", ["request", "parameter_type"])
+View = namedtuple("View", ["request", "response", "parameter_type", "result_type"])"""
+
+
+class GenerateError(Exception):
+    pass
+
+
+#############
+# Interface #
+#############
+
+def strip_entry_point_annotation(name, michelson_type):
+    # The entrypoints RPC keeps the annotation that names the entry point itself
+    annotations = [annotation for annotation in michelson_type.get("annots", []) if annotation != "%" + name]
+
+    stripped = {key: value for key, value in michelson_type.items() if key != "annots"}
+    if annotations:
+        stripped["annots"] = annotations
+
+    return stripped
+
+
+def fetch_interface(rpc, address):
+    contract = "/chains/main/blocks/head/context/contracts/%s" % address
+
+    entry_points = rpc.get(contract + "/entrypoints")["entrypoints"]
+    code = rpc.get(contract + "/script")["code"]
+
+    return {
+        "entrypoints": {
+            name: strip_entry_point_annotation(name, michelson_type)
+            for name, michelson_type in sorted(entry_points.items())
+        },
+        "views": {
+            section["args"][0]["string"]: {"parameter": section["args"][1], "result": section["args"][2]}
+            for section in sorted(code, key = lambda section: section["args"][0].get("string", ""))
+            if section["prim"] == "view"
+        },
+    }
+
+
+def parameter_names(name):
+    # Single parameters carry no field annotation; they are named as in the model
+    if name in model.REGISTRY_ENTRY_POINTS:
+        return model.REGISTRY_ENTRY_POINTS[name]
+    if hasattr(model.Registry, name):
+        return tuple(inspect.signature(getattr(model.Registry, name)).parameters)[1:]
+
+    return ("value",)
+
+
+#########
+# Types #
+#########
+
+def class_name(name):
+    return "".join(part.capitalize() for part in name.split("_"))
+
+
+def record_leaves(michelson_type):
+    # The annotated leaves of a record, through the nested pairs of its layout
+    leaves = []
+
+    for arg in michelson_type["args"]:
+        name = events.field_name(arg)
+
+        if arg["prim"] == "pair" and name is None:
+            leaves += record_leaves(arg)
+        elif name is None:
+            raise GenerateError("Record field without annotation: %s" % json.dumps(arg))
+        else:
+            leaves.append((name, arg))
+
+    return leaves
+
+
+def comb_args(michelson_type):
+    # Plain pairs are decoded to flat tuples of their right comb
+    args = michelson_type["args"]
+    if len(args) == 2 and args[1]["prim"] == "pair" and not events.is_record(args[1]) and events.field_name(args[1]) is None:
+        return [args[0]] + comb_args(args[1])
+
+    return args
+
+
+class Module:
+    def __init__(self):
+        # Dataclasses in definition order, nested records first, as (name, fields)
+        self.classes = []
+
+    def record_class(self, name, fields):
+        if any(name == existing for existing, _ in self.classes):
+            raise GenerateError("Duplicate class name: %s" % name)
+
+        self.classes.append((name, fields))
+        return name
+
+    def python_type(self, michelson_type, name):
+        # `name` is the class name given to a record nested in this type
+        prim = michelson_type["prim"]
+
+        if prim in PYTHON_TYPES:
+            return PYTHON_TYPES[prim]
+        if prim == "option":
+            return "Optional[%s]" % self.python_type(michelson_type["args"][0], name)
+        if prim in ("list", "set"):
+            return "List[%s]" % self.python_type(michelson_type["args"][0], name + "Item")
+        if prim in ("map", "big_map"):
+            key_type, value_type = michelson_type["args"]
+            return "Dict[%s, %s]" % (self.python_type(key_type, name + "Key"), self.python_type(value_type, name + "Value"))
+        if prim == "pair":
+            if events.is_record(michelson_type):
+                return self.record(michelson_type, name)
+
+            return "Tuple[%s]" % ", ".join(
+                self.python_type(arg, "%s%d" % (name, index))
+                for index, arg in enumerate(comb_args(michelson_type))
+            )
+
+        raise GenerateError("Unsupported Michelson type: %s" % prim)
+
+    def record(self, michelson_type, name):
+        fields = [
+            (field, self.python_type(leaf, name + class_name(field)))
+            for field, leaf in record_leaves(michelson_type)
+        ]
+
+        return self.record_class(name, fields)
+
+    def request(self, name, michelson_type):
+        # Records take their fields, unit none and other types are a single parameter
+        request_name = class_name(name) + "Request"
+
+        if michelson_type["prim"] == "unit":
+            return self.record_class(request_name, [])
+        if michelson_type["prim"] == "pair" and events.is_record(michelson_type):
+            fields = [
+                (field, self.python_type(leaf, class_name(name) + class_name(field)))
+                for field, leaf in record_leaves(michelson_type)
+            ]
+            return self.record_class(request_name, fields)
+
+        names = parameter_names(name)
+        if len(names) != 1:
+            raise GenerateError("%s takes %d parameters, its type a single one" % (name, len(names)))
+
+        return self.record_class(request_name, [(names[0], self.python_type(michelson_type, class_name(name) + class_name(names[0])))])
+
+    def fields(self, name):
+        return next(fields for existing, fields in self.classes if existing == name)
+
+
+##########
+# Source #
+##########
+
+def dataclass_source(name, fields):
+    lines = ["@dataclass(frozen = True)", "class %s:" % name]
+    lines += ["    %s: %s" % field for field in fields] or ["    pass"]
+
+    return "\n".join(lines)
+
+
+def method_source(name, request, fields, method, result = None):
+    arguments = "".join(", %s: %s" % field for field in fields)
+    keywords = ", ".join("%s = %s" % (field, field) for field, _ in fields)
+    returns = " -> %s" % result if result is not None else ""
+
+    return "\n".join([
+        "    def %s(self%s)%s:" % (name, arguments, returns),
+        "        return self.%s(\"%s\", %s(%s))" % (method, name, request, keywords),
+    ])
+
+
+def generate(interface, interface_name = INTERFACE_FILE.name):
+    module = Module()
+
+    entry_points = []
+    for name, michelson_type in sorted(interface["entrypoints"].items()):
+        entry_points.append((name, module.request(name, michelson_type), michelson_type))
+
+    views = []
+    for name, view in sorted(interface["views"].items()):
+        request = module.request(name, view["parameter"])
+        response = module.python_type(view["result"], class_name(name) + "Response")
+        views.append((name, request, response, view))
+
+    sections = [dataclass_source(name, fields) for name, fields in module.classes]
+
+    sections.append("\n".join(
+        ["ENTRY_POINTS = {"] +
+        ["    \"%s\": EntryPoint(%s, %s)," % (name, request, json.dumps(michelson_type)) for name, request, michelson_type in entry_points] +
+        ["}"]
+    ))
+    sections.append("\n".join(
+        ["VIEWS = {"] +
+        ["    \"%s\": View(%s, %s, %s, %s)," % (name, request, response, json.dumps(view["parameter"]), json.dumps(view["result"]))
+            for name, request, response, view in views] +
+        ["}"]
+    ))
+
+    sections.append("class EntryPointMethods:\n    # Sent right away by RegistryClient, and added to the group by OperationGroup\n" + "\n\n".join(
+        method_source(name, request, module.fields(request), "call") for name, request, _ in entry_points
+    ))
+    sections.append("class ViewMethods:\n" + "\n\n".join(
+        method_source(name, request, module.fields(request), "view", response) for name, request, response, _ in views
+    ))
+
+    # Only the generic types the interface uses are imported
+    source = "\n\n\n".join(sections)
+    generic_types = [name for name in ("Dict", "List", "Optional", "Tuple") if "%s[" % name in source]
+    typing_import = "from typing import %s\n" % ", ".join(generic_types) if generic_types else ""
+
+    return HEADER.format(interface = interface_name, typing_import = typing_import) + "\n\n\n" + source + "\n"
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m oat.client.generate")
+    parser.add_argument("--node", help = "node RPC URL to fetch the interface of --contract from")
+    parser.add_argument("--contract", help = "address of the deployed Registry")
+    parser.add_argument("--interface", default = str(INTERFACE_FILE),
+        help = "interface file, written first when --node is given (default: %(default)s)")
+    parser.add_argument("--output", default = str(TYPES_FILE), help = "generated module (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if (args.node is None) != (args.contract is None):
+        parser.error("--node and --contract go together")
+
+    try:
+        if args.node is not None:
+            with RPC(args.node) as rpc:
+                interface = fetch_interface(rpc, args.contract)
+            Path(args.interface).write_text(json.dumps(interface, indent = 2) + "\n")
+        else:
+            interface = json.loads(Path(args.interface).read_text())
+
+        Path(args.output).write_text(generate(interface, Path(args.interface).name))
+    except (OSError, ValueError, RPCError, GenerateError) as error:
+        parser.exit(1, "%s\n" % error)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# Mock node RPC
+#
+# A local HTTP server answering the RPCs the Registry client uses, for tests and for
+# trying out a backend without a node. Simulations report the gas and storage set
+# per entry point, or fail with the message set for it; views answer with what the
+# function set for them returns for the input; injected operations are kept, and
+# blocks are served as set.
+#
+#     with MockNode() as node:
+#         node.views["get_active_luw_state"] = lambda view_input: {"string": "active"}
+#         client = RegistryClient(RPC(node.url), REGISTRY_ADDRESS, signer)
+
+import hashlib
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from oat import events
+
+CHAIN_ID = "NetXdQprcVkpaWU"
+BRANCH = "BLockGenesisGenesisGenesisGenesisGenesisf79b5d1CoW2"
+
+# Gas and storage of a simulated call, unless set for its entry point
+DEFAULT_MILLIGAS = 1500000
+DEFAULT_STORAGE = 0
+
+REVEAL_MILLIGAS = 1000000
+
+OPERATION_HASH_PREFIX = bytes([5, 116])  # o
+
+BLOCK_PATH = re.compile(r"^/chains/main/blocks/([0-9]+)$")
+BLOCK_HEADER_PATH = re.compile(r"^/chains/main/blocks/([0-9]+)/header$")
+CONTRACT_PATH = re.compile(r"^/chains/main/blocks/head/context/contracts/([^/]+)/([a-z_]+)$")
+
+
+class ViewFailure(Exception):
+    # Raised by a view function, as the contract fails with `message`
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+def rejected(message):
+    return [
+        {"kind": "temporary", "id": "proto.alpha.michelson_v1.runtime_error"},
+        {"kind": "temporary", "id": "proto.alpha.michelson_v1.script_rejected", "with": {"string": message}},
+    ]
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Keep-alive connections, as a node serves them
+    protocol_version = "HTTP/1.1"
+    # The headers and the body are written separately
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.node.lock:
+            self.server.node.connections += 1
+
+    def log_message(self, *arguments):
+        pass
+
+    def reply(self, status, body):
+        content = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def handle_request(self, method):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length)) if length else None
+
+        node = self.server.node
+        with node.lock:
+            node.requests.append((method, self.path, body))
+
+        try:
+            status, result = node.answer(method, self.path, body)
+        except Exception as error:
+            status, result = 500, [{"kind": "temporary", "id": "mock.error", "msg": str(error)}]
+
+        self.reply(status, result)
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+
+class MockNode:
+    def __init__(self, counter = 0, revealed = True, interface = None, script = None):
+        self.counter = counter
+        self.revealed = revealed
+        # Answers of the entrypoints and script RPCs of any contract
+        self.interface = interface
+        self.script = script
+
+        # Entry point to milligas, paid storage, or the message simulations fail with
+        self.gas = {}
+        self.storage = {}
+        self.failures = {}
+        # View name to a function of the Micheline input, returning the Micheline result
+        self.views = {}
+        # Block receipts by level, the highest one is the head
+        self.blocks = {}
+
+        self.requests = []
+        self.injections = []
+        self.connections = 0
+        self.lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.server.node = self
+        self.thread = None
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d" % self.server.server_address[1]
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        self.thread = threading.Thread(target = self.server.serve_forever, kwargs = dict(poll_interval = 0.05), daemon = True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def requests_to(self, path):
+        return [request for request in self.requests if request[1].startswith(path)]
+
+    ########
+    # RPCs #
+    ########
+
+    def answer(self, method, path, body):
+        if method == "GET":
+            if path == "/chains/main/chain_id":
+                return 200, CHAIN_ID
+            if path == "/chains/main/blocks/head/hash":
+                return 200, BRANCH
+            if path == "/chains/main/blocks/head/header":
+                return 200, self.header(max(self.blocks, default = 0))
+
+            match = BLOCK_PATH.match(path)
+            if match is not None and int(match.group(1)) in self.blocks:
+                return 200, self.blocks[int(match.group(1))]
+
+            match = BLOCK_HEADER_PATH.match(path)
+            if match is not None and int(match.group(1)) in self.blocks:
+                return 200, self.header(int(match.group(1)))
+
+            match = CONTRACT_PATH.match(path)
+            if match is not None:
+                return self.contract(*match.groups())
+        else:
+            if path == "/chains/main/blocks/head/helpers/scripts/simulate_operation":
+                return 200, self.simulate(body["operation"])
+            if path == "/chains/main/blocks/head/helpers/scripts/run_script_view":
+                return self.run_view(body)
+            if path == "/chains/main/blocks/head/helpers/forge/operations":
+                # Not the binary encoding, but as long as the operation and growing with its fields
+                return 200, json.dumps(body, sort_keys = True).encode().hex()
+            if path == "/injection/operation?chain=main":
+                return 200, self.inject(body)
+
+        return 404, [{"kind": "permanent", "id": "mock.not_found", "msg": "%s %s" % (method, path)}]
+
+    def header(self, level):
+        # The header of the block set at the level, with its hash when it has one
+        block = self.blocks.get(level, {})
+        header = dict(block.get("header", {}), level = level)
+        if "hash" in block:
+            header["hash"] = block["hash"]
+
+        return header
+
+    def contract(self, address, resource):
+        if resource == "counter":
+            return 200, str(self.counter)
+        if resource == "manager_key":
+            return 200, "edpkMockPublicKey" if self.revealed else None
+        if resource == "entrypoints" and self.interface is not None:
+            return 200, {"entrypoints": self.interface}
+        if resource == "script" and self.script is not None:
+            return 200, self.script
+
+        return 404, [{"kind": "permanent", "id": "mock.not_found", "msg": resource}]
+
+    def simulate(self, operation):
+        contents = []
+        failed = False
+
+        for content in operation["contents"]:
+            entry_point = content.get("parameters", {}).get("entrypoint")
+
+            if failed:
+                result = {"status": "skipped"}
+            elif entry_point in self.failures:
+                result = {"status": "failed", "errors": rejected(self.failures[entry_point])}
+                failed = True
+            elif content["kind"] == "reveal":
+                result = {"status": "applied", "consumed_milligas": str(REVEAL_MILLIGAS)}
+            else:
+                result = {
+                    "status": "applied",
+                    "consumed_milligas": str(self.gas.get(entry_point, DEFAULT_MILLIGAS)),
+                    "paid_storage_size_diff": str(self.storage.get(entry_point, DEFAULT_STORAGE)),
+                }
+
+            contents.append(dict(content, metadata = {"operation_result": result}))
+
+        # Contents applied before a failing one are backtracked
+        if failed:
+            for content in contents:
+                if content["metadata"]["operation_result"]["status"] == "applied":
+                    content["metadata"]["operation_result"]["status"] = "backtracked"
+
+        return {"contents": contents}
+
+    def run_view(self, body):
+        view = self.views.get(body["view"])
+        if view is None:
+            return 400, [{"kind": "permanent", "id": "proto.alpha.michelson_v1.view_not_found", "name": body["view"]}]
+
+        try:
+            return 200, {"data": view(body["input"])}
+        except ViewFailure as failure:
+            return 500, rejected(failure.message)
+
+    def inject(self, signed):
+        # The forged operation of the mock is the JSON of the forge request, followed by the signature
+        signed = bytes.fromhex(signed)
+        operation = json.loads(signed[:-64])
+
+        with self.lock:
+            self.injections.append(operation)
+            self.counter += len(operation["contents"])
+
+        return events.base58check(OPERATION_HASH_PREFIX + hashlib.blake2b(signed, digest_size = 32).digest())
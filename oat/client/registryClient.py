@@ -0,0 +1,317 @@
+# Typed client of the Registry
+#
+# Every entry point and view of the Registry is a method taking and returning the
+# dataclasses of registryTypes.py. Calls are sent as manager operations through
+# the node RPC: the calls of an OperationGroup go out as one signed operation, with
+# its gas and storage limits taken from a simulation of the whole group and its
+# fees computed from them before anything is injected.
+#
+#     client = RegistryClient(RPC("http://localhost:8732"), registry_address, OctezClientSigner("operator"))
+#
+#     client.create_asset_provider(provider_id = provider_id, provider_data = provider_data)
+#
+#     with client.batch() as batch:
+#         batch.register_asset_twin(anchor_hash = anchor_hash, provider_id = provider_id, repo_end_point = end_point)
+#         batch.create_luw(provider_id = provider_id, luw_service_endpoint = coordinator_address)
+#     batch.injection.operation_hash
+#
+#     client.fetch_asset_twin(anchor_hash = anchor_hash, provider_id = provider_id).registration_count
+
+import math
+import re
+from collections import namedtuple
+
+from oat import events, toolchain
+from oat.client import codec, registryTypes
+from oat.client.rpc import RPCError
+
+BLOCK = "/chains/main/blocks/head"
+
+# Limits the simulation runs with, those of the protocol for an operation and a block
+HARD_GAS_LIMIT_PER_OPERATION = 1040000
+HARD_GAS_LIMIT_PER_BLOCK = 2600000
+HARD_STORAGE_LIMIT_PER_OPERATION = 60000
+
+# Added to the simulated gas and storage, as octez-client does
+GAS_MARGIN = 100
+STORAGE_MARGIN = 20
+
+# Default minimal fees of the mempool: a base fee, plus nanotez per byte and per gas unit
+MINIMAL_FEES = 100
+MINIMAL_NANOTEZ_PER_BYTE = 1000
+MINIMAL_NANOTEZ_PER_GAS_UNIT = 100
+
+# Forged sizes are taken before the fees are set, which adds a few bytes to each content
+FEE_BYTES = 4
+SIGNATURE_SIZE = 64
+
+# Watermark of signed manager operations
+GENERIC_OPERATION_WATERMARK = b"\x03"
+
+# Simulations take an unchecked, all-zero signature
+ZERO_SIGNATURE = events.base58check(bytes([4, 130, 43]) + bytes(SIGNATURE_SIZE))
+
+# `entry_point` is None for the reveal of the source, when the group needs one
+Estimate = namedtuple("Estimate", ["entry_point", "gas_limit", "storage_limit", "fee"])
+
+Injection = namedtuple("Injection", ["operation_hash", "estimates"])
+
+
+class ClientError(Exception):
+    def __init__(self, description, message = None, errors = None):
+        super().__init__(description)
+        # The FAILWITH string of a rejected call, as the contract tests expect it
+        self.message = message
+        self.errors = errors or []
+
+
+def client_error(description, errors):
+    # The string a script was rejected with, if one is among the errors of the node
+    for error in errors if isinstance(errors, list) else []:
+        rejection = error.get("with")
+        if rejection is not None:
+            message = rejection.get("string")
+            return ClientError("%s: %s" % (description, message or rejection), message, errors)
+
+    return ClientError("%s: %s" % (description, errors), errors = errors if isinstance(errors, list) else None)
+
+
+###########
+# Signers #
+###########
+
+SIGNATURE = re.compile(r"Signature: ([1-9A-HJ-NP-Za-km-z]+)")
+PUBLIC_KEY = re.compile(r"Public Key: ([1-9A-HJ-NP-Za-km-z]+)")
+PUBLIC_KEY_HASH = re.compile(r"Hash: (tz[1-4][1-9A-HJ-NP-Za-km-z]{33})")
+
+
+class OctezClientSigner:
+    # Signs with a key known to octez-client, which may be held by a remote signer or a ledger
+    def __init__(self, alias, base_dir = None):
+        self.alias = alias
+        self.base_dir = base_dir
+
+        output = self.client("show", "address", alias)
+        public_key_hash = PUBLIC_KEY_HASH.search(output)
+        public_key = PUBLIC_KEY.search(output)
+        if public_key_hash is None or public_key is None:
+            raise ClientError("Unknown octez-client key: %s" % alias)
+
+        self.public_key_hash = public_key_hash.group(1)
+        self.public_key = public_key.group(1)
+
+    def client(self, *arguments):
+        global_options = ["--base-dir", self.base_dir] if self.base_dir else []
+
+        return toolchain.run_command([toolchain.OCTEZ_CLIENT] + global_options + list(arguments))
+
+    def sign(self, data):
+        match = SIGNATURE.search(self.client("sign", "bytes", "0x" + data.hex(), "for", self.alias))
+        if match is None:
+            raise ClientError("octez-client did not return a signature for %s" % self.alias)
+
+        return match.group(1)
+
+
+##########
+# Client #
+##########
+
+class RegistryClient(registryTypes.EntryPointMethods, registryTypes.ViewMethods):
+    def __init__(self, rpc, address, signer = None):
+        self.rpc = rpc
+        self.address = address
+        # Views only need a signer-less client
+        self.signer = signer
+        self.chain_id = None
+
+    def get_chain_id(self):
+        if self.chain_id is None:
+            self.chain_id = self.rpc.get("/chains/main/chain_id")
+
+        return self.chain_id
+
+    def batch(self):
+        return OperationGroup(self)
+
+    def call(self, entry_point, request):
+        # A single call is a group of one
+        group = self.batch()
+        group.call(entry_point, request)
+
+        return group.send()
+
+    def run_view(self, view, view_input):
+        try:
+            response = self.rpc.post(BLOCK + "/helpers/scripts/run_script_view", {
+                "contract": self.address,
+                "view": view,
+                "input": view_input,
+                "chain_id": self.get_chain_id(),
+                "unlimited_gas": True,
+                "unparsing_mode": "Readable",
+            })
+        except RPCError as error:
+            raise client_error("View %s failed" % view, error.body)
+
+        return response["data"]
+
+    def view(self, view, request):
+        definition = registryTypes.VIEWS[view]
+        data = self.run_view(view, codec.parameter(definition.parameter_type, request))
+
+        return codec.typed(definition.response, events.decode(definition.result_type, data))
+
+
+class OperationGroup(registryTypes.EntryPointMethods):
+    def __init__(self, client):
+        self.client = client
+        # (entry point, Micheline parameter) of the calls, in order
+        self.calls = []
+        self.injection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.injection = self.send()
+
+    def call(self, entry_point, request):
+        parameter_type = registryTypes.ENTRY_POINTS[entry_point].parameter_type
+        self.calls.append((entry_point, codec.parameter(parameter_type, request)))
+
+        return self
+
+    ##############
+    # Estimation #
+    ##############
+
+    def contents(self):
+        # The reveal of the source, if it has none yet, and the transactions, without limits and fees
+        if self.client.signer is None:
+            raise ClientError("Sending calls needs a signer")
+        if not self.calls:
+            raise ClientError("Empty operation group")
+
+        rpc = self.client.rpc
+        source = self.client.signer.public_key_hash
+        account = BLOCK + "/context/contracts/%s" % source
+
+        counter = int(rpc.get(account + "/counter"))
+
+        contents = []
+        if rpc.get(account + "/manager_key") is None:
+            contents.append({"kind": "reveal", "source": source, "public_key": self.client.signer.public_key})
+
+        contents += [
+            {
+                "kind": "transaction",
+                "source": source,
+                "amount": "0",
+                "destination": self.client.address,
+                "parameters": {"entrypoint": entry_point, "value": value},
+            }
+            for entry_point, value in self.calls
+        ]
+
+        for index, content in enumerate(contents):
+            content["counter"] = str(counter + index + 1)
+
+        return contents
+
+    def simulate(self, branch, contents):
+        # Gas and storage used by each content, from a simulation of the whole group
+        gas_limit = min(HARD_GAS_LIMIT_PER_OPERATION, HARD_GAS_LIMIT_PER_BLOCK // len(contents))
+        operation = {
+            "branch": branch,
+            "contents": [
+                dict(content, fee = "0", gas_limit = str(gas_limit), storage_limit = str(HARD_STORAGE_LIMIT_PER_OPERATION))
+                for content in contents
+            ],
+            "signature": ZERO_SIGNATURE,
+        }
+
+        try:
+            response = self.client.rpc.post(BLOCK + "/helpers/scripts/simulate_operation", {
+                "operation": operation,
+                "chain_id": self.client.get_chain_id(),
+            })
+        except RPCError as error:
+            raise client_error("Simulation failed", error.body)
+
+        used = []
+        for content in response["contents"]:
+            result = content["metadata"]["operation_result"]
+            internal_results = [internal["result"] for internal in content["metadata"].get("internal_operation_results", [])]
+
+            # The other contents of a failing group are backtracked or skipped
+            if result["status"] == "failed" or any(internal["status"] == "failed" for internal in internal_results):
+                errors = result.get("errors", []) + [error for internal in internal_results for error in internal.get("errors", [])]
+                raise client_error(content.get("parameters", {}).get("entrypoint", content["kind"]), errors)
+
+            used.append((
+                sum(int(item.get("consumed_milligas", 0)) for item in [result] + internal_results),
+                sum(int(item.get("paid_storage_size_diff", 0)) for item in [result] + internal_results),
+            ))
+
+        return used
+
+    def forge(self, branch, contents):
+        try:
+            return bytes.fromhex(self.client.rpc.post(BLOCK + "/helpers/forge/operations", {"branch": branch, "contents": contents}))
+        except RPCError as error:
+            raise client_error("Forging failed", error.body)
+
+    def estimate_contents(self, branch, contents):
+        limited = [
+            dict(content, fee = "0", gas_limit = str(math.ceil(milligas / 1000) + GAS_MARGIN), storage_limit = str(storage + STORAGE_MARGIN))
+            for content, (milligas, storage) in zip(contents, self.simulate(branch, contents))
+        ]
+
+        # The base and size fees are paid by the first content, the gas fees by each one
+        size = len(self.forge(branch, limited)) + SIGNATURE_SIZE + FEE_BYTES * len(limited)
+        for index, content in enumerate(limited):
+            fee = math.ceil(int(content["gas_limit"]) * MINIMAL_NANOTEZ_PER_GAS_UNIT / 1000)
+            if index == 0:
+                fee += MINIMAL_FEES + math.ceil(size * MINIMAL_NANOTEZ_PER_BYTE / 1000)
+
+            content["fee"] = str(fee)
+
+        return limited
+
+    def estimates(self, contents):
+        return [
+            Estimate(
+                entry_point = content["parameters"]["entrypoint"] if content["kind"] == "transaction" else None,
+                gas_limit = int(content["gas_limit"]),
+                storage_limit = int(content["storage_limit"]),
+                fee = int(content["fee"]),
+            )
+            for content in contents
+        ]
+
+    def estimate(self):
+        branch = self.client.rpc.get(BLOCK + "/hash")
+
+        return self.estimates(self.estimate_contents(branch, self.contents()))
+
+    ###########
+    # Sending #
+    ###########
+
+    def send(self):
+        branch = self.client.rpc.get(BLOCK + "/hash")
+        contents = self.estimate_contents(branch, self.contents())
+
+        forged = self.forge(branch, contents)
+        signature = codec.base58check_decode(self.client.signer.sign(GENERIC_OPERATION_WATERMARK + forged))[-SIGNATURE_SIZE:]
+
+        try:
+            operation_hash = self.client.rpc.post("/injection/operation?chain=main", (forged + signature).hex())
+        except RPCError as error:
+            raise client_error("Injection failed", error.body)
+
+        self.calls = []
+
+        return Injection(operation_hash = operation_hash, estimates = self.estimates(contents))
@@ -0,0 +1,346 @@
+# Registry entry points and views
+#
+# Generated by `python -m oat.client.generate` from oat/client/registry.json.
+# Run it again, rather than editing this file, when the interface changes.
+
+from collections import namedtuple
+from dataclasses import dataclass
+from typing import Dict, List
+
+EntryPoint = namedtuple("EntryPoint", ["request", "parameter_type"])
+View = namedtuple("View", ["request", "response", "parameter_type", "result_type"])
+
+
+@dataclass(frozen = True)
+class AbortLuwRequest:
+    luw_id: int
+
+
+@dataclass(frozen = True)
+class AddLuwRepositoriesRequest:
+    luw_id: int
+    repository_ids: List[str]
+
+
+@dataclass(frozen = True)
+class AddLuwRepositoryRequest:
+    luw_id: int
+    repository_id: str
+
+
+@dataclass(frozen = True)
+class ChangeLuwRepositoryStateRequest:
+    luw_id: int
+    repository_id: str
+    state_id: int
+
+
+@dataclass(frozen = True)
+class ChangeLuwRepositoryStatesRepositoriesItem:
+    repository_id: str
+    state_id: int
+
+
+@dataclass(frozen = True)
+class ChangeLuwRepositoryStatesRequest:
+    luw_id: int
+    repositories: List[ChangeLuwRepositoryStatesRepositoriesItem]
+
+
+@dataclass(frozen = True)
+class ChangeLuwStateRequest:
+    luw_id: int
+    state_id: int
+
+
+@dataclass(frozen = True)
+class CommitLuwRequest:
+    luw_id: int
+
+
+@dataclass(frozen = True)
+class CreateAssetProviderRequest:
+    provider_data: str
+    provider_id: str
+
+
+@dataclass(frozen = True)
+class CreateLuwRequest:
+    luw_service_endpoint: str
+    provider_id: str
+
+
+@dataclass(frozen = True)
+class RegisterAssetTwinRequest:
+    anchor_hash: str
+    provider_id: str
+    repo_end_point: str
+
+
+@dataclass(frozen = True)
+class RegisterAssetTwinsBatchAssetTwinsItem:
+    anchor_hash: str
+    provider_id: str
+    repo_end_point: str
+
+
+@dataclass(frozen = True)
+class RegisterAssetTwinsBatchRequest:
+    asset_twins: List[RegisterAssetTwinsBatchAssetTwinsItem]
+
+
+@dataclass(frozen = True)
+class SetMaxBatchSizeRequest:
+    max_batch_size: int
+
+
+@dataclass(frozen = True)
+class SetProviderActiveRequest:
+    provider_id: str
+
+
+@dataclass(frozen = True)
+class SetProviderDataRequest:
+    provider_data: str
+    provider_id: str
+
+
+@dataclass(frozen = True)
+class SetProviderDeprecatedRequest:
+    provider_id: str
+
+
+@dataclass(frozen = True)
+class SetProviderOwnerRequest:
+    new_owner_address: str
+    provider_id: str
+
+
+@dataclass(frozen = True)
+class SetProviderStatusRequest:
+    provider_id: str
+    status: int
+
+
+@dataclass(frozen = True)
+class SyncStorageContractsRequest:
+    pass
+
+
+@dataclass(frozen = True)
+class FetchAssetTwinRequest:
+    anchor_hash: str
+    provider_id: str
+
+
+@dataclass(frozen = True)
+class FetchAssetTwinResponse:
+    asset_repository_endpoint: str
+    creator_wallet_address: str
+    latest_registration: str
+    registration_count: int
+
+
+@dataclass(frozen = True)
+class FetchAssetTwinHistoryRequest:
+    anchor_hash: str
+    limit: int
+    offset: int
+    provider_id: str
+
+
+@dataclass(frozen = True)
+class FetchLuwRequest:
+    limit: int
+    luw_id: int
+    offset: int
+
+
+@dataclass(frozen = True)
+class FetchLuwResponse:
+    active_state_id: int
+    creator_wallet_address: str
+    luw_id: int
+    luw_service_endpoint: str
+    provider_id: str
+    repository_count: int
+    repository_endpoints: Dict[str, int]
+    state_count: int
+    state_history: Dict[int, int]
+
+
+@dataclass(frozen = True)
+class FetchLuwDecodedRequest:
+    luw_id: int
+
+
+@dataclass(frozen = True)
+class FetchLuwDecodedResponse:
+    creator_wallet_address: str
+    luw_id: int
+    luw_service_endpoint: str
+    provider_id: str
+    repository_endpoints: Dict[str, str]
+    state_history: Dict[int, str]
+
+
+@dataclass(frozen = True)
+class GetActiveLuwStateRequest:
+    luw_id: int
+
+
+@dataclass(frozen = True)
+class GetAssetProviderRequest:
+    provider_id: str
+
+
+@dataclass(frozen = True)
+class GetAssetProviderResponse:
+    creator_wallet_address: str
+    provider_data: str
+    provider_id: str
+    status: str
+
+
+@dataclass(frozen = True)
+class GetLuwRepositoryStateRequest:
+    luw_id: int
+    repository_id: str
+
+
+@dataclass(frozen = True)
+class GetStorageContractsRequest:
+    pass
+
+
+@dataclass(frozen = True)
+class GetStorageContractsResponse:
+    asset_twin_storage_contract_address: str
+    luw_storage_contract_address: str
+    provider_storage_contract_address: str
+
+
+@dataclass(frozen = True)
+class VerifyStorageContractsRequest:
+    pass
+
+
+ENTRY_POINTS = {
+    "abort_luw": EntryPoint(AbortLuwRequest, {"prim": "nat"}),
+    "add_luw_repositories": EntryPoint(AddLuwRepositoriesRequest, {"prim": "pair", "args": [{"prim": "nat", "annots": ["%luw_id"]}, {"prim": "list", "args": [{"prim": "string"}], "annots": ["%repository_ids"]}]}),
+    "add_luw_repository": EntryPoint(AddLuwRepositoryRequest, {"prim": "pair", "args": [{"prim": "nat", "annots": ["%luw_id"]}, {"prim": "string", "annots": ["%repository_id"]}]}),
+    "change_luw_repository_state": EntryPoint(ChangeLuwRepositoryStateRequest, {"prim": "pair", "args": [{"prim": "nat", "annots": ["%luw_id"]}, {"prim": "pair", "args": [{"prim": "string", "annots": ["%repository_id"]}, {"prim": "nat", "annots": ["%state_id"]}]}]}),
+    "change_luw_repository_states": EntryPoint(ChangeLuwRepositoryStatesRequest, {"prim": "pair", "args": [{"prim": "nat", "annots": ["%luw_id"]}, {"prim": "list", "args": [{"prim": "pair", "args": [{"prim": "string", "annots": ["%repository_id"]}, {"prim": "nat", "annots": ["%state_id"]}]}], "annots": ["%repositories"]}]}),
+    "change_luw_state": EntryPoint(ChangeLuwStateRequest, {"prim": "pair", "args": [{"prim": "nat", "annots": ["%luw_id"]}, {"prim": "nat", "annots": ["%state_id"]}]}),
+    "commit_luw": EntryPoint(CommitLuwRequest, {"prim": "nat"}),
+    "create_asset_provider": EntryPoint(CreateAssetProviderRequest, {"prim": "pair", "args": [{"prim": "string", "annots": ["%provider_data"]}, {"prim": "string", "annots": ["%provider_id"]}]}),
+    "create_luw": EntryPoint(CreateLuwRequest, {"prim": "pair", "args": [{"prim": "address", "annots": ["%luw_service_endpoint"]}, {"prim": "string", "annots": ["%provider_id"]}]}),
+    "register_asset_twin": EntryPoint(RegisterAssetTwinRequest, {"prim": "pair", "args": [{"prim": "string", "annots": ["%anchor_hash"]}, {"prim": "pair", "args": [{"prim": "string", "annots": ["%provider_id"]}, {"prim": "string", "annots": ["%repo_end_point"]}]}]}),
+    "register_asset_twins_batch": EntryPoint(RegisterAssetTwinsBatchRequest, {"prim": "list", "args": [{"prim": "pair", "args": [{"prim": "string", "annots": ["%anchor_hash"]}, {"prim": "pair", "args": [{"prim": "string", "annots": ["%provider_id"]}, {"prim": "string", "annots": ["%repo_end_point"]}]}]}]}),
+    "set_max_batch_size": EntryPoint(SetMaxBatchSizeRequest, {"prim": "nat"}),
+    "set_provider_active": EntryPoint(SetProviderActiveRequest, {"prim": "string"}),
+    "set_provider_data": EntryPoint(SetProviderDataRequest, {"prim": "pair", "args": [{"prim": "string", "annots": ["%provider_data"]}, {"prim": "string", "annots": ["%provider_id"]}]}),
+    "set_provider_deprecated": EntryPoint(SetProviderDeprecatedRequest, {"prim": "string"}),
+    "set_provider_owner": EntryPoint(SetProviderOwnerRequest, {"prim": "pair", "args": [{"prim": "address", "annots": ["%new_owner_address"]}, {"prim": "string", "annots": ["%provider_id"]}]}),
+    "set_provider_status": EntryPoint(SetProviderStatusRequest, {"prim": "pair", "args": [{"prim": "string", "annots": ["%provider_id"]}, {"prim": "nat", "annots": ["%status"]}]}),
+    "sync_storage_contracts": EntryPoint(SyncStorageContractsRequest, {"prim": "unit"}),
+}
+
+
+VIEWS = {
+    "fetch_asset_twin": View(FetchAssetTwinRequest, FetchAssetTwinResponse, {"prim": "pair", "args": [{"prim": "string", "annots": ["%anchor_hash"]}, {"prim": "string", "annots": ["%provider_id"]}]}, {"prim": "pair", "args": [{"prim": "pair", "args": [{"prim": "string", "annots": ["%asset_repository_endpoint"]}, {"prim": "address", "annots": ["%creator_wallet_address"]}]}, {"prim": "pair", "args": [{"prim": "timestamp", "annots": ["%latest_registration"]}, {"prim": "nat", "annots": ["%registration_count"]}]}]}),
+    "fetch_asset_twin_history": View(FetchAssetTwinHistoryRequest, Dict[int, str], {"prim": "pair", "args": [{"prim": "pair", "args": [{"prim": "string", "annots": ["%anchor_hash"]}, {"prim": "nat", "annots": ["%limit"]}]}, {"prim": "pair", "args": [{"prim": "nat", "annots": ["%offset"]}, {"prim": "string", "annots": ["%provider_id"]}]}]}, {"prim": "map", "args": [{"prim": "nat"}, {"prim": "timestamp"}]}),
+    "fetch_luw": View(FetchLuwRequest, FetchLuwResponse, {"prim": "pair", "args": [{"prim": "nat", "annots": ["%limit"]}, {"prim": "pair", "args": [{"prim": "nat", "annots": ["%luw_id"]}, {"prim": "nat", "annots": ["%offset"]}]}]}, {"prim": "pair", "args": [{"prim": "pair", "args": [{"prim": "pair", "args": [{"prim": "nat", "annots": ["%active_state_id"]}, {"prim": "address", "annots": ["%creator_wallet_address"]}]}, {"prim": "pair", "args": [{"prim": "nat", "annots": ["%luw_id"]}, {"prim": "address", "annots": ["%luw_service_endpoint"]}]}]}, {"prim": "pair", "args": [{"prim": "pair", "args": [{"prim": "string", "annots": ["%provider_id"]}, {"prim": "nat", "annots": ["%repository_count"]}]}, {"prim": "pair", "args": [{"prim": "map", "args": [{"prim": "string"}, {"prim": "nat"}], "annots": ["%repository_endpoints"]}, {"prim": "pair", "args": [{"prim": "nat", "annots": ["%state_count"]}, {"prim": "map", "args": [{"prim": "nat"}, {"prim": "nat"}], "annots": ["%state_history"]}]}]}]}]}),
+    "fetch_luw_decoded": View(FetchLuwDecodedRequest, FetchLuwDecodedResponse, {"prim": "nat"}, {"prim": "pair", "args": [{"prim": "pair", "args": [{"prim": "address", "annots": ["%creator_wallet_address"]}, {"prim": "pair", "args": [{"prim": "nat", "annots": ["%luw_id"]}, {"prim": "address", "annots": ["%luw_service_endpoint"]}]}]}, {"prim": "pair", "args": [{"prim": "string", "annots": ["%provider_id"]}, {"prim": "pair", "args": [{"prim": "map", "args": [{"prim": "string"}, {"prim": "string"}], "annots": ["%repository_endpoints"]}, {"prim": "map", "args": [{"prim": "nat"}, {"prim": "string"}], "annots": ["%state_history"]}]}]}]}),
+    "get_active_luw_state": View(GetActiveLuwStateRequest, str, {"prim": "nat"}, {"prim": "string"}),
+    "get_asset_provider": View(GetAssetProviderRequest, GetAssetProviderResponse, {"prim": "string"}, {"prim": "pair", "args": [{"prim": "pair", "args": [{"prim": "address", "annots": ["%creator_wallet_address"]}, {"prim": "string", "annots": ["%provider_data"]}]}, {"prim": "pair", "args": [{"prim": "string", "annots": ["%provider_id"]}, {"prim": "string", "annots": ["%status"]}]}]}),
+    "get_luw_repository_state": View(GetLuwRepositoryStateRequest, str, {"prim": "pair", "args": [{"prim": "nat", "annots": ["%luw_id"]}, {"prim": "string", "annots": ["%repository_id"]}]}, {"prim": "string"}),
+    "get_storage_contracts": View(GetStorageContractsRequest, GetStorageContractsResponse, {"prim": "unit"}, {"prim": "pair", "args": [{"prim": "address", "annots": ["%asset_twin_storage_contract_address"]}, {"prim": "pair", "args": [{"prim": "address", "annots": ["%luw_storage_contract_address"]}, {"prim": "address", "annots": ["%provider_storage_contract_address"]}]}]}),
+    "verify_storage_contracts": View(VerifyStorageContractsRequest, bool, {"prim": "unit"}, {"prim": "bool"}),
+}
+
+
+class EntryPointMethods:
+    # Sent right away by RegistryClient, and added to the group by OperationGroup
+    def abort_luw(self, luw_id: int):
+        return self.call("abort_luw", AbortLuwRequest(luw_id = luw_id))
+
+    def add_luw_repositories(self, luw_id: int, repository_ids: List[str]):
+        return self.call("add_luw_repositories", AddLuwRepositoriesRequest(luw_id = luw_id, repository_ids = repository_ids))
+
+    def add_luw_repository(self, luw_id: int, repository_id: str):
+        return self.call("add_luw_repository", AddLuwRepositoryRequest(luw_id = luw_id, repository_id = repository_id))
+
+    def change_luw_repository_state(self, luw_id: int, repository_id: str, state_id: int):
+        return self.call("change_luw_repository_state", ChangeLuwRepositoryStateRequest(luw_id = luw_id, repository_id = repository_id, state_id = state_id))
+
+    def change_luw_repository_states(self, luw_id: int, repositories: List[ChangeLuwRepositoryStatesRepositoriesItem]):
+        return self.call("change_luw_repository_states", ChangeLuwRepositoryStatesRequest(luw_id = luw_id, repositories = repositories))
+
+    def change_luw_state(self, luw_id: int, state_id: int):
+        return self.call("change_luw_state", ChangeLuwStateRequest(luw_id = luw_id, state_id = state_id))
+
+    def commit_luw(self, luw_id: int):
+        return self.call("commit_luw", CommitLuwRequest(luw_id = luw_id))
+
+    def create_asset_provider(self, provider_data: str, provider_id: str):
+        return self.call("create_asset_provider", CreateAssetProviderRequest(provider_data = provider_data, provider_id = provider_id))
+
+    def create_luw(self, luw_service_endpoint: str, provider_id: str):
+        return self.call("create_luw", CreateLuwRequest(luw_service_endpoint = luw_service_endpoint, provider_id = provider_id))
+
+    def register_asset_twin(self, anchor_hash: str, provider_id: str, repo_end_point: str):
+        return self.call("register_asset_twin", RegisterAssetTwinRequest(anchor_hash = anchor_hash, provider_id = provider_id, repo_end_point = repo_end_point))
+
+    def register_asset_twins_batch(self, asset_twins: List[RegisterAssetTwinsBatchAssetTwinsItem]):
+        return self.call("register_asset_twins_batch", RegisterAssetTwinsBatchRequest(asset_twins = asset_twins))
+
+    def set_max_batch_size(self, max_batch_size: int):
+        return self.call("set_max_batch_size", SetMaxBatchSizeRequest(max_batch_size = max_batch_size))
+
+    def set_provider_active(self, provider_id: str):
+        return self.call("set_provider_active", SetProviderActiveRequest(provider_id = provider_id))
+
+    def set_provider_data(self, provider_data: str, provider_id: str):
+        return self.call("set_provider_data", SetProviderDataRequest(provider_data = provider_data, provider_id = provider_id))
+
+    def set_provider_deprecated(self, provider_id: str):
+        return self.call("set_provider_deprecated", SetProviderDeprecatedRequest(provider_id = provider_id))
+
+    def set_provider_owner(self, new_owner_address: str, provider_id: str):
+        return self.call("set_provider_owner", SetProviderOwnerRequest(new_owner_address = new_owner_address, provider_id = provider_id))
+
+    def set_provider_status(self, provider_id: str, status: int):
+        return self.call("set_provider_status", SetProviderStatusRequest(provider_id = provider_id, status = status))
+
+    def sync_storage_contracts(self):
+        return self.call("sync_storage_contracts", SyncStorageContractsRequest())
+
+
+class ViewMethods:
+    def fetch_asset_twin(self, anchor_hash: str, provider_id: str) -> FetchAssetTwinResponse:
+        return self.view("fetch_asset_twin", FetchAssetTwinRequest(anchor_hash = anchor_hash, provider_id = provider_id))
+
+    def fetch_asset_twin_history(self, anchor_hash: str, limit: int, offset: int, provider_id: str) -> Dict[int, str]:
+        return self.view("fetch_asset_twin_history", FetchAssetTwinHistoryRequest(anchor_hash = anchor_hash, limit = limit, offset = offset, provider_id = provider_id))
+
+    def fetch_luw(self, limit: int, luw_id: int, offset: int) -> FetchLuwResponse:
+        return self.view("fetch_luw", FetchLuwRequest(limit = limit, luw_id = luw_id, offset = offset))
+
+    def fetch_luw_decoded(self, luw_id: int) -> FetchLuwDecodedResponse:
+        return self.view("fetch_luw_decoded", FetchLuwDecodedRequest(luw_id = luw_id))
+
+    def get_active_luw_state(self, luw_id: int) -> str:
+        return self.view("get_active_luw_state", GetActiveLuwStateRequest(luw_id = luw_id))
+
+    def get_asset_provider(self, provider_id: str) -> GetAssetProviderResponse:
+        return self.view("get_asset_provider", GetAssetProviderRequest(provider_id = provider_id))
+
+    def get_luw_repository_state(self, luw_id: int, repository_id: str) -> str:
+        return self.view("get_luw_repository_state", GetLuwRepositoryStateRequest(luw_id = luw_id, repository_id = repository_id))
+
+    def get_storage_contracts(self) -> GetStorageContractsResponse:
+        return self.view("get_storage_contracts", GetStorageContractsRequest())
+
+    def verify_storage_contracts(self) -> bool:
+        return self.view("verify_storage_contracts", VerifyStorageContractsRequest())
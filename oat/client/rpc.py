@@ -0,0 +1,106 @@
+# Node RPC over pooled HTTP connections
+#
+# Each request borrows a keep-alive connection from the pool and gives it back
+# once the response is read, so a client serving many calls reuses a few TCP (and
+# TLS) connections instead of opening one per RPC, as urllib does.
+
+import http.client
+import json
+import queue
+import urllib.parse
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 30
+
+
+class RPCError(Exception):
+    def __init__(self, status, body):
+        super().__init__("RPC error %d: %s" % (status, json.dumps(body) if not isinstance(body, str) else body))
+        self.status = status
+        # The error list of the node, as JSON, or the response text
+        self.body = body
+
+
+class RPC:
+    def __init__(self, node, pool_size = DEFAULT_POOL_SIZE, timeout = DEFAULT_TIMEOUT):
+        url = urllib.parse.urlsplit(node)
+        if url.scheme not in ("http", "https"):
+            raise ValueError("Unsupported node URL: %s" % node)
+
+        self.connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.host = url.hostname
+        self.port = url.port
+        self.base_path = url.path.rstrip("/")
+        self.timeout = timeout
+
+        # Idle connections, the most recently used first; more are opened when all are busy
+        self.pool = queue.LifoQueue(maxsize = pool_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def connection(self):
+        try:
+            return self.pool.get_nowait(), True
+        except queue.Empty:
+            return self.connection_class(self.host, self.port, timeout = self.timeout), False
+
+    def release(self, connection):
+        try:
+            self.pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def request(self, method, path, data = None):
+        body = None if data is None else json.dumps(data)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+
+        connection, reused = self.connection()
+        try:
+            try:
+                connection.request(method, self.base_path + path, body = body, headers = headers)
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The node closed the idle connection; the request is sent again on a new one
+                if not reused:
+                    raise
+                connection.close()
+                connection = self.connection_class(self.host, self.port, timeout = self.timeout)
+                connection.request(method, self.base_path + path, body = body, headers = headers)
+                response = connection.getresponse()
+
+            content = response.read()
+        except Exception:
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self.release(connection)
+
+        try:
+            result = json.loads(content) if content else None
+        except ValueError:
+            result = content.decode(errors = "replace")
+
+        if response.status != 200:
+            raise RPCError(response.status, result)
+
+        return result
+
+    def get(self, path):
+        return self.request("GET", path)
+
+    def post(self, path, data):
+        return self.request("POST", path, data)
@@ -0,0 +1,290 @@
+# Read-through cache of the Registry views
+#
+# `fetch_asset_twin`, `get_asset_provider` and `fetch_luw` are answered from memory,
+# keyed by view and request, and read through the client on a miss. Entries are
+# evicted least recently used first, once there are more than `max_entries` or
+# their approximate size exceeds `max_size` bytes, and expire after `ttl` seconds.
+#
+# Entries are invalidated by the contract events (see oat/events.py) of the blocks
+# the node applies: a registration of hash H for provider P only evicts
+# fetch_asset_twin(H, P), a provider event get_asset_provider of that provider and
+# a LUW event every fetch_luw page of that LUW. The imports of the migration entry
+# points emit no events, the TTL bounds how long their changes can go unseen.
+#
+# sync keeps the hash of the last block it synced, and clears the cache when the
+# node replaced that block in a reorganization.
+#
+#     cache = ViewCache(client, contracts = {asset_twin_address, provider_address, luw_address})
+#     cache.fetch_asset_twin(anchor_hash = anchor_hash, provider_id = provider_id)
+#     cache.sync()    # e.g. from a thread, once per block
+#     cache.stats()
+
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+
+from oat import events
+from oat.client import registryTypes
+
+CACHED_VIEWS = ("fetch_asset_twin", "get_asset_provider", "fetch_luw")
+
+# The request fields naming the record a cached view reads, e.g. the LUW of any fetch_luw page
+RECORD_FIELDS = {
+    "fetch_asset_twin": ("anchor_hash", "provider_id"),
+    "get_asset_provider": ("provider_id",),
+    "fetch_luw": ("luw_id",),
+}
+
+# The cached view an event makes stale, for the record named by the same payload fields
+INVALIDATED_VIEWS = {
+    "asset_twin_registered": "fetch_asset_twin",
+    "provider_created": "get_asset_provider",
+    "provider_status_changed": "get_asset_provider",
+    "provider_data_changed": "get_asset_provider",
+    "provider_owner_changed": "get_asset_provider",
+    "luw_created": "fetch_luw",
+    "luw_state_added": "fetch_luw",
+    "luw_repositories_closed": "fetch_luw",
+    "repository_added": "fetch_luw",
+    "repository_state_changed": "fetch_luw",
+}
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 100000
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+# Latency percentiles are taken over the last so many reads of each view
+LATENCY_SAMPLES = 1024
+
+Entry = namedtuple("Entry", ["value", "size", "expires"])
+
+Latency = namedtuple("Latency", ["mean", "p50", "p99"])
+
+ViewStats = namedtuple("ViewStats", ["hits", "misses", "hit_rate", "invalidations", "hit_latency", "miss_latency"])
+
+CacheStats = namedtuple("CacheStats", ["entries", "size", "evictions", "expirations", "invalidations", "views"])
+
+
+def record_key(view, values):
+    return (view, tuple(getattr(values, field) for field in RECORD_FIELDS[view]))
+
+
+def entry_size(key, value):
+    # Approximate, from the length of the representations; used to bound the cache
+    return len(repr(key)) + len(repr(value))
+
+
+class LatencyStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen = LATENCY_SAMPLES)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def summary(self):
+        if not self.count:
+            return Latency(mean = None, p50 = None, p99 = None)
+
+        samples = sorted(self.samples)
+        return Latency(
+            mean = self.total / self.count,
+            p50 = samples[len(samples) // 2],
+            p99 = samples[min(len(samples) - 1, len(samples) * 99 // 100)],
+        )
+
+
+class ViewCounters:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.hit_latency = LatencyStats()
+        self.miss_latency = LatencyStats()
+
+    def stats(self):
+        reads = self.hits + self.misses
+
+        return ViewStats(
+            hits = self.hits,
+            misses = self.misses,
+            hit_rate = self.hits / reads if reads else None,
+            invalidations = self.invalidations,
+            hit_latency = self.hit_latency.summary(),
+            miss_latency = self.miss_latency.summary(),
+        )
+
+
+class ViewCache(registryTypes.ViewMethods):
+    def __init__(self, client, contracts = None, ttl = DEFAULT_TTL, max_entries = DEFAULT_MAX_ENTRIES,
+            max_size = DEFAULT_MAX_SIZE, clock = time.monotonic):
+        self.client = client
+        # Only the events of these contracts invalidate entries (default: every contract)
+        self.contracts = contracts
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.clock = clock
+
+        # (view, request) to Entry, the least recently used first
+        self.entries = OrderedDict()
+        # (view, record field values) to the cached (view, request) of that record
+        self.records = {}
+        self.size = 0
+        self.evictions = 0
+        self.expirations = 0
+        # Bumped by every invalidation, so reads that overlap one are not stored
+        self.generation = 0
+        self.counters = {view: ViewCounters() for view in CACHED_VIEWS}
+
+        # Level and hash of the last block synced from the node
+        self.level = None
+        self.block_hash = None
+        self.lock = threading.Lock()
+
+    ###########
+    # Reading #
+    ###########
+
+    def view(self, view, request):
+        if view not in CACHED_VIEWS:
+            return self.client.view(view, request)
+
+        key = (view, request)
+        counters = self.counters[view]
+        started = time.perf_counter()
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None and entry.expires <= self.clock():
+                self.remove(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is not None:
+                self.entries.move_to_end(key)
+                counters.hits += 1
+                counters.hit_latency.add(time.perf_counter() - started)
+                return entry.value
+
+            generation = self.generation
+
+        # Failed reads raise and are not cached, e.g. a twin not registered yet
+        try:
+            value = self.client.view(view, request)
+        finally:
+            with self.lock:
+                counters.misses += 1
+                counters.miss_latency.add(time.perf_counter() - started)
+
+        with self.lock:
+            # The value may predate an event seen while it was read
+            if generation == self.generation:
+                self.store(key, value)
+
+        return value
+
+    def store(self, key, value):
+        if key in self.entries:
+            self.remove(key)
+
+        size = entry_size(key, value)
+        if size > self.max_size:
+            return
+
+        self.entries[key] = Entry(value = value, size = size, expires = self.clock() + self.ttl)
+        self.records.setdefault(record_key(*key), set()).add(key)
+        self.size += size
+
+        while len(self.entries) > self.max_entries or self.size > self.max_size:
+            self.remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def remove(self, key):
+        self.size -= self.entries.pop(key).size
+
+        record = record_key(*key)
+        self.records[record].discard(key)
+        if not self.records[record]:
+            del self.records[record]
+
+    ################
+    # Invalidation #
+    ################
+
+    def invalidate_events(self, decoded_events):
+        # Evicts the entries made stale by the events; returns how many were cached
+        evicted = 0
+
+        with self.lock:
+            for event in decoded_events:
+                if event.tag not in INVALIDATED_VIEWS:
+                    continue
+
+                view = INVALIDATED_VIEWS[event.tag]
+
+                self.generation += 1
+                self.counters[view].invalidations += 1
+
+                for key in list(self.records.get(record_key(view, event.payload), ())):
+                    self.remove(key)
+                    evicted += 1
+
+        return evicted
+
+    def invalidate(self, document):
+        # A block, an operation, or a list of either, as receipts from the node or a file
+        return self.invalidate_events(events.events_from_json(document, self.contracts))
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+            self.records.clear()
+            self.size = 0
+
+    def sync(self):
+        # Invalidates with the blocks the node applied since the last sync. The first
+        # sync starts from the head and drops what was read before, as it may be stale.
+        # So does a sync after the last synced block was replaced by a reorganization,
+        # since the entries may have been read from the blocks that were dropped.
+        rpc = self.client.rpc
+        head = rpc.get("/chains/main/blocks/head/header")
+
+        if self.level is not None and self.block_hash is not None:
+            if self.level > head["level"] or rpc.get("/chains/main/blocks/%d/header" % self.level).get("hash") != self.block_hash:
+                self.level = None
+
+        if self.level is None:
+            self.clear()
+            self.level = head["level"]
+            self.block_hash = head.get("hash")
+            return 0
+
+        evicted = 0
+        for level in range(self.level + 1, head["level"] + 1):
+            block = rpc.get("/chains/main/blocks/%d" % level)
+            evicted += self.invalidate(block)
+            self.level = level
+            self.block_hash = block.get("hash")
+
+        return evicted
+
+    ###########
+    # Metrics #
+    ###########
+
+    def stats(self):
+        with self.lock:
+            return CacheStats(
+                entries = len(self.entries),
+                size = self.size,
+                evictions = self.evictions,
+                expirations = self.expirations,
+                invalidations = sum(counters.invalidations for counters in self.counters.values()),
+                views = {view: counters.stats() for view, counters in self.counters.items()},
+            )
@@ -0,0 +1,334 @@
+# Contract events
+#
+# AssetTwinTracing, the Asset Provider contracts and LUW emit a contract event for
+# every registration, provider change and LUW transition. The events are part of
+# the operation receipts, as internal results of kind "event" that carry their tag,
+# the Michelson type of the payload and the payload itself, so consumers can follow
+# them from the blocks instead of polling the views.
+#
+# The payload type keeps the record field names as annotations, which is what the
+# decoder uses to turn the Micheline JSON back into typed records.
+#
+#     python -m oat.events [<file> ...] [--contract <address> ...]
+#
+# reads blocks, operations or lists of them as JSON or JSON lines, from the given
+# files or from stdin, and prints one JSON line per event.
+
+import argparse
+import hashlib
+import json
+import sys
+from collections import namedtuple
+
+AssetTwinRegistered = namedtuple("AssetTwinRegistered", ["anchor_hash", "provider_id", "registration_count"])
+
+ProviderCreated = namedtuple("ProviderCreated", ["provider_id", "creator_wallet_address"])
+ProviderStatusChanged = namedtuple("ProviderStatusChanged", ["provider_id", "status"])
+ProviderDataChanged = namedtuple("ProviderDataChanged", ["provider_id"])
+ProviderOwnerChanged = namedtuple("ProviderOwnerChanged", ["provider_id", "new_owner_address"])
+
+LUWCreated = namedtuple("LUWCreated", ["luw_id", "creator_wallet_address"])
+LUWStateAdded = namedtuple("LUWStateAdded", ["luw_id", "state_id"])
+LUWRepositoriesClosed = namedtuple("LUWRepositoriesClosed", ["luw_id", "state_id"])
+RepositoryAdded = namedtuple("RepositoryAdded", ["luw_id", "repository_id", "state_id"])
+RepositoryStateChanged = namedtuple("RepositoryStateChanged", ["luw_id", "repository_id", "state_id"])
+
+EVENT_TYPES = {
+    "asset_twin_registered": AssetTwinRegistered,
+    "provider_created": ProviderCreated,
+    "provider_status_changed": ProviderStatusChanged,
+    "provider_data_changed": ProviderDataChanged,
+    "provider_owner_changed": ProviderOwnerChanged,
+    "luw_created": LUWCreated,
+    "luw_state_added": LUWStateAdded,
+    "luw_repositories_closed": LUWRepositoriesClosed,
+    "repository_added": RepositoryAdded,
+    "repository_state_changed": RepositoryStateChanged,
+}
+
+# `payload` is the typed record of EVENT_TYPES, or the decoded value for other tags
+Event = namedtuple("Event", ["contract", "tag", "operation_hash", "level", "timestamp", "payload"])
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# Base58 prefixes of the binary address forms, by implicit account curve
+IMPLICIT_PREFIXES = {
+    0: bytes([6, 161, 159]),  # tz1
+    1: bytes([6, 161, 161]),  # tz2
+    2: bytes([6, 161, 164]),  # tz3
+    3: bytes([6, 161, 166]),  # tz4
+}
+ORIGINATED_PREFIX = bytes([2, 90, 121])  # KT1
+
+
+class EventError(ValueError):
+    pass
+
+
+############
+# Decoding #
+############
+
+def base58check(data):
+    data += hashlib.sha256(hashlib.sha256(data).digest()).digest()[:4]
+
+    number = int.from_bytes(data, "big")
+    encoded = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = BASE58_ALPHABET[remainder] + encoded
+
+    leading_zeros = len(data) - len(data.lstrip(b"\0"))
+    return BASE58_ALPHABET[0] * leading_zeros + encoded
+
+
+def decode_address(value):
+    # Receipts in the optimized unparsing mode give addresses as their binary form
+    if "string" in value:
+        return value["string"]
+
+    data = bytes.fromhex(value["bytes"])
+    if len(data) != 22:
+        raise EventError("Invalid address bytes: %s" % value["bytes"])
+
+    if data[0] == 0 and data[1] in IMPLICIT_PREFIXES:
+        return base58check(IMPLICIT_PREFIXES[data[1]] + data[2:])
+    if data[0] == 1:
+        return base58check(ORIGINATED_PREFIX + data[1:21])
+
+    raise EventError("Invalid address bytes: %s" % value["bytes"])
+
+
+def comb(node, arity):
+    # Pair combs can be written as Pair a b c, Pair a (Pair b c) or { a; b; c }
+    if isinstance(node, list):
+        args = node
+    elif node.get("prim") == "Pair":
+        args = node["args"]
+    else:
+        raise EventError("Expected a pair, got %s" % json.dumps(node))
+
+    if len(args) < arity:
+        raise EventError("Pair has fewer elements than its type: %s" % json.dumps(node))
+    if len(args) == 2 and arity == 2:
+        return args
+
+    return [args[0], args[1] if len(args) == 2 else {"prim": "Pair", "args": args[1:]}]
+
+
+def field_name(michelson_type):
+    for annotation in michelson_type.get("annots", []):
+        if annotation.startswith("%"):
+            return annotation[1:]
+
+    return None
+
+
+def is_record(michelson_type):
+    # A pair whose leaves, through the nested pairs of the tree layout, are annotated
+    return any(
+        field_name(arg) is not None or (arg["prim"] == "pair" and is_record(arg))
+        for arg in michelson_type["args"]
+    )
+
+
+def record_fields(michelson_type, value, fields):
+    # Walks the nested pairs of a record; each annotated leaf is one field
+    name = field_name(michelson_type)
+
+    if michelson_type["prim"] == "pair" and name is None:
+        left_type = michelson_type["args"][0]
+        right_type = michelson_type["args"][1] if len(michelson_type["args"]) == 2 else \
+            {"prim": "pair", "args": michelson_type["args"][1:]}
+
+        left, right = comb(value, 2)
+        record_fields(left_type, left, fields)
+        record_fields(right_type, right, fields)
+    else:
+        fields[name] = decode(michelson_type, value)
+
+    return fields
+
+
+def decode(michelson_type, value):
+    # Decodes a Micheline JSON value of the given Micheline JSON type. Records,
+    # i.e. pairs with annotated fields, are decoded to dicts by field name.
+    prim = michelson_type["prim"]
+
+    if prim in ("string", "key_hash", "signature", "chain_id", "key"):
+        return value["string"] if "string" in value else value["bytes"]
+    if prim in ("nat", "int", "mutez"):
+        return int(value["int"])
+    if prim == "timestamp":
+        return value["string"] if "string" in value else int(value["int"])
+    if prim == "address":
+        return decode_address(value)
+    if prim == "bytes":
+        return bytes.fromhex(value["bytes"])
+    if prim == "bool":
+        return value["prim"] == "True"
+    if prim == "unit":
+        return None
+    if prim == "option":
+        return None if value["prim"] == "None" else decode(michelson_type["args"][0], value["args"][0])
+    if prim in ("list", "set"):
+        return [decode(michelson_type["args"][0], item) for item in value]
+    if prim == "map":
+        key_type, value_type = michelson_type["args"]
+        return {
+            decode(key_type, element["args"][0]): decode(value_type, element["args"][1])
+            for element in value
+        }
+    if prim == "pair":
+        if not is_record(michelson_type):
+            left_type = michelson_type["args"][0]
+            right_type = michelson_type["args"][1] if len(michelson_type["args"]) == 2 else \
+                {"prim": "pair", "args": michelson_type["args"][1:]}
+            left, right = comb(value, 2)
+
+            # Plain pairs, as produced by sp.pair, decode to tuples
+            right = decode(right_type, right)
+            if right_type["prim"] == "pair" and isinstance(right, tuple):
+                return (decode(left_type, left),) + right
+            return (decode(left_type, left), right)
+
+        return record_fields({"prim": "pair", "args": michelson_type["args"]}, value, {})
+
+    raise EventError("Unsupported Michelson type: %s" % prim)
+
+
+def payload_record(tag, michelson_type, payload):
+    value = decode(michelson_type, payload)
+
+    record_type = EVENT_TYPES.get(tag)
+    if record_type is None:
+        return value
+
+    # Payloads of a single value, like provider_data_changed, are not records
+    if not isinstance(value, dict):
+        return record_type(value)
+
+    try:
+        return record_type(**value)
+    except TypeError:
+        raise EventError("Payload of %s does not match %s: %s" % (tag, record_type.__name__, sorted(value)))
+
+
+############
+# Receipts #
+############
+
+def events_from_operation(operation, level = None, timestamp = None, contracts = None):
+    # The events of an operation as returned by the RPC, e.g. one item of the
+    # operations of a block. Only events of applied operations are returned.
+    # The level and timestamp are those of the block, when it is known.
+    events = []
+
+    for content in operation.get("contents", []):
+        metadata = content.get("metadata", {})
+
+        # A failed operation reverts its internal operations, events included
+        if metadata.get("operation_result", {}).get("status") != "applied":
+            continue
+
+        for result in metadata.get("internal_operation_results", []):
+            if result.get("kind") != "event" or result.get("result", {}).get("status") != "applied":
+                continue
+            if contracts is not None and result["source"] not in contracts:
+                continue
+
+            events.append(Event(
+                contract = result["source"],
+                tag = result.get("tag"),
+                operation_hash = operation.get("hash"),
+                level = level,
+                timestamp = timestamp,
+                payload = payload_record(result.get("tag"), result["type"], result.get("payload", {"prim": "Unit"})),
+            ))
+
+    return events
+
+
+def events_from_block(block, contracts = None):
+    header = block.get("header", {})
+
+    return [
+        event
+        for validation_pass in block.get("operations", [])
+        for operation in validation_pass
+        for event in events_from_operation(operation, header.get("level"), header.get("timestamp"), contracts)
+    ]
+
+
+def events_from_json(document, contracts = None):
+    # A block, an operation, or a list of either
+    if isinstance(document, list):
+        return [event for item in document for event in events_from_json(item, contracts)]
+    if "operations" in document:
+        return events_from_block(document, contracts)
+
+    return events_from_operation(document, contracts = contracts)
+
+
+def read_documents(stream):
+    # A JSON document or JSON lines, one block or operation per line. Lines are
+    # decoded as they are read, so the stream can be followed with tail -f.
+    first_line = stream.readline()
+    while first_line and not first_line.strip():
+        first_line = stream.readline()
+
+    if not first_line:
+        return
+
+    try:
+        document = json.loads(first_line)
+    except ValueError:
+        # The first line is only part of a document that spans several lines
+        yield json.loads(first_line + stream.read())
+        return
+
+    yield document
+
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_events(stream, contracts = None):
+    for document in read_documents(stream):
+        yield from events_from_json(document, contracts)
+
+
+def to_json(event):
+    payload = event.payload._asdict() if hasattr(event.payload, "_asdict") else event.payload
+
+    return json.dumps({
+        "contract": event.contract,
+        "tag": event.tag,
+        "operation_hash": event.operation_hash,
+        "level": event.level,
+        "timestamp": event.timestamp,
+        "payload": payload,
+    }, default = lambda value: value.hex() if isinstance(value, bytes) else str(value))
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m oat.events")
+    parser.add_argument("files", nargs = "*", help = "block or operation receipts as JSON or JSON lines (default: stdin)")
+    parser.add_argument("--contract", action = "append",
+        help = "only print the events of this contract, may be repeated (default: every contract)")
+    args = parser.parse_args(argv)
+
+    contracts = set(args.contract) if args.contract else None
+
+    try:
+        for stream in [open(path) for path in args.files] or [sys.stdin]:
+            with stream:
+                for event in read_events(stream, contracts):
+                    print(to_json(event), flush = True)
+    except (OSError, ValueError) as error:
+        parser.exit(1, "%s\n" % error)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+# Differential fuzzing of the Registry call graph
+#
+# Generates random operation sequences across every Registry entry point, with
+# random senders, IDs, batch sizes and state values (oat.model.OperationGenerator),
+# and replays each sequence on the contracts in the SmartPy interpreter through
+# the `replay` of modelScenarios.py. Every operation has to succeed or fail as it
+# does in the pure-Python model of oat/model.py, and the Registry views have to
+# return what the model holds. The hand-written failure scenarios only cover the
+# cases someone thought of; the fuzzer also finds the ones nobody did. The summary
+# reports how many operations of each entry point succeed, as the paths behind the
+# checks are only covered by the operations that get past them.
+#
+# Sequences are split into shards, each run by its own SmartPy process. A shard
+# that fails is shrunk: chunks of its operations are removed for as long as the
+# remaining sequence still fails, so that the recorded failure is as short as it
+# can be. The expected outcomes are computed again by the model for every
+# candidate sequence.
+#
+# With --gas, the sequences are also run in an octez-client mockup, since the
+# SmartPy interpreter does not meter gas. Operations that cost far more than the
+# median of their entry point and batch size are recorded as gas outliers, next
+# to the correctness failures.
+#
+#     python -m oat.fuzz [--shards <count>] [--operations <count>] [--seed <seed>] [--jobs <count>] [--gas]
+#     python -m oat.fuzz --replay <failure file>
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from oat import artifacts, michelson, model, testRunner, toolchain
+from oat.benchmarks import deploy_registry_topology, format_table
+
+FUZZ_DIR = artifacts.CACHE_ROOT / "fuzz"
+
+# An operation costing more than this many times the median of its entry point and batch size is an outlier
+OUTLIER_RATIO = 2.0
+
+# SmartPy runs allowed for shrinking one failing shard
+SHRINK_RUNS = 64
+
+# Mockup accounts of the model accounts; the certifier is the one the topology is deployed with
+MOCKUP_ACCOUNTS = {
+    "certifier": "bootstrap1",
+    "operator_A": "bootstrap2",
+    "operator_B": "bootstrap3",
+    model.ENDPOINT_ACCOUNT: "bootstrap4",
+}
+
+# Michelson encoding of the Registry parameters, by parameter name
+STRING_PARAMETERS = ("provider_id", "provider_data", "anchor_hash", "repo_end_point", "repository_id")
+NAT_PARAMETERS = ("status", "max_batch_size", "luw_id", "state_id")
+ADDRESS_PARAMETERS = ("new_owner_address", "luw_service_endpoint")
+
+FUZZ_TEST = "FuzzShard"
+
+# The scenario of one shard: the operations are replayed by modelScenarios.py
+SHARD_SCRIPT = """import smartpy as sp
+
+OPERATIONS = %r
+
+@sp.add_test(name = %r)
+def test():
+    REPLAY = sp.io.import_stored_contract("modelScenarios.py")
+
+    REPLAY.replay(OPERATIONS, verify_every = %d)
+"""
+
+Shard = namedtuple("Shard", ["index", "seed", "operations"])
+
+ShardResult = namedtuple("ShardResult", [
+    "shard",
+    "status",
+    "operations",
+    "output",
+    "shrink_runs",
+    "gas",
+    "duration",
+])
+
+GasMeasurement = namedtuple("GasMeasurement", ["seed", "index", "entry_point", "consumed_gas", "batch_size"])
+
+GasOutlier = namedtuple("GasOutlier", ["measurement", "median"])
+
+
+##############
+# Generation #
+##############
+
+def shards(count, operations, seed = 0, **generator_options):
+    # Shard i replays the sequence of seed + i, so that any shard can be generated again on its own
+    return [
+        Shard(
+            index = index,
+            seed = seed + index,
+            operations = model.OperationGenerator(seed = seed + index, **generator_options).operations(operations),
+        )
+        for index in range(count)
+    ]
+
+
+def outcomes(shards):
+    # Operations and successes of each entry point over the shards, as the model runs them
+    counts = {entry_point: [0, 0] for entry_point in model.REGISTRY_ENTRY_POINTS}
+
+    for shard in shards:
+        topology = model.Topology()
+
+        for operation in shard.operations:
+            counts[operation.entry_point][0] += 1
+            if topology.apply(operation) is None:
+                counts[operation.entry_point][1] += 1
+
+    return [
+        {"entry_point": entry_point, "operations": operations, "succeeded": succeeded}
+        for entry_point, (operations, succeeded) in counts.items()
+    ]
+
+
+def batch_size(operation):
+    for value in operation.parameters.values():
+        if isinstance(value, list):
+            return len(value)
+
+    return None
+
+
+###########
+# SmartPy #
+###########
+
+def shard_script(operations, verify_every = 50):
+    # Operations are written as tuples of their fields, which only hold literals
+    return SHARD_SCRIPT % ([tuple(operation) for operation in operations], FUZZ_TEST, verify_every)
+
+
+def run_sequence(operations):
+    # Returns None when the contracts agree with the model, or the SmartPy output.
+    # The filter keeps the ModelScenarios test of modelScenarios.py from running too.
+    with tempfile.TemporaryDirectory(prefix = "oat-fuzz-") as work_dir:
+        script_path = Path(work_dir) / "fuzzShard.py"
+        script_path.write_text(testRunner.TEST_FILTER % FUZZ_TEST + testRunner.resolve_imports(shard_script(operations), work_dir))
+
+        try:
+            toolchain.run_command([toolchain.SMARTPY_CLI, "test", str(script_path), str(Path(work_dir) / "output")])
+        except toolchain.ToolchainError as error:
+            return str(error)
+
+    return None
+
+
+def verify_smartpy_cli():
+    # A missing CLI would otherwise look like a failing shard
+    if shutil.which(toolchain.SMARTPY_CLI) is None:
+        raise toolchain.ToolchainError("Command not found: %s" % toolchain.SMARTPY_CLI)
+
+
+def shrink(operations, fails, max_runs = SHRINK_RUNS):
+    # Removes chunks of operations, halving the chunk size whenever no chunk can be
+    # removed, as long as the remaining sequence still fails. Returns the shortest
+    # failing sequence found and the number of runs it took.
+    runs = 0
+    chunk = max(len(operations) // 2, 1)
+
+    while runs < max_runs:
+        removed = False
+        start = 0
+
+        while start < len(operations) and runs < max_runs:
+            candidate = operations[:start] + operations[start + chunk:]
+            if not candidate:
+                start += chunk
+                continue
+
+            runs += 1
+            if fails(candidate):
+                operations = candidate
+                removed = True
+            else:
+                start += chunk
+
+        if not removed:
+            if chunk == 1:
+                break
+            chunk //= 2
+
+    return operations, runs
+
+
+##########
+# Mockup #
+##########
+
+def michelson_value(name, value, addresses):
+    # `addresses` maps the model accounts to mockup addresses
+    if name in ADDRESS_PARAMETERS:
+        return michelson.address(addresses[value])
+    if name in STRING_PARAMETERS:
+        return michelson.string(value)
+    if name in NAT_PARAMETERS:
+        return michelson.nat(value)
+    if name == "repository_ids":
+        return michelson.sequence([michelson.string(item) for item in value])
+    if name in ("asset_twins", "repositories"):
+        return michelson.sequence([michelson_argument(item, addresses) for item in value])
+
+    raise ValueError("Unknown Registry parameter: %s" % name)
+
+
+def michelson_argument(parameters, addresses):
+    values = {name: michelson_value(name, value, addresses) for name, value in parameters.items()}
+
+    # Entry points with a single parameter take it as is
+    if len(values) == 1:
+        return next(iter(values.values()))
+
+    return michelson.record(**values)
+
+
+def measure_gas(shard):
+    # Only the operations the model expects to succeed are sent: the client does
+    # not inject operations that fail, so they have no cost to measure
+    topology = model.Topology()
+    measurements = []
+
+    with toolchain.Mockup() as mockup:
+        registry = deploy_registry_topology(mockup, MOCKUP_ACCOUNTS["certifier"]).registry
+        addresses = {name: mockup.accounts[account] for name, account in MOCKUP_ACCOUNTS.items()}
+
+        for index, operation in enumerate(shard.operations):
+            if topology.apply(operation) is not None:
+                continue
+
+            receipt = mockup.transfer(MOCKUP_ACCOUNTS[operation.sender], registry, operation.entry_point,
+                michelson_argument(operation.parameters, addresses))
+
+            measurements.append(GasMeasurement(
+                seed = shard.seed,
+                index = index,
+                entry_point = operation.entry_point,
+                consumed_gas = receipt.consumed_gas,
+                batch_size = batch_size(operation),
+            ))
+
+    return measurements
+
+
+def gas_outliers(measurements, ratio = OUTLIER_RATIO):
+    # Batches are compared with batches of the same size, or their size alone would make the outliers
+    by_call = {}
+    for measurement in measurements:
+        by_call.setdefault((measurement.entry_point, measurement.batch_size), []).append(measurement.consumed_gas)
+
+    medians = {call: statistics.median(gas) for call, gas in by_call.items()}
+
+    return sorted((
+        GasOutlier(measurement = measurement, median = medians[(measurement.entry_point, measurement.batch_size)])
+        for measurement in measurements
+        if measurement.consumed_gas > ratio * medians[(measurement.entry_point, measurement.batch_size)]
+    ), key = lambda outlier: outlier.measurement.consumed_gas / outlier.median, reverse = True)
+
+
+###########
+# Running #
+###########
+
+def run_shard(shard, gas = False, shrink_runs = SHRINK_RUNS):
+    started = time.monotonic()
+
+    output = run_sequence(shard.operations)
+    operations = shard.operations
+    runs = 0
+
+    if output is not None and shrink_runs:
+        operations, runs = shrink(operations, lambda candidate: run_sequence(candidate) is not None, shrink_runs)
+        if len(operations) < len(shard.operations):
+            output = run_sequence(operations) or output
+
+    measurements = measure_gas(shard) if gas else []
+
+    return ShardResult(
+        shard = shard,
+        status = "passed" if output is None else "failed",
+        operations = operations,
+        output = output or "",
+        shrink_runs = runs,
+        gas = measurements,
+        duration = time.monotonic() - started,
+    )
+
+
+def run_shards(shards, jobs = None, gas = False, shrink_runs = SHRINK_RUNS):
+    # Each shard is its own SmartPy process (and mockup), the threads only wait for them
+    with ThreadPoolExecutor(max_workers = jobs or os.cpu_count()) as executor:
+        return list(executor.map(lambda shard: run_shard(shard, gas, shrink_runs), shards))
+
+
+#############
+# Reporting #
+#############
+
+def operation_json(operation):
+    return dict(operation._asdict())
+
+
+def write_failure(result, fuzz_dir = FUZZ_DIR):
+    fuzz_dir.mkdir(parents = True, exist_ok = True)
+    path = fuzz_dir / ("failure-%d.json" % result.shard.seed)
+
+    path.write_text(json.dumps({
+        "seed": result.shard.seed,
+        "generated_operations": len(result.shard.operations),
+        "operations": [operation_json(operation) for operation in result.operations],
+        "output": result.output,
+    }, indent = 2))
+
+    return path
+
+
+def write_gas_outliers(outliers, fuzz_dir = FUZZ_DIR):
+    fuzz_dir.mkdir(parents = True, exist_ok = True)
+    path = fuzz_dir / "gas-outliers.jsonl"
+
+    with open(path, "w") as stream:
+        for outlier in outliers:
+            stream.write(json.dumps(dict(outlier.measurement._asdict(), median = outlier.median)) + "\n")
+
+    return path
+
+
+def read_failure(path):
+    failure = json.loads(Path(path).read_text())
+
+    return [model.Operation(**operation) for operation in failure["operations"]]
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m oat.fuzz")
+    parser.add_argument("--shards", type = int, default = 8, help = "number of random sequences (default: 8)")
+    parser.add_argument("--operations", type = int, default = 200, help = "operations per sequence (default: 200)")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the first sequence (default: 0)")
+    parser.add_argument("--max-batch", type = int, default = 4, help = "largest batch of the batch entry points (default: 4)")
+    parser.add_argument("--jobs", type = int, help = "number of shards run at the same time (default: CPU count)")
+    parser.add_argument("--shrink-runs", type = int, default = SHRINK_RUNS,
+        help = "SmartPy runs allowed to shrink a failing shard, 0 to keep it whole (default: %d)" % SHRINK_RUNS)
+    parser.add_argument("--gas", action = "store_true", help = "also measure gas in an octez-client mockup")
+    parser.add_argument("--replay", help = "run the operations of a recorded failure again, instead of random ones")
+    args = parser.parse_args(argv)
+
+    try:
+        verify_smartpy_cli()
+    except toolchain.ToolchainError as error:
+        parser.exit(2, "%s\n" % error)
+
+    if args.replay:
+        try:
+            output = run_sequence(read_failure(args.replay))
+        except (OSError, ValueError, KeyError) as error:
+            parser.exit(2, "%s\n" % error)
+
+        print(output or "The contracts agree with the model")
+        sys.exit(1 if output else 0)
+
+    generated = shards(args.shards, args.operations, args.seed, max_batch = args.max_batch)
+
+    started = time.monotonic()
+    try:
+        results = run_shards(
+            generated,
+            jobs = args.jobs,
+            gas = args.gas,
+            shrink_runs = args.shrink_runs,
+        )
+    except toolchain.ToolchainError as error:
+        parser.exit(2, "%s\n" % error)
+    duration = time.monotonic() - started
+
+    failures = [result for result in results if result.status == "failed"]
+    for result in failures:
+        print("# seed %d, shrunk to %d of %d operations: %s\n\n%s\n" % (
+            result.shard.seed, len(result.operations), len(result.shard.operations), write_failure(result), result.output,
+        ))
+
+    print(format_table([{
+        "seed": result.shard.seed,
+        "status": result.status,
+        "operations": len(result.shard.operations),
+        "failing_operations": len(result.operations) if result.status == "failed" else "",
+        "shrink_runs": result.shrink_runs,
+        "duration": "%.1fs" % result.duration,
+    } for result in results]))
+
+    print()
+    print(format_table(outcomes(generated)))
+
+    if args.gas:
+        outliers = gas_outliers([measurement for result in results for measurement in result.gas])
+        print("\n%d gas outliers (more than %.1f times the median of their entry point and batch size): %s" % (
+            len(outliers), OUTLIER_RATIO, write_gas_outliers(outliers),
+        ))
+        if outliers:
+            print(format_table([{
+                "seed": outlier.measurement.seed,
+                "operation": outlier.measurement.index,
+                "entry_point": outlier.measurement.entry_point,
+                "batch_size": "" if outlier.measurement.batch_size is None else outlier.measurement.batch_size,
+                "consumed_gas": outlier.measurement.consumed_gas,
+                "median": outlier.median,
+            } for outlier in outliers]))
+
+    print("\n%d shards, %d failed, in %.1fs" % (len(results), len(failures), duration))
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+# SQLite indexer
+#
+# Materializes the state of a deployment into SQLite, for the queries the contracts
+# cannot answer without enumerating their big maps: the asset twins of a provider,
+# the LUWs in a given state and the providers with a given status.
+#
+# The indexer replays the contract events (see oat/events.py) of the operation
+# receipts it ingests. Every entry point that changes the indexed state emits one,
+# with the values the contract resolved on chain, like the ID of a new LUW or the
+# registration count of an asset twin, which the operation parameters do not hold.
+#
+# Receipts are ingested from files, as blocks or operations in JSON or JSON lines,
+# or fetched from a node. Each source is checkpointed in the same transaction as
+# the rows it produced, so an interrupted ingest resumes where it stopped.
+#
+# Events are never undone, so a node is only followed up to its last final block,
+# FINALITY_DEPTH levels below the head: under Tenderbake a block is final once two
+# blocks are built on top of it, and cannot be replaced by a reorganization. The
+# hash of the last block is checkpointed with its level, and a next block that does
+# not build on it fails the follow with IndexerError instead of being applied.
+#
+# The migration imports emit no events. An event changing a provider, LUW or
+# repository the index does not hold, e.g. an imported LUW, fails the ingest with
+# IndexerError, and the transaction it was part of is rolled back.
+#
+#     python -m oat.indexer <database> ingest [<file> ...] [--contract <address> ...]
+#     python -m oat.indexer <database> follow <node URL> [--from-level <level>]
+#     python -m oat.indexer <database> query twins <provider_id>
+#     python -m oat.indexer <database> query luws <state>
+#     python -m oat.indexer <database> query providers <status>
+
+import argparse
+import itertools
+import json
+import sqlite3
+import sys
+import urllib.request
+from collections import namedtuple
+from pathlib import Path
+
+from oat import events
+
+DEFAULT_BATCH_SIZE = 500
+
+# Levels below the head of the last final block
+FINALITY_DEPTH = 2
+
+# State IDs and names, as in the tables of LUWRepository.py and the Asset Provider contracts
+LUW_STATES = {
+    1: "active",
+    2: "prepare_to_commit",
+    3: "committed",
+    4: "aborted"
+}
+
+REPOSITORY_STATES = {
+    1: "open",
+    2: "ready",
+    3: "committed",
+    4: "rollbacked"
+}
+
+PROVIDER_STATUSES = {
+    1: "active",
+    2: "deprecated"
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS providers (
+    provider_id TEXT PRIMARY KEY,
+    contract TEXT NOT NULL,
+    creator_wallet_address TEXT NOT NULL,
+    owner_address TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    created_level INTEGER,
+    data_changed_level INTEGER
+);
+CREATE INDEX IF NOT EXISTS providers_status ON providers (status);
+
+CREATE TABLE IF NOT EXISTS asset_twins (
+    anchor_hash TEXT NOT NULL,
+    provider_id TEXT NOT NULL,
+    registration_count INTEGER NOT NULL,
+    latest_registration TEXT,
+    PRIMARY KEY (anchor_hash, provider_id)
+);
+CREATE INDEX IF NOT EXISTS asset_twins_provider ON asset_twins (provider_id);
+
+CREATE TABLE IF NOT EXISTS registrations (
+    anchor_hash TEXT NOT NULL,
+    provider_id TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    timestamp TEXT,
+    level INTEGER,
+    operation_hash TEXT,
+    PRIMARY KEY (anchor_hash, provider_id, n)
+);
+
+CREATE TABLE IF NOT EXISTS luws (
+    luw_id INTEGER PRIMARY KEY,
+    creator_wallet_address TEXT NOT NULL,
+    active_state_id INTEGER NOT NULL,
+    state_count INTEGER NOT NULL,
+    repository_count INTEGER NOT NULL,
+    created_level INTEGER
+);
+CREATE INDEX IF NOT EXISTS luws_active_state ON luws (active_state_id);
+
+CREATE TABLE IF NOT EXISTS luw_states (
+    luw_id INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    state_id INTEGER NOT NULL,
+    level INTEGER,
+    PRIMARY KEY (luw_id, n)
+);
+
+CREATE TABLE IF NOT EXISTS luw_repositories (
+    luw_id INTEGER NOT NULL,
+    repository_id TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    state_id INTEGER NOT NULL,
+    PRIMARY KEY (luw_id, repository_id)
+);
+CREATE INDEX IF NOT EXISTS luw_repositories_repository ON luw_repositories (repository_id);
+
+CREATE TABLE IF NOT EXISTS checkpoints (
+    source TEXT PRIMARY KEY,
+    documents INTEGER NOT NULL,
+    level INTEGER,
+    block_hash TEXT
+);
+"""
+
+# The statements replaying each event, in order, with the fields of the event
+# payload and of the event itself as named parameters. State history and
+# repository positions follow the numbering of the LUW contract.
+STATEMENTS = {
+    "asset_twin_registered": [
+        """INSERT INTO asset_twins (anchor_hash, provider_id, registration_count, latest_registration)
+            VALUES (:anchor_hash, :provider_id, :registration_count, :timestamp)
+            ON CONFLICT (anchor_hash, provider_id) DO UPDATE SET
+                registration_count = excluded.registration_count,
+                latest_registration = excluded.latest_registration""",
+        """INSERT OR REPLACE INTO registrations (anchor_hash, provider_id, n, timestamp, level, operation_hash)
+            VALUES (:anchor_hash, :provider_id, :registration_count - 1, :timestamp, :level, :operation_hash)""",
+    ],
+    "provider_created": [
+        """INSERT OR REPLACE INTO providers (provider_id, contract, creator_wallet_address, owner_address, status, created_level)
+            VALUES (:provider_id, :contract, :creator_wallet_address, :creator_wallet_address, 1, :level)""",
+    ],
+    "provider_status_changed": [
+        "UPDATE providers SET status = :status WHERE provider_id = :provider_id",
+    ],
+    "provider_data_changed": [
+        "UPDATE providers SET data_changed_level = :level WHERE provider_id = :provider_id",
+    ],
+    "provider_owner_changed": [
+        "UPDATE providers SET owner_address = :new_owner_address WHERE provider_id = :provider_id",
+    ],
+    "luw_created": [
+        """INSERT OR REPLACE INTO luws (luw_id, creator_wallet_address, active_state_id, state_count, repository_count, created_level)
+            VALUES (:luw_id, :creator_wallet_address, 1, 1, 0, :level)""",
+        "INSERT OR REPLACE INTO luw_states (luw_id, n, state_id, level) VALUES (:luw_id, 1, 1, :level)",
+    ],
+    "luw_state_added": [
+        "UPDATE luws SET active_state_id = :state_id, state_count = state_count + 1 WHERE luw_id = :luw_id",
+        """INSERT OR REPLACE INTO luw_states (luw_id, n, state_id, level)
+            SELECT luw_id, state_count, :state_id, :level FROM luws WHERE luw_id = :luw_id""",
+    ],
+    "repository_added": [
+        """INSERT OR REPLACE INTO luw_repositories (luw_id, repository_id, n, state_id)
+            SELECT luw_id, :repository_id, repository_count, :state_id FROM luws WHERE luw_id = :luw_id""",
+        "UPDATE luws SET repository_count = repository_count + 1 WHERE luw_id = :luw_id",
+    ],
+    "repository_state_changed": [
+        "UPDATE luw_repositories SET state_id = :state_id WHERE luw_id = :luw_id AND repository_id = :repository_id",
+    ],
+    "luw_repositories_closed": [
+        "UPDATE luw_repositories SET state_id = :state_id WHERE luw_id = :luw_id",
+    ],
+}
+
+# Events that change a record the index has to hold already, with the record and the
+# query finding it. The migration imports emit no events, so the providers, LUWs and
+# repositories they hold, like the ones created before the first level followed, are
+# not indexed, and the changes of these events would be dropped without a word.
+KNOWN_RECORDS = {
+    "provider_status_changed": ("provider %(provider_id)s", "SELECT 1 FROM providers WHERE provider_id = :provider_id"),
+    "provider_data_changed": ("provider %(provider_id)s", "SELECT 1 FROM providers WHERE provider_id = :provider_id"),
+    "provider_owner_changed": ("provider %(provider_id)s", "SELECT 1 FROM providers WHERE provider_id = :provider_id"),
+    "luw_state_added": ("LUW %(luw_id)s", "SELECT 1 FROM luws WHERE luw_id = :luw_id"),
+    "repository_added": ("LUW %(luw_id)s", "SELECT 1 FROM luws WHERE luw_id = :luw_id"),
+    "repository_state_changed": (
+        "repository %(repository_id)s of LUW %(luw_id)s",
+        "SELECT 1 FROM luw_repositories WHERE luw_id = :luw_id AND repository_id = :repository_id",
+    ),
+    "luw_repositories_closed": ("LUW %(luw_id)s", "SELECT 1 FROM luws WHERE luw_id = :luw_id"),
+}
+
+Checkpoint = namedtuple("Checkpoint", ["documents", "level", "block_hash"])
+
+IngestStats = namedtuple("IngestStats", ["documents", "operations", "events"])
+
+Provider = namedtuple("Provider", [
+    "provider_id",
+    "contract",
+    "creator_wallet_address",
+    "owner_address",
+    "status",
+    "created_level",
+    "data_changed_level",
+])
+
+AssetTwin = namedtuple("AssetTwin", ["anchor_hash", "provider_id", "registration_count", "latest_registration"])
+
+LUW = namedtuple("LUW", [
+    "luw_id",
+    "creator_wallet_address",
+    "active_state_id",
+    "state_count",
+    "repository_count",
+    "created_level",
+])
+
+
+class IndexerError(Exception):
+    pass
+
+
+def state_id(states, state):
+    # States are given by ID or by name
+    if isinstance(state, int) or str(state).isdigit():
+        return int(state)
+
+    for key, name in states.items():
+        if name == state:
+            return key
+
+    raise IndexerError("Unknown state %r, expected one of %s" % (state, ", ".join(states.values())))
+
+
+def operation_count(document):
+    if isinstance(document, list):
+        return sum(operation_count(item) for item in document)
+    if "operations" in document:
+        return sum(len(validation_pass) for validation_pass in document["operations"])
+
+    return 1
+
+
+def event_parameters(event):
+    parameters = event.payload._asdict()
+    parameters.update(
+        contract = event.contract,
+        operation_hash = event.operation_hash,
+        level = event.level,
+        timestamp = event.timestamp,
+    )
+
+    return parameters
+
+
+class Indexer:
+    def __init__(self, path, contracts = None, batch_size = DEFAULT_BATCH_SIZE):
+        # `contracts` limits the indexed events to the contracts of one deployment;
+        # LUW IDs are only unique within one LUW contract
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.contracts = set(contracts) if contracts else None
+        self.batch_size = batch_size
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    #############
+    # Ingestion #
+    #############
+
+    def checkpoint(self, source):
+        found = self.connection.execute(
+            "SELECT documents, level, block_hash FROM checkpoints WHERE source = ?", (source,)
+        ).fetchone()
+
+        return Checkpoint(*found) if found else Checkpoint(documents = 0, level = None, block_hash = None)
+
+    def verify_known(self, tag, row):
+        if tag not in KNOWN_RECORDS:
+            return
+
+        record, query = KNOWN_RECORDS[tag]
+        if self.connection.execute(query, row).fetchone() is None:
+            raise IndexerError("%s event of %s, which is not indexed: it was imported, or created before the "
+                "ingested receipts" % (tag, record % row))
+
+    def apply(self, decoded):
+        # Consecutive events with the same tag are inserted with one executemany,
+        # which keeps the order of the events across tags
+        for tag, tag_events in itertools.groupby(decoded, key = lambda event: event.tag):
+            statements = STATEMENTS.get(tag)
+            if statements is None:
+                continue
+
+            parameters = [event_parameters(event) for event in tag_events]
+
+            if len(statements) == 1:
+                # These events only update records, none of them creates one another needs
+                for row in parameters:
+                    self.verify_known(tag, row)
+
+                self.connection.executemany(statements[0], parameters)
+            else:
+                # Later statements of an event read what the earlier ones wrote
+                for row in parameters:
+                    self.verify_known(tag, row)
+
+                    for statement in statements:
+                        self.connection.execute(statement, row)
+
+    def commit_batch(self, source, decoded, documents, level, block_hash = None):
+        with self.connection:
+            self.apply(decoded)
+
+            if source is not None:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO checkpoints (source, documents, level, block_hash) VALUES (?, ?, ?, ?)",
+                    (source, documents, level, block_hash),
+                )
+
+    def ingest(self, documents, source):
+        # Ingests an iterable of blocks, operations or lists of them. Documents of
+        # the source that were ingested before are skipped, unless `source` is None.
+        checkpoint = self.checkpoint(source) if source is not None else Checkpoint(documents = 0, level = None, block_hash = None)
+        count, level = checkpoint.documents, checkpoint.level
+
+        stats = IngestStats(documents = 0, operations = 0, events = 0)
+        batch = []
+        batch_documents = 0
+
+        for document in itertools.islice(documents, checkpoint.documents, None):
+            decoded = events.events_from_json(document, self.contracts)
+            batch += decoded
+
+            count += 1
+            batch_documents += 1
+            level = document.get("header", {}).get("level", level) if isinstance(document, dict) else level
+
+            stats = IngestStats(
+                documents = stats.documents + 1,
+                operations = stats.operations + operation_count(document),
+                events = stats.events + len(decoded),
+            )
+
+            if batch_documents >= self.batch_size:
+                self.commit_batch(source, batch, count, level)
+                batch = []
+                batch_documents = 0
+
+        if batch_documents:
+            self.commit_batch(source, batch, count, level)
+
+        return stats
+
+    def follow(self, node, from_level = None, to_level = None, finality_depth = FINALITY_DEPTH):
+        # Ingests the final blocks of a node from the checkpoint, or `from_level`, up
+        # to `to_level` or the last final block
+        node = node.rstrip("/")
+
+        def get(path):
+            with urllib.request.urlopen(node + path) as response:
+                return json.load(response)
+
+        checkpoint = self.checkpoint(node)
+        first_level = checkpoint.level + 1 if checkpoint.level is not None else (from_level or 1)
+        last_level = get("/chains/main/blocks/head/header")["level"] - finality_depth
+        if to_level is not None:
+            last_level = min(last_level, to_level)
+
+        stats = IngestStats(documents = 0, operations = 0, events = 0)
+        batch = []
+        block_hash = checkpoint.block_hash
+
+        # Blocks are checkpointed by level, which is where the next run starts from,
+        # and by hash, which the next block has to build on
+        for level in range(first_level, last_level + 1):
+            block = get("/chains/main/blocks/%d" % level)
+
+            predecessor = block.get("header", {}).get("predecessor")
+            if block_hash is not None and predecessor is not None and predecessor != block_hash:
+                raise IndexerError("Block %d builds on %s, not on the indexed block %s: the indexed blocks were "
+                    "replaced by a reorganization deeper than the finality depth" % (level, predecessor, block_hash))
+            block_hash = block.get("hash")
+
+            decoded = events.events_from_block(block, self.contracts)
+            batch += decoded
+
+            stats = IngestStats(
+                documents = stats.documents + 1,
+                operations = stats.operations + operation_count(block),
+                events = stats.events + len(decoded),
+            )
+
+            if stats.documents % self.batch_size == 0 or level == last_level:
+                self.commit_batch(node, batch, checkpoint.documents + stats.documents, level, block_hash)
+                batch = []
+
+        return stats
+
+    ###########
+    # Queries #
+    ###########
+
+    def asset_twins(self, provider_id):
+        return [AssetTwin(*found) for found in self.connection.execute(
+            """SELECT anchor_hash, provider_id, registration_count, latest_registration
+                FROM asset_twins WHERE provider_id = ? ORDER BY anchor_hash""",
+            (provider_id,),
+        )]
+
+    def luws(self, state):
+        return [LUW(*found) for found in self.connection.execute(
+            """SELECT luw_id, creator_wallet_address, active_state_id, state_count, repository_count, created_level
+                FROM luws WHERE active_state_id = ? ORDER BY luw_id""",
+            (state_id(LUW_STATES, state),),
+        )]
+
+    def providers(self, status):
+        return [Provider(*found) for found in self.connection.execute(
+            """SELECT provider_id, contract, creator_wallet_address, owner_address, status, created_level, data_changed_level
+                FROM providers WHERE status = ? ORDER BY provider_id""",
+            (state_id(PROVIDER_STATUSES, status),),
+        )]
+
+    def luw_repositories(self, luw_id):
+        # Repository ID and state ID of every repository of the LUW, in the order they were added
+        return self.connection.execute(
+            "SELECT repository_id, state_id FROM luw_repositories WHERE luw_id = ? ORDER BY n", (luw_id,)
+        ).fetchall()
+
+
+def print_rows(rows):
+    from oat.benchmarks import format_table
+
+    print(format_table([row._asdict() for row in rows]) if rows else "No results")
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m oat.indexer")
+    parser.add_argument("database", help = "SQLite database file, created when missing")
+    parser.add_argument("--contract", action = "append",
+        help = "only index the events of this contract, may be repeated (default: every contract)")
+    parser.add_argument("--batch-size", type = int, default = DEFAULT_BATCH_SIZE,
+        help = "documents per transaction (default: %d)" % DEFAULT_BATCH_SIZE)
+    commands = parser.add_subparsers(dest = "command", required = True)
+
+    ingest = commands.add_parser("ingest", help = "ingest block or operation receipts as JSON or JSON lines")
+    ingest.add_argument("files", nargs = "*", help = "receipt files (default: stdin)")
+    ingest.add_argument("--source", help = "checkpoint name of stdin (default: none, stdin is not checkpointed)")
+
+    follow = commands.add_parser("follow", help = "ingest the final blocks of a node")
+    follow.add_argument("node", help = "node RPC URL")
+    follow.add_argument("--from-level", type = int, help = "first level when the node was never followed (default: 1)")
+    follow.add_argument("--finality-depth", type = int, default = FINALITY_DEPTH,
+        help = "levels below the head of the last final block (default: %d)" % FINALITY_DEPTH)
+
+    query = commands.add_parser("query", help = "print the indexed state")
+    query.add_argument("table", choices = ("twins", "luws", "providers"))
+    query.add_argument("key", help = "provider ID for twins, state for luws, status for providers (ID or name)")
+
+    args = parser.parse_args(argv)
+
+    with Indexer(args.database, contracts = args.contract, batch_size = args.batch_size) as indexer:
+        try:
+            if args.command == "ingest":
+                for path in args.files or [None]:
+                    with open(path) if path else sys.stdin as stream:
+                        source = str(Path(path).resolve()) if path else args.source
+                        stats = indexer.ingest(events.read_documents(stream), source)
+                    print("%s: %d documents, %d operations, %d events" % (
+                        path or "stdin", stats.documents, stats.operations, stats.events
+                    ))
+            elif args.command == "follow":
+                stats = indexer.follow(args.node, from_level = args.from_level, finality_depth = args.finality_depth)
+                print("%d blocks, %d operations, %d events" % stats)
+            elif args.table == "twins":
+                print_rows(indexer.asset_twins(args.key))
+            elif args.table == "luws":
+                print_rows(indexer.luws(args.key))
+            else:
+                print_rows(indexer.providers(args.key))
+        except (OSError, ValueError, IndexerError) as error:
+            parser.exit(1, "%s\n" % error)
+
+
+if __name__ == "__main__":
+    main()
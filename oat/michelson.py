@@ -0,0 +1,89 @@
+# Michelson literals for entry point arguments and initial storage
+#
+# The contracts are compiled with the legacy SmartPy defaults: record fields are
+# sorted by name and laid out as a balanced ("tree") pair structure.
+
+STRING_ESCAPES = {
+    "\"": "\\\"",
+    "\\": "\\\\",
+    "\n": "\\n",
+    "\r": "\\r",
+    "\t": "\\t",
+}
+
+
+def string(value):
+    # Michelson strings are restricted to printable ASCII plus a few escapes
+    if any(ord(character) > 126 or (ord(character) < 32 and character not in STRING_ESCAPES) for character in value):
+        raise ValueError("Michelson strings only allow printable ASCII: %r" % value)
+
+    return '"%s"' % "".join(STRING_ESCAPES.get(character, character) for character in value)
+
+
+def nat(value):
+    if value < 0:
+        raise ValueError("nat literal must be non-negative: %d" % value)
+    return str(value)
+
+
+def integer(value):
+    return str(value)
+
+
+def address(value):
+    return string(value)
+
+
+def timestamp(value):
+    # Seconds since epoch, which is what sp.timestamp(...) compiles to
+    return str(value)
+
+
+def bytes_(value):
+    return "0x" + value.hex()
+
+
+def boolean(value):
+    return "True" if value else "False"
+
+
+def unit():
+    return "Unit"
+
+
+def some(value):
+    return "(Some %s)" % value
+
+
+def none():
+    return "None"
+
+
+def pair(left, right):
+    return "(Pair %s %s)" % (left, right)
+
+
+def sequence(items):
+    return "{ %s }" % "; ".join(items) if items else "{}"
+
+
+def mapping(items):
+    # Michelson maps must be given in increasing key order; callers pass the
+    # (key, value) literal pairs already sorted
+    elements = ["Elt %s %s" % (key, value) for key, value in items]
+    return sequence(elements)
+
+
+def tree(values):
+    if len(values) == 1:
+        return values[0]
+
+    middle = len(values) // 2
+    return pair(tree(values[:middle]), tree(values[middle:]))
+
+
+def record(**fields):
+    if not fields:
+        return unit()
+
+    return tree([fields[name] for name in sorted(fields)])
@@ -0,0 +1,1195 @@
+# Pure-Python model of the Registry topology
+#
+# An executable model of AssetProvider, AssetProviderRepository, AssetTwinTracing,
+# LUW, LUWRepository and Registry, for simulations far larger than the SmartPy
+# interpreter can run. Every entry point and view of the six contracts is mirrored,
+# with the same checks in the same order, the same error messages, the same
+# storage layout and the same events. modelScenarios.py replays random operation
+# sequences on both the model and the contracts, and checks they agree.
+#
+# Entry points take the source and the sender of the call first, then the fields
+# of their parameter record. Views take the fields of their parameter and return
+# dicts for records. Accounts and contracts are addressed by name. A failing call
+# raises ContractError with the FAILWITH message, or None for failures without a
+# message of their own, such as reading a missing big_map entry.
+#
+# Operations are atomic, as on chain. The logic contracts only check and call, and
+# every storage entry point checks the whole call, batches included, before
+# writing anything, so a failing operation never leaves partial writes behind.
+#
+# The model only depends on the standard library, so that SmartPy scenarios can
+# load it as a stored contract.
+
+import random
+from collections import namedtuple
+
+# State IDs and names, as in LUWRepository.py and AssetProviderRepository.py
+LUW_STATES = {
+    1: "active",
+    2: "prepare_to_commit",
+    3: "committed",
+    4: "aborted"
+}
+
+REPOSITORY_STATES = {
+    1: "open",
+    2: "ready",
+    3: "committed",
+    4: "rollbacked"
+}
+
+PROVIDER_STATUSES = {
+    1: "active",
+    2: "deprecated"
+}
+
+# The accounts random operations are sent from, named as in testFixture.py
+ACCOUNTS = ("certifier", "operator_A", "operator_B")
+
+# The account LUW service endpoints point to
+ENDPOINT_ACCOUNT = "offchain_coordinator"
+
+# Random LUW operations mostly go to one of the last so many LUWs created, or to a LUW
+# in one of the active states they need
+RECENT_LUWS = 2
+
+# Valid LUW and repository states are drawn with these weights: commits need the LUW
+# prepared to commit and every repository ready, state 2 both
+STATE_WEIGHTS = {1: 1, 2: 3, 3: 1, 4: 1}
+
+LUW_ACTIVE_STATES = {
+    "add_luw_repository": (1,),
+    "add_luw_repositories": (1,),
+    "commit_luw": (2,),
+    "abort_luw": (1, 2),
+}
+
+# Registry entry points and the parameters they take, in the order of the parameter record
+REGISTRY_ENTRY_POINTS = {
+    "create_asset_provider": ("provider_id", "provider_data"),
+    "set_provider_data": ("provider_id", "provider_data"),
+    "set_provider_active": ("provider_id",),
+    "set_provider_deprecated": ("provider_id",),
+    "set_provider_status": ("provider_id", "status"),
+    "set_provider_owner": ("provider_id", "new_owner_address"),
+    "register_asset_twin": ("anchor_hash", "provider_id", "repo_end_point"),
+    "register_asset_twins_batch": ("asset_twins",),
+    "set_max_batch_size": ("max_batch_size",),
+    "sync_storage_contracts": (),
+    "create_luw": ("provider_id", "luw_service_endpoint"),
+    "change_luw_state": ("luw_id", "state_id"),
+    "add_luw_repository": ("luw_id", "repository_id"),
+    "change_luw_repository_state": ("luw_id", "repository_id", "state_id"),
+    "add_luw_repositories": ("luw_id", "repository_ids"),
+    "change_luw_repository_states": ("luw_id", "repositories"),
+    "commit_luw": ("luw_id",),
+    "abort_luw": ("luw_id",),
+}
+
+Operation = namedtuple("Operation", ["entry_point", "sender", "now", "parameters"])
+
+Event = namedtuple("Event", ["contract", "tag", "payload"])
+
+
+class ContractError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+###########
+# Records #
+###########
+
+class Record:
+    __slots__ = ()
+
+    def _asdict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__, ", ".join("%s=%r" % item for item in self._asdict().items()))
+
+
+class Provider(Record):
+    __slots__ = ("provider_id", "provider_data", "status", "creator_wallet_address")
+
+    def __init__(self, provider_id, provider_data, status, creator_wallet_address):
+        self.provider_id = provider_id
+        self.provider_data = provider_data
+        self.status = status
+        self.creator_wallet_address = creator_wallet_address
+
+
+class AssetTwin(Record):
+    __slots__ = ("asset_repository_endpoint", "creator_wallet_address", "latest_registration", "registration_count")
+
+    def __init__(self, asset_repository_endpoint, creator_wallet_address, latest_registration, registration_count):
+        self.asset_repository_endpoint = asset_repository_endpoint
+        self.creator_wallet_address = creator_wallet_address
+        self.latest_registration = latest_registration
+        self.registration_count = registration_count
+
+
+class LUWHeader(Record):
+    __slots__ = (
+        "creator_wallet_address",
+        "provider_id",
+        "luw_service_endpoint",
+        "active_state_id",
+        "state_count",
+        "repository_count",
+    )
+
+    def __init__(self, creator_wallet_address, provider_id, luw_service_endpoint, active_state_id, state_count, repository_count):
+        self.creator_wallet_address = creator_wallet_address
+        self.provider_id = provider_id
+        self.luw_service_endpoint = luw_service_endpoint
+        self.active_state_id = active_state_id
+        self.state_count = state_count
+        self.repository_count = repository_count
+
+
+###########
+# Network #
+###########
+
+class Network:
+    # The contracts by address and the time of the current operation. Events are
+    # only kept when record_events is set, to keep long simulations lean.
+    __slots__ = ("contracts", "now", "events")
+
+    def __init__(self, record_events = False):
+        self.contracts = {}
+        self.now = 0
+        self.events = [] if record_events else None
+
+    def originate(self, contract):
+        contract.address = "KT1_model_%d" % len(self.contracts)
+        self.contracts[contract.address] = contract
+
+        return contract
+
+    def call(self, source, address, entry_point, parameters, now = None):
+        # Runs a whole operation from an account; returns the ContractError it
+        # failed with, or None when it succeeded
+        if now is not None:
+            self.now = now
+        events = self.events
+        recorded = len(events) if events is not None else 0
+
+        try:
+            getattr(self.contracts[address], entry_point)(source, source, **parameters)
+        except ContractError as error:
+            if events is not None:
+                del events[recorded:]
+            return error
+
+        return None
+
+
+class Contract:
+    __slots__ = ("network", "address")
+
+    def __init__(self, network):
+        self.network = network
+        self.address = None
+
+    def contract(self, address):
+        # sp.contract(...).open_some()
+        try:
+            return self.network.contracts[address]
+        except KeyError:
+            raise ContractError(None)
+
+    def emit(self, tag, **payload):
+        events = self.network.events
+        if events is not None:
+            events.append(Event(self.address, tag, payload))
+
+
+def verify(condition, message):
+    if not condition:
+        raise ContractError(message)
+
+
+def get(big_map, key):
+    # Reading a missing entry fails without a message
+    try:
+        return big_map[key]
+    except KeyError:
+        raise ContractError(None)
+
+
+def verify_logic_contract(logic_contract_address, sender):
+    if logic_contract_address is None:
+        raise ContractError("Empty logic_contract_address")
+    if logic_contract_address != sender:
+        raise ContractError("Incorrect caller")
+
+
+def verify_certifier(certifier, source):
+    if certifier != source:
+        raise ContractError("Incorrect certifier")
+
+
+###################
+# Asset Providers #
+###################
+
+class AssetProvider(Contract):
+    __slots__ = ("asset_providers", "logic_contract_address", "certifier")
+
+    def __init__(self, network, certifier):
+        super().__init__(network)
+        self.asset_providers = {}
+        self.logic_contract_address = None
+        self.certifier = certifier
+
+    def create_asset_provider(self, source, sender, provider_id, provider_data, status, creator_wallet_address):
+        verify_logic_contract(self.logic_contract_address, sender)
+
+        self.asset_providers[provider_id] = Provider(provider_id, provider_data, status, creator_wallet_address)
+
+        self.emit("provider_created", provider_id = provider_id, creator_wallet_address = creator_wallet_address)
+
+    def change_status(self, source, sender, provider_id, status):
+        verify_logic_contract(self.logic_contract_address, sender)
+
+        get(self.asset_providers, provider_id).status = status
+
+        self.emit("provider_status_changed", provider_id = provider_id, status = status)
+
+    def change_data(self, source, sender, provider_id, provider_data):
+        verify_logic_contract(self.logic_contract_address, sender)
+
+        get(self.asset_providers, provider_id).provider_data = provider_data
+
+        self.emit("provider_data_changed", provider_id = provider_id)
+
+    def change_owner(self, source, sender, provider_id, new_owner_address):
+        verify_logic_contract(self.logic_contract_address, sender)
+
+        get(self.asset_providers, provider_id).creator_wallet_address = new_owner_address
+
+        self.emit("provider_owner_changed", provider_id = provider_id, new_owner_address = new_owner_address)
+
+    def change_logic_contract_address(self, source, sender, new_logic_contract_address):
+        verify_certifier(self.certifier, source)
+
+        self.logic_contract_address = new_logic_contract_address
+
+    # Views
+
+    def get_asset_provider(self, provider_id):
+        verify(provider_id in self.asset_providers, "Provider ID does not exist")
+        return self.asset_providers[provider_id]._asdict()
+
+    def verify_provider_exists(self, provider_id):
+        return provider_id in self.asset_providers
+
+    def get_provider_owner_address(self, provider_id):
+        verify(provider_id in self.asset_providers, "Provider ID does not exist")
+        return self.asset_providers[provider_id].creator_wallet_address
+
+    def get_provider_auth_context(self, provider_id):
+        provider = self.asset_providers.get(provider_id)
+
+        if provider is None:
+            return dict(exists = False, owner_address = None, status = None)
+
+        return dict(exists = True, owner_address = provider.creator_wallet_address, status = provider.status)
+
+
+class AssetProviderRepository(Contract):
+    __slots__ = ("storage_contract", "certifier", "content_addressed")
+
+    def __init__(self, network, storage_contract, certifier, content_addressed = False):
+        super().__init__(network)
+        self.storage_contract = storage_contract
+        self.certifier = certifier
+        self.content_addressed = content_addressed
+
+    def verify_provider_owner(self, source, provider_id):
+        provider_auth_context = self.contract(self.storage_contract).get_provider_auth_context(provider_id)
+
+        verify(provider_auth_context["exists"], "Provider ID does not exist")
+        verify(provider_auth_context["owner_address"] == source, "Non-matching owner address")
+
+    def verify_provider_data(self, provider_data):
+        if self.content_addressed:
+            verify(len(provider_data["digest"]) == 32, "Invalid digest length")
+
+    def create_asset_provider(self, source, sender, provider_id, provider_data):
+        storage = self.contract(self.storage_contract)
+
+        verify(not storage.get_provider_auth_context(provider_id)["exists"], "Provider ID already exists")
+        self.verify_provider_data(provider_data)
+
+        storage.create_asset_provider(source, self.address, provider_id, provider_data, 1, source)
+
+    def set_provider_active(self, source, sender, provider_id):
+        self.verify_provider_owner(source, provider_id)
+
+        self.contract(self.storage_contract).change_status(source, self.address, provider_id, 1)
+
+    def set_provider_deprecated(self, source, sender, provider_id):
+        self.verify_provider_owner(source, provider_id)
+
+        self.contract(self.storage_contract).change_status(source, self.address, provider_id, 2)
+
+    def set_provider_status(self, source, sender, provider_id, status):
+        self.verify_provider_owner(source, provider_id)
+        storage = self.contract(self.storage_contract)
+
+        verify(status in PROVIDER_STATUSES, "Incorrect status")
+
+        storage.change_status(source, self.address, provider_id, status)
+
+    def set_provider_data(self, source, sender, provider_id, provider_data):
+        self.verify_provider_owner(source, provider_id)
+        self.verify_provider_data(provider_data)
+
+        self.contract(self.storage_contract).change_data(source, self.address, provider_id, provider_data)
+
+    def set_provider_owner(self, source, sender, provider_id, new_owner_address):
+        self.verify_provider_owner(source, provider_id)
+
+        self.contract(self.storage_contract).change_owner(source, self.address, provider_id, new_owner_address)
+
+    def update_storage_contract_with_address(self, source, sender):
+        verify_certifier(self.certifier, source)
+
+        self.contract(self.storage_contract).change_logic_contract_address(source, self.address, self.address)
+
+    # Views
+
+    def get_asset_provider(self, provider_id):
+        provider = self.contract(self.storage_contract).get_asset_provider(provider_id)
+
+        return dict(
+            provider_id = provider_id,
+            provider_data = provider["provider_data"],
+            status = get(PROVIDER_STATUSES, provider["status"]),
+            creator_wallet_address = provider["creator_wallet_address"],
+        )
+
+    def get_storage_contract(self):
+        return self.storage_contract
+
+
+###############
+# Asset Twins #
+###############
+
+class AssetTwinTracing(Contract):
+    __slots__ = (
+        "assets",
+        "registration_history",
+        "calling_contract_address",
+        "max_batch_size",
+        "certifier",
+        "history_page_limit",
+    )
+
+    def __init__(self, network, certifier, history_page_limit = 100, max_batch_size = 100):
+        super().__init__(network)
+        self.assets = {}
+        self.registration_history = {}
+        self.calling_contract_address = None
+        self.max_batch_size = max_batch_size
+        self.certifier = certifier
+        self.history_page_limit = history_page_limit
+
+    def verify_calling_contract(self, sender):
+        if self.calling_contract_address is None:
+            raise ContractError("Empty calling contract address")
+        if self.calling_contract_address != sender:
+            raise ContractError("Incorrect caller")
+
+    def register_asset_twin(self, source, anchor_hash, provider_id, repo_end_point):
+        asset_key = (anchor_hash, provider_id)
+        now = self.network.now
+
+        asset_twin = self.assets.get(asset_key)
+
+        if asset_twin is not None:
+            self.registration_history[(asset_key, asset_twin.registration_count)] = now
+            asset_twin.latest_registration = now
+            asset_twin.registration_count += 1
+        else:
+            self.registration_history[(asset_key, 0)] = now
+            asset_twin = self.assets[asset_key] = AssetTwin(repo_end_point, source, now, 1)
+
+        self.emit("asset_twin_registered",
+            anchor_hash = anchor_hash, provider_id = provider_id, registration_count = asset_twin.registration_count)
+
+    def register(self, source, sender, anchor_hash, provider_id, repo_end_point):
+        self.verify_calling_contract(sender)
+
+        self.register_asset_twin(source, anchor_hash, provider_id, repo_end_point)
+
+    def register_asset_twins_batch(self, source, sender, asset_twins):
+        self.verify_calling_contract(sender)
+
+        verify(len(asset_twins) > 0, "Empty batch")
+        verify(len(asset_twins) <= self.max_batch_size, "Batch size exceeds limit")
+
+        for asset_twin in asset_twins:
+            self.register_asset_twin(source, asset_twin["anchor_hash"], asset_twin["provider_id"], asset_twin["repo_end_point"])
+
+    def import_asset_twins(self, source, sender, asset_twins):
+        verify_certifier(self.certifier, source)
+
+        # An asset twin is also rejected when it comes twice in the import
+        imported_keys = set()
+        for asset_twin in asset_twins:
+            for provider_id, provider in sorted(asset_twin["providers"].items()):
+                asset_key = (asset_twin["anchor_hash"], provider_id)
+                verify(asset_key not in self.assets and asset_key not in imported_keys, "Asset twin already exists")
+                verify(len(provider["registration_timestamps"]) > 0, "Empty registration history")
+                imported_keys.add(asset_key)
+
+        for asset_twin in asset_twins:
+            for provider_id, provider in sorted(asset_twin["providers"].items()):
+                asset_key = (asset_twin["anchor_hash"], provider_id)
+                registration_timestamps = provider["registration_timestamps"]
+                registration_count = len(registration_timestamps)
+
+                # The old timestamp lists are ordered from the latest registration to the first one
+                for index, registration_timestamp in enumerate(registration_timestamps):
+                    self.registration_history[(asset_key, registration_count - 1 - index)] = registration_timestamp
+
+                self.assets[asset_key] = AssetTwin(
+                    provider["asset_repository_endpoint"],
+                    provider["creator_wallet_address"],
+                    registration_timestamps[0],
+                    registration_count,
+                )
+
+    def change_calling_contract_address(self, source, sender, new_calling_contract_address):
+        verify_certifier(self.certifier, source)
+
+        self.calling_contract_address = new_calling_contract_address
+
+    def set_max_batch_size(self, source, sender, max_batch_size):
+        verify_certifier(self.certifier, source)
+
+        self.max_batch_size = max_batch_size
+
+    # Views
+
+    def fetch_asset_twin(self, anchor_hash, provider_id):
+        asset_twin = self.assets.get((anchor_hash, provider_id))
+        verify(asset_twin is not None, "Hash not found")
+
+        return asset_twin._asdict()
+
+    def fetch_asset_twin_history(self, anchor_hash, provider_id, offset, limit):
+        asset_key = (anchor_hash, provider_id)
+        asset_twin = self.assets.get(asset_key)
+
+        verify(asset_twin is not None, "Hash not found")
+        verify(limit <= self.history_page_limit, "History page limit exceeded")
+
+        page_end = min(offset + limit, asset_twin.registration_count)
+
+        return {index: get(self.registration_history, (asset_key, index)) for index in range(offset, page_end)}
+
+
+########
+# LUWs #
+########
+
+class LUW(Contract):
+    __slots__ = (
+        "luw_map",
+        "state_history",
+        "repository_states",
+        "repository_index",
+        "luw_last_id",
+        "logic_contract_address",
+        "certifier",
+        "page_limit",
+    )
+
+    def __init__(self, network, certifier, page_limit = 100):
+        super().__init__(network)
+        self.luw_map = {}
+        self.state_history = {}
+        self.repository_states = {}
+        self.repository_index = {}
+        self.luw_last_id = 0
+        self.logic_contract_address = None
+        self.certifier = certifier
+        self.page_limit = page_limit
+
+    def build_state_history(self, luw_id, state_count):
+        return {state_key: get(self.state_history, (luw_id, state_key)) for state_key in range(1, state_count + 1)}
+
+    def build_repository_endpoints(self, luw_id, repository_count):
+        repository_endpoints = {}
+
+        for repository_key in range(repository_count):
+            repository_id = get(self.repository_index, (luw_id, repository_key))
+            repository_endpoints[repository_id] = get(self.repository_states, (luw_id, repository_id))
+
+        return repository_endpoints
+
+    def luw(self, luw_id):
+        luw = self.luw_map.get(luw_id)
+        verify(luw is not None, "LUW ID does not exist")
+
+        return luw
+
+    def add(self, source, sender, provider_id, luw_service_endpoint):
+        verify_logic_contract(self.logic_contract_address, sender)
+
+        luw_id = self.luw_last_id
+
+        self.luw_map[luw_id] = LUWHeader(source, provider_id, luw_service_endpoint, 1, 1, 0)
+        self.state_history[(luw_id, 1)] = 1
+
+        self.emit("luw_created", luw_id = luw_id, creator_wallet_address = source)
+
+        self.luw_last_id += 1
+
+    def add_state(self, source, sender, luw_id, state_id):
+        verify_logic_contract(self.logic_contract_address, sender)
+        luw = self.luw(luw_id)
+
+        luw.state_count += 1
+        luw.active_state_id = state_id
+        self.state_history[(luw_id, luw.state_count)] = state_id
+
+        self.emit("luw_state_added", luw_id = luw_id, state_id = state_id)
+
+    def add_repository(self, source, sender, luw_id, repository_id, state_id):
+        verify_logic_contract(self.logic_contract_address, sender)
+        luw = self.luw(luw_id)
+
+        repository_key = (luw_id, repository_id)
+        verify(repository_key not in self.repository_states, "Repository ID already exists")
+
+        self.repository_states[repository_key] = state_id
+        self.repository_index[(luw_id, luw.repository_count)] = repository_id
+        luw.repository_count += 1
+
+        self.emit("repository_added", luw_id = luw_id, repository_id = repository_id, state_id = state_id)
+
+    def add_repositories(self, source, sender, luw_id, repository_ids, state_id):
+        verify_logic_contract(self.logic_contract_address, sender)
+        luw = self.luw(luw_id)
+
+        # A repository is also rejected when it comes twice in the batch
+        added = set()
+        for repository_id in repository_ids:
+            verify((luw_id, repository_id) not in self.repository_states and repository_id not in added,
+                "Repository ID already exists")
+            added.add(repository_id)
+
+        for repository_id in repository_ids:
+            self.repository_states[(luw_id, repository_id)] = state_id
+            self.repository_index[(luw_id, luw.repository_count)] = repository_id
+            luw.repository_count += 1
+
+            self.emit("repository_added", luw_id = luw_id, repository_id = repository_id, state_id = state_id)
+
+    def change_repository_state(self, source, sender, luw_id, repository_id, state_id):
+        verify_logic_contract(self.logic_contract_address, sender)
+        self.luw(luw_id)
+
+        repository_key = (luw_id, repository_id)
+        verify(repository_key in self.repository_states, "Repository ID does not exist")
+
+        self.repository_states[repository_key] = state_id
+
+        self.emit("repository_state_changed", luw_id = luw_id, repository_id = repository_id, state_id = state_id)
+
+    def change_repository_states(self, source, sender, luw_id, repositories):
+        verify_logic_contract(self.logic_contract_address, sender)
+        self.luw(luw_id)
+
+        for repository in repositories:
+            verify((luw_id, repository["repository_id"]) in self.repository_states, "Repository ID does not exist")
+
+        for repository in repositories:
+            self.repository_states[(luw_id, repository["repository_id"])] = repository["state_id"]
+
+            self.emit("repository_state_changed",
+                luw_id = luw_id, repository_id = repository["repository_id"], state_id = repository["state_id"])
+
+    def close(self, source, sender, luw_id, luw_state_id, repository_state_id, ready_state_id):
+        verify_logic_contract(self.logic_contract_address, sender)
+        luw = self.luw(luw_id)
+
+        repository_keys = [
+            (luw_id, get(self.repository_index, (luw_id, repository_index)))
+            for repository_index in range(luw.repository_count)
+        ]
+
+        for repository_key in repository_keys:
+            repository_state = get(self.repository_states, repository_key)
+            if ready_state_id is not None:
+                verify(repository_state == ready_state_id, "Repository is not ready")
+
+        for repository_key in repository_keys:
+            self.repository_states[repository_key] = repository_state_id
+
+        luw.state_count += 1
+        luw.active_state_id = luw_state_id
+        self.state_history[(luw_id, luw.state_count)] = luw_state_id
+
+        self.emit("luw_repositories_closed", luw_id = luw_id, state_id = repository_state_id)
+        self.emit("luw_state_added", luw_id = luw_id, state_id = luw_state_id)
+
+    def import_luws(self, source, sender, luws):
+        verify_certifier(self.certifier, source)
+
+        imported_ids = set()
+        for imported in luws:
+            verify(imported["luw_id"] not in self.luw_map and imported["luw_id"] not in imported_ids, "LUW ID already exists")
+            state_count = len(imported["luw"]["state_history"])
+            verify(state_count > 0, "Empty state history")
+            verify(all(1 <= state_key <= state_count for state_key in imported["luw"]["state_history"]), "Invalid state history")
+            imported_ids.add(imported["luw_id"])
+
+        for imported in luws:
+            luw_id = imported["luw_id"]
+            luw = imported["luw"]
+
+            for state_key, state_id in luw["state_history"].items():
+                self.state_history[(luw_id, state_key)] = state_id
+
+            # Maps are iterated in key order
+            repository_ids = sorted(luw["repository_endpoints"])
+            for repository_key, repository_id in enumerate(repository_ids):
+                self.repository_states[(luw_id, repository_id)] = luw["repository_endpoints"][repository_id]
+                self.repository_index[(luw_id, repository_key)] = repository_id
+
+            state_count = len(luw["state_history"])
+            self.luw_map[luw_id] = LUWHeader(
+                luw["creator_wallet_address"],
+                luw["provider_id"],
+                luw["luw_service_endpoint"],
+                luw["state_history"][state_count],
+                state_count,
+                len(repository_ids),
+            )
+
+            if luw_id >= self.luw_last_id:
+                self.luw_last_id = luw_id + 1
+
+    def change_logic_contract_address(self, source, sender, new_logic_contract_address):
+        verify_certifier(self.certifier, source)
+
+        self.logic_contract_address = new_logic_contract_address
+
+    # Views
+
+    def fetch(self, luw_id):
+        luw = self.luw(luw_id)
+
+        return dict(
+            creator_wallet_address = luw.creator_wallet_address,
+            provider_id = luw.provider_id,
+            luw_service_endpoint = luw.luw_service_endpoint,
+            state_history = self.build_state_history(luw_id, luw.state_count),
+            repository_endpoints = self.build_repository_endpoints(luw_id, luw.repository_count),
+        )
+
+    def fetch_page(self, luw_id, offset, limit):
+        luw = self.luw(luw_id)
+        verify(limit <= self.page_limit, "Page limit exceeded")
+
+        state_page_end = min(offset + limit, luw.state_count)
+        repository_page_end = min(offset + limit, luw.repository_count)
+
+        repository_endpoints = {}
+        for repository_key in range(offset, repository_page_end):
+            repository_id = get(self.repository_index, (luw_id, repository_key))
+            repository_endpoints[repository_id] = get(self.repository_states, (luw_id, repository_id))
+
+        return dict(
+            creator_wallet_address = luw.creator_wallet_address,
+            provider_id = luw.provider_id,
+            luw_service_endpoint = luw.luw_service_endpoint,
+            active_state_id = luw.active_state_id,
+            state_count = luw.state_count,
+            repository_count = luw.repository_count,
+            state_history = {
+                state_key: get(self.state_history, (luw_id, state_key)) for state_key in range(offset + 1, state_page_end + 1)
+            },
+            repository_endpoints = repository_endpoints,
+        )
+
+    def get_active_luw_state(self, luw_id):
+        return self.luw(luw_id).active_state_id
+
+    def get_luw_state_history(self, luw_id):
+        return self.build_state_history(luw_id, self.luw(luw_id).state_count)
+
+    def get_luw_owner_address(self, luw_id):
+        return self.luw(luw_id).creator_wallet_address
+
+    def get_luw_repositories(self, luw_id):
+        return self.build_repository_endpoints(luw_id, self.luw(luw_id).repository_count)
+
+    def has_luw_repository(self, luw_id, repository_id):
+        self.luw(luw_id)
+        return (luw_id, repository_id) in self.repository_states
+
+    def get_luw_repository_state(self, luw_id, repository_id):
+        self.luw(luw_id)
+        return get(self.repository_states, (luw_id, repository_id))
+
+
+class LUWRepository(Contract):
+    __slots__ = ("storage_contract", "certifier")
+
+    def __init__(self, network, storage_contract, certifier):
+        super().__init__(network)
+        self.storage_contract = storage_contract
+        self.certifier = certifier
+
+    def verify_owner(self, storage, source, luw_id):
+        verify(storage.get_luw_owner_address(luw_id) == source, "Non-matching owner address")
+
+    def verify_luw_active(self, storage, luw_id):
+        verify(storage.get_active_luw_state(luw_id) == 1, "LUW is not Active")
+
+    def create_luw(self, source, sender, provider_id, luw_service_endpoint):
+        self.contract(self.storage_contract).add(source, self.address, provider_id, luw_service_endpoint)
+
+    def change_luw_state(self, source, sender, luw_id, state_id):
+        verify(state_id in LUW_STATES, "Incorrect state ID")
+
+        storage = self.contract(self.storage_contract)
+        self.verify_owner(storage, source, luw_id)
+
+        storage.add_state(source, self.address, luw_id, state_id)
+
+    def add_repository(self, source, sender, luw_id, repository_id):
+        storage = self.contract(self.storage_contract)
+        self.verify_owner(storage, source, luw_id)
+        self.verify_luw_active(storage, luw_id)
+
+        storage.add_repository(source, self.address, luw_id, repository_id, 1)
+
+    def change_repository_state(self, source, sender, luw_id, repository_id, state_id):
+        storage = self.contract(self.storage_contract)
+        self.verify_owner(storage, source, luw_id)
+
+        verify(storage.has_luw_repository(luw_id, repository_id), "Repository ID does not exist")
+        verify(state_id in REPOSITORY_STATES, "Incorrect state ID")
+
+        storage.change_repository_state(source, self.address, luw_id, repository_id, state_id)
+
+    def add_repositories(self, source, sender, luw_id, repository_ids):
+        verify(len(repository_ids) > 0, "Empty batch")
+
+        storage = self.contract(self.storage_contract)
+        self.verify_owner(storage, source, luw_id)
+        self.verify_luw_active(storage, luw_id)
+
+        storage.add_repositories(source, self.address, luw_id, repository_ids, 1)
+
+    def change_repository_states(self, source, sender, luw_id, repositories):
+        verify(len(repositories) > 0, "Empty batch")
+
+        storage = self.contract(self.storage_contract)
+        self.verify_owner(storage, source, luw_id)
+
+        for repository in repositories:
+            verify(repository["state_id"] in REPOSITORY_STATES, "Incorrect state ID")
+
+        storage.change_repository_states(source, self.address, luw_id, repositories)
+
+    def commit_luw(self, source, sender, luw_id):
+        storage = self.contract(self.storage_contract)
+        self.verify_owner(storage, source, luw_id)
+
+        verify(storage.get_active_luw_state(luw_id) == 2, "LUW is not prepared to commit")
+
+        storage.close(source, self.address, luw_id, 3, 3, 2)
+
+    def abort_luw(self, source, sender, luw_id):
+        storage = self.contract(self.storage_contract)
+        self.verify_owner(storage, source, luw_id)
+
+        verify(storage.get_active_luw_state(luw_id) in (1, 2), "LUW is already closed")
+
+        storage.close(source, self.address, luw_id, 4, 4, None)
+
+    def update_storage_contract_with_address(self, source, sender):
+        verify_certifier(self.certifier, source)
+
+        self.contract(self.storage_contract).change_logic_contract_address(source, self.address, self.address)
+
+    # Views
+
+    def fetch_luw(self, luw_id, offset, limit):
+        luw = self.contract(self.storage_contract).fetch_page(luw_id, offset, limit)
+        luw["luw_id"] = luw_id
+
+        return luw
+
+    def fetch_luw_decoded(self, luw_id):
+        luw = self.contract(self.storage_contract).fetch(luw_id)
+        luw["luw_id"] = luw_id
+        luw["state_history"] = {key: get(LUW_STATES, state_id) for key, state_id in luw["state_history"].items()}
+        luw["repository_endpoints"] = {
+            repository_id: get(REPOSITORY_STATES, state_id) for repository_id, state_id in luw["repository_endpoints"].items()
+        }
+
+        return luw
+
+    def get_active_luw_state(self, luw_id):
+        return get(LUW_STATES, self.contract(self.storage_contract).get_active_luw_state(luw_id))
+
+    def get_luw_repository_state(self, luw_id, repository_id):
+        return get(REPOSITORY_STATES, self.contract(self.storage_contract).get_luw_repository_state(luw_id, repository_id))
+
+    def get_storage_contract(self):
+        return self.storage_contract
+
+
+############
+# Registry #
+############
+
+class Registry(Contract):
+    __slots__ = (
+        "asset_provider_contract",
+        "asset_twin_contract",
+        "luw_contract",
+        "storage_contracts",
+        "max_batch_size",
+        "certifier",
+    )
+
+    def __init__(self, network, asset_provider_contract, asset_twin_contract, luw_contract, certifier, max_batch_size = 100):
+        super().__init__(network)
+        self.asset_provider_contract = asset_provider_contract
+        self.asset_twin_contract = asset_twin_contract
+        self.luw_contract = luw_contract
+        self.storage_contracts = None
+        self.max_batch_size = max_batch_size
+        self.certifier = certifier
+
+    def resolve_storage_contracts(self):
+        return dict(
+            luw_storage_contract_address = self.contract(self.luw_contract).get_storage_contract(),
+            provider_storage_contract_address = self.contract(self.asset_provider_contract).get_storage_contract(),
+        )
+
+    def create_asset_provider(self, source, sender, provider_id, provider_data):
+        self.contract(self.asset_provider_contract).create_asset_provider(source, self.address, provider_id, provider_data)
+
+    def set_provider_data(self, source, sender, provider_id, provider_data):
+        self.contract(self.asset_provider_contract).set_provider_data(source, self.address, provider_id, provider_data)
+
+    def set_provider_active(self, source, sender, provider_id):
+        self.contract(self.asset_provider_contract).set_provider_active(source, self.address, provider_id)
+
+    def set_provider_deprecated(self, source, sender, provider_id):
+        self.contract(self.asset_provider_contract).set_provider_deprecated(source, self.address, provider_id)
+
+    def set_provider_status(self, source, sender, provider_id, status):
+        self.contract(self.asset_provider_contract).set_provider_status(source, self.address, provider_id, status)
+
+    def set_provider_owner(self, source, sender, provider_id, new_owner_address):
+        self.contract(self.asset_provider_contract).set_provider_owner(source, self.address, provider_id, new_owner_address)
+
+    def register_asset_twin(self, source, sender, anchor_hash, provider_id, repo_end_point):
+        self.contract(self.asset_twin_contract).register(source, self.address, anchor_hash, provider_id, repo_end_point)
+
+    def register_asset_twins_batch(self, source, sender, asset_twins):
+        verify(len(asset_twins) <= self.max_batch_size, "Batch size exceeds limit")
+
+        self.contract(self.asset_twin_contract).register_asset_twins_batch(source, self.address, asset_twins)
+
+    def set_max_batch_size(self, source, sender, max_batch_size):
+        verify_certifier(self.certifier, source)
+
+        self.max_batch_size = max_batch_size
+
+    def sync_storage_contracts(self, source, sender):
+        verify_certifier(self.certifier, source)
+
+        self.storage_contracts = self.resolve_storage_contracts()
+
+    def create_luw(self, source, sender, provider_id, luw_service_endpoint):
+        self.contract(self.luw_contract).create_luw(source, self.address, provider_id, luw_service_endpoint)
+
+    def change_luw_state(self, source, sender, luw_id, state_id):
+        self.contract(self.luw_contract).change_luw_state(source, self.address, luw_id, state_id)
+
+    def add_luw_repository(self, source, sender, luw_id, repository_id):
+        self.contract(self.luw_contract).add_repository(source, self.address, luw_id, repository_id)
+
+    def change_luw_repository_state(self, source, sender, luw_id, repository_id, state_id):
+        self.contract(self.luw_contract).change_repository_state(source, self.address, luw_id, repository_id, state_id)
+
+    def add_luw_repositories(self, source, sender, luw_id, repository_ids):
+        verify(len(repository_ids) <= self.max_batch_size, "Batch size exceeds limit")
+
+        self.contract(self.luw_contract).add_repositories(source, self.address, luw_id, repository_ids)
+
+    def change_luw_repository_states(self, source, sender, luw_id, repositories):
+        verify(len(repositories) <= self.max_batch_size, "Batch size exceeds limit")
+
+        self.contract(self.luw_contract).change_repository_states(source, self.address, luw_id, repositories)
+
+    def commit_luw(self, source, sender, luw_id):
+        self.contract(self.luw_contract).commit_luw(source, self.address, luw_id)
+
+    def abort_luw(self, source, sender, luw_id):
+        self.contract(self.luw_contract).abort_luw(source, self.address, luw_id)
+
+    # Views
+
+    def get_asset_provider(self, provider_id):
+        return self.contract(self.asset_provider_contract).get_asset_provider(provider_id)
+
+    def fetch_asset_twin(self, anchor_hash, provider_id):
+        return self.contract(self.asset_twin_contract).fetch_asset_twin(anchor_hash, provider_id)
+
+    def fetch_asset_twin_history(self, anchor_hash, provider_id, offset, limit):
+        return self.contract(self.asset_twin_contract).fetch_asset_twin_history(anchor_hash, provider_id, offset, limit)
+
+    def fetch_luw(self, luw_id, offset, limit):
+        return self.contract(self.luw_contract).fetch_luw(luw_id, offset, limit)
+
+    def fetch_luw_decoded(self, luw_id):
+        return self.contract(self.luw_contract).fetch_luw_decoded(luw_id)
+
+    def get_active_luw_state(self, luw_id):
+        return self.contract(self.luw_contract).get_active_luw_state(luw_id)
+
+    def get_luw_repository_state(self, luw_id, repository_id):
+        return self.contract(self.luw_contract).get_luw_repository_state(luw_id, repository_id)
+
+    def get_storage_contracts(self):
+        verify(self.storage_contracts is not None, "Storage contracts not synced")
+
+        return dict(self.storage_contracts, asset_twin_storage_contract_address = self.asset_twin_contract)
+
+    def verify_storage_contracts(self):
+        return self.storage_contracts == self.resolve_storage_contracts()
+
+
+############
+# Topology #
+############
+
+class Topology:
+    # The six contracts, deployed and linked the same way as in testFixture.py
+    def __init__(self, certifier = "certifier", network = None, max_batch_size = 100):
+        self.network = network = network or Network()
+
+        self.asset_provider = network.originate(AssetProvider(network, certifier))
+        self.asset_provider_repo = network.originate(
+            AssetProviderRepository(network, self.asset_provider.address, certifier)
+        )
+        self.asset_provider_repo.update_storage_contract_with_address(certifier, certifier)
+
+        self.asset_twin_tracing = network.originate(AssetTwinTracing(network, certifier))
+
+        self.luw_contract = network.originate(LUW(network, certifier))
+        self.luw_repo_contract = network.originate(LUWRepository(network, self.luw_contract.address, certifier))
+        self.luw_repo_contract.update_storage_contract_with_address(certifier, certifier)
+
+        self.registry = network.originate(Registry(
+            network,
+            self.asset_provider_repo.address,
+            self.asset_twin_tracing.address,
+            self.luw_repo_contract.address,
+            certifier,
+            max_batch_size = max_batch_size,
+        ))
+
+        self.asset_twin_tracing.change_calling_contract_address(certifier, certifier, self.registry.address)
+        self.registry.sync_storage_contracts(certifier, certifier)
+
+    def apply(self, operation):
+        # Runs a Registry operation; returns the ContractError it failed with, or None
+        return self.network.call(
+            operation.sender, self.registry.address, operation.entry_point, operation.parameters, now = operation.now
+        )
+
+
+#####################
+# Random Operations #
+#####################
+
+class OperationGenerator:
+    # Random Registry operations with valid parameter shapes. IDs come from small
+    # pools, so that operations keep hitting existing providers, asset twins, LUWs
+    # and repositories as well as missing ones, and states range over a few IDs
+    # past the valid ones.
+    #
+    # Operations on a LUW are biased towards the ones that can succeed, or the owner
+    # check alone would reject most of them and commits would hardly ever be reached:
+    # they mostly go to a recent LUW, sent by its creator, with valid state IDs, and
+    # with repositories the LUW has, or does not have yet to add them. The generator
+    # runs the operations on a model of its own to know the LUWs as they are.
+
+    def __init__(self, seed = None, providers = 4, hashes = 6, repositories = 4, max_batch = 4, max_state = 5,
+            valid_ratio = 0.8):
+        self.random = random.Random(seed)
+        self.provider_ids = ["provider_%d" % index for index in range(providers)]
+        self.anchor_hashes = ["hash_%d" % index for index in range(hashes)]
+        self.repository_ids = ["repository_%d" % index for index in range(repositories)]
+        self.max_batch = max_batch
+        self.max_state = max_state
+        # Share of the LUW operations given parameters and a sender that can succeed
+        self.valid_ratio = valid_ratio
+        self.topology = Topology()
+        self.now = 0
+
+    def sample(self, values, count):
+        return [self.random.choice(values) for _ in range(count)]
+
+    def valid(self):
+        return self.random.random() < self.valid_ratio
+
+    def luw_id(self, active_states = None):
+        # Mostly a LUW in one of the active states the operation needs, if given, or one of
+        # the last LUWs created, as older ones tend to be closed; otherwise any LUW that
+        # exists, or the next one
+        luw_map = self.topology.luw_contract.luw_map
+        luws = self.topology.luw_contract.luw_last_id
+
+        if luws and self.valid():
+            if active_states is None:
+                return self.random.randint(max(0, luws - RECENT_LUWS), luws - 1)
+
+            luw_ids = [luw_id for luw_id, luw in luw_map.items() if luw.active_state_id in active_states]
+            if luw_ids:
+                return self.random.choice(luw_ids)
+
+        return self.random.randint(0, luws)
+
+    def luw_repository_ids(self, luw_id):
+        luw = self.topology.luw_contract.luw_map.get(luw_id)
+        if luw is None:
+            return []
+
+        return list(self.topology.luw_contract.build_repository_endpoints(luw_id, luw.repository_count))
+
+    def state_id(self):
+        # Mostly a valid state, most often the one commits need
+        if self.valid():
+            return self.random.choices(list(STATE_WEIGHTS), weights = list(STATE_WEIGHTS.values()))[0]
+
+        return self.random.randint(0, self.max_state)
+
+    def new_repository_ids(self, luw_id, count):
+        # Mostly repositories the LUW does not have yet, each once
+        added = self.luw_repository_ids(luw_id)
+        new = [repository_id for repository_id in self.repository_ids if repository_id not in added]
+
+        if self.valid() and len(new) >= count:
+            return self.random.sample(new, count)
+
+        return self.sample(self.repository_ids, count)
+
+    def added_repository_ids(self, luw_id, count):
+        # Mostly repositories the LUW has
+        added = self.luw_repository_ids(luw_id)
+
+        if added and self.valid():
+            return self.sample(added, count)
+
+        return self.sample(self.repository_ids, count)
+
+    def batch_size(self):
+        if self.valid():
+            return self.random.randint(1, min(self.max_batch, self.topology.registry.max_batch_size))
+
+        return self.random.randint(0, self.max_batch)
+
+    def parameters(self, entry_point):
+        choice = self.random.choice
+        randint = self.random.randint
+
+        if entry_point in ("create_asset_provider", "set_provider_data"):
+            return dict(provider_id = choice(self.provider_ids), provider_data = "data_%d" % randint(0, 3))
+        if entry_point in ("set_provider_active", "set_provider_deprecated"):
+            return dict(provider_id = choice(self.provider_ids))
+        if entry_point == "set_provider_status":
+            return dict(provider_id = choice(self.provider_ids), status = randint(0, 3))
+        if entry_point == "set_provider_owner":
+            return dict(provider_id = choice(self.provider_ids), new_owner_address = choice(ACCOUNTS))
+        if entry_point == "register_asset_twin":
+            return dict(anchor_hash = choice(self.anchor_hashes), provider_id = choice(self.provider_ids), repo_end_point = "end_point")
+        if entry_point == "register_asset_twins_batch":
+            return dict(asset_twins = [
+                dict(anchor_hash = choice(self.anchor_hashes), provider_id = choice(self.provider_ids), repo_end_point = "end_point")
+                for _ in range(randint(0, self.max_batch))
+            ])
+        if entry_point == "set_max_batch_size":
+            return dict(max_batch_size = randint(1, self.max_batch))
+        if entry_point == "sync_storage_contracts":
+            return dict()
+        if entry_point == "create_luw":
+            return dict(provider_id = choice(self.provider_ids), luw_service_endpoint = ENDPOINT_ACCOUNT)
+
+        luw_id = self.luw_id(LUW_ACTIVE_STATES.get(entry_point))
+
+        if entry_point == "change_luw_state":
+            return dict(luw_id = luw_id, state_id = self.state_id())
+        if entry_point == "add_luw_repository":
+            return dict(luw_id = luw_id, repository_id = self.new_repository_ids(luw_id, 1)[0])
+        if entry_point == "change_luw_repository_state":
+            return dict(luw_id = luw_id, repository_id = self.added_repository_ids(luw_id, 1)[0], state_id = self.state_id())
+        if entry_point == "add_luw_repositories":
+            return dict(luw_id = luw_id, repository_ids = self.new_repository_ids(luw_id, self.batch_size()))
+        if entry_point == "change_luw_repository_states":
+            # Mostly every repository of the LUW to the same state, the way to get them all ready to commit
+            repository_ids = self.luw_repository_ids(luw_id)
+            if repository_ids and len(repository_ids) <= self.topology.registry.max_batch_size and self.valid():
+                state_id = self.state_id()
+                return dict(luw_id = luw_id, repositories = [
+                    dict(repository_id = repository_id, state_id = state_id) for repository_id in repository_ids
+                ])
+
+            return dict(luw_id = luw_id, repositories = [
+                dict(repository_id = repository_id, state_id = self.state_id())
+                for repository_id in self.added_repository_ids(luw_id, self.batch_size())
+            ])
+
+        # commit_luw, abort_luw
+        return dict(luw_id = luw_id)
+
+    def sender(self, parameters):
+        # Mostly the creator of the LUW operated on
+        luw = self.topology.luw_contract.luw_map.get(parameters.get("luw_id"))
+
+        if luw is not None and self.valid():
+            return luw.creator_wallet_address
+
+        return self.random.choice(ACCOUNTS)
+
+    def operation(self):
+        entry_point = self.random.choice(list(REGISTRY_ENTRY_POINTS))
+        self.now += self.random.randint(1, 60)
+
+        parameters = self.parameters(entry_point)
+
+        operation = Operation(
+            entry_point = entry_point,
+            sender = self.sender(parameters),
+            now = self.now,
+            parameters = parameters,
+        )
+        self.topology.apply(operation)
+
+        return operation
+
+    def operations(self, count):
+        return [self.operation() for _ in range(count)]
@@ -0,0 +1,57 @@
+# Off-chain provider documents of content-addressed providers
+#
+# Contracts built with content_addressed = True keep only the SHA-256 digest of
+# a provider document and the URI it is served from. The digest is taken over a
+# canonical JSON encoding (sorted keys, no insignificant whitespace, UTF-8), so
+# that re-serializing the same document does not change it.
+
+import hashlib
+import hmac
+import json
+
+from oat import michelson
+
+DIGEST_SIZE = 32
+
+
+def canonicalize(document):
+    # `document` is either parsed JSON or JSON text / bytes
+    if isinstance(document, (bytes, bytearray)):
+        document = document.decode("utf-8")
+    if isinstance(document, str):
+        document = json.loads(document)
+
+    return json.dumps(
+        document,
+        sort_keys = True,
+        separators = (",", ":"),
+        ensure_ascii = False,
+        allow_nan = False,
+    ).encode("utf-8")
+
+
+def digest(document):
+    return hashlib.sha256(canonicalize(document)).digest()
+
+
+def parse_digest(value):
+    # On-chain bytes come back from views and the RPC as hex, with or without 0x
+    if isinstance(value, str):
+        value = bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+    if len(value) != DIGEST_SIZE:
+        raise ValueError("Provider document digests are %d bytes, got %d" % (DIGEST_SIZE, len(value)))
+
+    return bytes(value)
+
+
+def verify(document, on_chain_digest):
+    return hmac.compare_digest(digest(document), parse_digest(on_chain_digest))
+
+
+def provider_data(document, uri):
+    # Michelson literal of the provider_data parameter in the content-addressed mode
+    return michelson.record(
+        digest = michelson.bytes_(digest(document)),
+        uri = michelson.string(uri),
+    )
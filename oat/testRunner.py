@@ -0,0 +1,202 @@
+# Headless test runner
+#
+# Runs every @sp.add_test target of the repository with the SmartPy CLI, without
+# the smartpy.io IDE. The stored contracts that the scenarios load with
+# sp.io.import_stored_contract are resolved to the repository files, each target
+# runs in its own SmartPy process, and targets whose sources did not change since
+# their last successful run are not run again.
+#
+#     python -m oat.testRunner [<file>[:<test name>] ...] [--jobs <count>] [--no-cache]
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from oat import artifacts, toolchain
+from oat.benchmarks import format_table
+
+CACHE_DIR = artifacts.CACHE_ROOT / "tests"
+
+ADD_TEST = re.compile(r"""@sp\.add_test\(\s*name\s*=\s*["']([^"']+)["']""")
+IMPORT_STORED_CONTRACT = re.compile(r"""sp\.io\.import_stored_contract\(\s*["']([^"']+)["']\s*\)""")
+
+TestTarget = namedtuple("TestTarget", ["path", "name"])
+
+TestResult = namedtuple("TestResult", ["target", "status", "duration", "output"])
+
+# Only the selected test is registered, whether it is defined by the script itself
+# or by one of the contract modules it imports
+TEST_FILTER = """import smartpy as sp
+
+SELECTED_TEST = %r
+
+add_test = sp.add_test
+
+def add_selected_test(name, **kwargs):
+    if name != SELECTED_TEST:
+        return lambda test: test
+
+    return add_test(name = name, **kwargs)
+
+sp.add_test = add_selected_test
+
+"""
+
+
+#############
+# Discovery #
+#############
+
+def discover(paths = None):
+    # All tests of the given files, or of every script of the repository root
+    if not paths:
+        paths = sorted(path for path in toolchain.REPOSITORY_ROOT.glob("*.py") if ADD_TEST.search(path.read_text()))
+
+    targets = []
+
+    for path in paths:
+        path, _, name = str(path).partition(":")
+        path = Path(path).resolve()
+
+        names = ADD_TEST.findall(path.read_text())
+        if name:
+            if name not in names:
+                raise ValueError("%s has no test named %r" % (path.name, name))
+            names = [name]
+
+        targets += [TestTarget(path = path, name = test_name) for test_name in names]
+
+    return targets
+
+
+def stored_contracts(path, found = None):
+    # Stored contracts are named after their file in the repository root. Modules
+    # that load stored contracts themselves, like testFixture.py, are followed.
+    found = {} if found is None else found
+
+    for name in IMPORT_STORED_CONTRACT.findall(path.read_text()):
+        if name not in found:
+            found[name] = toolchain.REPOSITORY_ROOT / name
+            stored_contracts(found[name], found)
+
+    return found
+
+
+def resolve_imports(source, work_dir):
+    def import_script(match):
+        path = toolchain.REPOSITORY_ROOT / match.group(1)
+        contract_source = path.read_text()
+
+        if IMPORT_STORED_CONTRACT.search(contract_source):
+            path = Path(work_dir) / match.group(1)
+            path.write_text(resolve_imports(contract_source, work_dir))
+
+        return "sp.io.import_script_from_url(%r)" % ("file:%s" % path)
+
+    return IMPORT_STORED_CONTRACT.sub(import_script, source)
+
+
+def test_script(target, work_dir):
+    return TEST_FILTER % target.name + resolve_imports(target.path.read_text(), work_dir)
+
+
+def cache_key(target):
+    # The run only depends on the test, the stored contracts it loads and the SmartPy version
+    parts = [target.name, target.path.read_bytes(), toolchain.smartpy_version()]
+    for name, path in sorted(stored_contracts(target.path).items()):
+        parts += [name, path.read_bytes()]
+
+    return artifacts.digest(parts)
+
+
+###########
+# Running #
+###########
+
+def run_test(target, use_cache = True):
+    cache_dir = CACHE_DIR / cache_key(target)
+
+    # Only successful runs are kept, so a failing test is run again until it is fixed
+    if use_cache and (cache_dir / "passed").exists():
+        return TestResult(target = target, status = "cached", duration = 0.0, output = "")
+
+    with tempfile.TemporaryDirectory(prefix = "oat-test-") as work_dir:
+        script_path = Path(work_dir) / target.path.name
+        script_path.write_text(test_script(target, work_dir))
+
+        output_dir = Path(work_dir) / "output"
+
+        started = time.monotonic()
+        try:
+            output = toolchain.run_command([toolchain.SMARTPY_CLI, "test", str(script_path), str(output_dir)])
+            status = "passed"
+        except toolchain.ToolchainError as error:
+            output = str(error)
+            status = "failed"
+        duration = time.monotonic() - started
+
+        if status == "passed":
+            # The compiled contracts and scenario logs are kept with the marker
+            shutil.rmtree(cache_dir, ignore_errors = True)
+            if output_dir.exists():
+                shutil.copytree(output_dir, cache_dir)
+            else:
+                cache_dir.mkdir(parents = True)
+            (cache_dir / "passed").write_text(output)
+
+    return TestResult(target = target, status = status, duration = duration, output = output)
+
+
+def run_tests(targets, jobs = None, use_cache = True):
+    # Each test is its own SmartPy process, the threads only wait for them
+    with ThreadPoolExecutor(max_workers = jobs or os.cpu_count()) as executor:
+        return list(executor.map(lambda target: run_test(target, use_cache), targets))
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m oat.testRunner")
+    parser.add_argument("tests", nargs = "*",
+        help = "test files, optionally with a test name as <file>:<name> (default: every test of the repository)")
+    parser.add_argument("--jobs", type = int, help = "number of tests run at the same time (default: CPU count)")
+    parser.add_argument("--no-cache", action = "store_true", help = "run the tests even if their sources did not change")
+    args = parser.parse_args(argv)
+
+    try:
+        targets = discover(args.tests)
+        # Needed by every cache key, so a missing CLI is reported once
+        toolchain.smartpy_version()
+    except (OSError, ValueError, toolchain.ToolchainError) as error:
+        parser.exit(2, "%s\n" % error)
+
+    started = time.monotonic()
+    results = run_tests(targets, jobs = args.jobs, use_cache = not args.no_cache)
+    duration = time.monotonic() - started
+
+    for result in results:
+        if result.status == "failed":
+            print("# %s:%s\n\n%s\n" % (result.target.path.name, result.target.name, result.output))
+
+    # Slowest first, so that the scenarios worth splitting further stand out
+    print(format_table([{
+        "file": result.target.path.name,
+        "test": result.target.name,
+        "status": result.status,
+        "duration": "%.1fs" % result.duration,
+    } for result in sorted(results, key = lambda result: result.duration, reverse = True)]))
+
+    failed = sum(result.status == "failed" for result in results)
+    print("\n%d tests, %d failed, in %.1fs" % (len(results), failed, duration))
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
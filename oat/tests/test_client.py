@@ -0,0 +1,203 @@
+# Typed Registry client, against the mock node RPC
+#
+#     python -m unittest discover oat/tests
+
+import json
+import unittest
+
+from oat import events
+from oat.client import RPC, ClientError, RegistryClient, codec, generate, registryTypes
+from oat.client.mockNode import MockNode, ViewFailure
+
+REGISTRY_ADDRESS = "KT1PWx2mnDueood7fEmfbBDKx1D9BAnnXitn"
+OPERATOR_ADDRESS = "tz1VSUr8wwNhLAzempoch5d6hLRiTh8Cjcjb"
+COORDINATOR_ADDRESS = "tz1Ke2h7sDdakHJQh8WX4Z372du1KChsksyU"
+
+HASH_1 = "efb583d376b19d92d81e75bea335768d2b5cc9d60460c182cb6e66e8031b1aea"
+PROVIDER_ID_1 = "86a6c8f7-dc31-46ba-98fc-58bea40fc28d"
+PROVIDER_ID_2 = "7f6fd42a-1927-4dd1-b32a-e87f4890d77a"
+
+
+class StubSigner:
+    public_key_hash = OPERATOR_ADDRESS
+    public_key = "edpkuBknW28nW72KG6RoHtYW7p12T6GKc7nAbwYX5m8Wd9sDVC9yav"
+
+    def __init__(self):
+        self.signed = []
+
+    def sign(self, data):
+        self.signed.append(data)
+        # An ed25519 signature of 64 bytes
+        return events.base58check(bytes([9, 245, 205, 134, 18]) + bytes(range(64)))
+
+
+class CodecTest(unittest.TestCase):
+    def test_records_follow_the_type_layout(self):
+        parameter_type = registryTypes.ENTRY_POINTS["register_asset_twin"].parameter_type
+        request = registryTypes.RegisterAssetTwinRequest(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1, repo_end_point = "end_point")
+
+        self.assertEqual(codec.parameter(parameter_type, request), {"prim": "Pair", "args": [
+            {"string": HASH_1},
+            {"prim": "Pair", "args": [{"string": PROVIDER_ID_1}, {"string": "end_point"}]},
+        ]})
+
+    def test_single_unit_and_nested_parameters(self):
+        self.assertEqual(codec.parameter({"prim": "nat"}, registryTypes.CommitLuwRequest(luw_id = 3)), {"int": "3"})
+        self.assertEqual(codec.parameter({"prim": "unit"}, registryTypes.SyncStorageContractsRequest()), {"prim": "Unit"})
+
+        parameter_type = registryTypes.ENTRY_POINTS["change_luw_repository_states"].parameter_type
+        encoded = codec.parameter(parameter_type, registryTypes.ChangeLuwRepositoryStatesRequest(luw_id = 1, repositories = [
+            registryTypes.ChangeLuwRepositoryStatesRepositoriesItem(repository_id = "repository", state_id = 2),
+        ]))
+        self.assertEqual(events.decode(parameter_type, encoded), dict(luw_id = 1, repositories = [
+            dict(repository_id = "repository", state_id = 2),
+        ]))
+
+        with self.assertRaises(codec.CodecError):
+            codec.encode({"prim": "nat"}, -1)
+
+    def test_base58check_round_trip(self):
+        data = bytes([9, 245, 205, 134, 18]) + bytes(range(64))
+
+        self.assertEqual(codec.base58check_decode(events.base58check(data)), data)
+        with self.assertRaises(codec.CodecError):
+            codec.base58check_decode(events.base58check(data)[:-1] + "1")
+
+
+class GenerateTest(unittest.TestCase):
+    def test_module_is_up_to_date(self):
+        interface = json.loads(generate.INTERFACE_FILE.read_text())
+
+        self.assertEqual(generate.generate(interface), generate.TYPES_FILE.read_text())
+
+    def test_interface_from_the_node(self):
+        interface = json.loads(generate.INTERFACE_FILE.read_text())
+
+        # The node keeps the entry point annotations and gives the views as script sections
+        entry_points = {
+            name: dict(michelson_type, annots = michelson_type.get("annots", []) + ["%" + name])
+            for name, michelson_type in interface["entrypoints"].items()
+        }
+        script = {"code": [
+            {"prim": "view", "args": [{"string": name}, view["parameter"], view["result"], []]}
+            for name, view in interface["views"].items()
+        ]}
+
+        with MockNode(interface = entry_points, script = script) as node, RPC(node.url) as rpc:
+            self.assertEqual(generate.fetch_interface(rpc, REGISTRY_ADDRESS), interface)
+
+
+class ClientTest(unittest.TestCase):
+    def setUp(self):
+        self.node = MockNode(counter = 41)
+        self.node.start()
+        self.addCleanup(self.node.close)
+
+        self.rpc = RPC(self.node.url)
+        self.addCleanup(self.rpc.close)
+
+        self.signer = StubSigner()
+        self.client = RegistryClient(self.rpc, REGISTRY_ADDRESS, self.signer)
+
+    def test_batch_is_one_operation(self):
+        self.node.gas["create_asset_provider"] = 2345678
+        self.node.storage["create_asset_provider"] = 300
+
+        with self.client.batch() as batch:
+            batch.create_asset_provider(provider_id = PROVIDER_ID_1, provider_data = "provider")
+            batch.register_asset_twins_batch(asset_twins = [
+                registryTypes.RegisterAssetTwinsBatchAssetTwinsItem(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1, repo_end_point = "end_point"),
+            ])
+            batch.create_luw(provider_id = PROVIDER_ID_1, luw_service_endpoint = COORDINATOR_ADDRESS)
+
+        self.assertEqual(len(self.node.injections), 1)
+        contents = self.node.injections[0]["contents"]
+
+        self.assertEqual([content["parameters"]["entrypoint"] for content in contents],
+            ["create_asset_provider", "register_asset_twins_batch", "create_luw"])
+        self.assertEqual([content["counter"] for content in contents], ["42", "43", "44"])
+        self.assertTrue(all(content["destination"] == REGISTRY_ADDRESS for content in contents))
+
+        # Limits are the simulated use plus the margins, and fees follow from them
+        estimates = batch.injection.estimates
+        self.assertEqual(estimates[0].gas_limit, 2346 + 100)
+        self.assertEqual(estimates[0].storage_limit, 300 + 20)
+        self.assertEqual(estimates[1].gas_limit, 1500 + 100)
+        self.assertEqual(estimates[1].fee, 160)
+        self.assertGreater(estimates[0].fee, 100 + 245)
+        self.assertEqual([str(estimate.fee) for estimate in estimates], [content["fee"] for content in contents])
+
+        self.assertTrue(self.signer.signed[0].startswith(b"\x03"))
+        self.assertEqual(self.node.counter, 44)
+
+    def test_reveal_comes_first(self):
+        self.node.revealed = False
+
+        injection = self.client.commit_luw(luw_id = 1)
+
+        contents = self.node.injections[0]["contents"]
+        self.assertEqual([content["kind"] for content in contents], ["reveal", "transaction"])
+        self.assertEqual(contents[0]["public_key"], StubSigner.public_key)
+        self.assertEqual([estimate.entry_point for estimate in injection.estimates], [None, "commit_luw"])
+        self.assertEqual(contents[1]["parameters"]["value"], {"int": "1"})
+
+    def test_rejected_call_is_not_injected(self):
+        self.node.failures["register_asset_twin"] = "Provider ID does not exist"
+
+        batch = self.client.batch()
+        batch.set_provider_active(provider_id = PROVIDER_ID_1)
+        batch.register_asset_twin(anchor_hash = HASH_1, provider_id = PROVIDER_ID_2, repo_end_point = "end_point")
+
+        with self.assertRaises(ClientError) as raised:
+            batch.estimate()
+        self.assertEqual(raised.exception.message, "Provider ID does not exist")
+
+        with self.assertRaises(ClientError):
+            batch.send()
+        self.assertEqual(self.node.injections, [])
+
+    def test_views_return_dataclasses(self):
+        fetched = []
+
+        def fetch_asset_twin(view_input):
+            fetched.append(events.decode(registryTypes.VIEWS["fetch_asset_twin"].parameter_type, view_input))
+            return {"prim": "Pair", "args": [
+                {"prim": "Pair", "args": [{"string": "end_point"}, {"string": OPERATOR_ADDRESS}]},
+                {"prim": "Pair", "args": [{"string": "2026-10-18T10:00:00Z"}, {"int": "2"}]},
+            ]}
+
+        def get_asset_provider(view_input):
+            raise ViewFailure("Provider ID does not exist")
+
+        self.node.views["fetch_asset_twin"] = fetch_asset_twin
+        self.node.views["get_asset_provider"] = get_asset_provider
+        self.node.views["fetch_asset_twin_history"] = lambda view_input: [
+            {"prim": "Elt", "args": [{"int": "0"}, {"string": "2026-10-18T10:00:00Z"}]},
+        ]
+
+        self.assertEqual(self.client.fetch_asset_twin(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1), registryTypes.FetchAssetTwinResponse(
+            asset_repository_endpoint = "end_point",
+            creator_wallet_address = OPERATOR_ADDRESS,
+            latest_registration = "2026-10-18T10:00:00Z",
+            registration_count = 2,
+        ))
+        self.assertEqual(fetched, [dict(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1)])
+        self.assertEqual(self.client.fetch_asset_twin_history(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1, offset = 0, limit = 1),
+            {0: "2026-10-18T10:00:00Z"})
+
+        with self.assertRaises(ClientError) as raised:
+            self.client.get_asset_provider(provider_id = PROVIDER_ID_1)
+        self.assertEqual(raised.exception.message, "Provider ID does not exist")
+
+    def test_connections_are_reused(self):
+        self.node.views["get_active_luw_state"] = lambda view_input: {"string": "active"}
+
+        for luw_id in range(20):
+            self.assertEqual(self.client.get_active_luw_state(luw_id = luw_id), "active")
+        self.client.commit_luw(luw_id = 1)
+
+        self.assertEqual(self.node.connections, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
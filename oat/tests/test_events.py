@@ -0,0 +1,136 @@
+# Decoding of contract events from operation receipts
+#
+#     python -m unittest discover oat/tests
+
+import io
+import json
+import unittest
+from pathlib import Path
+
+from oat import events
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+ASSET_TWIN_CONTRACT = "KT1PWx2mnDueood7fEmfbBDKx1D9BAnnXitn"
+PROVIDER_CONTRACT = "KT1XTxpQvo7oRCqp85LikEZgAZ22uDxhbWJv"
+LUW_CONTRACT = "KT1SJ9ufn9YjAiMkgA3pL6cXgrbmrZ1nZL5C"
+
+HASH_1 = "efb583d376b19d92d81e75bea335768d2b5cc9d60460c182cb6e66e8031b1aea"
+PROVIDER_ID_1 = "86a6c8f7-dc31-46ba-98fc-58bea40fc28d"
+PROVIDER_ID_2 = "7f6fd42a-1927-4dd1-b32a-e87f4890d77a"
+REPOSITORY_ID_1 = "01add8a4-7302-490b-be57-cec2cd02f8da"
+
+
+def load_block():
+    return json.loads((FIXTURES / "block.json").read_text())
+
+
+class BlockTest(unittest.TestCase):
+    def test_events_of_applied_operations(self):
+        decoded = events.events_from_block(load_block())
+
+        self.assertEqual([event.operation_hash for event in decoded],
+            ["ooProviders", "ooProviders", "ooProviders", "ooBatch", "ooBatch"])
+        self.assertTrue(all(event.level == 4200 and event.timestamp == "2026-10-18T10:00:00Z" for event in decoded))
+
+    def test_provider_events(self):
+        created, status_changed, data_changed = events.events_from_block(load_block())[:3]
+
+        self.assertEqual(created.contract, PROVIDER_CONTRACT)
+        # The address is given in its binary form in this receipt
+        self.assertEqual(created.payload, events.ProviderCreated(
+            provider_id = PROVIDER_ID_1,
+            creator_wallet_address = "tz1Ke2h7sDdakHJQh8WX4Z372du1KChsksyU",
+        ))
+        self.assertEqual(status_changed.payload, events.ProviderStatusChanged(provider_id = PROVIDER_ID_1, status = 2))
+        self.assertEqual(data_changed.payload, events.ProviderDataChanged(provider_id = PROVIDER_ID_1))
+
+    def test_batch_registration_emits_one_event_per_item(self):
+        decoded = events.events_from_block(load_block(), contracts = {ASSET_TWIN_CONTRACT})
+
+        # The first payload is a flat comb, the second a nested pair
+        self.assertEqual([event.payload for event in decoded], [
+            events.AssetTwinRegistered(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1, registration_count = 1),
+            events.AssetTwinRegistered(anchor_hash = HASH_1, provider_id = PROVIDER_ID_2, registration_count = 3),
+        ])
+
+    def test_failed_operation_has_no_events(self):
+        block = load_block()
+        failed = block["operations"][3][2]
+
+        self.assertEqual(events.events_from_operation(failed), [])
+
+
+class StreamTest(unittest.TestCase):
+    def test_json_lines(self):
+        with open(FIXTURES / "luw_operations.jsonl") as stream:
+            decoded = list(events.read_events(stream))
+
+        self.assertTrue(all(event.contract == LUW_CONTRACT and event.level is None for event in decoded))
+        self.assertEqual([event.payload for event in decoded], [
+            events.LUWCreated(luw_id = 0, creator_wallet_address = "tz1VSUr8wwNhLAzempoch5d6hLRiTh8Cjcjb"),
+            events.RepositoryAdded(luw_id = 0, repository_id = REPOSITORY_ID_1, state_id = 1),
+            events.RepositoryStateChanged(luw_id = 0, repository_id = REPOSITORY_ID_1, state_id = 2),
+            events.LUWRepositoriesClosed(luw_id = 0, state_id = 3),
+            events.LUWStateAdded(luw_id = 0, state_id = 3),
+        ])
+
+    def test_empty_stream(self):
+        self.assertEqual(list(events.read_events(io.StringIO("\n"))), [])
+
+    def test_indented_json_document(self):
+        decoded = list(events.read_events(io.StringIO((FIXTURES / "block.json").read_text())))
+
+        self.assertEqual(decoded, events.events_from_block(load_block()))
+
+
+class DecodeTest(unittest.TestCase):
+    def test_tree_layout_record(self):
+        # Four fields, as the legacy SmartPy layout splits them: ((a, b), (c, d))
+        michelson_type = {"prim": "pair", "args": [
+            {"prim": "pair", "args": [
+                {"prim": "nat", "annots": ["%a"]},
+                {"prim": "string", "annots": ["%b"]},
+            ]},
+            {"prim": "pair", "args": [
+                {"prim": "option", "args": [{"prim": "nat"}], "annots": ["%c"]},
+                {"prim": "bool", "annots": ["%d"]},
+            ]},
+        ]}
+        value = {"prim": "Pair", "args": [
+            {"prim": "Pair", "args": [{"int": "1"}, {"string": "b"}]},
+            {"prim": "Pair", "args": [{"prim": "Some", "args": [{"int": "3"}]}, {"prim": "False"}]},
+        ]}
+
+        self.assertEqual(events.decode(michelson_type, value), {"a": 1, "b": "b", "c": 3, "d": False})
+
+    def test_implicit_address_bytes(self):
+        # Tag and public key hash, here the zero hash, of each curve
+        for tag, address in (
+            ("00", "tz1Ke2h7sDdakHJQh8WX4Z372du1KChsksyU"),
+            ("03", "tz491FasxEbqzR2SfjgTPnRyw9JY7og2HZUA"),
+        ):
+            self.assertEqual(events.decode_address({"bytes": "00" + tag + "00" * 20}), address)
+
+        with self.assertRaises(events.EventError):
+            events.decode_address({"bytes": "0004" + "00" * 20})
+
+    def test_originated_address_bytes(self):
+        self.assertEqual(
+            events.decode_address({"bytes": "01" + "00" * 20 + "00"}),
+            "KT18amZmM5W7qDWVt2pH6uj7sCEd3kbzLrHT",
+        )
+
+    def test_unknown_tag_keeps_the_decoded_value(self):
+        self.assertEqual(events.payload_record("other", {"prim": "nat"}, {"int": "7"}), 7)
+
+    def test_payload_not_matching_its_tag(self):
+        with self.assertRaises(events.EventError):
+            events.payload_record("luw_state_added", {"prim": "pair", "args": [
+                {"prim": "nat", "annots": ["%luw_id"]},
+                {"prim": "nat", "annots": ["%other"]},
+            ]}, {"prim": "Pair", "args": [{"int": "0"}, {"int": "1"}]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+# Differential fuzzing harness, without the SmartPy CLI and the mockup
+#
+#     python -m unittest discover oat/tests
+
+import ast
+import tempfile
+import unittest
+from pathlib import Path
+
+from oat import fuzz, model
+
+ADDRESSES = {
+    "operator_A": "tz1VSUr8wwNhLAzempoch5d6hLRiTh8Cjcjb",
+    "offchain_coordinator": "tz1Ke2h7sDdakHJQh8WX4Z372du1KChsksyU",
+}
+
+
+class ShrinkTest(unittest.TestCase):
+    def test_shortest_failing_sequence(self):
+        runs = []
+
+        def fails(operations):
+            runs.append(operations)
+            return 3 in operations and 17 in operations
+
+        operations, shrink_runs = fuzz.shrink(list(range(40)), fails)
+
+        self.assertEqual(operations, [3, 17])
+        self.assertEqual(shrink_runs, len(runs))
+
+    def test_run_budget(self):
+        operations, shrink_runs = fuzz.shrink(list(range(40)), lambda operations: 0 in operations, max_runs = 3)
+
+        self.assertEqual(shrink_runs, 3)
+        self.assertIn(0, operations)
+
+
+class ShardTest(unittest.TestCase):
+    def test_shards_are_seeded_one_by_one(self):
+        shards = fuzz.shards(3, 20, seed = 5)
+
+        self.assertEqual([shard.seed for shard in shards], [5, 6, 7])
+        self.assertEqual(shards[2].operations, fuzz.shards(1, 20, seed = 7)[0].operations)
+
+    def test_script_holds_the_operations(self):
+        operations = fuzz.shards(1, 30)[0].operations
+        script = fuzz.shard_script(operations)
+
+        tree = ast.parse(script)
+        assigned = next(node.value for node in tree.body if isinstance(node, ast.Assign))
+        self.assertEqual([model.Operation(*operation) for operation in ast.literal_eval(assigned)], operations)
+
+    def test_outcomes(self):
+        shards = fuzz.shards(2, 200, seed = 3)
+        rows = {row["entry_point"]: row for row in fuzz.outcomes(shards)}
+
+        self.assertEqual(list(rows), list(model.REGISTRY_ENTRY_POINTS))
+        self.assertEqual(sum(row["operations"] for row in rows.values()), 400)
+        for row in rows.values():
+            self.assertLessEqual(row["succeeded"], row["operations"])
+        self.assertGreater(rows["commit_luw"]["succeeded"], 0)
+
+    def test_failure_file(self):
+        shard = fuzz.shards(1, 10)[0]
+        result = fuzz.ShardResult(
+            shard = shard, status = "failed", operations = shard.operations[2:4], output = "output",
+            shrink_runs = 5, gas = [], duration = 1.0,
+        )
+
+        with tempfile.TemporaryDirectory() as fuzz_dir:
+            path = fuzz.write_failure(result, Path(fuzz_dir))
+            self.assertEqual(fuzz.read_failure(path), shard.operations[2:4])
+
+
+class MockupTest(unittest.TestCase):
+    def test_record_argument(self):
+        self.assertEqual(fuzz.michelson_argument(dict(
+            provider_id = "provider",
+            luw_service_endpoint = "offchain_coordinator",
+        ), ADDRESSES), '(Pair "tz1Ke2h7sDdakHJQh8WX4Z372du1KChsksyU" "provider")')
+
+    def test_single_parameter_and_batch_arguments(self):
+        self.assertEqual(fuzz.michelson_argument(dict(luw_id = 2), ADDRESSES), "2")
+        self.assertEqual(fuzz.michelson_argument(dict(repositories = [
+            dict(repository_id = "repository", state_id = 2),
+        ]), ADDRESSES), '{ (Pair "repository" 2) }')
+
+    def test_gas_outliers(self):
+        measurements = [
+            fuzz.GasMeasurement(seed = 0, index = index, entry_point = "commit_luw", consumed_gas = gas, batch_size = None)
+            for index, gas in enumerate([1000, 1100, 1200, 5000])
+        ] + [fuzz.GasMeasurement(seed = 0, index = 4, entry_point = "create_luw", consumed_gas = 900, batch_size = None)]
+
+        outliers = fuzz.gas_outliers(measurements)
+
+        self.assertEqual([outlier.measurement.index for outlier in outliers], [3])
+        self.assertEqual(outliers[0].median, 1150)
+
+    def test_batches_are_compared_by_size(self):
+        measurements = [
+            fuzz.GasMeasurement(seed = 0, index = index, entry_point = "add_luw_repositories", consumed_gas = gas, batch_size = size)
+            for index, (gas, size) in enumerate([(1000, 1), (1100, 1), (3000, 4), (3200, 4), (9000, 4)])
+        ]
+
+        outliers = fuzz.gas_outliers(measurements)
+
+        self.assertEqual([outlier.measurement.index for outlier in outliers], [4])
+        self.assertEqual(outliers[0].median, 3200)
+
+
+if __name__ == "__main__":
+    unittest.main()
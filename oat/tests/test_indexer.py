@@ -0,0 +1,144 @@
+# Replaying contract events into the SQLite index
+#
+#     python -m unittest discover oat/tests
+
+import unittest
+from pathlib import Path
+
+from oat import events, indexer, workload
+from oat.client.mockNode import MockNode
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+PROVIDER_ID_1 = "86a6c8f7-dc31-46ba-98fc-58bea40fc28d"
+PROVIDER_ID_2 = "7f6fd42a-1927-4dd1-b32a-e87f4890d77a"
+REPOSITORY_ID_1 = "01add8a4-7302-490b-be57-cec2cd02f8da"
+
+
+def fixture_documents(name):
+    with open(FIXTURES / name) as stream:
+        return list(events.read_documents(stream))
+
+
+def chain(levels, branch):
+    # Empty blocks of one branch, except for the fixture block at level 2
+    blocks = {level: {"operations": [[], [], [], []]} for level in levels}
+    if 2 in blocks:
+        blocks[2] = fixture_documents("block.json")[0]
+
+    for level, block in blocks.items():
+        block["hash"] = "BL%s%d" % (branch, level)
+        block["header"] = dict(block.get("header", {}), level = level, predecessor = "BL%s%d" % (branch, level - 1))
+
+    return blocks
+
+
+class IndexerTest(unittest.TestCase):
+    def setUp(self):
+        self.indexer = indexer.Indexer(":memory:", batch_size = 2)
+        self.addCleanup(self.indexer.close)
+
+    def test_providers_by_status(self):
+        self.indexer.ingest(fixture_documents("block.json"), "block.json")
+
+        deprecated = self.indexer.providers("deprecated")
+        self.assertEqual([provider.provider_id for provider in deprecated], [PROVIDER_ID_1])
+        self.assertEqual(deprecated[0].data_changed_level, 4200)
+        self.assertEqual(self.indexer.providers(1), [])
+
+    def test_asset_twins_of_provider(self):
+        self.indexer.ingest(fixture_documents("block.json"), "block.json")
+
+        # The failed operation of the block is not indexed
+        twins = self.indexer.asset_twins(PROVIDER_ID_1)
+        self.assertEqual(len(twins), 1)
+        self.assertEqual(twins[0].registration_count, 1)
+        self.assertEqual(twins[0].latest_registration, "2026-10-18T10:00:00Z")
+        self.assertEqual(self.indexer.asset_twins(PROVIDER_ID_2)[0].registration_count, 3)
+
+    def test_luw_lifecycle(self):
+        stats = self.indexer.ingest(fixture_documents("luw_operations.jsonl"), "luw_operations.jsonl")
+
+        self.assertEqual(stats, indexer.IngestStats(documents = 4, operations = 4, events = 5))
+        self.assertEqual(self.indexer.luws("prepare_to_commit"), [])
+
+        committed = self.indexer.luws("committed")
+        self.assertEqual([(luw.luw_id, luw.state_count, luw.repository_count) for luw in committed], [(0, 2, 1)])
+        self.assertEqual(self.indexer.luw_repositories(0), [(REPOSITORY_ID_1, 3)])
+
+    def test_checkpoint_skips_ingested_documents(self):
+        documents = fixture_documents("luw_operations.jsonl")
+
+        self.indexer.ingest(documents[:3], "luws")
+        self.assertEqual(self.indexer.luws("active")[0].repository_count, 1)
+
+        # The whole source again, e.g. after the file grew: only the last operation is new
+        stats = self.indexer.ingest(documents, "luws")
+        self.assertEqual(stats.documents, 1)
+        self.assertEqual(self.indexer.checkpoint("luws").documents, 4)
+        self.assertEqual(self.indexer.luws("committed")[0].repository_count, 1)
+
+    def test_events_of_unknown_luws_fail(self):
+        # Without the operation creating LUW 0, e.g. as for an imported LUW
+        documents = fixture_documents("luw_operations.jsonl")
+
+        with self.assertRaisesRegex(indexer.IndexerError, "repository_added event of LUW 0"):
+            self.indexer.ingest(documents[1:], "luws")
+
+        self.assertEqual(self.indexer.checkpoint("luws").documents, 0)
+        self.assertEqual(self.indexer.luw_repositories(0), [])
+
+    def test_contract_filter(self):
+        filtered = indexer.Indexer(":memory:", contracts = {workload.LUW_CONTRACT})
+        self.addCleanup(filtered.close)
+
+        filtered.ingest(fixture_documents("block.json"), None)
+        self.assertEqual(filtered.providers("deprecated"), [])
+
+    def test_generated_workload(self):
+        # The index matches the state the workload generator kept while generating
+        generator = workload.Workload()
+        operations = [generator.next_operation() for _ in range(500)]
+
+        self.indexer.ingest([{"header": {"level": 1}, "operations": [[], [], [], operations]}], None)
+
+        self.assertEqual(len(self.indexer.luws("committed")), generator.luws)
+        self.assertEqual(len(self.indexer.providers("active")), generator.providers)
+
+        provider_id = generator.provider_id(0)
+        self.assertEqual(
+            {(twin.anchor_hash, twin.registration_count) for twin in self.indexer.asset_twins(provider_id)},
+            {(key[0], count) for key, count in generator.registrations.items() if key[1] == provider_id},
+        )
+
+    def test_follow_stops_at_the_last_final_block(self):
+        with MockNode() as node:
+            node.blocks.update(chain(range(1, 6), "a"))
+
+            self.assertEqual(self.indexer.follow(node.url).documents, 3)
+            self.assertEqual(self.indexer.checkpoint(node.url), indexer.Checkpoint(documents = 3, level = 3, block_hash = "BLa3"))
+            self.assertEqual(len(self.indexer.providers("deprecated")), 1)
+
+            node.blocks.update(chain(range(6, 8), "a"))
+            self.assertEqual(self.indexer.follow(node.url).documents, 2)
+            self.assertEqual(self.indexer.checkpoint(node.url).level, 5)
+
+    def test_follow_fails_on_a_replaced_block(self):
+        with MockNode() as node:
+            node.blocks.update(chain(range(1, 6), "a"))
+            self.indexer.follow(node.url)
+
+            # Levels 3 and up are replaced by another branch
+            node.blocks.update(chain(range(3, 8), "b"))
+            with self.assertRaisesRegex(indexer.IndexerError, "Block 4 builds on BLb3, not on the indexed block BLa3"):
+                self.indexer.follow(node.url)
+
+            self.assertEqual(self.indexer.checkpoint(node.url).level, 3)
+
+    def test_unknown_state(self):
+        with self.assertRaises(indexer.IndexerError):
+            self.indexer.luws("closed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,234 @@
+# Pure-Python model of the Registry topology
+#
+#     python -m unittest discover oat/tests
+
+import unittest
+
+from oat import events, model
+
+PROVIDER_ID_1 = "86a6c8f7-dc31-46ba-98fc-58bea40fc28d"
+PROVIDER_ID_2 = "7f6fd42a-1927-4dd1-b32a-e87f4890d77a"
+HASH_1 = "efb583d376b19d92d81e75bea335768d2b5cc9d60460c182cb6e66e8031b1aea"
+REPOSITORY_ID_1 = "01add8a4-7302-490b-be57-cec2cd02f8da"
+REPOSITORY_ID_2 = "db161792-d5a9-434b-b0fc-5359f6d6460b"
+
+
+class ModelTest(unittest.TestCase):
+    def setUp(self):
+        self.topology = model.Topology(network = model.Network(record_events = True))
+        self.registry = self.topology.registry
+
+    def call(self, sender, entry_point, now = None, **parameters):
+        error = self.topology.apply(model.Operation(entry_point, sender, now, parameters))
+
+        return None if error is None else error.message
+
+    def create_luw(self, repository_ids):
+        self.assertIsNone(self.call("operator_A", "create_luw",
+            provider_id = PROVIDER_ID_1, luw_service_endpoint = model.ENDPOINT_ACCOUNT))
+        luw_id = self.topology.luw_contract.luw_last_id - 1
+
+        self.assertIsNone(self.call("operator_A", "add_luw_repositories", luw_id = luw_id, repository_ids = repository_ids))
+
+        return luw_id
+
+    def test_provider_owner_checks(self):
+        self.assertIsNone(self.call("operator_A", "create_asset_provider", provider_id = PROVIDER_ID_1, provider_data = "A"))
+
+        self.assertEqual(self.call("operator_B", "create_asset_provider", provider_id = PROVIDER_ID_1, provider_data = "B"),
+            "Provider ID already exists")
+        self.assertEqual(self.call("operator_B", "set_provider_deprecated", provider_id = PROVIDER_ID_1),
+            "Non-matching owner address")
+        self.assertEqual(self.call("operator_A", "set_provider_status", provider_id = PROVIDER_ID_2, status = 2),
+            "Provider ID does not exist")
+        # The owner is checked before the status
+        self.assertEqual(self.call("operator_B", "set_provider_status", provider_id = PROVIDER_ID_1, status = 3),
+            "Non-matching owner address")
+        self.assertEqual(self.call("operator_A", "set_provider_status", provider_id = PROVIDER_ID_1, status = 3),
+            "Incorrect status")
+
+        self.assertIsNone(self.call("operator_A", "set_provider_owner", provider_id = PROVIDER_ID_1, new_owner_address = "operator_B"))
+        self.assertIsNone(self.call("operator_B", "set_provider_deprecated", provider_id = PROVIDER_ID_1))
+        self.assertEqual(self.registry.get_asset_provider(PROVIDER_ID_1), dict(
+            provider_id = PROVIDER_ID_1,
+            provider_data = "A",
+            status = "deprecated",
+            creator_wallet_address = "operator_B",
+        ))
+
+    def test_asset_twin_registrations(self):
+        self.assertIsNone(self.call("operator_A", "register_asset_twin", now = 10,
+            anchor_hash = HASH_1, provider_id = PROVIDER_ID_1, repo_end_point = "end_point_1"))
+        self.assertIsNone(self.call("operator_B", "register_asset_twins_batch", now = 20, asset_twins = [
+            dict(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1, repo_end_point = "end_point_2"),
+            dict(anchor_hash = HASH_1, provider_id = PROVIDER_ID_2, repo_end_point = "end_point_2"),
+        ]))
+
+        # Re-registrations keep the first endpoint and creator
+        self.assertEqual(self.registry.fetch_asset_twin(HASH_1, PROVIDER_ID_1), dict(
+            asset_repository_endpoint = "end_point_1",
+            creator_wallet_address = "operator_A",
+            latest_registration = 20,
+            registration_count = 2,
+        ))
+        self.assertEqual(self.registry.fetch_asset_twin_history(HASH_1, PROVIDER_ID_1, 0, 100), {0: 10, 1: 20})
+
+        with self.assertRaises(model.ContractError) as raised:
+            self.registry.fetch_asset_twin_history(HASH_1, PROVIDER_ID_1, 0, 101)
+        self.assertEqual(raised.exception.message, "History page limit exceeded")
+
+        self.assertEqual(self.call("operator_A", "register_asset_twins_batch", asset_twins = []), "Empty batch")
+        self.assertEqual(self.call("operator_A", "set_max_batch_size", max_batch_size = 1), "Incorrect certifier")
+        self.assertIsNone(self.call("certifier", "set_max_batch_size", max_batch_size = 1))
+        self.assertEqual(self.call("operator_B", "register_asset_twins_batch", asset_twins = [
+            dict(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1, repo_end_point = "end_point_2"),
+        ] * 2), "Batch size exceeds limit")
+
+    def test_luw_commit(self):
+        luw_id = self.create_luw([REPOSITORY_ID_1, REPOSITORY_ID_2])
+
+        self.assertEqual(self.call("operator_B", "add_luw_repository", luw_id = luw_id, repository_id = "other"),
+            "Non-matching owner address")
+        self.assertEqual(self.call("operator_A", "commit_luw", luw_id = luw_id), "LUW is not prepared to commit")
+        self.assertEqual(self.call("operator_A", "change_luw_state", luw_id = luw_id, state_id = 5), "Incorrect state ID")
+        self.assertIsNone(self.call("operator_A", "change_luw_state", luw_id = luw_id, state_id = 2))
+        self.assertEqual(self.call("operator_A", "add_luw_repository", luw_id = luw_id, repository_id = "other"),
+            "LUW is not Active")
+
+        self.assertEqual(self.call("operator_A", "commit_luw", luw_id = luw_id), "Repository is not ready")
+        self.assertIsNone(self.call("operator_A", "change_luw_repository_states", luw_id = luw_id, repositories = [
+            dict(repository_id = REPOSITORY_ID_1, state_id = 2),
+            dict(repository_id = REPOSITORY_ID_2, state_id = 2),
+        ]))
+        self.assertIsNone(self.call("operator_A", "commit_luw", luw_id = luw_id))
+
+        luw = self.registry.fetch_luw_decoded(luw_id)
+        self.assertEqual(luw["state_history"], {1: "active", 2: "prepare_to_commit", 3: "committed"})
+        self.assertEqual(luw["repository_endpoints"], {REPOSITORY_ID_1: "committed", REPOSITORY_ID_2: "committed"})
+        self.assertEqual(self.call("operator_A", "abort_luw", luw_id = luw_id), "LUW is already closed")
+
+        # fetch_luw returns the header with one page of the states and of the repositories
+        page = self.registry.fetch_luw(luw_id, 1, 1)
+        self.assertEqual((page["active_state_id"], page["state_count"], page["repository_count"]), (3, 3, 2))
+        self.assertEqual(page["state_history"], {2: 2})
+        self.assertEqual(list(page["repository_endpoints"]), [REPOSITORY_ID_2])
+        self.assertEqual(self.registry.fetch_luw(luw_id, 3, 100)["state_history"], {})
+
+        with self.assertRaises(model.ContractError) as raised:
+            self.registry.fetch_luw(luw_id, 0, 101)
+        self.assertEqual(raised.exception.message, "Page limit exceeded")
+
+    def test_failing_batch_writes_nothing(self):
+        luw_id = self.create_luw([REPOSITORY_ID_1])
+        recorded = len(self.topology.network.events)
+
+        # The second item fails after the first one was checked
+        self.assertEqual(self.call("operator_A", "add_luw_repositories", luw_id = luw_id,
+            repository_ids = [REPOSITORY_ID_2, REPOSITORY_ID_2]), "Repository ID already exists")
+        self.assertEqual(self.call("operator_A", "change_luw_repository_states", luw_id = luw_id, repositories = [
+            dict(repository_id = REPOSITORY_ID_1, state_id = 2),
+            dict(repository_id = REPOSITORY_ID_2, state_id = 2),
+        ]), "Repository ID does not exist")
+
+        self.assertEqual(self.registry.fetch_luw(luw_id, 0, 100)["repository_endpoints"], {REPOSITORY_ID_1: 1})
+        self.assertEqual(len(self.topology.network.events), recorded)
+
+    def test_import_luws_checks_the_state_history(self):
+        luw_contract = self.topology.luw_contract
+
+        def import_luw(state_history):
+            with self.assertRaises(model.ContractError) as raised:
+                luw_contract.import_luws("certifier", "certifier", [dict(luw_id = 4, luw = dict(
+                    creator_wallet_address = "operator_A",
+                    provider_id = PROVIDER_ID_1,
+                    luw_service_endpoint = model.ENDPOINT_ACCOUNT,
+                    state_history = state_history,
+                    repository_endpoints = {},
+                ))])
+
+            return raised.exception.message
+
+        self.assertEqual(import_luw({}), "Empty state history")
+        self.assertEqual(import_luw({1: 1, 3: 2}), "Invalid state history")
+        self.assertEqual(import_luw({0: 1}), "Invalid state history")
+        self.assertEqual(luw_contract.luw_map, {})
+
+    def test_missing_repository_state_has_no_message(self):
+        luw_id = self.create_luw([REPOSITORY_ID_1])
+
+        with self.assertRaises(model.ContractError) as raised:
+            self.registry.get_luw_repository_state(luw_id, REPOSITORY_ID_2)
+        self.assertIsNone(raised.exception.message)
+
+    def test_storage_contracts(self):
+        storage_contracts = self.registry.get_storage_contracts()
+
+        self.assertEqual(storage_contracts["luw_storage_contract_address"], self.topology.luw_contract.address)
+        self.assertEqual(storage_contracts["provider_storage_contract_address"], self.topology.asset_provider.address)
+        self.assertTrue(self.registry.verify_storage_contracts())
+
+        self.assertEqual(self.call("operator_A", "sync_storage_contracts"), "Incorrect certifier")
+
+        # A stale cache is detected, and fixed by syncing again
+        self.topology.luw_repo_contract.storage_contract = "KT1_other"
+        self.assertFalse(self.registry.verify_storage_contracts())
+        self.assertIsNone(self.call("certifier", "sync_storage_contracts"))
+        self.assertEqual(self.registry.get_storage_contracts()["luw_storage_contract_address"], "KT1_other")
+
+    def test_events_match_the_decoded_records(self):
+        self.assertIsNone(self.call("operator_A", "create_asset_provider", provider_id = PROVIDER_ID_1, provider_data = "A"))
+        self.assertIsNone(self.call("operator_A", "set_provider_data", provider_id = PROVIDER_ID_1, provider_data = "B"))
+        self.assertIsNone(self.call("operator_A", "register_asset_twin",
+            anchor_hash = HASH_1, provider_id = PROVIDER_ID_1, repo_end_point = "end_point_1"))
+        luw_id = self.create_luw([REPOSITORY_ID_1])
+        self.assertIsNone(self.call("operator_A", "abort_luw", luw_id = luw_id))
+
+        recorded = self.topology.network.events
+        self.assertEqual([event.tag for event in recorded], [
+            "provider_created",
+            "provider_data_changed",
+            "asset_twin_registered",
+            "luw_created",
+            "repository_added",
+            "luw_repositories_closed",
+            "luw_state_added",
+        ])
+        for event in recorded:
+            self.assertEqual(sorted(event.payload), sorted(events.EVENT_TYPES[event.tag]._fields))
+
+
+class OperationGeneratorTest(unittest.TestCase):
+    def test_seeded_sequences_are_repeatable(self):
+        self.assertEqual(
+            model.OperationGenerator(seed = 1).operations(50),
+            model.OperationGenerator(seed = 1).operations(50),
+        )
+
+    def test_every_entry_point_takes_its_parameters(self):
+        generator = model.OperationGenerator(seed = 2)
+        topology = model.Topology()
+
+        for entry_point, parameter_names in model.REGISTRY_ENTRY_POINTS.items():
+            operation = generator.operation()._replace(entry_point = entry_point, parameters = generator.parameters(entry_point))
+            self.assertEqual(tuple(operation.parameters), parameter_names)
+            # Runs through the model, whether the operation succeeds or fails
+            topology.apply(operation)
+
+    def test_every_entry_point_succeeds(self):
+        # The sequence of modelScenarios.py
+        topology = model.Topology()
+        successes = {entry_point: 0 for entry_point in model.REGISTRY_ENTRY_POINTS}
+
+        for operation in model.OperationGenerator(seed = 21).operations(400):
+            if topology.apply(operation) is None:
+                successes[operation.entry_point] += 1
+
+        for entry_point, count in successes.items():
+            self.assertGreaterEqual(count, 2, entry_point)
+
+        for entry_point in ("change_luw_state", "change_luw_repository_states", "commit_luw"):
+            self.assertGreaterEqual(successes[entry_point], 5, entry_point)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+# Digests of the off-chain provider documents of content-addressed providers
+#
+#     python -m unittest discover oat/tests
+
+import json
+import re
+import unittest
+from pathlib import Path
+
+from oat import providerDocuments
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+SCENARIOS = Path(__file__).resolve().parents[2] / "providerTopologyScenarios.py"
+
+
+def load_document(name):
+    return json.loads((FIXTURES / name).read_text())
+
+
+def scenario_digest(name):
+    # The digest the scenario of content-addressed providers stores for the document
+    found = re.search(r"%s = sp\.record\(\s*digest = sp\.bytes\(\"(0x[0-9a-f]+)\"\)" % name, SCENARIOS.read_text())
+
+    return found.group(1)
+
+
+class DigestTest(unittest.TestCase):
+    def test_key_order_and_whitespace_do_not_change_the_digest(self):
+        text = (FIXTURES / "provider_A.json").read_text()
+        document = json.loads(text)
+        reordered = dict(reversed(list(document.items())))
+
+        self.assertEqual(providerDocuments.digest(text), providerDocuments.digest(document))
+        self.assertEqual(providerDocuments.digest(json.dumps(reordered, separators = (",", ":")).encode()),
+            providerDocuments.digest(document))
+        self.assertEqual(providerDocuments.canonicalize(text), providerDocuments.canonicalize(json.dumps(document)))
+
+    def test_verify(self):
+        document_A = load_document("provider_A.json")
+        digest_A = providerDocuments.digest(document_A)
+
+        self.assertTrue(providerDocuments.verify(document_A, digest_A))
+        self.assertTrue(providerDocuments.verify(document_A, "0x" + digest_A.hex()))
+        self.assertFalse(providerDocuments.verify(load_document("provider_B.json"), digest_A))
+
+        document_A["repositories"].append("https://repository-0.example.com/r0")
+        self.assertFalse(providerDocuments.verify(document_A, digest_A.hex()))
+
+    def test_digest_length(self):
+        with self.assertRaisesRegex(ValueError, "32 bytes, got 31"):
+            providerDocuments.parse_digest(bytes(31))
+        with self.assertRaisesRegex(ValueError, "32 bytes, got 33"):
+            providerDocuments.verify(load_document("provider_A.json"), "00" * 33)
+
+    def test_scenario_digests_are_the_fixture_digests(self):
+        for name, fixture in (("provider_document_A", "provider_A.json"), ("provider_document_B", "provider_B.json")):
+            self.assertEqual(
+                providerDocuments.parse_digest(scenario_digest(name)),
+                providerDocuments.digest(load_document(fixture)),
+                name,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+# Read-through cache of the Registry views, invalidated by recorded receipts
+#
+#     python -m unittest discover oat/tests
+
+import json
+import unittest
+from pathlib import Path
+
+from oat.client import RPC, RegistryClient, ViewCache, registryTypes
+from oat.client.mockNode import MockNode
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+REGISTRY_ADDRESS = "KT1TezoooozzSmartPyzzSTATiCzzzwwBFA1"
+ASSET_TWIN_CONTRACT = "KT1PWx2mnDueood7fEmfbBDKx1D9BAnnXitn"
+OPERATOR_ADDRESS = "tz1VSUr8wwNhLAzempoch5d6hLRiTh8Cjcjb"
+
+HASH_1 = "efb583d376b19d92d81e75bea335768d2b5cc9d60460c182cb6e66e8031b1aea"
+HASH_2 = "0b7f8c54e7f3a1c2d0b6c1d8e3c2b4a59f7e1d2c3b4a5968778695a4b3c2d1e0"
+PROVIDER_ID_1 = "86a6c8f7-dc31-46ba-98fc-58bea40fc28d"
+PROVIDER_ID_2 = "7f6fd42a-1927-4dd1-b32a-e87f4890d77a"
+
+
+def load_block():
+    return json.loads((FIXTURES / "block.json").read_text())
+
+
+def load_luw_operations():
+    return [json.loads(line) for line in (FIXTURES / "luw_operations.jsonl").read_text().splitlines() if line.strip()]
+
+
+class StubClient:
+    # Answers each read with the view, its request and the number of reads so far
+    def __init__(self):
+        self.reads = []
+        self.during_read = None
+
+    def view(self, view, request):
+        self.reads.append((view, request))
+        if self.during_read is not None:
+            self.during_read()
+
+        return (view, request, len(self.reads))
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ViewCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.client = StubClient()
+        self.clock = Clock()
+        self.cache = ViewCache(self.client, ttl = 10, clock = self.clock)
+
+    def test_reads_through_once(self):
+        first = self.cache.fetch_asset_twin(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1)
+        second = self.cache.fetch_asset_twin(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.client.reads), 1)
+
+        stats = self.cache.stats().views["fetch_asset_twin"]
+        self.assertEqual((stats.hits, stats.misses, stats.hit_rate), (1, 1, 0.5))
+        self.assertIsNotNone(stats.hit_latency.p99)
+        self.assertIsNotNone(stats.miss_latency.mean)
+
+        # Other views are not cached
+        self.cache.get_active_luw_state(luw_id = 0)
+        self.cache.get_active_luw_state(luw_id = 0)
+        self.assertEqual(len(self.client.reads), 3)
+
+    def test_registration_evicts_only_its_key(self):
+        self.cache.fetch_asset_twin(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1)
+        self.cache.fetch_asset_twin(anchor_hash = HASH_2, provider_id = PROVIDER_ID_1)
+        self.cache.get_asset_provider(provider_id = PROVIDER_ID_1)
+        self.cache.get_asset_provider(provider_id = PROVIDER_ID_2)
+        self.cache.fetch_luw(luw_id = 0, offset = 0, limit = 100)
+
+        # Registrations of (HASH_1, PROVIDER_ID_1), (HASH_1, PROVIDER_ID_2), and changes of PROVIDER_ID_1
+        self.assertEqual(self.cache.invalidate(load_block()), 2)
+
+        self.client.reads = []
+        self.cache.fetch_asset_twin(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1)
+        self.cache.fetch_asset_twin(anchor_hash = HASH_2, provider_id = PROVIDER_ID_1)
+        self.cache.get_asset_provider(provider_id = PROVIDER_ID_1)
+        self.cache.get_asset_provider(provider_id = PROVIDER_ID_2)
+        self.cache.fetch_luw(luw_id = 0, offset = 0, limit = 100)
+
+        self.assertEqual(self.client.reads, [
+            ("fetch_asset_twin", registryTypes.FetchAssetTwinRequest(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1)),
+            ("get_asset_provider", registryTypes.GetAssetProviderRequest(provider_id = PROVIDER_ID_1)),
+        ])
+        self.assertEqual(self.cache.stats().views["get_asset_provider"].invalidations, 3)
+
+    def test_luw_events_evict_their_luw(self):
+        self.cache.fetch_luw(luw_id = 0, offset = 0, limit = 100)
+        self.cache.fetch_luw(luw_id = 0, offset = 100, limit = 100)
+        self.cache.fetch_luw(luw_id = 1, offset = 0, limit = 100)
+
+        # Every page of the LUW is evicted
+        self.assertEqual(self.cache.invalidate(load_luw_operations()), 2)
+        self.assertEqual(self.cache.stats().entries, 1)
+
+        self.cache.fetch_luw(luw_id = 1, offset = 0, limit = 100)
+        self.assertEqual(len(self.client.reads), 3)
+
+    def test_contract_filter(self):
+        cache = ViewCache(self.client, contracts = {ASSET_TWIN_CONTRACT})
+        cache.get_asset_provider(provider_id = PROVIDER_ID_1)
+        cache.fetch_asset_twin(anchor_hash = HASH_1, provider_id = PROVIDER_ID_2)
+
+        # Only the registrations are from the asset twin contract
+        self.assertEqual(cache.invalidate(load_block()), 1)
+        self.assertEqual(cache.stats().entries, 1)
+
+    def test_ttl(self):
+        self.cache.get_asset_provider(provider_id = PROVIDER_ID_1)
+        self.clock.now = 9.9
+        self.cache.get_asset_provider(provider_id = PROVIDER_ID_1)
+        self.clock.now = 10
+        self.cache.get_asset_provider(provider_id = PROVIDER_ID_1)
+
+        self.assertEqual(len(self.client.reads), 2)
+        self.assertEqual(self.cache.stats().expirations, 1)
+
+    def test_lru_bounds(self):
+        cache = ViewCache(self.client, max_entries = 2)
+        for luw_id in (0, 1, 0, 2):
+            cache.fetch_luw(luw_id = luw_id, offset = 0, limit = 100)
+
+        # LUW 1 was the least recently used
+        self.assertEqual([key[1].luw_id for key in cache.entries], [0, 2])
+        self.assertEqual(cache.stats().evictions, 1)
+
+        entry_size = next(iter(cache.entries.values())).size
+        cache = ViewCache(self.client, max_size = 2 * entry_size + 1)
+        for luw_id in (3, 4, 5):
+            cache.fetch_luw(luw_id = luw_id, offset = 0, limit = 100)
+
+        self.assertEqual(cache.stats().entries, 2)
+        self.assertLessEqual(cache.stats().size, cache.max_size)
+
+    def test_read_overlapping_an_invalidation_is_not_stored(self):
+        self.client.during_read = lambda: self.cache.invalidate(load_block())
+        self.cache.fetch_asset_twin(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1)
+
+        self.client.during_read = None
+        self.cache.fetch_asset_twin(anchor_hash = HASH_1, provider_id = PROVIDER_ID_1)
+        self.assertEqual(len(self.client.reads), 2)
+
+
+class SyncTest(unittest.TestCase):
+    def test_sync_with_the_node(self):
+        with MockNode() as node, RPC(node.url) as rpc:
+            node.views["get_asset_provider"] = lambda view_input: {"prim": "Pair", "args": [
+                {"prim": "Pair", "args": [{"string": OPERATOR_ADDRESS}, {"string": "provider"}]},
+                {"prim": "Pair", "args": [{"string": view_input["string"]}, {"string": "active"}]},
+            ]}
+            node.blocks[4199] = {"header": {"level": 4199}, "operations": []}
+
+            cache = ViewCache(RegistryClient(rpc, REGISTRY_ADDRESS))
+
+            provider = cache.get_asset_provider(provider_id = PROVIDER_ID_1)
+            self.assertEqual(provider.status, "active")
+
+            # The first sync does not know which blocks the entries predate
+            self.assertEqual(cache.sync(), 0)
+            self.assertEqual(cache.stats().entries, 0)
+
+            cache.get_asset_provider(provider_id = PROVIDER_ID_1)
+            cache.get_asset_provider(provider_id = PROVIDER_ID_2)
+            node.blocks[4200] = load_block()
+
+            self.assertEqual(cache.sync(), 1)
+            self.assertEqual(cache.level, 4200)
+            self.assertEqual(len(node.requests_to("/chains/main/blocks/head/helpers/scripts/run_script_view")), 3)
+
+    def test_sync_after_a_reorganization(self):
+        with MockNode() as node, RPC(node.url) as rpc:
+            node.views["get_asset_provider"] = lambda view_input: {"prim": "Pair", "args": [
+                {"prim": "Pair", "args": [{"string": OPERATOR_ADDRESS}, {"string": "provider"}]},
+                {"prim": "Pair", "args": [{"string": view_input["string"]}, {"string": "active"}]},
+            ]}
+            node.blocks[4199] = {"hash": "BLa4199", "header": {"level": 4199}, "operations": []}
+
+            cache = ViewCache(RegistryClient(rpc, REGISTRY_ADDRESS))
+            cache.sync()
+            self.assertEqual(cache.block_hash, "BLa4199")
+
+            # The entry may have been read from the block that is replaced
+            cache.get_asset_provider(provider_id = PROVIDER_ID_2)
+            node.blocks[4199] = {"hash": "BLb4199", "header": {"level": 4199}, "operations": []}
+            node.blocks[4200] = load_block()
+
+            self.assertEqual(cache.sync(), 0)
+            self.assertEqual(cache.stats().entries, 0)
+            self.assertEqual((cache.level, cache.block_hash), (4200, "BLblock"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+# SmartPy CLI and octez-client mockup wrappers
+#
+# The SmartPy interpreter does not meter gas, so anything that needs real costs
+# compiles the contracts with the SmartPy CLI and runs the Michelson in a local
+# octez-client mockup, which reports consumed gas and storage burn per operation.
+
+import functools
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+
+REPOSITORY_ROOT = Path(__file__).resolve().parent.parent
+
+SMARTPY_CLI = os.environ.get("SMARTPY_CLI", os.path.expanduser("~/smartpy-cli/SmartPy.sh"))
+OCTEZ_CLIENT = os.environ.get("OCTEZ_CLIENT", "octez-client")
+
+BOOTSTRAP_ACCOUNTS = ("bootstrap1", "bootstrap2", "bootstrap3", "bootstrap4", "bootstrap5")
+
+CompiledContract = namedtuple("CompiledContract", ["code", "storage"])
+
+Receipt = namedtuple("Receipt", [
+    "consumed_gas",
+    "storage_size",
+    "paid_storage_size_diff",
+    "internal_operations",
+    "output",
+])
+
+
+class ToolchainError(Exception):
+    pass
+
+
+def run_command(arguments, cwd = None):
+    try:
+        completed = subprocess.run(
+            arguments,
+            cwd = cwd,
+            stdout = subprocess.PIPE,
+            stderr = subprocess.STDOUT,
+            text = True,
+        )
+    except FileNotFoundError:
+        raise ToolchainError("Command not found: %s" % arguments[0])
+
+    if completed.returncode != 0:
+        raise ToolchainError("%s failed:\n%s" % (" ".join(arguments[:3]), completed.stdout))
+
+    return completed.stdout
+
+
+#######################
+# SmartPy compilation #
+#######################
+
+@functools.lru_cache(maxsize = None)
+def smartpy_version():
+    # Identifies the compiler in the artifact and test result cache keys, so that they
+    # change with an upgrade of the CLI in place: its `--version` output, or the digest
+    # of the CLI itself when it has no such option. Computed once per process.
+    try:
+        return run_command([SMARTPY_CLI, "--version"]).strip()
+    except ToolchainError:
+        pass
+
+    try:
+        return hashlib.sha256(Path(SMARTPY_CLI).read_bytes()).hexdigest()
+    except OSError:
+        raise ToolchainError("Command not found: %s" % SMARTPY_CLI)
+
+
+def compilation_script(contract_file, contract_class, arguments):
+    # The contract modules are loaded from the repository files, the same way the
+    # IDE loads them with sp.io.import_stored_contract
+    contract_path = Path(contract_file)
+    if not contract_path.is_absolute():
+        contract_path = REPOSITORY_ROOT / contract_path
+
+    return "\n".join([
+        "import smartpy as sp",
+        "",
+        "CONTRACT = sp.io.import_script_from_url(%r)" % ("file:%s" % contract_path),
+        "",
+        "sp.add_compilation_target(\"contract\", CONTRACT.%s(%s))" % (contract_class, ", ".join(arguments)),
+        "",
+    ])
+
+
+def compile_contract(contract_file, contract_class, arguments):
+    # `arguments` are SmartPy expressions given as source, e.g. "sp.address('tz1...')"
+    with tempfile.TemporaryDirectory(prefix = "oat-compile-") as work_dir:
+        script = Path(work_dir) / "target.py"
+        script.write_text(compilation_script(contract_file, contract_class, arguments))
+
+        output_dir = Path(work_dir) / "output"
+        run_command([SMARTPY_CLI, "compile", str(script), str(output_dir)])
+
+        target_dir = output_dir / "contract"
+        return CompiledContract(
+            code = (target_dir / "step_000_cont_0_contract.tz").read_text(),
+            storage = (target_dir / "step_000_cont_0_storage.tz").read_text().strip(),
+        )
+
+
+################
+# octez mockup #
+################
+
+CONSUMED_GAS = re.compile(r"Consumed gas: ([0-9.]+)")
+STORAGE_SIZE = re.compile(r"Storage size: ([0-9]+) bytes")
+PAID_STORAGE_SIZE_DIFF = re.compile(r"Paid storage size diff: ([0-9]+) bytes")
+INTERNAL_OPERATION = re.compile(r"Internal (?:Transaction|Origination|Event):")
+ORIGINATED_CONTRACT = re.compile(r"New contract (KT1[1-9A-HJ-NP-Za-km-z]{33}) originated")
+ADDRESS_HASH = re.compile(r"Hash: (tz[1-4][1-9A-HJ-NP-Za-km-z]{33})")
+
+
+def parse_receipt(output):
+    # Every (internal) operation result reports its own gas and storage figures
+    return Receipt(
+        consumed_gas = sum(float(value) for value in CONSUMED_GAS.findall(output)),
+        storage_size = sum(int(value) for value in STORAGE_SIZE.findall(output)),
+        paid_storage_size_diff = sum(int(value) for value in PAID_STORAGE_SIZE_DIFF.findall(output)),
+        internal_operations = len(INTERNAL_OPERATION.findall(output)),
+        output = output,
+    )
+
+
+class Mockup:
+    def __init__(self, base_dir = None, protocol = None):
+        self.owns_base_dir = base_dir is None
+        self.base_dir = base_dir or tempfile.mkdtemp(prefix = "oat-mockup-")
+        self.protocol = protocol or os.environ.get("OCTEZ_PROTOCOL")
+        self.contracts = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def client(self, *arguments):
+        global_options = ["--mode", "mockup", "--base-dir", self.base_dir]
+        if self.protocol:
+            global_options += ["--protocol", self.protocol]
+
+        return run_command([OCTEZ_CLIENT] + global_options + list(arguments))
+
+    def start(self):
+        # The mockup state lives in the (empty) base dir for the lifetime of this object
+        self.client("create", "mockup")
+
+        self.accounts = {name: self.address_of(name) for name in BOOTSTRAP_ACCOUNTS}
+
+    def close(self):
+        if self.owns_base_dir:
+            shutil.rmtree(self.base_dir, ignore_errors = True)
+
+    def address_of(self, account):
+        match = ADDRESS_HASH.search(self.client("show", "address", account))
+        if match is None:
+            raise ToolchainError("Unknown mockup account: %s" % account)
+
+        return match.group(1)
+
+    def originate(self, name, compiled, storage = None, source = "bootstrap1"):
+        code_file = Path(self.base_dir) / ("%s.tz" % name)
+        code_file.write_text(compiled.code)
+
+        output = self.client(
+            "originate", "contract", name,
+            "transferring", "0", "from", source,
+            "running", str(code_file),
+            "--init", storage or compiled.storage,
+            "--burn-cap", "100",
+            "--force",
+        )
+
+        match = ORIGINATED_CONTRACT.search(output)
+        if match is None:
+            raise ToolchainError("Origination of %s did not report a contract address:\n%s" % (name, output))
+
+        self.contracts[name] = match.group(1)
+        return self.contracts[name], parse_receipt(output)
+
+    def transfer(self, source, destination, entrypoint, argument):
+        output = self.client(
+            "transfer", "0", "from", source,
+            "to", destination,
+            "--entrypoint", entrypoint,
+            "--arg", argument,
+            "--burn-cap", "100",
+        )
+
+        return parse_receipt(output)
@@ -0,0 +1,159 @@
+# Synthetic Registry receipts
+#
+# Generates blocks of Registry operations as a node returns them, with the contract
+# events of their internal operations, for the indexer and view cache tests and
+# benchmarks. The blocks hold a realistic mix of operations: provider creations,
+# single and batch asset twin registrations, and LUWs taken through their whole
+# lifecycle. The generator keeps the state the operations lead to, to check an
+# index built from them against.
+#
+#     workload = Workload()
+#     operation = workload.next_operation()
+#     blocks = generate_blocks(blocks = 200, operations_per_block = 50)
+
+ASSET_TWIN_CONTRACT = "KT1PWx2mnDueood7fEmfbBDKx1D9BAnnXitn"
+PROVIDER_CONTRACT = "KT1XTxpQvo7oRCqp85LikEZgAZ22uDxhbWJv"
+LUW_CONTRACT = "KT1SJ9ufn9YjAiMkgA3pL6cXgrbmrZ1nZL5C"
+OPERATOR_ADDRESS = "tz1VSUr8wwNhLAzempoch5d6hLRiTh8Cjcjb"
+
+# Registrations per batch registration operation
+REGISTRATION_BATCH = 10
+
+DISTINCT_HASHES = 1000
+
+
+def annotated(prim, name):
+    return {"prim": prim, "annots": ["%" + name]}
+
+
+def pair_type(*args):
+    return {"prim": "pair", "args": list(args)}
+
+
+def pair(*args):
+    return {"prim": "Pair", "args": list(args)}
+
+
+def string(value):
+    return {"string": value}
+
+
+def nat(value):
+    return {"int": str(value)}
+
+
+ASSET_TWIN_REGISTERED_TYPE = pair_type(
+    annotated("string", "anchor_hash"),
+    pair_type(annotated("string", "provider_id"), annotated("nat", "registration_count")),
+)
+PROVIDER_CREATED_TYPE = pair_type(annotated("address", "creator_wallet_address"), annotated("string", "provider_id"))
+LUW_CREATED_TYPE = pair_type(annotated("address", "creator_wallet_address"), annotated("nat", "luw_id"))
+LUW_STATE_TYPE = pair_type(annotated("nat", "luw_id"), annotated("nat", "state_id"))
+REPOSITORY_TYPE = pair_type(
+    annotated("nat", "luw_id"),
+    pair_type(annotated("string", "repository_id"), annotated("nat", "state_id")),
+)
+
+
+def event(contract, tag, michelson_type, payload):
+    return {
+        "kind": "event",
+        "source": contract,
+        "type": michelson_type,
+        "tag": tag,
+        "payload": payload,
+        "result": {"status": "applied", "consumed_milligas": "100000"},
+    }
+
+
+def operation(operation_hash, internal_results):
+    return {
+        "hash": operation_hash,
+        "contents": [{
+            "kind": "transaction",
+            "source": OPERATOR_ADDRESS,
+            "metadata": {
+                "operation_result": {"status": "applied"},
+                "internal_operation_results": internal_results,
+            },
+        }],
+    }
+
+
+class Workload:
+    # Generates the operations of a Registry deployment in the order they could be applied
+
+    def __init__(self):
+        self.operations = 0
+        self.providers = 0
+        self.registered = 0
+        self.registrations = {}
+        self.luws = 0
+
+    def provider_id(self, index):
+        return "provider-%d" % index
+
+    def create_provider(self):
+        provider_id = self.provider_id(self.providers)
+        self.providers += 1
+
+        return [event(PROVIDER_CONTRACT, "provider_created", PROVIDER_CREATED_TYPE,
+            pair(string(OPERATOR_ADDRESS), string(provider_id)))]
+
+    def register(self, count):
+        # Anchor hashes come back every DISTINCT_HASHES registrations, with the next provider
+        results = []
+
+        for _ in range(count):
+            key = ("%064x" % (self.registered % DISTINCT_HASHES), self.provider_id(self.registered % self.providers))
+            self.registrations[key] = self.registrations.get(key, 0) + 1
+            self.registered += 1
+
+            results.append(event(ASSET_TWIN_CONTRACT, "asset_twin_registered", ASSET_TWIN_REGISTERED_TYPE,
+                pair(string(key[0]), string(key[1]), nat(self.registrations[key]))))
+
+        return results
+
+    def luw_lifecycle(self):
+        # Created, two repositories added and made ready, prepared and committed
+        luw_id = self.luws
+        self.luws += 1
+
+        results = [event(LUW_CONTRACT, "luw_created", LUW_CREATED_TYPE, pair(string(OPERATOR_ADDRESS), nat(luw_id)))]
+        for repository in ("repository-a", "repository-b"):
+            results.append(event(LUW_CONTRACT, "repository_added", REPOSITORY_TYPE,
+                pair(nat(luw_id), string(repository), nat(1))))
+        for repository in ("repository-a", "repository-b"):
+            results.append(event(LUW_CONTRACT, "repository_state_changed", REPOSITORY_TYPE,
+                pair(nat(luw_id), string(repository), nat(2))))
+        results += [
+            event(LUW_CONTRACT, "luw_state_added", LUW_STATE_TYPE, pair(nat(luw_id), nat(2))),
+            event(LUW_CONTRACT, "luw_repositories_closed", LUW_STATE_TYPE, pair(nat(luw_id), nat(3))),
+            event(LUW_CONTRACT, "luw_state_added", LUW_STATE_TYPE, pair(nat(luw_id), nat(3))),
+        ]
+
+        return results
+
+    def next_operation(self):
+        # One in fifty operations creates a provider, one in ten is a LUW lifecycle and
+        # one in ten a batch registration
+        if self.providers < 2 or self.operations % 50 == 0:
+            results = self.create_provider()
+        elif self.operations % 10 == 1:
+            results = self.luw_lifecycle()
+        elif self.operations % 10 == 2:
+            results = self.register(REGISTRATION_BATCH)
+        else:
+            results = self.register(1)
+
+        self.operations += 1
+        return operation("oo%d" % self.operations, results)
+
+
+def generate_blocks(blocks, operations_per_block):
+    workload = Workload()
+
+    return [{
+        "header": {"level": level, "timestamp": "2026-01-01T00:00:00Z"},
+        "operations": [[], [], [], [workload.next_operation() for _ in range(operations_per_block)]],
+    } for level in range(1, blocks + 1)]
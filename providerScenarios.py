@@ -0,0 +1,92 @@
+# Asset Provider Scenarios
+
+import smartpy as sp
+
+@sp.add_test(name = "ProviderScenarios")
+def test():
+    FIXTURE = sp.io.import_stored_contract("testFixture.py")
+
+    accounts = FIXTURE.Accounts()
+
+    operator_A_address = accounts.operator_A_address
+    operator_B_address = accounts.operator_B_address
+
+    scenario = sp.test_scenario()
+
+    topology = FIXTURE.Topology(scenario, accounts)
+
+    lambda_contract = topology.lambda_contract
+
+    # Testing
+
+    scenario.h1("Testing")
+    scenario.h2("Expected Successful Cases")
+
+    # Asset Provider Testing
+
+    scenario.h2("Asset Provider Testing")
+    scenario.h3("Asset Provider Creation")
+
+    asset_provider_data_A = FIXTURE.asset_provider_data_A
+    asset_provider_data_B = FIXTURE.asset_provider_data_B
+
+    provider_id_1 = FIXTURE.provider_id_1
+    provider_id_2 = FIXTURE.provider_id_2
+
+    asset_provider_1 = sp.record(
+        provider_id = provider_id_1,
+        provider_data = asset_provider_data_A
+    )
+
+    asset_provider_2 = sp.record(
+        provider_id = provider_id_2,
+        provider_data = asset_provider_data_B
+    )
+
+    lambda_contract.create_asset_provider(asset_provider_1).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_1).provider_data == asset_provider_data_A)
+    lambda_contract.create_asset_provider(asset_provider_2).run(valid = True, sender = operator_B_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_2).provider_data == asset_provider_data_B)
+
+    scenario.h3("Asset Provider Management")
+
+    change_asset_provider_1_data = sp.record(
+        provider_id = provider_id_1,
+        provider_data = asset_provider_data_B
+    )
+
+    lambda_contract.set_provider_data(change_asset_provider_1_data).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_1).provider_data == asset_provider_data_B)
+
+    change_asset_provider_1_owner_A = sp.record(
+        provider_id = provider_id_1,
+        new_owner_address = operator_A_address
+    )
+
+    change_asset_provider_1_owner_B = sp.record(
+        provider_id = provider_id_1,
+        new_owner_address = operator_B_address
+    )
+
+    lambda_contract.set_provider_owner(change_asset_provider_1_owner_B).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_1).creator_wallet_address == operator_B_address)
+    lambda_contract.set_provider_owner(change_asset_provider_1_owner_A).run(valid = True, sender = operator_B_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_1).creator_wallet_address == operator_A_address)
+
+    scenario.h3("Asset Provider Status Change")
+
+    asset_provider_status_valid = sp.record(
+        provider_id = provider_id_1,
+        status = 1
+    )
+
+    lambda_contract.set_provider_deprecated(provider_id_1).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_1).status == "deprecated")
+    lambda_contract.set_provider_status(asset_provider_status_valid).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_1).status == "active")
+
+    scenario.h3("Storage Contracts")
+
+    scenario.verify(lambda_contract.verify_storage_contracts())
+    scenario.verify(lambda_contract.get_storage_contracts().provider_storage_contract_address == topology.asset_provider.address)
+    scenario.verify(lambda_contract.get_storage_contracts().luw_storage_contract_address == topology.luw_contract.address)
@@ -0,0 +1,319 @@
+# Provider Topology Scenarios
+
+import smartpy as sp
+
+@sp.add_test(name = "DirectTopologyTestScripts")
+def test():
+    FIXTURE = sp.io.import_stored_contract("testFixture.py")
+    ASSET_PROVIDER_DIRECT = sp.io.import_stored_contract("assetProviderDirect.py")
+
+    accounts = FIXTURE.Accounts()
+
+    certifier_address = accounts.certifier_address
+    operator_A_address = accounts.operator_A_address
+    operator_B_address = accounts.operator_B_address
+
+    scenario = sp.test_scenario()
+
+    # Status and state names are compiled into the contracts of this topology
+    topology = FIXTURE.Topology(scenario, accounts, direct_provider = True, constant_tables = True)
+
+    asset_provider_direct = topology.asset_provider_direct
+    lambda_contract = topology.lambda_contract
+
+    # Testing
+
+    scenario.h1("Testing")
+    scenario.h2("Expected Successful Cases")
+
+    scenario.h2("Asset Provider Testing")
+    scenario.h3("Asset Provider Creation")
+
+    asset_provider_data_A = "asset_provider_data_A"
+    asset_provider_data_B = "asset_provider_data_B"
+
+    provider_id_1 = "86a6c8f7-dc31-46ba-98fc-58bea40fc28d"
+    provider_id_2 = "7f6fd42a-1927-4dd1-b32a-e87f4890d77a"
+
+    asset_provider_1 = sp.record(
+        provider_id = provider_id_1,
+        provider_data = asset_provider_data_A
+    )
+
+    asset_provider_2 = sp.record(
+        provider_id = provider_id_2,
+        provider_data = asset_provider_data_B
+    )
+
+    lambda_contract.create_asset_provider(asset_provider_1).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_1).provider_data == asset_provider_data_A)
+    lambda_contract.create_asset_provider(asset_provider_2).run(valid = True, sender = operator_B_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_2).provider_data == asset_provider_data_B)
+
+    scenario.h3("Asset Provider Management")
+
+    change_asset_provider_1_data = sp.record(
+        provider_id = provider_id_1,
+        provider_data = asset_provider_data_B
+    )
+
+    lambda_contract.set_provider_data(change_asset_provider_1_data).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_1).provider_data == asset_provider_data_B)
+
+    change_asset_provider_1_owner_A = sp.record(
+        provider_id = provider_id_1,
+        new_owner_address = operator_A_address
+    )
+
+    change_asset_provider_1_owner_B = sp.record(
+        provider_id = provider_id_1,
+        new_owner_address = operator_B_address
+    )
+
+    lambda_contract.set_provider_owner(change_asset_provider_1_owner_B).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_1).creator_wallet_address == operator_B_address)
+    lambda_contract.set_provider_owner(change_asset_provider_1_owner_A).run(valid = True, sender = operator_B_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_1).creator_wallet_address == operator_A_address)
+
+    scenario.h3("Asset Provider Status Change")
+
+    asset_provider_status_valid = sp.record(
+        provider_id = provider_id_1,
+        status = 1
+    )
+
+    asset_status_invalid_status = sp.record(
+        provider_id = provider_id_2,
+        status = 9999
+    )
+
+    asset_status_invalid_status_owner = sp.record(
+        provider_id = provider_id_1,
+        status = 9999
+    )
+
+    asset_status_invalid_provider = sp.record(
+        provider_id = "non_existing_did",
+        status = 1
+    )
+
+    lambda_contract.set_provider_deprecated(provider_id_1).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_1).status == "deprecated")
+    lambda_contract.set_provider_status(asset_provider_status_valid).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_1).status == "active")
+
+    scenario.h3("Asset Provider Logic Upgrade")
+
+    asset_provider_direct.set_logic(
+        name = "update_provider",
+        logic = sp.build_lambda(ASSET_PROVIDER_DIRECT.update_provider)
+    ).run(valid = True, sender = certifier_address)
+
+    lambda_contract.set_provider_data(change_asset_provider_1_data).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_asset_provider(provider_id_1).provider_data == asset_provider_data_B)
+
+    scenario.h3("Storage Contracts")
+
+    scenario.verify(lambda_contract.get_storage_contracts().provider_storage_contract_address == asset_provider_direct.address)
+
+    scenario.h2("LUW Testing")
+    scenario.h3("LUW State Names")
+
+    repository_id_1 = "01add8a4-7302-490b-be57-cec2cd02f8da"
+
+    lambda_contract.create_luw(
+        provider_id = provider_id_1,
+        luw_service_endpoint = operator_B_address
+    ).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_active_luw_state(0) == "active")
+
+    lambda_contract.add_luw_repository(luw_id = 0, repository_id = repository_id_1).run(valid = True, sender = operator_A_address)
+    lambda_contract.change_luw_repository_state(luw_id = 0, repository_id = repository_id_1, state_id = 2).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_luw_repository_state(sp.record(luw_id = 0, repository_id = repository_id_1)) == "ready")
+
+    lambda_contract.change_luw_state(luw_id = 0, state_id = 2).run(valid = True, sender = operator_A_address)
+    scenario.verify(lambda_contract.get_active_luw_state(0) == "prepare_to_commit")
+
+    scenario.h2("Expected Failed Cases")
+
+    scenario.h2("Asset Provider Testing")
+    scenario.h3("Asset Provider Creation")
+
+    scenario.h4("Adding an existing Provider ID. Expected exception - Provider ID already exists")
+    lambda_contract.create_asset_provider(asset_provider_1).run(valid = False, sender = operator_B_address, exception = "Provider ID already exists")
+
+    scenario.h4("Changing provider data from incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.set_provider_data(change_asset_provider_1_data).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
+
+    scenario.h4("Changing provider owner from incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.set_provider_owner(change_asset_provider_1_owner_B).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
+
+    scenario.h3("Asset Provider Status Change")
+
+    scenario.h4("Changing provider to Active status from incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.set_provider_active(provider_id_1).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
+
+    scenario.h4("Changing provider status from incorrect wallet address. Expected exception - Non-matching owner address")
+    lambda_contract.set_provider_status(asset_status_invalid_status).run(valid = False, sender = operator_A_address, exception = "Non-matching owner address")
+
+    scenario.h4("Changing provider status to an invalid status ID. Expected exception - Incorrect status")
+    lambda_contract.set_provider_status(asset_status_invalid_status_owner).run(valid = False, sender = operator_A_address, exception = "Incorrect status")
+
+    scenario.h4("Changing provider status of a non-existing provider ID. Expected exception - Provider ID does not exist")
+    lambda_contract.set_provider_status(asset_status_invalid_provider).run(valid = False, sender = operator_A_address, exception = "Provider ID does not exist")
+
+    scenario.h3("Asset Provider Logic Upgrade")
+
+    scenario.h4("Upgrading the provider logic from a non-certifier address. Expected exception - Incorrect certifier")
+    asset_provider_direct.set_logic(
+        name = "update_provider",
+        logic = sp.build_lambda(ASSET_PROVIDER_DIRECT.update_provider)
+    ).run(valid = False, sender = operator_A_address, exception = "Incorrect certifier")
+
+    scenario.h4("Upgrading a logic the contract does not have. Expected exception - Unknown logic")
+    asset_provider_direct.set_logic(
+        name = "update_providers",
+        logic = sp.build_lambda(ASSET_PROVIDER_DIRECT.update_provider)
+    ).run(valid = False, sender = certifier_address, exception = "Unknown logic")
+
+    scenario.h2("LUW Testing")
+    scenario.h3("LUW State Names")
+
+    scenario.h4("Changing LUW state to an invalid state ID. Expected exception - Incorrect state ID")
+    lambda_contract.change_luw_state(luw_id = 0, state_id = 999).run(valid = False, sender = operator_A_address, exception = "Incorrect state ID")
+
+    scenario.h4("Changing a LUW Repository state to an invalid state ID. Expected exception - Incorrect state ID")
+    lambda_contract.change_luw_repository_state(luw_id = 0, repository_id = repository_id_1, state_id = 999).run(valid = False, sender = operator_A_address, exception = "Incorrect state ID")
+
+@sp.add_test(name = "ContentAddressedTestScripts")
+def test():
+    ASSET_PROVIDER = sp.io.import_stored_contract("assetProvider.py")
+    ASSET_PROVIDER_REPOSITORY = sp.io.import_stored_contract("assetProviderRepository.py")
+    ASSET_PROVIDER_DIRECT = sp.io.import_stored_contract("assetProviderDirect.py")
+    LAMBDA = sp.io.import_stored_contract("registry.py")
+
+    certifier = sp.test_account("Certifier")
+    operator_A = sp.test_account("Operator_A")
+    operator_B = sp.test_account("Operator_B")
+
+    certifier_address = certifier.address
+    operator_A_address = operator_A.address
+    operator_B_address = operator_B.address
+
+    scenario = sp.test_scenario()
+    scenario.h1("Preparation")
+    scenario.table_of_contents()
+
+    scenario.h2("Accounts")
+    scenario.show([certifier, operator_A, operator_B])
+
+    scenario.h2("Contracts List")
+
+    # Only the provider digest and URI are stored by the contracts of this scenario
+
+    scenario.h3("Asset Provider")
+
+    asset_provider = ASSET_PROVIDER.AssetProvider(certifier_address, content_addressed = True)
+
+    scenario += asset_provider
+
+    scenario.h3("Asset Provider Repository")
+
+    asset_provider_repo = ASSET_PROVIDER_REPOSITORY.AssetProviderRepository(
+        asset_provider.address, certifier_address, content_addressed = True
+    )
+
+    scenario += asset_provider_repo
+
+    scenario.h2("Updating storage contract with logic contract address for Asset Provider Repository")
+
+    asset_provider_repo.update_storage_contract_with_address().run(valid = True, sender = certifier_address)
+
+    scenario.h3("Asset Provider Direct")
+
+    asset_provider_direct = ASSET_PROVIDER_DIRECT.AssetProviderDirect(certifier_address, content_addressed = True)
+
+    scenario += asset_provider_direct
+
+    # Lambda Contract Instantiation, one per topology. Only the provider entry points are called.
+
+    scenario.h3("Lambda Contracts")
+
+    lambda_contracts = []
+
+    for asset_provider_contract in [asset_provider_repo, asset_provider_direct]:
+        lambda_contract = LAMBDA.Registry(
+            sp.record(
+                asset_provider_contract = asset_provider_contract.address,
+                asset_twin_contract = asset_provider_contract.address,
+                luw_contract = asset_provider_contract.address,
+            ),
+            certifier_address,
+            content_addressed = True
+        )
+
+        scenario += lambda_contract
+
+        lambda_contracts.append(lambda_contract)
+
+    # Testing
+
+    scenario.h1("Testing")
+
+    provider_id_1 = "86a6c8f7-dc31-46ba-98fc-58bea40fc28d"
+
+    # SHA-256 digests of the canonical provider documents oat/tests/fixtures/provider_A.json and
+    # provider_B.json, as computed by oat.providerDocuments.digest (see oat/tests/test_provider_documents.py)
+    provider_document_A = sp.record(
+        digest = sp.bytes("0xc7320eb922ec6aeced64bda226588e7c178b30d39e8fb65f9aacf8df985798f8"),
+        uri = "https://providers.example.com/provider_A.json"
+    )
+
+    provider_document_B = sp.record(
+        digest = sp.bytes("0x9355b98e1d65a26c76cfe53aa1032ff8afe6415d5f472c9600c142163dfc139a"),
+        uri = "https://providers.example.com/provider_B.json"
+    )
+
+    provider_document_short_digest = sp.record(
+        digest = sp.bytes("0xc7320eb922ec6aeced64bda226588e7c178b30d39e8fb65f9aacf8df985798"),
+        uri = "https://providers.example.com/provider_A.json"
+    )
+
+    for lambda_contract in lambda_contracts:
+        scenario.h2("Expected Successful Cases")
+
+        scenario.h3("Asset Provider Creation")
+
+        lambda_contract.create_asset_provider(
+            provider_id = provider_id_1,
+            provider_data = provider_document_A
+        ).run(valid = True, sender = operator_A_address)
+        scenario.verify_equal(lambda_contract.get_asset_provider(provider_id_1).provider_data, provider_document_A)
+
+        scenario.h3("Asset Provider Management")
+
+        lambda_contract.set_provider_data(
+            provider_id = provider_id_1,
+            provider_data = provider_document_B
+        ).run(valid = True, sender = operator_A_address)
+        scenario.verify_equal(lambda_contract.get_asset_provider(provider_id_1).provider_data, provider_document_B)
+
+        scenario.h2("Expected Failed Cases")
+
+        scenario.h4("Adding a Provider with a digest that is not 32 bytes long. Expected exception - Invalid digest length")
+        lambda_contract.create_asset_provider(
+            provider_id = "7f6fd42a-1927-4dd1-b32a-e87f4890d77a",
+            provider_data = provider_document_short_digest
+        ).run(valid = False, sender = operator_A_address, exception = "Invalid digest length")
+
+        scenario.h4("Changing provider data to a digest that is not 32 bytes long. Expected exception - Invalid digest length")
+        lambda_contract.set_provider_data(
+            provider_id = provider_id_1,
+            provider_data = provider_document_short_digest
+        ).run(valid = False, sender = operator_A_address, exception = "Invalid digest length")
+
+        scenario.h4("Changing provider data from incorrect wallet address. Expected exception - Non-matching owner address")
+        lambda_contract.set_provider_data(
+            provider_id = provider_id_1,
+            provider_data = provider_document_A
+        ).run(valid = False, sender = operator_B_address, exception = "Non-matching owner address")
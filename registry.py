@@ -2,8 +2,24 @@
 
 import smartpy as sp
 
+# Provider data is either the provider document itself or, in the content-addressed
+# mode, the SHA-256 digest of the document and the URI it is served from
+def provider_data_type(content_addressed):
+    if content_addressed:
+        return sp.TRecord(digest = sp.TBytes, uri = sp.TString)
+
+    return sp.TString
+
+# Storage contracts of the logic contracts, resolved by sync_storage_contracts
+STORAGE_CONTRACTS_TYPE = sp.TRecord(
+    luw_storage_contract_address = sp.TAddress,
+    provider_storage_contract_address = sp.TAddress,
+)
+
 class Registry(sp.Contract):
-    def __init__(self, contract_addresses, certifier):
+    def __init__(self, contract_addresses, certifier, max_batch_size = 100, content_addressed = False):
+        self.provider_data_type = provider_data_type(content_addressed)
+
         self.init_type(
             sp.TRecord(
                 contracts = sp.TRecord(
@@ -11,6 +27,8 @@ class Registry(sp.Contract):
                     asset_twin_contract = sp.TAddress,
                     luw_contract = sp.TAddress,
                 ),
+                storage_contracts = sp.TOption(STORAGE_CONTRACTS_TYPE),
+                max_batch_size = sp.TNat,
                 certifier = sp.TAddress
             )
         )
@@ -20,6 +38,8 @@ class Registry(sp.Contract):
                 asset_twin_contract = contract_addresses.asset_twin_contract,
                 luw_contract = contract_addresses.luw_contract,
             ),
+            storage_contracts = sp.none,
+            max_batch_size = max_batch_size,
             certifier = certifier
         )
 
@@ -27,10 +47,10 @@ class Registry(sp.Contract):
     def create_asset_provider(self, provider_id, provider_data):
         # Defining the parameters' types
         sp.set_type(provider_id, sp.TString)
-        sp.set_type(provider_data, sp.TString)
+        sp.set_type(provider_data, self.provider_data_type)
 
         # Defining the data expected by the Logic contract
-        contract_data = sp.TRecord(provider_id = sp.TString, provider_data = sp.TString)
+        contract_data = sp.TRecord(provider_id = sp.TString, provider_data = self.provider_data_type)
 
         # Defining the Logic contract itself and its entry point for the call
         logic_contract = sp.contract(contract_data, self.data.contracts.asset_provider_contract, "create_asset_provider").open_some()
@@ -48,10 +68,10 @@ class Registry(sp.Contract):
     def set_provider_data(self, provider_id, provider_data):
         # Defining the parameters' types
         sp.set_type(provider_id, sp.TString)
-        sp.set_type(provider_data, sp.TString)
+        sp.set_type(provider_data, self.provider_data_type)
 
         # Defining the data expected by the Logic contract
-        contract_data = sp.TRecord(provider_id = sp.TString, provider_data = sp.TString)
+        contract_data = sp.TRecord(provider_id = sp.TString, provider_data = self.provider_data_type)
 
         # Defining the Logic contract itself and its entry point for the call
         logic_contract = sp.contract(contract_data, self.data.contracts.asset_provider_contract, "set_provider_data").open_some()
@@ -157,7 +177,7 @@ class Registry(sp.Contract):
             provider_id,
             t = sp.TRecord(
                 provider_id = sp.TString,
-                provider_data = sp.TString,
+                provider_data = self.provider_data_type,
                 creator_wallet_address = sp.TAddress,
                 status = sp.TString
             )
@@ -188,6 +208,31 @@ class Registry(sp.Contract):
         # Calling the Logic contract with the parameters we defined
         sp.transfer(params, sp.mutez(0), logic_contract)
 
+    @sp.entry_point
+    def register_asset_twins_batch(self, asset_twins):
+        # Defining the parameters' types
+        asset_twin_data = sp.TRecord(anchor_hash = sp.TString, provider_id = sp.TString, repo_end_point = sp.TString)
+        sp.set_type(asset_twins, sp.TList(asset_twin_data))
+
+        # Rejecting oversized batches before calling the Logic contract
+        sp.verify(sp.len(asset_twins) <= self.data.max_batch_size, message = "Batch size exceeds limit")
+
+        # Defining the Logic contract itself and its entry point for the call
+        logic_contract = sp.contract(sp.TList(asset_twin_data), self.data.contracts.asset_twin_contract, "register_asset_twins_batch").open_some()
+
+        # The whole batch is registered by a single call to the Logic contract
+        sp.transfer(asset_twins, sp.mutez(0), logic_contract)
+
+    @sp.entry_point
+    def set_max_batch_size(self, max_batch_size):
+        sp.set_type(max_batch_size, sp.TNat)
+
+        # Update is allowed only from certifier
+        with sp.if_(self.data.certifier != sp.source):
+            sp.failwith("Incorrect certifier")
+
+        self.data.max_batch_size = max_batch_size
+
     @sp.onchain_view()
     def fetch_asset_twin(self, parameters):
         # Defining the parameters' types
@@ -205,12 +250,39 @@ class Registry(sp.Contract):
             t = sp.TRecord(
                 asset_repository_endpoint = sp.TString,
                 creator_wallet_address = sp.TAddress,
-                registration_timestamps = sp.TList(sp.TTimestamp),
+                latest_registration = sp.TTimestamp,
+                registration_count = sp.TNat,
             )
         ).open_some("Invalid view");
         
         sp.result(asset_twin)
 
+    @sp.onchain_view()
+    def fetch_asset_twin_history(self, parameters):
+        # Defining the parameters' types
+        sp.set_type(parameters.anchor_hash, sp.TString)
+        sp.set_type(parameters.provider_id, sp.TString)
+        sp.set_type(parameters.offset, sp.TNat)
+        sp.set_type(parameters.limit, sp.TNat)
+
+        # Registration timestamps are returned one page at a time, indexed from the first registration
+        asset_twin_history = sp.view(
+            "fetch_asset_twin_history",
+            self.data.contracts.asset_twin_contract,
+            sp.record(
+                anchor_hash = parameters.anchor_hash,
+                provider_id = parameters.provider_id,
+                offset = parameters.offset,
+                limit = parameters.limit,
+            ),
+            t = sp.TMap(
+                sp.TNat,
+                sp.TTimestamp
+            )
+        ).open_some("Invalid view");
+
+        sp.result(asset_twin_history)
+
     @sp.entry_point
     def create_luw(self, provider_id, luw_service_endpoint):
         sp.set_type(provider_id, sp.TString)
@@ -293,21 +365,92 @@ class Registry(sp.Contract):
         # Calling the Storage contract with the parameters we defined
         sp.transfer(params, sp.mutez(0), luw_contract)
 
-    @sp.onchain_view()
-    def fetch_luw(self, luw_id):
-        # Defining the parameters' types
+    @sp.entry_point
+    def add_luw_repositories(self, luw_id, repository_ids):
         sp.set_type(luw_id, sp.TNat)
-        
+        sp.set_type(repository_ids, sp.TList(sp.TString))
+
+        # Rejecting oversized batches before calling the Logic contract
+        sp.verify(sp.len(repository_ids) <= self.data.max_batch_size, message = "Batch size exceeds limit")
+
+        # Defining the data expected by the Logic contract
+        data_schema = sp.TRecord(luw_id = sp.TNat, repository_ids = sp.TList(sp.TString))
+
+        # Defining the Logic contract itself and its entry point for the call
+        luw_contract = sp.contract(data_schema, self.data.contracts.luw_contract, "add_repositories").open_some()
+
+        # Defining the parameters that will be passed to the Logic contract
+        params = sp.record(
+            luw_id = luw_id,
+            repository_ids = repository_ids
+        )
+
+        # The whole batch is added by a single call to the Logic contract
+        sp.transfer(params, sp.mutez(0), luw_contract)
+
+    @sp.entry_point
+    def change_luw_repository_states(self, luw_id, repositories):
+        sp.set_type(luw_id, sp.TNat)
+        sp.set_type(repositories, sp.TList(sp.TRecord(repository_id = sp.TString, state_id = sp.TNat)))
+
+        # Rejecting oversized batches before calling the Logic contract
+        sp.verify(sp.len(repositories) <= self.data.max_batch_size, message = "Batch size exceeds limit")
+
+        # Defining the data expected by the Logic contract
+        data_schema = sp.TRecord(luw_id = sp.TNat, repositories = sp.TList(sp.TRecord(repository_id = sp.TString, state_id = sp.TNat)))
+
+        # Defining the Logic contract itself and its entry point for the call
+        luw_contract = sp.contract(data_schema, self.data.contracts.luw_contract, "change_repository_states").open_some()
+
+        # Defining the parameters that will be passed to the Logic contract
+        params = sp.record(
+            luw_id = luw_id,
+            repositories = repositories
+        )
+
+        # The whole batch is applied by a single call to the Logic contract
+        sp.transfer(params, sp.mutez(0), luw_contract)
+
+    @sp.entry_point
+    def commit_luw(self, luw_id):
+        sp.set_type(luw_id, sp.TNat)
+
+        # Defining the Logic contract itself and its entry point for the call
+        luw_contract = sp.contract(sp.TNat, self.data.contracts.luw_contract, "commit_luw").open_some()
+
+        # The LUW and all its repositories are committed by a single call to the Logic contract
+        sp.transfer(luw_id, sp.mutez(0), luw_contract)
+
+    @sp.entry_point
+    def abort_luw(self, luw_id):
+        sp.set_type(luw_id, sp.TNat)
+
+        # Defining the Logic contract itself and its entry point for the call
+        luw_contract = sp.contract(sp.TNat, self.data.contracts.luw_contract, "abort_luw").open_some()
+
+        # The LUW is aborted and all its repositories rolled back by a single call to the Logic contract
+        sp.transfer(luw_id, sp.mutez(0), luw_contract)
+
+    @sp.onchain_view()
+    def fetch_luw(self, parameters):
         # Defining the parameters' types
+        sp.set_type(parameters.luw_id, sp.TNat)
+        sp.set_type(parameters.offset, sp.TNat)
+        sp.set_type(parameters.limit, sp.TNat)
+
+        # The LUW header with one page of its state history and repositories
         luw = sp.view(
             "fetch_luw",
             self.data.contracts.luw_contract,
-            luw_id,
+            parameters,
             t = sp.TRecord(
                 luw_id = sp.TNat,
                 creator_wallet_address = sp.TAddress,
                 provider_id = sp.TString,
                 luw_service_endpoint = sp.TAddress,
+                active_state_id = sp.TNat,
+                state_count = sp.TNat,
+                repository_count = sp.TNat,
                 state_history = sp.TMap(
                     sp.TNat,
                     sp.TNat
@@ -321,6 +464,34 @@ class Registry(sp.Contract):
 
         sp.result(luw)
 
+    @sp.onchain_view()
+    def fetch_luw_decoded(self, luw_id):
+        # Defining the parameters' types
+        sp.set_type(luw_id, sp.TNat)
+
+        # Same LUW as fetch_luw, with state names instead of state IDs
+        luw = sp.view(
+            "fetch_luw_decoded",
+            self.data.contracts.luw_contract,
+            luw_id,
+            t = sp.TRecord(
+                luw_id = sp.TNat,
+                creator_wallet_address = sp.TAddress,
+                provider_id = sp.TString,
+                luw_service_endpoint = sp.TAddress,
+                state_history = sp.TMap(
+                    sp.TNat,
+                    sp.TString
+                ),
+                repository_endpoints = sp.TMap(
+                    sp.TString,
+                    sp.TString
+                ),
+            )
+        ).open_some("Invalid view");
+
+        sp.result(luw)
+
     @sp.onchain_view()
     def get_active_luw_state(self, luw_id):
         # Defining the parameters' types
@@ -354,8 +525,8 @@ class Registry(sp.Contract):
 
         sp.result(repository_state)
 
-    @sp.onchain_view()
-    def get_storage_contracts(self):
+    # Storage contracts as reported by the logic contracts themselves
+    def resolve_storage_contracts(self):
         luw_contract_address = sp.view(
             "get_storage_contract",
             self.data.contracts.luw_contract,
@@ -370,14 +541,37 @@ class Registry(sp.Contract):
             t = sp.TAddress
         ).open_some("Invalid view");
 
-        result = sp.record(
+        return sp.record(
             luw_storage_contract_address = luw_contract_address,
             provider_storage_contract_address = provider_contract_address,
+        )
+
+    @sp.entry_point
+    def sync_storage_contracts(self):
+        # Update is allowed only from certifier
+        with sp.if_(self.data.certifier != sp.source):
+            sp.failwith("Incorrect certifier")
+
+        # The addresses only change when contracts are linked again, so they are read once and kept
+        self.data.storage_contracts = sp.some(self.resolve_storage_contracts())
+
+    @sp.onchain_view()
+    def get_storage_contracts(self):
+        storage_contracts = self.data.storage_contracts.open_some("Storage contracts not synced")
+
+        result = sp.record(
+            luw_storage_contract_address = storage_contracts.luw_storage_contract_address,
+            provider_storage_contract_address = storage_contracts.provider_storage_contract_address,
             asset_twin_storage_contract_address = self.data.contracts.asset_twin_contract
         )
 
         sp.result(result)
 
+    @sp.onchain_view()
+    def verify_storage_contracts(self):
+        # False when the kept addresses are missing or differ from those of the logic contracts
+        sp.result(self.data.storage_contracts == sp.some(self.resolve_storage_contracts()))
+
 @sp.add_test(name = "Registry")
 def test():
 
@@ -390,4 +584,16 @@ def test():
             ),
             sp.address('tz1_certifier_address')
         )
+    )
+
+    sp.add_compilation_target("registryContentAddressed",
+        Registry(
+            sp.record(
+                asset_provider_contract = sp.address('KT1_contract_address'),
+                asset_twin_contract = sp.address('KT1_contract_address'),
+                luw_contract = sp.address('KT1_contract_address'),
+            ),
+            sp.address('tz1_certifier_address'),
+            content_addressed = True
+        )
     )
\ No newline at end of file
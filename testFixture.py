@@ -0,0 +1,221 @@
+# Test Fixture
+#
+# Accounts, test data and the deployed Registry topology shared by the scenario
+# modules. Every module deploys its own copy of the topology, so the modules do not
+# depend on each other and can run at the same time.
+
+import smartpy as sp
+
+provider_id_1 = "86a6c8f7-dc31-46ba-98fc-58bea40fc28d"
+provider_id_2 = "7f6fd42a-1927-4dd1-b32a-e87f4890d77a"
+
+asset_provider_data_A = "asset_provider_data_A"
+asset_provider_data_B = "asset_provider_data_B"
+
+hash_1 = "efb583d376b19d92d81e75bea335768d2b5cc9d60460c182cb6e66e8031b1aea"
+hash_2 = "fc2c0c139d5b71c45a339f91a81961904ec564d62ca3727e0679bef4193c7c7a"
+hash_3 = "5a1f3f0b5e7f0c63fb8f28b8f1de5b62a4a2a52b8ff3b1ac4f1e8e4e1f1b2c3d"
+
+repository_id_1 = "01add8a4-7302-490b-be57-cec2cd02f8da"
+repository_id_2 = "db161792-d5a9-434b-b0fc-5359f6d6460b"
+repository_id_3 = "6f1b2c3d-8a9e-4f70-b1c2-d3e4f5a6b7c8"
+
+class Accounts:
+    def __init__(self):
+        self.certifier = sp.test_account("Certifier")
+        self.operator_A = sp.test_account("Operator_A")
+        self.operator_B = sp.test_account("Operator_B")
+        self.offchain_coordinator = sp.test_account("Offchain_Coordinator")
+
+        self.certifier_address = self.certifier.address
+        self.operator_A_address = self.operator_A.address
+        self.operator_B_address = self.operator_B.address
+        self.offchain_coordinator_address = self.offchain_coordinator.address
+
+# The six contracts of the Registry topology, or five with the direct provider topology,
+# deployed and linked the same way in every scenario module
+class Topology:
+    def __init__(self, scenario, accounts, direct_provider = False, constant_tables = False):
+        ASSET_TWIN_TRACING = sp.io.import_stored_contract("assetTwinTracing.py")
+        LUW = sp.io.import_stored_contract("LUW.py")
+        LUW_REPOSITORY = sp.io.import_stored_contract("LUWRepository.py")
+        LAMBDA = sp.io.import_stored_contract("registry.py")
+
+        self.scenario = scenario
+        self.accounts = accounts
+
+        certifier_address = accounts.certifier_address
+
+        scenario.h1("Preparation")
+        scenario.table_of_contents()
+
+        scenario.h2("Accounts")
+        scenario.show([accounts.certifier, accounts.operator_A, accounts.operator_B])
+
+        scenario.h2("Contracts List")
+
+        if direct_provider:
+            # Asset Provider Direct Contract Instantiation, replacing the Asset Provider and its Repository
+
+            ASSET_PROVIDER_DIRECT = sp.io.import_stored_contract("assetProviderDirect.py")
+
+            scenario.h3("Asset Provider Direct")
+
+            self.asset_provider_direct = ASSET_PROVIDER_DIRECT.AssetProviderDirect(certifier_address, constant_tables = constant_tables)
+
+            scenario += self.asset_provider_direct
+
+            provider_contract = self.asset_provider_direct
+        else:
+            ASSET_PROVIDER = sp.io.import_stored_contract("assetProvider.py")
+            ASSET_PROVIDER_REPOSITORY = sp.io.import_stored_contract("assetProviderRepository.py")
+
+            # Asset Provider Contract Instantiation
+
+            scenario.h3("Asset Provider")
+
+            self.asset_provider = ASSET_PROVIDER.AssetProvider(certifier_address)
+
+            scenario += self.asset_provider
+
+            # Asset Provider Repository Contract Instantiation
+
+            scenario.h3("Asset Provider Repository")
+
+            self.asset_provider_repo = ASSET_PROVIDER_REPOSITORY.AssetProviderRepository(
+                self.asset_provider.address, certifier_address, constant_tables = constant_tables
+            )
+
+            scenario += self.asset_provider_repo
+
+            # Update logic contract address of the storage contract
+            scenario.h2("Updating storage contract with logic contract address for Asset Provider Repository")
+            self.asset_provider_repo.update_storage_contract_with_address().run(valid = True, sender = certifier_address)
+
+            provider_contract = self.asset_provider_repo
+
+        # Asset Twin Contract Instantiation
+
+        scenario.h3("Asset Twin Tracing")
+
+        self.asset_twin_tracing = ASSET_TWIN_TRACING.AssetTwinTracing(
+            certifier_address
+        )
+
+        scenario += self.asset_twin_tracing
+
+        # LUW Contract Instantiation
+
+        scenario.h3("LUW")
+
+        self.luw_contract = LUW.LUW(certifier_address)
+
+        scenario += self.luw_contract
+
+        # LUW Repository Contract Instantiation
+
+        scenario.h3("LUW Repository")
+
+        self.luw_repo_contract = LUW_REPOSITORY.LUWRepository(
+            self.luw_contract.address, certifier_address, constant_tables = constant_tables
+        )
+
+        scenario += self.luw_repo_contract
+
+        # Update logic contract address of the storage contract
+        scenario.h2("Updating storage contract with logic contract address for LUW Repository")
+        self.luw_repo_contract.update_storage_contract_with_address().run(valid = True, sender = certifier_address)
+
+        # Lambda Contract Instantiation
+
+        scenario.h3("Lambda Contract")
+
+        self.lambda_contract = LAMBDA.Registry(
+            sp.record(
+                asset_provider_contract = provider_contract.address,
+                asset_twin_contract = self.asset_twin_tracing.address,
+                luw_contract = self.luw_repo_contract.address,
+            ),
+            certifier_address
+        )
+
+        scenario += self.lambda_contract
+
+        # Update calling contract address of the asset twin contract to allow calls from the lambda contract
+
+        scenario.h2("Updating asset twin contract with calling contract address")
+        self.asset_twin_tracing.change_calling_contract_address(self.lambda_contract.address).run(valid = True, sender = certifier_address)
+
+        # Keep the storage contract addresses of the logic contracts in the lambda contract
+
+        scenario.h2("Syncing the storage contracts of the lambda contract")
+        self.lambda_contract.sync_storage_contracts().run(valid = True, sender = certifier_address)
+
+    #########
+    # Seeds #
+    #########
+
+    # The data the successful cases leave behind, for the modules that start from it
+
+    def create_asset_providers(self):
+        # Provider 1 is owned by Operator A, provider 2 by Operator B
+        self.lambda_contract.create_asset_provider(
+            provider_id = provider_id_1,
+            provider_data = asset_provider_data_A
+        ).run(valid = True, sender = self.accounts.operator_A_address)
+        self.lambda_contract.create_asset_provider(
+            provider_id = provider_id_2,
+            provider_data = asset_provider_data_B
+        ).run(valid = True, sender = self.accounts.operator_B_address)
+
+    def register_asset_twins(self):
+        # Hash 1 with both providers, hash 1 and provider 1 twice, hash 2 with provider 1
+        # and, in one batch, hash 3 with both providers
+        self.lambda_contract.register_asset_twin(
+            anchor_hash = hash_1, provider_id = provider_id_1, repo_end_point = "end_point_1"
+        ).run(valid = True, sender = self.accounts.operator_A_address)
+        self.lambda_contract.register_asset_twin(
+            anchor_hash = hash_1, provider_id = provider_id_2, repo_end_point = "end_point_1"
+        ).run(valid = True, sender = self.accounts.operator_A_address)
+        self.lambda_contract.register_asset_twin(
+            anchor_hash = hash_2, provider_id = provider_id_1, repo_end_point = "end_point_2"
+        ).run(valid = True, sender = self.accounts.operator_B_address)
+        self.lambda_contract.register_asset_twin(
+            anchor_hash = hash_1, provider_id = provider_id_1, repo_end_point = "end_point_1"
+        ).run(valid = True, sender = self.accounts.operator_A_address)
+
+        self.lambda_contract.register_asset_twins_batch([
+            sp.record(anchor_hash = hash_3, provider_id = provider_id_1, repo_end_point = "end_point_3"),
+            sp.record(anchor_hash = hash_3, provider_id = provider_id_2, repo_end_point = "end_point_3"),
+        ]).run(valid = True, sender = self.accounts.operator_B_address)
+
+    def create_luws(self):
+        # All owned by Operator A:
+        # LUW 0 in prepare_to_commit, with repository 1 ready and repository 2 open
+        # LUW 1 active, with repositories 1 and 3 ready and repository 2 open
+        # LUW 2 committed, with repositories 1 and 2 committed
+        luw_record = sp.record(
+            provider_id = "provider_id",
+            luw_service_endpoint = self.accounts.offchain_coordinator_address,
+        )
+
+        operator_A_address = self.accounts.operator_A_address
+
+        for luw_id, repository_ids, ready_repository_ids in [
+            (0, [repository_id_1, repository_id_2], [repository_id_1]),
+            (1, [repository_id_1, repository_id_2, repository_id_3], [repository_id_1, repository_id_3]),
+            (2, [repository_id_1, repository_id_2], [repository_id_1, repository_id_2]),
+        ]:
+            self.lambda_contract.create_luw(luw_record).run(valid = True, sender = operator_A_address)
+            self.lambda_contract.add_luw_repositories(
+                luw_id = luw_id,
+                repository_ids = repository_ids
+            ).run(valid = True, sender = operator_A_address)
+            self.lambda_contract.change_luw_repository_states(
+                luw_id = luw_id,
+                repositories = [sp.record(repository_id = repository_id, state_id = 2) for repository_id in ready_repository_ids]
+            ).run(valid = True, sender = operator_A_address)
+
+        self.lambda_contract.change_luw_state(luw_id = 0, state_id = 2).run(valid = True, sender = operator_A_address)
+        self.lambda_contract.change_luw_state(luw_id = 2, state_id = 2).run(valid = True, sender = operator_A_address)
+        self.lambda_contract.commit_luw(2).run(valid = True, sender = operator_A_address)